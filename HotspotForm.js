@@ -40,10 +40,31 @@ export default function HotspotAnalysis() {
   const [result, setResult] = useState(null);
   const [mapUrl, setMapUrl] = useState("");
   const [showMap, setShowMap] = useState(false);
+  const [place, setPlace] = useState("");
+  const [placeSuggestions, setPlaceSuggestions] = useState([]);
 
   // Backend URL
   const BASE_URL = "http://127.0.0.1:5000";
 
+  // 🔎 Place search: picking a city, state or hotspot fills in its coordinates
+  const handlePlaceChange = async (e) => {
+    const value = e.target.value;
+    setPlace(value);
+    const match = placeSuggestions.find(p => `${p.name} (${p.kind})` === value);
+    if (match) {
+      setLatitude(String(match.latitude));
+      setLongitude(String(match.longitude));
+      return;
+    }
+    if (value.trim().length < 2) return;
+    try {
+      const response = await axios.get(`${BASE_URL}/autocomplete`, { params: { q: value, limit: 8 } });
+      setPlaceSuggestions(response.data.results || []);
+    } catch (error) {
+      setPlaceSuggestions([]);
+    }
+  };
+
   // 🔍 Analyze Hotspot Risk (Text Info)
   const handleHotspotAnalysis = async () => {
     if (!latitude || !longitude) {
@@ -122,6 +143,24 @@ export default function HotspotAnalysis() {
         <motion.div style={{
           display:"flex",gap:20,justifyContent:"center",flexWrap:"wrap",marginBottom:"14px"
         }}>
+          <motion.div whileFocus={{scale:1.08}}>
+            <label style={{color:ACCENT4,fontWeight:600,marginBottom:4,display:"block"}}>
+              <FaSearchLocation style={{marginRight:6,verticalAlign:"-3px"}}/>
+              Place
+            </label>
+            <input
+              type="text"
+              list="place-suggestions"
+              autoComplete="off"
+              style={inputStyle}
+              placeholder="e.g., Hyderabad"
+              value={place}
+              onChange={handlePlaceChange}
+            />
+            <datalist id="place-suggestions">
+              {placeSuggestions.map(p => (<option key={`${p.kind}-${p.name}`} value={`${p.name} (${p.kind})`} />))}
+            </datalist>
+          </motion.div>
           <motion.div whileFocus={{scale:1.08}}>
             <label style={{color:ACCENT1,fontWeight:600,marginBottom:4,display:"block"}}>
               <FaMapPin style={{marginRight:6,verticalAlign:"-3px"}}/>
@@ -203,8 +203,25 @@ export default function PredictionPage() {
   });
   const [loading, setLoading] = useState(false);
   const [focusField, setFocusField] = useState(null);
+  const [citySuggestions, setCitySuggestions] = useState([]);
   const navigate = useNavigate();
 
+  // City names come from the backend gazetteer (training cities, with their state and coordinates)
+  const handleCityChange = async (e) => {
+    const { value } = e.target;
+    const match = citySuggestions.find(s => s.name === value);
+    setFormData(prev => match
+      ? { ...prev, "City Name": match.name, "State Name": match.state, latitude: match.latitude, longitude: match.longitude }
+      : { ...prev, "City Name": value });
+    if (match || value.trim().length < 2) return;
+    try {
+      const res = await API.get("/autocomplete", { params: { q: value, kind: "city", limit: 8 } });
+      setCitySuggestions(res.data.results || []);
+    } catch (err) {
+      setCitySuggestions([]);
+    }
+  };
+
   const handleChange = (e) => {
     const { name, value } = e.target;
     let val = value;
@@ -299,23 +316,30 @@ export default function PredictionPage() {
                 onBlur={handleBlur}
               >
                 {stateOptions.map(opt => (<option key={opt.label} value={opt.label}>{opt.label}</option>))}
+                {!stateOptions.some(opt => opt.value === formData["State Name"]) && (
+                  <option value={formData["State Name"]}>{formData["State Name"]}</option>
+                )}
               </motion.select>
             </div>
             <div>
               <label style={{color: ACCENT2, fontWeight: 600, marginBottom: 3, display: "block"}}>City</label>
-              <motion.select
+              <motion.input
                 name="City Name"
+                list="city-suggestions"
+                autoComplete="off"
                 value={formData["City Name"]}
                 style={{
-                  ...styles.select,
-                  ...(focusField === "City Name" ? styles.selectFocus : {})
+                  ...styles.input,
+                  ...(focusField === "City Name" ? styles.inputFocus : {})
                 }}
-                onChange={handleChange}
+                onChange={handleCityChange}
                 onFocus={() => handleFocus("City Name")}
                 onBlur={handleBlur}
-              >
-                {cityOptions.map(opt => (<option key={opt.label} value={opt.label}>{opt.label}</option>))}
-              </motion.select>
+              />
+              <datalist id="city-suggestions">
+                {(citySuggestions.length ? citySuggestions.map(s => s.name) : cityOptions.map(opt => opt.label))
+                  .map(name => (<option key={name} value={name} />))}
+              </datalist>
             </div>
           </div>
           {/* Road/Weather */}
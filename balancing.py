@@ -0,0 +1,153 @@
+import hashlib
+import os
+
+import numpy as np
+
+
+BALANCING_METHODS = ['smote', 'smote-index', 'class-weight', 'sample-weight', 'none']
+
+
+def data_fingerprint(X, y, **params):
+    """Stable hash of the training data and balancing parameters, used as the cache key"""
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(np.asarray(X, dtype=np.float64)).tobytes())
+    h.update(np.ascontiguousarray(np.asarray(y, dtype=np.int64)).tobytes())
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()[:16]
+
+
+class SmoteIndex:
+    """
+    Synthetic minority samples stored as (base row, neighbor row, gap) triples
+    Memory scales with the number of synthetic rows times 13 bytes, not with the feature count
+    Training uses row_weights(), so the oversampled matrix is never built
+    """
+
+    def __init__(self, base, neighbor, gap, labels):
+        self.base = base
+        self.neighbor = neighbor
+        self.gap = gap
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.base)
+
+    @property
+    def nbytes(self):
+        return self.base.nbytes + self.neighbor.nbytes + self.gap.nbytes + self.labels.nbytes
+
+    def materialize(self, X):
+        """Synthetic feature rows for the original training matrix X"""
+        X = np.asarray(X, dtype=np.float64)
+        base = X[self.base]
+        return base + self.gap[:, None] * (X[self.neighbor] - base)
+
+    def row_weights(self, n_rows):
+        """
+        Sample weight per original row: 1 plus its share of every synthetic row it spans
+        (1 - gap to the base row, gap to the neighbor), so each class weighs as much as the oversampled set
+        Trees then see the minority mass on the real rows SMOTE interpolates between instead of on new points
+        """
+        gap = self.gap.astype(np.float64)
+        return (1.0 + np.bincount(self.base, weights=1.0 - gap, minlength=n_rows)
+                + np.bincount(self.neighbor, weights=gap, minlength=n_rows))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(path, base=self.base, neighbor=self.neighbor, gap=self.gap, labels=self.labels)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data['base'], data['neighbor'], data['gap'], data['labels'])
+
+
+def fit_smote_index(X, y, k_neighbors=5, random_state=42):
+    """
+    SMOTE that oversamples every class up to the majority count using a KD-tree per class
+    Returns a SmoteIndex referencing rows of X instead of a materialized copy
+    """
+    from sklearn.neighbors import KDTree
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    rng = np.random.default_rng(random_state)
+    classes, counts = np.unique(y, return_counts=True)
+    target = counts.max()
+
+    parts = []
+    for cls, count in zip(classes, counts):
+        n_new = int(target - count)
+        if n_new == 0:
+            continue
+        rows = np.flatnonzero(y == cls)
+        k = min(k_neighbors, len(rows) - 1)
+        if k < 1:
+            raise ValueError(f'Class {cls} has too few samples for SMOTE')
+        tree = KDTree(X[rows])
+        _, nn = tree.query(X[rows], k=k + 1)
+        pick = rng.integers(0, len(rows), n_new)
+        which = rng.integers(1, k + 1, n_new)
+        parts.append((
+            rows[pick].astype(np.int32),
+            rows[nn[pick, which]].astype(np.int32),
+            rng.random(n_new).astype(np.float32),
+            np.full(n_new, cls, dtype=np.int8)
+        ))
+
+    if not parts:
+        empty = np.empty(0, dtype=np.int32)
+        return SmoteIndex(empty, empty, np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int8))
+    return SmoteIndex(*(np.concatenate(arrays) for arrays in zip(*parts)))
+
+
+def balance_training_set(X_train, y_train, method='smote', k_neighbors=5, random_state=42,
+                         cache_dir='cache/balancing'):
+    """
+    Apply the selected class-balancing strategy
+    Returns (X_balanced, y_balanced, sample_weight or None, info dict)
+    smote / smote-index results are cached on disk keyed by data hash, seed and k
+    smote-index returns the original rows with SmoteIndex.row_weights(), memory stays at one weight per row
+    """
+    import pandas as pd
+
+    info = {'method': method, 'original_rows': len(X_train), 'cache_hit': False}
+
+    if method == 'none':
+        return X_train, y_train, None, dict(info, rows=len(X_train))
+
+    if method in ('class-weight', 'sample-weight'):
+        from sklearn.utils.class_weight import compute_sample_weight
+        weights = compute_sample_weight('balanced', y_train)
+        return X_train, y_train, weights, dict(info, rows=len(X_train))
+
+    key = data_fingerprint(X_train, y_train, method=method, k=k_neighbors, seed=random_state)
+    cache_path = os.path.join(cache_dir, f'{method}_{key}.npz') if cache_dir else None
+    info['cache_key'] = key
+
+    if method == 'smote-index':
+        if cache_path and os.path.exists(cache_path):
+            index = SmoteIndex.load(cache_path)
+            info['cache_hit'] = True
+        else:
+            index = fit_smote_index(X_train, y_train, k_neighbors, random_state)
+            if cache_path:
+                index.save(cache_path)
+        weights = index.row_weights(len(X_train))
+        return X_train, y_train, weights, dict(info, rows=len(X_train), synthetic_rows=len(index),
+                                               index_bytes=index.nbytes)
+
+    if method == 'smote':
+        if cache_path and os.path.exists(cache_path):
+            data = np.load(cache_path)
+            X_bal = pd.DataFrame(data['X'], columns=X_train.columns)
+            y_bal = pd.Series(data['y'], name=y_train.name)
+            return X_bal, y_bal, None, dict(info, rows=len(X_bal), cache_hit=True)
+        from imblearn.over_sampling import SMOTE
+        X_bal, y_bal = SMOTE(random_state=random_state, k_neighbors=k_neighbors).fit_resample(X_train, y_train)
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.savez(cache_path, X=X_bal.to_numpy(), y=y_bal.to_numpy())
+        return X_bal, y_bal, None, dict(info, rows=len(X_bal))
+
+    raise ValueError(f'Unknown balancing method: {method}')
@@ -0,0 +1,115 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from chunked_io import process_file
+from feature_engineering import CLEANED_DATA_SCHEMA, REPORT_FIELD_ALIASES
+
+
+_model = None
+_feature_names = None
+_severity_mapping = None
+_feature_engineer = None
+
+
+def _init_worker(model_path, features_path, mapping_path, encoders_path=None, cleaned_csv=None):
+    """Load the model artifacts and the training label encoders once per worker process"""
+    import joblib
+    from ingest import load_feature_engineer
+    global _model, _feature_names, _severity_mapping, _feature_engineer
+    _model = joblib.load(model_path)
+    _feature_names = joblib.load(features_path)
+    _severity_mapping = joblib.load(mapping_path)
+    _feature_engineer = load_feature_engineer(encoders_path, cleaned_csv)
+
+
+def engineer_features(df, feature_engineer, dayfirst=False):
+    """
+    Model features for raw cleaned_data.csv-style records, built by FeatureEngineer.transform with the saved
+    encoders (the pipeline that produced featured_data.csv); absent columns are treated as missing values
+    """
+    frame = df.rename(columns={k: v for k, v in REPORT_FIELD_ALIASES.items() if v not in df.columns})
+    for col in CLEANED_DATA_SCHEMA:
+        if col not in frame.columns and col != 'Accident Severity':
+            frame[col] = np.nan
+    frame['datetime'] = pd.to_datetime(frame['datetime'], errors='coerce', dayfirst=dayfirst, format='mixed')
+    return feature_engineer.transform(frame)
+
+
+def score_chunk(df, feature_source='auto', dayfirst=False, keep_columns=None,
+                model=None, feature_names=None, severity_mapping=None, feature_engineer=None):
+    """
+    Predict severity and class probabilities for a chunk of accident records
+    feature_source: 'precomputed' uses the engineered columns already in the data (featured_data.csv),
+                    'raw' rebuilds them with FeatureEngineer.transform, 'auto' picks precomputed when present
+    """
+    model = model or _model
+    feature_names = feature_names or _feature_names
+    severity_mapping = severity_mapping or _severity_mapping
+    feature_engineer = feature_engineer or _feature_engineer
+
+    precomputed = all(f in df.columns for f in feature_names)
+    if feature_source == 'precomputed' or (feature_source == 'auto' and precomputed):
+        X = df[feature_names].astype(np.float64)
+    else:
+        X = engineer_features(df, feature_engineer, dayfirst)[feature_names].astype(np.float64)
+
+    proba = model.predict_proba(X)
+    classes = np.asarray(model.classes_)
+    codes = classes[proba.argmax(axis=1)]
+
+    out = df[keep_columns].copy() if keep_columns else pd.DataFrame(index=df.index)
+    out['pred_severity_code'] = codes.astype(np.int64)
+    out['pred_severity'] = pd.Series(codes).map(severity_mapping).values
+    out['pred_probability'] = proba.max(axis=1).astype(np.float32)
+    for j, cls in enumerate(classes):
+        out[f"proba_{severity_mapping.get(int(cls), cls)}"] = proba[:, j].astype(np.float32)
+    return out.reset_index(drop=True)
+
+
+def _score_in_worker(df, feature_source, dayfirst, keep_columns):
+    return score_chunk(df, feature_source, dayfirst, keep_columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline batch severity scoring of accident records')
+    parser.add_argument('input', help='CSV or Parquet accident records (e.g. featured_data.csv)')
+    parser.add_argument('output', help='Output file, .parquet recommended')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--model-file', default='best_model.joblib',
+                        help='Model artifact in --model-dir, e.g. compressed_model.joblib')
+    parser.add_argument('--feature-source', choices=['auto', 'precomputed', 'raw'], default='auto')
+    parser.add_argument('--keep', nargs='*', default=None,
+                        help='Input columns copied to the output (e.g. datetime target)')
+    parser.add_argument('--encoders', default=None,
+                        help='Label encoders saved by FeatureEngineer.save (default: <model-dir>/feature_columns.joblib)')
+    parser.add_argument('--cleaned-data', default='cleaned_data.csv',
+                        help='Refit the encoders from this file when --encoders does not exist')
+    parser.add_argument('--dayfirst', action='store_true', help='Parse raw datetimes day-first (e.g. 17-04-2020)')
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    model_path = os.path.join(args.model_dir, args.model_file)
+    features_path = os.path.join(args.model_dir, 'feature_names.joblib')
+    mapping_path = os.path.join(args.model_dir, 'severity_mapping.joblib')
+    encoders_path = args.encoders or os.path.join(args.model_dir, 'feature_columns.joblib')
+
+    print("\n📦 BATCH SEVERITY SCORING")
+    print(f"   Input: {args.input}")
+    print(f"   Model: {model_path}")
+    print(f"   Output: {args.output}")
+    result = process_file(
+        args.input, args.output, _score_in_worker,
+        args=(args.feature_source, args.dayfirst, args.keep),
+        initializer=_init_worker, initargs=(model_path, features_path, mapping_path, encoders_path, args.cleaned_data),
+        chunksize=args.chunksize, workers=args.workers
+    )
+    print(f"\n✅ Scored {result['rows']:,} rows in {result['seconds']}s ({result['rows_per_sec']:,} rows/sec)\n")
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must not be pulled in just by importing the API / spatial module
+HEAVY_MODULES = ['pandas', 'folium', 'branca', 'sklearn', 'sklearn.cluster', 'joblib', 'xgboost', 'matplotlib']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+import_seconds = time.perf_counter() - start
+heavy_loaded = [m for m in {heavy!r} if m in sys.modules]
+load_seconds = None
+if {load} and hasattr({module}, 'load_resources'):
+    start = time.perf_counter()
+    {module}.load_resources()
+    load_seconds = time.perf_counter() - start
+print(json.dumps({{
+    'import_seconds': import_seconds,
+    'load_seconds': load_seconds,
+    'heavy_loaded': heavy_loaded
+}}))
+"""
+
+
+def measure(module, runs=5, load=False):
+    """Import a module in fresh interpreters and collect timings"""
+    samples = []
+    for _ in range(runs):
+        code = PROBE.format(module=module, load=load, heavy=HEAVY_MODULES)
+        out = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    import_times = [s['import_seconds'] for s in samples]
+    load_times = [s['load_seconds'] for s in samples if s['load_seconds'] is not None]
+    return {
+        'module': module,
+        'import_median_ms': round(statistics.median(import_times) * 1000, 1),
+        'import_max_ms': round(max(import_times) * 1000, 1),
+        'load_median_ms': round(statistics.median(load_times) * 1000, 1) if load_times else None,
+        'heavy_loaded': samples[-1]['heavy_loaded']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cold-start import benchmark for the API modules')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1500.0,
+                        help='Fail if the median import time of a module exceeds this')
+    parser.add_argument('--load', action='store_true',
+                        help='Also time load_resources() (needs MODEL_DIR / HOTSPOTS_CSV)')
+    args = parser.parse_args(argv)
+
+    print("\n⏱️  STARTUP BENCHMARK")
+    failures = []
+    for module in ['spatial_analysis', 'prediction_api']:
+        result = measure(module, args.runs, args.load)
+        print(f"   {module:18s} import median {result['import_median_ms']:8.1f} ms | "
+              f"max {result['import_max_ms']:8.1f} ms | load {result['load_median_ms']} ms")
+        if result['heavy_loaded']:
+            failures.append(f"{module} imports heavy modules eagerly: {', '.join(result['heavy_loaded'])}")
+        if result['import_median_ms'] > args.budget_ms:
+            failures.append(f"{module} import {result['import_median_ms']} ms > budget {args.budget_ms} ms")
+
+    for failure in failures:
+        print(f"   ❌ {failure}")
+    if not failures:
+        print("   ✅ Within startup budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
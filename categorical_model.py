@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.utils.class_weight import compute_sample_weight
+
+from compress_model import evaluate
+from report_model import save_json
+
+
+# Label-coded location columns with too many arbitrary codes to split on as numbers
+HIGH_CARDINALITY = ('City Name_enc', 'State Name_enc')
+
+# HistGradientBoosting only takes categorical codes below max_bins
+HGB_MAX_CATEGORIES = 255
+
+
+def target_encode_oof(codes, y, n_categories, n_splits=5, smoothing=20.0, random_state=42):
+    """
+    Smoothed mean target per code: out-of-fold values for the training rows (a row never sees its own label)
+    and the full-data table used at serving time. Returns (oof values, table indexed by code, prior)
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    y = np.asarray(y, dtype=np.float64)
+    prior = float(y.mean())
+
+    def table(rows):
+        sums = np.bincount(codes[rows], weights=y[rows], minlength=n_categories)
+        counts = np.bincount(codes[rows], minlength=n_categories)
+        return (sums + smoothing * prior) / (counts + smoothing)
+
+    oof = np.empty(len(codes))
+    for fit_rows, enc_rows in KFold(n_splits, shuffle=True, random_state=random_state).split(codes):
+        oof[enc_rows] = table(fit_rows)[codes[enc_rows]]
+    return oof, table(np.arange(len(codes))), prior
+
+
+class EncodedModel:
+    """
+    A model trained on re-encoded location columns, served from the usual label-coded feature frame
+    target_maps: column -> mean target per label code (target encoding)
+    category_counts: column -> number of known codes (native categories); unseen codes become missing
+    """
+
+    def __init__(self, model, feature_names, target_maps=None, priors=None, category_counts=None):
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.target_maps = target_maps or {}
+        self.priors = priors or {}
+        self.category_counts = category_counts or {}
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
+    @property
+    def feature_importances_(self):
+        return self.model.feature_importances_
+
+    def prepare(self, X):
+        """Label-coded feature rows -> the encoding the inner model was trained on (same column order)"""
+        values = np.array(X[self.feature_names] if hasattr(X, 'columns') else X, dtype=np.float64)
+        for col, table in self.target_maps.items():
+            j = self.feature_names.index(col)
+            codes = values[:, j]
+            known = (codes >= 0) & (codes < len(table))
+            values[:, j] = np.where(known, table[np.where(known, codes, 0).astype(np.int64)], self.priors[col])
+        for col, n in self.category_counts.items():
+            j = self.feature_names.index(col)
+            values[~((values[:, j] >= 0) & (values[:, j] < n)), j] = np.nan
+        return pd.DataFrame(values, columns=self.feature_names)
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self.prepare(X))
+
+    def predict(self, X):
+        return self.model.predict(self.prepare(X))
+
+
+def tree_stats(model):
+    """Total node count and mean per-tree depth of a tree ensemble (RandomForest, XGBoost, HistGradientBoosting)"""
+    model = getattr(model, 'model', model)
+    if hasattr(model, 'get_booster'):
+        def walk(node, depth):
+            children = node.get('children', [])
+            counts = [walk(c, depth + 1) for c in children]
+            return 1 + sum(n for n, _ in counts), max([d for _, d in counts], default=depth)
+        trees = [walk(json.loads(dump), 0) for dump in model.get_booster().get_dump(dump_format='json')]
+        return {'nodes': int(sum(n for n, _ in trees)), 'mean_depth': round(float(np.mean([d for _, d in trees])), 2)}
+    if hasattr(model, 'estimators_'):
+        trees = [est.tree_ for est in np.ravel(model.estimators_)]
+        return {'nodes': int(sum(t.node_count for t in trees)),
+                'mean_depth': round(float(np.mean([t.max_depth for t in trees])), 2)}
+    if hasattr(model, '_predictors'):
+        predictors = [p for iteration in model._predictors for p in iteration]
+        return {'nodes': int(sum(len(p.nodes) for p in predictors)),
+                'mean_depth': round(float(np.mean([p.nodes['depth'].max() for p in predictors])), 2)}
+    return {'nodes': None, 'mean_depth': None}
+
+
+def reference_estimator(model, threads=-1):
+    """Unfitted copy of the served model's family and parameters (fixed rounds for early-stopped XGBoost)"""
+    estimator = clone(model)
+    if hasattr(model, 'get_booster'):
+        best = getattr(model, 'best_iteration', None)
+        estimator.set_params(n_estimators=best + 1 if best is not None else model.n_estimators,
+                             early_stopping_rounds=None)
+    return estimator.set_params(n_jobs=threads) if 'n_jobs' in estimator.get_params() else estimator
+
+
+def fit_timed(estimator, X, y):
+    """Fit with balanced classes (class_weight when the estimator has it, else sample weights); returns seconds"""
+    fit_params = {} if estimator.get_params().get('class_weight') else {'sample_weight': compute_sample_weight('balanced', y)}
+    start = time.perf_counter()
+    estimator.fit(X, y, **fit_params)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark categorical encodings of the location columns against the served model')
+    parser.add_argument('--data', default='ai-traffic-prediction-backend/data/processed/featured_data.csv')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--columns', nargs='*', default=list(HIGH_CARDINALITY),
+                        help='High-cardinality label-coded columns to re-encode')
+    parser.add_argument('--folds', type=int, default=5, help='Out-of-fold splits for target encoding')
+    parser.add_argument('--smoothing', type=float, default=20.0, help='Target encoding prior weight (rows)')
+    parser.add_argument('--max-f1-drop', type=float, default=0.0,
+                        help='Publish the smallest candidate whose weighted F1 is within this of the served model')
+    parser.add_argument('--threads', type=int, default=-1)
+    args = parser.parse_args(argv)
+
+    print("\n🏷️  CATEGORICAL ENCODING CANDIDATES")
+    model = joblib.load(os.path.join(args.model_dir, 'best_model.joblib'))
+    feature_cols = joblib.load(os.path.join(args.model_dir, 'feature_names.joblib'))
+    columns = [c for c in args.columns if c in feature_cols]
+
+    # Same split as retrain_model.py
+    df = pd.read_csv(args.data)
+    X = df[feature_cols].fillna(df[feature_cols].mean())
+    y = df['target']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    y_train = y_train.to_numpy()
+    category_counts = {c: int(X[c].max()) + 1 for c in feature_cols if c.endswith('_enc')}
+    for c in columns:
+        print(f"   {c}: {X[c].nunique():,} distinct codes")
+
+    # Target encoding: out-of-fold values for training, full-training tables for the test rows and serving
+    X_train_te = X_train.copy()
+    target_maps, priors = {}, {}
+    for c in columns:
+        X_train_te[c], target_maps[c], priors[c] = target_encode_oof(
+            X_train[c], y_train, category_counts[c], args.folds, args.smoothing)
+
+    family = type(model).__name__
+    candidates, timings = [], {}
+
+    print(f"   Refitting {family} on label codes (reference)...")
+    reference = reference_estimator(model, args.threads)
+    timings['label_codes'] = fit_timed(reference, X_train, y_train)
+    candidates.append(('label_codes', reference))
+
+    print(f"   Fitting {family} on out-of-fold target encoding...")
+    target_model = reference_estimator(model, args.threads)
+    timings['target_encoded'] = fit_timed(target_model, X_train_te, y_train)
+    candidates.append(('target_encoded', EncodedModel(target_model, feature_cols, target_maps, priors)))
+
+    print("   Fitting XGBoost with native categorical splits...")
+    from xgboost import XGBClassifier
+    X_native = X_train.copy()
+    for c, n in category_counts.items():
+        X_native[c] = pd.Categorical(X_native[c].astype(int), categories=range(n))
+    X_fit, X_val, y_fit, y_val = train_test_split(X_native, y_train, test_size=0.15, random_state=42, stratify=y_train)
+    xgb_native = XGBClassifier(n_estimators=1000, early_stopping_rounds=30, max_depth=8, learning_rate=0.1,
+                               gamma=0.1, subsample=0.9, colsample_bytree=0.9, tree_method='hist',
+                               enable_categorical=True, max_cat_to_onehot=4, random_state=42,
+                               n_jobs=args.threads, eval_metric='mlogloss', verbosity=0)
+    start = time.perf_counter()
+    xgb_native.fit(X_fit, y_fit, sample_weight=compute_sample_weight('balanced', y_fit),
+                   eval_set=[(X_val, y_val)], sample_weight_eval_set=[compute_sample_weight('balanced', y_val)],
+                   verbose=False)
+    timings['xgb_native_categorical'] = time.perf_counter() - start
+    # Categorical trees predict from plain numeric codes; the wrapper only turns unseen codes into missing values
+    candidates.append(('xgb_native_categorical', EncodedModel(xgb_native, feature_cols, category_counts=category_counts)))
+
+    print("   Fitting HistGradientBoosting with native categories...")
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    hgb_categorical = [c for c, n in category_counts.items() if n <= HGB_MAX_CATEGORIES]
+    hgb_targets = [c for c in columns if c not in hgb_categorical]
+    hgb = HistGradientBoostingClassifier(categorical_features=[c in hgb_categorical for c in feature_cols],
+                                         class_weight='balanced', early_stopping=True, random_state=42)
+    timings['hgb_native_categorical'] = fit_timed(hgb, X_train_te[feature_cols].assign(
+        **{c: X_train[c] for c in hgb_categorical}), y_train)
+    candidates.append(('hgb_native_categorical', EncodedModel(
+        hgb, feature_cols, {c: target_maps[c] for c in hgb_targets}, {c: priors[c] for c in hgb_targets},
+        {c: category_counts[c] for c in hgb_categorical})))
+
+    baseline = dict(evaluate('served', model, X_test, y_test, X_test), **tree_stats(model), fit_seconds=None)
+    results = [baseline]
+    for name, candidate in candidates:
+        results.append(dict(evaluate(name, candidate, X_test, y_test, X_test), **tree_stats(candidate),
+                            fit_seconds=round(timings[name], 2)))
+    for r in results:
+        r['f1_delta'] = round(r['f1_weighted'] - baseline['f1_weighted'], 4)
+        r['size_ratio'] = round(r['size_bytes'] / baseline['size_bytes'], 4)
+
+    print(f"\n   ┌────────────────────────┬──────────┬──────────┬───────────┬────────────┬───────┬─────────┬───────────┐")
+    print(f"   │ Candidate              │ Accuracy │ F1 Δ     │ Size (MB) │ Nodes      │ Depth │ Fit s   │ 1 row ms  │")
+    print(f"   ├────────────────────────┼──────────┼──────────┼───────────┼────────────┼───────┼─────────┼───────────┤")
+    for r in results:
+        fit = f"{r['fit_seconds']:7.1f}" if r['fit_seconds'] is not None else '      -'
+        print(f"   │ {r['name']:22s} │ {r['accuracy']:8.4f} │ {r['f1_delta']:+8.4f} │ {r['size_bytes'] / 1024 / 1024:9.2f} │ "
+              f"{r['nodes']:10,} │ {r['mean_depth']:5.1f} │ {fit} │ {r['single_row_ms']:9.3f} │")
+    print(f"   └────────────────────────┴──────────┴──────────┴───────────┴────────────┴───────┴─────────┴───────────┘")
+
+    # label_codes is only the like-for-like reference; HistGradientBoosting has no explainer support
+    publishable = {'target_encoded', 'xgb_native_categorical'}
+    eligible = [(r, m) for r, (name, m) in zip(results[1:], candidates)
+                if name in publishable and r['f1_delta'] >= -args.max_f1_drop]
+    selected = min(eligible, key=lambda rm: rm[0]['size_bytes']) if eligible else None
+    report = {'baseline': baseline, 'candidates': results[1:], 'columns': columns, 'folds': args.folds,
+              'smoothing': args.smoothing, 'max_f1_drop': args.max_f1_drop,
+              'selected': selected[0]['name'] if selected else None}
+
+    if selected:
+        joblib.dump(selected[1], os.path.join(args.model_dir, 'categorical_model.joblib'))
+        print(f"\n   🏆 Published categorical_model.joblib: {selected[0]['name']} "
+              f"({selected[0]['size_ratio']:.1%} of served size, F1 Δ {selected[0]['f1_delta']:+.4f})")
+    else:
+        print(f"\n   ⚠️  No candidate within F1 drop {args.max_f1_drop}; categorical model not published")
+    save_json(report, os.path.join(args.model_dir, 'categorical_report.json'))
+    print("   ✓ Report saved: categorical_report.json\n")
+    return report
+
+
+if __name__ == '__main__':
+    # Run from the imported module so the published EncodedModel pickles as categorical_model.EncodedModel
+    from categorical_model import main
+    main()
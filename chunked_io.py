@@ -0,0 +1,106 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+
+def is_parquet(path):
+    """True for .parquet / .pq paths"""
+    return str(path).lower().endswith(('.parquet', '.pq'))
+
+
+def iter_chunks(path, chunksize=100000, columns=None):
+    """Stream a CSV or Parquet file as DataFrame chunks without loading it whole"""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        usecols = (lambda c: c in columns) if columns else None
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols):
+            yield chunk
+
+
+def widen_null_fields(schema):
+    """
+    Schema with null-typed fields (all-None columns of the chunk it was inferred from) typed as string
+    Later chunks that hold values for such a column still fit; pass an explicit schema for other types
+    """
+    import pyarrow as pa
+    return pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema],
+                     metadata=schema.metadata)
+
+
+class ChunkWriter:
+    """
+    Append DataFrame chunks to a CSV or Parquet file as they are produced
+    schema: optional pyarrow schema for Parquet output, inferred from the first chunk otherwise
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.rows = 0
+        self._parquet_writer = None
+        self._schema = schema
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df):
+        """Write one chunk"""
+        if is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._schema is None:
+                self._schema = widen_null_fields(pa.Schema.from_pandas(df, preserve_index=False))
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, self._schema, compression='snappy')
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a', header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        """Flush and close the output file"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def process_file(input_path, output_path, fn, args=(), initializer=None, initargs=(),
+                 chunksize=100000, workers=None, columns=None, schema=None):
+    """
+    Stream chunks through fn(chunk, *args) in a process pool and write results in input order
+    At most 2 chunks per worker are in flight, so memory is bounded by chunksize, not file size
+    schema: optional pyarrow schema for Parquet output (see ChunkWriter)
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool, \
+            ChunkWriter(output_path, schema) as writer:
+        def drain(limit):
+            while len(pending) > limit:
+                writer.write(pending.popleft().result())
+                elapsed = time.perf_counter() - start
+                print(f"   ✓ {writer.rows:,} rows processed | {writer.rows / elapsed:,.0f} rows/sec")
+
+        for chunk in iter_chunks(input_path, chunksize, columns):
+            pending.append(pool.submit(fn, chunk, *args))
+            drain(2 * workers)
+        drain(0)
+
+    elapsed = time.perf_counter() - start
+    return {'rows': writer.rows, 'seconds': round(elapsed, 2),
+            'rows_per_sec': round(writer.rows / elapsed, 1) if elapsed else None}
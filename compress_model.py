@@ -0,0 +1,182 @@
+import argparse
+import copy
+import io
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+
+from report_model import save_json
+
+
+def model_size_bytes(model):
+    """Serialized joblib size of a model"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+def measure_latency(model, X, single_runs=200, batch_size=1000):
+    """Median single-row latency and per-1k-row batch latency in milliseconds"""
+    row = X.iloc[[0]]
+    model.predict_proba(row)
+    samples = []
+    for _ in range(single_runs):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        samples.append(time.perf_counter() - start)
+    batch = X.iloc[:batch_size]
+    start = time.perf_counter()
+    model.predict_proba(batch)
+    batch_ms = (time.perf_counter() - start) * 1000 * 1000 / len(batch)
+    return round(float(np.median(samples)) * 1000, 3), round(batch_ms, 3)
+
+
+def select_tree_subset(forest, X_sel, y_sel, max_trees):
+    """
+    Greedy forward selection of RandomForest trees maximizing weighted F1 on a selection set
+    Returns a copy of the forest holding only the chosen trees
+    """
+    classes = forest.classes_
+    X_values = X_sel.to_numpy(dtype=np.float32)
+    tree_proba = np.stack([tree.predict_proba(X_values) for tree in forest.estimators_])
+
+    chosen = []
+    summed = np.zeros_like(tree_proba[0])
+    remaining = list(range(len(forest.estimators_)))
+    for _ in range(min(max_trees, len(remaining))):
+        best_idx, best_score = None, -1.0
+        for idx in remaining:
+            pred = classes[(summed + tree_proba[idx]).argmax(axis=1)]
+            score = f1_score(y_sel, pred, average='weighted')
+            if score > best_score:
+                best_idx, best_score = idx, score
+        chosen.append(best_idx)
+        remaining.remove(best_idx)
+        summed += tree_proba[best_idx]
+
+    pruned = copy.copy(forest)
+    pruned.estimators_ = [forest.estimators_[i] for i in chosen]
+    pruned.n_estimators = len(chosen)
+    return pruned
+
+
+def truncate_boosted(model):
+    """Drop XGBoost rounds after the early-stopping best iteration"""
+    best = getattr(model, 'best_iteration', None)
+    if best is None:
+        return None
+    pruned = copy.deepcopy(model)
+    pruned._Booster = model.get_booster()[: best + 1]
+    pruned.n_estimators = best + 1
+    return pruned
+
+
+def distill_boosted(teacher, X_train, max_depth=4, n_estimators=150, threads=-1):
+    """Fit a shallow hist-XGBoost student on the teacher's predicted classes"""
+    from xgboost import XGBClassifier
+    student = XGBClassifier(
+        n_estimators=n_estimators, max_depth=max_depth, learning_rate=0.1,
+        tree_method='hist', n_jobs=threads, eval_metric='mlogloss', verbosity=0, random_state=42
+    )
+    student.fit(X_train, teacher.predict(X_train))
+    return student
+
+
+def evaluate(name, model, X_eval, y_eval, X_latency):
+    """Accuracy, F1, size and latency for one candidate"""
+    pred = model.predict(X_eval)
+    single_ms, batch_ms = measure_latency(model, X_latency)
+    return {
+        'name': name,
+        'accuracy': round(float(accuracy_score(y_eval, pred)), 4),
+        'f1_weighted': round(float(f1_score(y_eval, pred, average='weighted')), 4),
+        'size_bytes': model_size_bytes(model),
+        'single_row_ms': single_ms,
+        'per_1k_rows_ms': batch_ms
+    }
+
+
+def select_compressed(results, candidates, max_f1_drop):
+    """Smallest candidate whose weighted-F1 loss is at most max_f1_drop, as (result, model); None when none is"""
+    eligible = [(r, m) for r, (_, m) in zip(results, candidates) if r['f1_delta'] >= -max_f1_drop]
+    return min(eligible, key=lambda rm: rm[0]['size_bytes']) if eligible else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compress the served model and report the accuracy/latency trade-off')
+    parser.add_argument('--data', default='ai-traffic-prediction-backend/data/processed/featured_data.csv')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--tree-counts', type=int, nargs='*', default=[10, 25, 50],
+                        help='RandomForest subset sizes to try')
+    parser.add_argument('--student-depth', type=int, default=4)
+    parser.add_argument('--max-f1-drop', type=float, default=0.01,
+                        help='Largest weighted-F1 loss accepted for the published compressed model')
+    parser.add_argument('--threads', type=int, default=-1)
+    args = parser.parse_args(argv)
+
+    print("\n🗜️  MODEL COMPRESSION")
+    model = joblib.load(os.path.join(args.model_dir, 'best_model.joblib'))
+    feature_cols = joblib.load(os.path.join(args.model_dir, 'feature_names.joblib'))
+
+    # Same split as retrain_model.py; the held-out 20% is halved into selection and evaluation sets
+    df = pd.read_csv(args.data)
+    X = df[feature_cols].fillna(df[feature_cols].mean())
+    y = df['target']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_sel, X_eval, y_sel, y_eval = train_test_split(X_test, y_test, test_size=0.5, random_state=42, stratify=y_test)
+
+    candidates = []
+    if hasattr(model, 'estimators_'):
+        for n in sorted(set(args.tree_counts)):
+            if n < len(model.estimators_):
+                print(f"   Selecting {n} of {len(model.estimators_)} trees...")
+                candidates.append((f'rf_subset_{n}', select_tree_subset(model, X_sel, y_sel, n)))
+    truncated = truncate_boosted(model)
+    if truncated is not None:
+        candidates.append((f'xgb_best_iteration_{truncated.n_estimators}', truncated))
+    print(f"   Distilling depth-{args.student_depth} boosted student...")
+    candidates.append((f'xgb_student_depth_{args.student_depth}',
+                       distill_boosted(model, X_train, args.student_depth, threads=args.threads)))
+
+    baseline = evaluate('full', model, X_eval, y_eval, X_test)
+    results = [baseline] + [evaluate(name, m, X_eval, y_eval, X_test) for name, m in candidates]
+    for r in results:
+        r['f1_delta'] = round(r['f1_weighted'] - baseline['f1_weighted'], 4)
+        r['accuracy_delta'] = round(r['accuracy'] - baseline['accuracy'], 4)
+        r['size_ratio'] = round(r['size_bytes'] / baseline['size_bytes'], 4)
+
+    print(f"\n   ┌──────────────────────────┬──────────┬──────────┬────────────┬───────────┬────────────┐")
+    print(f"   │ Candidate                │ Accuracy │ F1 Δ     │ Size (MB)  │ 1 row ms  │ 1k rows ms │")
+    print(f"   ├──────────────────────────┼──────────┼──────────┼────────────┼───────────┼────────────┤")
+    for r in results:
+        print(f"   │ {r['name']:24s} │ {r['accuracy']:8.4f} │ {r['f1_delta']:+8.4f} │ "
+              f"{r['size_bytes'] / 1024 / 1024:10.2f} │ {r['single_row_ms']:9.3f} │ {r['per_1k_rows_ms']:10.3f} │")
+    print(f"   └──────────────────────────┴──────────┴──────────┴────────────┴───────────┴────────────┘")
+
+    selected = select_compressed(results[1:], candidates, args.max_f1_drop)
+    report = {'baseline': baseline, 'candidates': results[1:], 'max_f1_drop': args.max_f1_drop,
+              'selected': selected[0]['name'] if selected else None}
+
+    compressed_path = os.path.join(args.model_dir, 'compressed_model.joblib')
+    if selected:
+        joblib.dump(selected[1], compressed_path)
+        print(f"\n   🏆 Published compressed_model.joblib: {selected[0]['name']} "
+              f"({selected[0]['size_ratio']:.1%} of full size, F1 Δ {selected[0]['f1_delta']:+.4f})")
+    else:
+        print(f"\n   ⚠️  No candidate within F1 drop {args.max_f1_drop}; compressed model not published")
+        # A model published by an earlier run would otherwise keep serving MODEL_VARIANT=compressed
+        if os.path.exists(compressed_path):
+            os.remove(compressed_path)
+            print("   ✓ Removed the previous compressed_model.joblib")
+    save_json(report, os.path.join(args.model_dir, 'compression_report.json'))
+    print("   ✓ Report saved: compression_report.json\n")
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import argparse
+import bisect
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+
+KM_PER_DEG = 111.195
+
+# Density risk levels by percentile of the density at historical accident locations (lower bounds)
+DENSITY_LEVELS = [
+    (0.95, 'HIGH CRITICAL RED ZONE', '⛔ NOT ALLOWED - Extreme accident density'),
+    (0.80, 'CRITICAL ZONE', '⚠️ RESTRICTED - High caution required'),
+    (0.50, 'MEDIUM RISK ZONE', '⚠️ ALLOWED WITH CAUTION - Drive carefully'),
+    (0.05, 'LOW RISK ZONE', '✅ ALLOWED - Travel with normal precautions'),
+    (0.00, 'NO RISK - SAFE TO TRAVEL', '✅ ALLOWED - Safe to travel anywhere')
+]
+
+
+class DensitySurface:
+    """
+    Accident kernel density (accidents per km²) sampled on a regular lat/lon grid
+    Values between grid nodes are bilinearly interpolated; points outside the grid have zero density
+    risk_score is the fraction of historical accidents located at a lower density (0-1)
+    """
+
+    def __init__(self, grid, lat0, lon0, cell_deg, quantiles, meta=None):
+        self.grid = grid
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self.cell_deg = float(cell_deg)
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        self._quantile_list = self.quantiles.tolist()
+        self._steps = np.linspace(0, 1, len(self.quantiles))
+        self.rows, self.cols = grid.shape
+        self.meta = meta or {}
+
+    def density_at(self, lats, lons):
+        """Vectorized bilinear density lookup"""
+        fy = (np.asarray(lats, dtype=np.float64) - self.lat0) / self.cell_deg
+        fx = (np.asarray(lons, dtype=np.float64) - self.lon0) / self.cell_deg
+        inside = (fy >= 0) & (fy <= self.rows - 1) & (fx >= 0) & (fx <= self.cols - 1)
+        fy = np.where(inside, fy, 0)
+        fx = np.where(inside, fx, 0)
+        i = np.minimum(fy.astype(np.int64), self.rows - 2)
+        j = np.minimum(fx.astype(np.int64), self.cols - 2)
+        dy, dx = fy - i, fx - j
+        g = self.grid
+        value = ((g[i, j] * (1 - dx) + g[i, j + 1] * dx) * (1 - dy)
+                 + (g[i + 1, j] * (1 - dx) + g[i + 1, j + 1] * dx) * dy)
+        return np.where(inside, value, 0.0)
+
+    def density_at_point(self, lat, lon):
+        """Scalar bilinear lookup without array allocation (single-point queries)"""
+        fy = (lat - self.lat0) / self.cell_deg
+        fx = (lon - self.lon0) / self.cell_deg
+        if not (0 <= fy <= self.rows - 1 and 0 <= fx <= self.cols - 1):
+            return 0.0
+        i = min(int(fy), self.rows - 2)
+        j = min(int(fx), self.cols - 2)
+        dy, dx = fy - i, fx - j
+        g = self.grid
+        top = float(g[i, j]) * (1 - dx) + float(g[i, j + 1]) * dx
+        bottom = float(g[i + 1, j]) * (1 - dx) + float(g[i + 1, j + 1]) * dx
+        return top * (1 - dy) + bottom * dy
+
+    def risk_scores(self, densities):
+        """Percentile of each density among historical accident locations"""
+        return np.interp(densities, self.quantiles, self._steps, left=0.0, right=1.0)
+
+    def risk_score(self, density):
+        if density <= self._quantile_list[0]:
+            return 0.0
+        k = bisect.bisect_left(self._quantile_list, density)
+        if k >= len(self._quantile_list):
+            return 1.0
+        lo, hi = self._quantile_list[k - 1], self._quantile_list[k]
+        step = 1.0 / (len(self._quantile_list) - 1)
+        return (k - 1 + (density - lo) / (hi - lo)) * step if hi > lo else k * step
+
+    @staticmethod
+    def level_index(score):
+        """Index into DENSITY_LEVELS for a risk score"""
+        for k, (bound, _, _) in enumerate(DENSITY_LEVELS):
+            if score >= bound:
+                return k
+        return len(DENSITY_LEVELS) - 1
+
+    @staticmethod
+    def level_indices(scores):
+        """Vectorized level_index"""
+        bounds = np.array([b for b, _, _ in DENSITY_LEVELS])
+        return (scores[:, None] < bounds[None, :]).sum(axis=1)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'density.npy'), np.asarray(self.grid, dtype=np.float32))
+        meta = dict(self.meta, lat0=self.lat0, lon0=self.lon0, cell_deg=self.cell_deg,
+                    shape=[self.rows, self.cols], quantiles=self.quantiles.tolist())
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a surface directory, memory-mapping the density raster"""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        grid = np.load(os.path.join(path, 'density.npy'), mmap_mode='r' if mmap else None)
+        return cls(grid, meta['lat0'], meta['lon0'], meta['cell_deg'], meta['quantiles'], meta)
+
+
+def gaussian_kernel(bandwidth_km, cell_deg, ref_lat, truncate=4.0):
+    """2-D Gaussian density kernel (per km²) on the grid spacing at ref_lat"""
+    cell_y = cell_deg * KM_PER_DEG
+    cell_x = cell_deg * KM_PER_DEG * math.cos(math.radians(ref_lat))
+    ry = int(math.ceil(truncate * bandwidth_km / cell_y))
+    rx = int(math.ceil(truncate * bandwidth_km / cell_x))
+    y = np.arange(-ry, ry + 1)[:, None] * cell_y
+    x = np.arange(-rx, rx + 1)[None, :] * cell_x
+    return np.exp(-0.5 * (x ** 2 + y ** 2) / bandwidth_km ** 2) / (2 * math.pi * bandwidth_km ** 2)
+
+
+def linear_binning(lats, lons, weights, lat0, lon0, cell_deg, shape):
+    """Spread each point's weight over its 4 surrounding grid nodes (bilinear weights)"""
+    rows, cols = shape
+    fy = (lats - lat0) / cell_deg
+    fx = (lons - lon0) / cell_deg
+    i = np.floor(fy).astype(np.int64)
+    j = np.floor(fx).astype(np.int64)
+    dy, dx = fy - i, fx - j
+    counts = np.zeros(rows * cols)
+    for di, dj, w in ((0, 0, (1 - dy) * (1 - dx)), (0, 1, (1 - dy) * dx), (1, 0, dy * (1 - dx)), (1, 1, dy * dx)):
+        counts += np.bincount((i + di) * cols + (j + dj), weights=weights * w, minlength=rows * cols)
+    return counts.reshape(rows, cols)
+
+
+def fft_convolve(counts, kernel):
+    """'same'-size linear convolution via zero-padded real FFTs"""
+    ky, kx = kernel.shape
+    shape = (counts.shape[0] + ky - 1, counts.shape[1] + kx - 1)
+    out = np.fft.irfft2(np.fft.rfft2(counts, shape) * np.fft.rfft2(kernel, shape), shape)
+    oy, ox = ky // 2, kx // 2
+    return np.maximum(out[oy:oy + counts.shape[0], ox:ox + counts.shape[1]], 0)
+
+
+def build_density_surface(lats, lons, weights=None, bandwidth_km=10.0, cell_deg=0.02):
+    """
+    Binned KDE: linear binning onto the grid, then one FFT convolution with a Gaussian kernel
+    Cost is O(N + G log G) for N accidents and G grid cells instead of O(N x G) pairwise sums
+    Longitude spacing uses the cosine of the mid latitude (equirectangular approximation)
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    weights = np.ones(len(lats)) if weights is None else np.asarray(weights, dtype=np.float64)
+    ref_lat = float((lats.min() + lats.max()) / 2)
+    pad = 4 * bandwidth_km / (KM_PER_DEG * math.cos(math.radians(max(abs(lats.min()), abs(lats.max())))))
+    lat0 = math.floor((lats.min() - pad) / cell_deg) * cell_deg
+    lon0 = math.floor((lons.min() - pad) / cell_deg) * cell_deg
+    rows = int(math.ceil((lats.max() + pad - lat0) / cell_deg)) + 2
+    cols = int(math.ceil((lons.max() + pad - lon0) / cell_deg)) + 2
+
+    counts = linear_binning(lats, lons, weights, lat0, lon0, cell_deg, (rows, cols))
+    grid = fft_convolve(counts, gaussian_kernel(bandwidth_km, cell_deg, ref_lat)).astype(np.float32)
+
+    surface = DensitySurface(grid, lat0, lon0, cell_deg, np.zeros(2))
+    # Score calibration: distribution of density at the accidents themselves
+    at_accidents = surface.density_at(lats, lons)
+    surface = DensitySurface(grid, lat0, lon0, cell_deg, np.quantile(at_accidents, np.linspace(0, 1, 101)), {
+        'bandwidth_km': bandwidth_km,
+        'ref_lat': ref_lat,
+        'accidents': int(len(lats)),
+        'weighted': bool(weights is not None and not np.all(weights == 1))
+    })
+    return surface
+
+
+def exact_density(lats, lons, weights, query_lats, query_lons, bandwidth_km):
+    """Pairwise Gaussian KDE with haversine distances (reference for checking the raster)"""
+    lat1 = np.radians(np.asarray(query_lats))[:, None]
+    lon1 = np.radians(np.asarray(query_lons))[:, None]
+    lat2, lon2 = np.radians(lats)[None, :], np.radians(lons)[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    d = 2 * 6371 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    return (weights * np.exp(-0.5 * (d / bandwidth_km) ** 2)).sum(axis=1) / (2 * math.pi * bandwidth_km ** 2)
+
+
+def main(argv=None):
+    import pandas as pd
+    from hotspot_time_profile import SEVERITY_WEIGHTS
+
+    parser = argparse.ArgumentParser(description='Build the accident kernel density risk raster')
+    parser.add_argument('--data', default='cleaned_data.csv', help='Geotagged accidents (latitude, longitude)')
+    parser.add_argument('--out', default='models/density_surface')
+    parser.add_argument('--bandwidth-km', type=float, default=10.0)
+    parser.add_argument('--cell-deg', type=float, default=0.02)
+    parser.add_argument('--weighted', action='store_true', help='Weight accidents by severity (Minor 1, Serious 2, Fatal 3)')
+    parser.add_argument('--check', type=int, default=500, help='Compare this many random grid points with exact KDE')
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data, usecols=lambda c: c in ('latitude', 'longitude', 'Accident Severity'))
+    df = df.dropna(subset=['latitude', 'longitude'])
+    weights = df['Accident Severity'].map(SEVERITY_WEIGHTS).fillna(1.0).to_numpy() if args.weighted else None
+
+    start = time.perf_counter()
+    surface = build_density_surface(df['latitude'].to_numpy(), df['longitude'].to_numpy(), weights,
+                                    args.bandwidth_km, args.cell_deg)
+    seconds = time.perf_counter() - start
+    surface.meta['build_seconds'] = round(seconds, 3)
+    surface.meta['data'] = os.path.abspath(args.data)
+
+    print("\n🌡️  ACCIDENT DENSITY SURFACE")
+    print(f"   {len(df):,} accidents, bandwidth {args.bandwidth_km:g} km, cell {args.cell_deg:g}°")
+    print(f"   Raster: {surface.rows} x {surface.cols} ({surface.grid.nbytes / 1024 / 1024:.2f} MB), built in {seconds:.2f}s")
+
+    if args.check:
+        rng = np.random.default_rng(42)
+        idx = rng.integers(0, len(df), args.check)
+        q_lats = df['latitude'].to_numpy()[idx] + rng.normal(0, args.bandwidth_km / KM_PER_DEG, args.check)
+        q_lons = df['longitude'].to_numpy()[idx] + rng.normal(0, args.bandwidth_km / KM_PER_DEG, args.check)
+        w = np.ones(len(df)) if weights is None else weights
+        exact = exact_density(df['latitude'].to_numpy(), df['longitude'].to_numpy(), w, q_lats, q_lons, args.bandwidth_km)
+        approx = surface.density_at(q_lats, q_lons)
+        rel = np.abs(approx - exact) / exact.max()
+        surface.meta['check'] = {'points': args.check, 'max_abs_error_rel_to_peak': round(float(rel.max()), 5),
+                                 'median_abs_error_rel_to_peak': round(float(np.median(rel)), 5)}
+        print(f"   vs exact KDE at {args.check} points: max error {rel.max():.2%}, median {np.median(rel):.3%} of peak density")
+
+    surface.save(args.out)
+    print(f"✅ Saved: {args.out}\n")
+    return surface
+
+
+if __name__ == '__main__':
+    main()
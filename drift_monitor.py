@@ -0,0 +1,381 @@
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter, deque
+
+import numpy as np
+
+
+# Engineered /predict features with small integer domains -> number of bins (the last bin takes out-of-range codes)
+COUNT_FEATURES = {
+    'hour': 25,
+    'is_weekend': 3,
+    'is_rush_hour': 3,
+    'weather_score': 7,
+    'road_type_score': 7,
+    'road_cond_score': 7,
+    'age_score': 7,
+    'license_score': 7,
+    'alcohol_flag': 3,
+    'experience_score': 7,
+    'vehicle_condition_score': 7,
+    'driver_speed_score': 7,
+    'State Name_enc': 65,
+    'Vehicle Type Involved_enc': 17,
+    'Lighting Conditions_enc': 9,
+    'Traffic Control Presence_enc': 9
+}
+
+# Raw numeric inputs -> featured_data.csv column
+QUANTILE_FEATURES = {
+    'driver_speed_habit': 'driver_speed_habit(km/h)',
+    'Driver Age': 'Driver Age'
+}
+
+CITY_FEATURE = 'City Name'
+
+# Population stability index bands
+PSI_LEVELS = [(0.25, 'DRIFT'), (0.1, 'MODERATE'), (0.0, 'STABLE')]
+
+
+def psi(expected, actual, eps=1e-4):
+    """Population stability index between two count vectors over the same bins"""
+    p = np.asarray(expected, dtype=np.float64)
+    q = np.asarray(actual, dtype=np.float64)
+    p = p / p.sum() if p.sum() > 0 else p
+    q = q / q.sum() if q.sum() > 0 else q
+    p, q = np.maximum(p, eps), np.maximum(q, eps)
+    return float(((q - p) * np.log(q / p)).sum())
+
+
+def psi_level(value):
+    for bound, level in PSI_LEVELS:
+        if value >= bound:
+            return level
+    return PSI_LEVELS[-1][1]
+
+
+class CategoryCounts:
+    """Fixed-size count array for a small integer domain"""
+
+    def __init__(self, bins, counts=None):
+        self.counts = np.zeros(bins, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    def bin(self, value):
+        code = int(value)
+        return code if 0 <= code < len(self.counts) - 1 else len(self.counts) - 1
+
+    def update(self, value):
+        self.counts[self.bin(value)] += 1
+
+    def update_many(self, values):
+        codes = np.asarray(values, dtype=np.float64).astype(np.int64)
+        codes = np.where((codes >= 0) & (codes < len(self.counts) - 1), codes, len(self.counts) - 1)
+        self.counts += np.bincount(codes, minlength=len(self.counts))
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def to_dict(self):
+        return {'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(len(data['counts']), data['counts'])
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch layout): quantiles within `alpha` relative error,
+    memory fixed by the value range; values below min_value share bucket 0
+    """
+
+    def __init__(self, alpha=0.01, min_value=1.0, max_value=1e4, counts=None):
+        self.alpha, self.min_value, self.max_value = alpha, min_value, max_value
+        self.log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.offset = math.ceil(math.log(min_value) / self.log_gamma)
+        bins = math.ceil(math.log(max_value) / self.log_gamma) - self.offset + 2
+        self.counts = np.zeros(bins, dtype=np.int64)
+        for idx, count in (counts or {}).items():
+            self.counts[int(idx)] = count
+
+    def bin(self, value):
+        if not value >= self.min_value:  # also catches NaN
+            return 0
+        idx = math.ceil(math.log(value) / self.log_gamma) - self.offset + 1
+        return min(idx, len(self.counts) - 1)
+
+    def update(self, value):
+        self.counts[self.bin(value)] += 1
+
+    def update_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            idx = np.ceil(np.log(values) / self.log_gamma) - self.offset + 1
+        idx = np.where(values >= self.min_value, np.clip(idx, 1, len(self.counts) - 1), 0).astype(np.int64)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def value(self, idx):
+        """Representative value of a bucket"""
+        if idx == 0:
+            return self.min_value
+        return 2 * math.exp((idx - 1 + self.offset) * self.log_gamma) / (1 + math.exp(self.log_gamma))
+
+    def quantile(self, q):
+        if self.total == 0:
+            return None
+        idx = int(np.searchsorted(np.cumsum(self.counts), max(q * self.total, 1)))
+        return self.value(idx)
+
+    def histogram(self, edges):
+        """Counts between consecutive bucket indices in `edges` (for PSI against another sketch's deciles)"""
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        bounds = [0] + [self.bin(e) + 1 for e in edges] + [len(self.counts)]
+        return np.diff(cumulative[np.maximum.accumulate(bounds)])
+
+    def to_dict(self):
+        nonzero = np.flatnonzero(self.counts)
+        return {'alpha': self.alpha, 'min_value': self.min_value, 'max_value': self.max_value,
+                'counts': {str(i): int(self.counts[i]) for i in nonzero}}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['alpha'], data['min_value'], data['max_value'], data['counts'])
+
+
+class CountMinSketch:
+    """
+    Count-min sketch for high-cardinality strings; hashes are stable across processes (blake2b)
+    The default width keeps a never-seen city reported as seen (all rows collide) below ~1% for ~4k cities
+    """
+
+    def __init__(self, width=16384, depth=4, counts=None):
+        self.width, self.depth = width, depth
+        self.counts = np.zeros((depth, width), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def _columns(self, key):
+        digest = hashlib.blake2b(str(key).strip().lower().encode('utf-8'), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[4 * i:4 * i + 4], 'little') % self.width for i in range(self.depth)]
+
+    def update(self, key, count=1):
+        self.counts[self._rows, self._columns(key)] += count
+
+    def estimate(self, key):
+        return int(self.counts[self._rows, self._columns(key)].min())
+
+    @property
+    def total(self):
+        return int(self.counts[0].sum())
+
+    def to_dict(self):
+        """Counts as zlib-compressed little-endian int32 (mostly zeros), base64 for JSON"""
+        packed = zlib.compress(self.counts.astype('<i4').tobytes())
+        return {'width': self.width, 'depth': self.depth, 'counts': base64.b64encode(packed).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data):
+        counts = np.frombuffer(zlib.decompress(base64.b64decode(data['counts'])), dtype='<i4')
+        return cls(data['width'], data['depth'], counts.reshape(data['depth'], data['width']))
+
+
+def _new_sketches(baseline=None):
+    """Empty live sketches with the same layout as the baseline (defaults without one)"""
+    counts = {name: CategoryCounts(len(baseline['counts'][name]['counts']) if baseline else bins)
+              for name, bins in COUNT_FEATURES.items()}
+    quantiles = {}
+    for name in QUANTILE_FEATURES:
+        if baseline:
+            layout = baseline['quantiles'][name]
+            quantiles[name] = QuantileSketch(layout['alpha'], layout['min_value'], layout['max_value'])
+        else:
+            quantiles[name] = QuantileSketch()
+    cities = CountMinSketch(baseline['city']['width'], baseline['city']['depth']) if baseline else CountMinSketch()
+    return counts, quantiles, cities
+
+
+def build_baseline(df):
+    """Baseline sketches from featured_data.csv-style training rows (engineered + raw columns)"""
+    import pandas as pd
+
+    counts, quantiles, cities = _new_sketches()
+    for name, sketch in counts.items():
+        if name in df.columns:
+            sketch.update_many(df[name].fillna(-1))
+    for name, column in QUANTILE_FEATURES.items():
+        if column in df.columns:
+            quantiles[name].update_many(pd.to_numeric(df[column], errors='coerce'))
+    if CITY_FEATURE in df.columns:
+        for key, count in df[CITY_FEATURE].astype(str).value_counts().items():
+            cities.update(key, count)
+    return {
+        'rows': int(len(df)),
+        'counts': {name: s.to_dict() for name, s in counts.items()},
+        'quantiles': {name: s.to_dict() for name, s in quantiles.items()},
+        'city': cities.to_dict()
+    }
+
+
+class DriftMonitor:
+    """
+    Live input sketches compared against the training baseline
+    observe() only appends to a bounded deque (no locks, no hashing); a daemon thread folds pending
+    observations into the sketches, so memory is fixed by the sketch layout plus max_pending
+    """
+
+    def __init__(self, baseline=None, max_pending=100000, min_observations=200):
+        self.baseline = baseline
+        self.min_observations = min_observations
+        self._baseline_counts = {n: CategoryCounts.from_dict(d) for n, d in baseline['counts'].items()} if baseline else {}
+        self._baseline_quantiles = {n: QuantileSketch.from_dict(d) for n, d in baseline['quantiles'].items()} if baseline else {}
+        self._baseline_cities = CountMinSketch.from_dict(baseline['city']) if baseline else None
+        self._pending = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts, self.quantiles, self.cities = _new_sketches(self.baseline)
+            self.observations = 0
+            self.unseen_cities = 0
+            self.dropped = 0
+            self.since = time.time()
+
+    def observe(self, features, speed, age, city):
+        """Queue one /predict input (engineered feature dict plus raw speed, age and city)"""
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append((features, speed, age, city))
+
+    def drain(self):
+        """Fold pending observations into the live sketches (vectorized per feature, one hash per distinct city)"""
+        with self._lock:
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if not batch:
+                return
+            features, speeds, ages, cities = zip(*batch)
+            for name, sketch in self.counts.items():
+                values = np.array([f.get(name, np.nan) for f in features], dtype=np.float64)
+                sketch.update_many(values[~np.isnan(values)])
+            self.quantiles['driver_speed_habit'].update_many(np.array(speeds, dtype=np.float64))
+            self.quantiles['Driver Age'].update_many(np.array(ages, dtype=np.float64))
+            for city, count in Counter(cities).items():
+                self.cities.update(city, count)
+                if self._baseline_cities is not None and self._baseline_cities.estimate(city) == 0:
+                    self.unseen_cities += count
+            self.observations += len(batch)
+
+    def start(self, interval=1.0):
+        """Drain in a daemon thread every `interval` seconds"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            self.drain()
+
+    def report(self):
+        """Per-feature PSI against the baseline, live quantiles and the unseen-city rate"""
+        self.drain()
+        with self._lock:
+            enough = self.observations >= self.min_observations
+            features = {}
+            for name, live in self.counts.items():
+                entry = {'observations': live.total}
+                if name in self._baseline_counts and live.total:
+                    entry['psi'] = round(psi(self._baseline_counts[name].counts, live.counts), 4)
+                features[name] = entry
+            for name, live in self.quantiles.items():
+                entry = {'observations': live.total,
+                         'live': {'p10': live.quantile(0.1), 'p50': live.quantile(0.5), 'p90': live.quantile(0.9)}}
+                base = self._baseline_quantiles.get(name)
+                if base is not None and live.total:
+                    edges = sorted({base.quantile(q / 10) for q in range(1, 10)})
+                    entry['baseline'] = {'p10': base.quantile(0.1), 'p50': base.quantile(0.5), 'p90': base.quantile(0.9)}
+                    entry['psi'] = round(psi(base.histogram(edges), live.histogram(edges)), 4)
+                features[name] = entry
+            for entry in features.values():
+                if 'psi' in entry:
+                    entry['level'] = psi_level(entry['psi']) if enough else 'INSUFFICIENT_DATA'
+                for stats in (entry.get('live'), entry.get('baseline')):
+                    for k, v in (stats or {}).items():
+                        stats[k] = round(v, 1) if v is not None else None
+
+            unseen_rate = self.unseen_cities / self.observations if self.observations else 0.0
+            drifted = sorted(n for n, e in features.items() if e.get('level') == 'DRIFT')
+            return {
+                'baseline': self.baseline is not None,
+                'baseline_rows': self.baseline['rows'] if self.baseline else None,
+                'observations': self.observations,
+                'pending': len(self._pending),
+                'dropped': self.dropped,
+                'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.since)),
+                'drifted_features': drifted,
+                'status': 'INSUFFICIENT_DATA' if not enough or self.baseline is None else ('DRIFT' if drifted else 'STABLE'),
+                'cities': {'observations': self.cities.total, 'unseen_in_training': self.unseen_cities,
+                           'unseen_rate': round(unseen_rate, 4)},
+                'features': features
+            }
+
+    @classmethod
+    def from_manifest(cls, path, **kwargs):
+        """Monitor with the manifest's drift_baseline (no baseline when the manifest or key is missing)"""
+        baseline = None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                baseline = json.load(f).get('drift_baseline')
+        return cls(baseline, **kwargs)
+
+
+def main(argv=None):
+    import pandas as pd
+    from report_model import save_json
+
+    parser = argparse.ArgumentParser(description='Write drift baseline sketches into the model manifest')
+    parser.add_argument('--data', default='featured_data.csv', help='Training data the model was fit on')
+    parser.add_argument('--manifest', default='models/model_manifest.json')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    baseline = build_baseline(pd.read_csv(args.data))
+    manifest = {}
+    if os.path.exists(args.manifest):
+        with open(args.manifest) as f:
+            manifest = json.load(f)
+    manifest['drift_baseline'] = baseline
+    save_json(manifest, args.manifest)
+    print(f"✅ Drift baseline written to {args.manifest} ({baseline['rows']:,} rows, {time.perf_counter() - start:.2f}s)")
+
+    monitor = DriftMonitor(baseline)
+    features = dict.fromkeys(COUNT_FEATURES, 1)
+    n = 50000
+    start = time.perf_counter()
+    for _ in range(n):
+        monitor.observe(features, 80.0, 30, 'Mumbai')
+    observe_ns = (time.perf_counter() - start) / n * 1e9
+    start = time.perf_counter()
+    monitor.drain()
+    drain_us = (time.perf_counter() - start) / n * 1e6
+    print(f"   observe(): {observe_ns:.0f} ns per request (hot path) | background update: {drain_us:.1f} µs per request")
+    return baseline
+
+
+if __name__ == '__main__':
+    main()
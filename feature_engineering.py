@@ -0,0 +1,285 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Column types of cleaned_data.csv (the input of FeatureEngineer.process)
+CLEANED_DATA_SCHEMA = {
+    'State Name': 'str',
+    'City Name': 'str',
+    'Year': 'int',
+    'Month': 'str',
+    'datetime': 'datetime',
+    'latitude': 'float',
+    'longitude': 'float',
+    'Road Type': 'str',
+    'Road Condition': 'str',
+    'Lighting Conditions': 'str',
+    'Weather Conditions': 'str',
+    'Traffic Control Presence': 'str',
+    'Driver Age': 'int',
+    'Driver Gender': 'str',
+    'driver_experience': 'str',
+    'Driver License Status': 'str',
+    'driver_speed_habit(km/h)': 'float',
+    'Alcohol Involvement': 'str',
+    'Vehicle Type Involved': 'str',
+    'vehicle_condition': 'str',
+    'Accident Severity': 'str'
+}
+
+# Fields a live report must carry; the rest fall back to FeatureEngineer defaults (Year/Month come from datetime)
+REQUIRED_REPORT_FIELDS = ['datetime', 'latitude', 'longitude', 'Accident Severity']
+
+REPORT_FIELD_ALIASES = {'driver_speed_habit': 'driver_speed_habit(km/h)'}
+
+CATEGORICAL_COLUMNS = [
+    'State Name', 'City Name', 'Accident Severity',
+    'Vehicle Type Involved', 'Lighting Conditions',
+    'Traffic Control Presence'
+]
+
+SEVERITY_MAPPING = {'Minor': 0, 'Serious': 1, 'Fatal': 2}
+
+
+def _map_unique(series, fn):
+    """Apply a scalar function once per distinct value and broadcast the result"""
+    uniques = pd.unique(series)
+    return series.map(pd.Series([fn(v) for v in uniques], index=uniques, dtype=object)).infer_objects()
+
+
+def validate_reports(df, dayfirst=False):
+    """
+    Check raw accident reports against the cleaned_data.csv schema
+    Returns (valid rows with schema columns and dtypes, list of {'row', 'error'} for rejected rows)
+    """
+    df = df.rename(columns={k: v for k, v in REPORT_FIELD_ALIASES.items() if v not in df.columns})
+    out = pd.DataFrame(index=df.index)
+    reasons = pd.Series('', index=df.index, dtype=object)
+
+    def reject(mask, reason):
+        mask = mask & (reasons == '')
+        reasons[mask] = reason
+
+    for field in REQUIRED_REPORT_FIELDS:
+        present = df[field].notna() & (df[field].astype(str).str.strip() != '') if field in df.columns \
+            else pd.Series(False, index=df.index)
+        reject(~present, f'missing {field}')
+
+    for col, kind in CLEANED_DATA_SCHEMA.items():
+        raw = df[col] if col in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+        if kind == 'datetime':
+            parsed = pd.to_datetime(raw, errors='coerce', dayfirst=dayfirst, format='mixed')
+        elif kind in ('int', 'float'):
+            parsed = pd.to_numeric(raw, errors='coerce')
+        else:
+            parsed = raw.where(raw.isna(), raw.astype(str).str.strip())
+        reject(raw.notna() & parsed.isna(), f'invalid {col}')
+        out[col] = parsed
+
+    reject(~out['latitude'].between(-90, 90) | ~out['longitude'].between(-180, 180), 'coordinates out of range')
+    reject(out['Driver Age'].notna() & ~out['Driver Age'].between(10, 120), 'invalid Driver Age')
+    reject(~out['Accident Severity'].isin(list(SEVERITY_MAPPING)), 'unknown Accident Severity')
+
+    out['Year'] = out['Year'].fillna(out['datetime'].dt.year)
+    out['Month'] = out['Month'].fillna(out['datetime'].dt.month_name())
+
+    valid = reasons == ''
+    errors = [{'row': int(i), 'error': r} for i, r in reasons[~valid].items()]
+    out = out[valid]
+    out['Year'] = out['Year'].astype('int64')
+    return out, errors
+
+
+class FeatureEngineer:
+    """
+    Feature pipeline from 02_feature_engineering.ipynb (cleaned_data.csv -> featured_data.csv)
+    Scoring functions are evaluated once per distinct value so micro-batches stay vectorized
+    """
+
+    def __init__(self, label_encoders=None):
+        self.label_encoders = label_encoders or {}
+
+    def create_time_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Extract time-based features from datetime"""
+        df['hour'] = df['datetime'].dt.hour
+        df['day_of_week'] = df['datetime'].dt.dayofweek
+        df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
+        df['is_rush_hour'] = ((df['hour'].between(7, 9)) | (df['hour'].between(17, 19))).astype(int)
+        return df
+
+    @staticmethod
+    def get_weather_score(w):
+        """Map weather conditions to risk scores with broader mapping"""
+        w = str(w).lower()
+        if 'storm' in w or 'blizzard' in w or 'hurricane' in w:
+            return 5
+        elif 'rain' in w or 'snow' in w or 'fog' in w or 'mist' in w:
+            return 4
+        elif 'cloud' in w or 'overcast' in w or 'hazy' in w or 'drizzle' in w:
+            return 2
+        else:
+            return 1  # Clear or sunny
+
+    def create_weather_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        df['weather_score'] = _map_unique(df['Weather Conditions'], self.get_weather_score)
+        return df
+
+    def create_road_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Map road type and condition to risk scores"""
+        type_map = {'National Highway': 5, 'State Highway': 4, 'Urban Road': 3, 'Village Road': 2, 'Rural Road': 2}
+        cond_map = {'Dry': 1, 'Wet': 3, 'Damaged': 4, 'Under Construction': 5}
+        df['road_type_score'] = df['Road Type'].map(type_map).fillna(2)
+        df['road_cond_score'] = df['Road Condition'].map(cond_map).fillna(1)
+        return df
+
+    @staticmethod
+    def get_age_score(age):
+        """Age scoring: young (<21) and elderly (>=75) higher risk"""
+        age = float(age)
+        if age < 21:
+            return 4
+        elif age < 45:
+            return 3
+        elif age < 65:
+            return 2
+        elif age < 75:
+            return 1
+        else:
+            return 5
+
+    def create_driver_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Create driver-related feature scores (realistic)"""
+        df['age_score'] = _map_unique(df['Driver Age'], self.get_age_score)
+
+        lic_map = {'Valid': 1, 'Expired': 2, 'No License': 3}
+        df['license_score'] = df['Driver License Status'].map(lic_map).fillna(3)
+
+        df['alcohol_flag'] = ((df.get('Alcohol Involvement', None) == 'Yes')
+                              | (df.get('alcohol_flag', 0) == 1)).astype(int)
+
+        df['experience_score'] = _map_unique(df['driver_experience'], self.get_experience_score)
+        df['vehicle_condition_score'] = _map_unique(df['vehicle_condition'], self.get_vehicle_condition_score)
+        return df
+
+    @staticmethod
+    def get_speed_score(x):
+        """Map driver speed to realistic risk score"""
+        try:
+            speed = float(x)
+            if speed <= 40:
+                return 1
+            elif speed <= 60:
+                return 2
+            elif speed <= 80:
+                return 3
+            elif speed <= 100:
+                return 4
+            else:
+                return 5
+        except (TypeError, ValueError):
+            return 3
+
+    def create_driver_speed_feature(self, df: pd.DataFrame) -> pd.DataFrame:
+        if 'driver_speed_habit' in df.columns:
+            df['driver_speed_score'] = _map_unique(df['driver_speed_habit'], self.get_speed_score)
+        elif 'driver_speed_habit(km/h)' in df.columns:
+            df['driver_speed_score'] = _map_unique(df['driver_speed_habit(km/h)'], self.get_speed_score)
+        else:
+            df['driver_speed_score'] = 2
+        return df
+
+    @staticmethod
+    def get_experience_score(experience_str):
+        """Parse driver experience and apply realistic accident risk scoring (1=lowest risk, 5=highest risk)"""
+        try:
+            experience_str = str(experience_str).lower().strip()
+            match = re.search(r'\d+\.?\d*', experience_str)
+            if not match:
+                return 5  # Unknown experience: treat as highest risk
+            value = float(match.group())
+            years = value / 12 if 'month' in experience_str else value
+            if years < 0.5:
+                return 5
+            elif years < 1:
+                return 4
+            elif years < 2:
+                return 3
+            elif years < 5:
+                return 2
+            else:
+                return 1
+        except Exception:
+            return 5
+
+    @staticmethod
+    def get_vehicle_condition_score(condition):
+        """Score vehicle condition (realistic)"""
+        condition = str(condition).lower()
+        if 'poor' in condition or 'bad' in condition or 'damaged' in condition:
+            return 5
+        elif 'average' in condition or 'medium' in condition or 'old' in condition:
+            return 3
+        elif 'good' in condition or 'excellent' in condition or 'new' in condition:
+            return 1
+        else:
+            return 2
+
+    def encode_categoricals(self, df: pd.DataFrame, cols: list, fit=True) -> pd.DataFrame:
+        """
+        Encode categorical features using LabelEncoder
+        fit=False reuses the fitted encoders; values unseen at fit time are encoded as -1
+        """
+        from sklearn.preprocessing import LabelEncoder
+
+        for col in cols:
+            if col not in df.columns:
+                print(f"Warning: Column '{col}' not found for encoding.")
+                continue
+            values = df[col].astype(str)
+            if fit:
+                le = LabelEncoder()
+                df[col + '_enc'] = le.fit_transform(values)
+                self.label_encoders[col] = le
+            elif col in self.label_encoders:
+                classes = self.label_encoders[col].classes_
+                codes = pd.Series(np.arange(len(classes)), index=classes)
+                df[col + '_enc'] = values.map(codes).fillna(-1).astype(int)
+            else:
+                df[col + '_enc'] = -1
+        return df
+
+    def process(self, df: pd.DataFrame, fit=True) -> pd.DataFrame:
+        """Robust main processing pipeline (fit=False for new batches against saved encoders)"""
+        if not pd.api.types.is_datetime64_any_dtype(df['datetime']):
+            df['datetime'] = pd.to_datetime(df['datetime'], errors='coerce')
+        df = self.create_time_features(df)
+        df = self.create_weather_features(df)
+        df = self.create_road_features(df)
+        df = self.create_driver_features(df)
+        df = self.create_driver_speed_feature(df)
+        # New batches may be unlabeled (e.g. batch scoring): no severity column means no target
+        labeled = 'Accident Severity' in df.columns
+        cols = [c for c in CATEGORICAL_COLUMNS if fit or labeled or c != 'Accident Severity']
+        df = self.encode_categoricals(df, cols, fit=fit)
+        if not labeled and not fit:
+            return df
+        df['target'] = df['Accident Severity'].map(SEVERITY_MAPPING)
+        if df['target'].isna().any():
+            print(f"⚠️  Warning: {df['target'].isna().sum()} rows have unmapped Accident Severity values")
+            df['target'] = df['target'].fillna(0)
+        return df
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feature rows for a new batch using the saved encoders"""
+        return self.process(df, fit=False)
+
+    def save(self, path='models/feature_columns.joblib'):
+        import joblib
+        joblib.dump(self.label_encoders, path)
+
+    @classmethod
+    def load(cls, path='models/feature_columns.joblib'):
+        import joblib
+        return cls(joblib.load(path))
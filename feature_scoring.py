@@ -0,0 +1,256 @@
+import re
+
+
+def parse_experience_to_years(experience_input):
+    """Parse driver experience string to years"""
+    try:
+        experience_str = str(experience_input).lower().strip()
+        number = re.search(r'\d+\.?\d*', experience_str)
+        if not number:
+            return 5.0
+        value = float(number.group())
+        if 'month' in experience_str:
+            return value / 12
+        else:
+            return value
+    except:
+        return 5.0
+
+
+def format_experience_display(years):
+    """Format years to readable experience string"""
+    if years < 1:
+        months = int(years * 12)
+        return f"{months} months"
+    else:
+        return f"{years:.1f} years"
+
+
+def calculate_experience_score(years):
+    """Calculate risk score based on driver experience (1-5 scale)"""
+    if years < 0.5:
+        return 5  # Extreme risk
+    elif years < 1:
+        return 4  # Very high risk
+    elif years < 2:
+        return 3  # High risk
+    elif years < 5:
+        return 2  # Medium risk
+    else:
+        return 1  # Low risk
+
+
+def calculate_driver_speed_score(speed_habit):
+    """Calculate risk score based on driving speed habit (1-5 scale)"""
+    try:
+        speed = float(speed_habit)
+        if speed < 40:
+            return 1  # Safe/Cautious
+        elif speed < 60:
+            return 1  # Moderate
+        elif speed < 80:
+            return 2  # Slightly risky
+        elif speed < 100:
+            return 3  # Risky
+        else:
+            return 4  # Very risky
+    except:
+        return 2
+
+
+def calculate_age_risk_score(age):
+    """Calculate risk score based on driver age (1-5 scale)"""
+    if age < 20:
+        return 5  # Very high risk
+    elif age < 25:
+        return 4  # High risk
+    elif age > 70:
+        return 4  # High risk (elderly)
+    elif age > 60:
+        return 3  # Medium risk
+    else:
+        return 1  # Low risk (25-60)
+
+
+def calculate_vehicle_condition_score(condition):
+    """Calculate risk score based on vehicle condition (1-5 scale)"""
+    condition_lower = str(condition).lower()
+    if 'poor' in condition_lower or 'bad' in condition_lower or 'terrible' in condition_lower:
+        return 5  # Extreme risk
+    elif 'average' in condition_lower or 'medium' in condition_lower or 'ok' in condition_lower:
+        return 3  # Medium risk
+    elif 'good' in condition_lower or 'excellent' in condition_lower:
+        return 1  # Low risk
+    else:
+        return 2  # Default moderate risk
+
+
+def calculate_weather_risk_score(weather):
+    """Calculate risk score based on weather (1-5 scale)"""
+    weather_lower = str(weather).lower()
+    if 'storm' in weather_lower or 'tornado' in weather_lower or 'hurricane' in weather_lower:
+        return 5  # Extreme risk
+    elif 'heavy rain' in weather_lower or 'snow' in weather_lower or 'hail' in weather_lower:
+        return 4  # Very high risk
+    elif 'rain' in weather_lower or 'fog' in weather_lower or 'mist' in weather_lower:
+        return 3  # High risk
+    elif 'cloudy' in weather_lower or 'drizzle' in weather_lower:
+        return 2  # Medium risk
+    else:  # Clear, sunny
+        return 1  # Low risk
+
+
+def calculate_road_type_score(road_type):
+    """Calculate risk score based on road type (1-4 scale)"""
+    road_type = str(road_type).lower()
+    return 4 if 'national' in road_type else 3 if 'state' in road_type else 2 if 'urban' in road_type else 1
+
+
+def calculate_road_condition_score(road_condition):
+    """Calculate risk score based on road condition (1-5 scale)"""
+    road_cond = str(road_condition).lower()
+    return 5 if 'construction' in road_cond else 4 if 'damaged' in road_cond else 3 if 'wet' in road_cond else 1
+
+
+def calculate_license_score(license_status):
+    """Calculate risk score based on driver license status (1-5 scale)"""
+    license_status = str(license_status).lower()
+    return 5 if 'expired' in license_status else 4 if 'no' in license_status else 1
+
+
+def encode_categorical(value, category_type):
+    """Encode categorical features"""
+    value_lower = str(value).lower().strip()
+    
+    if category_type == 'state':
+        state_mapping = {
+            'maharashtra': 0, 'delhi': 1, 'karnataka': 2, 'tamil nadu': 3,
+            'gujarat': 4, 'uttar pradesh': 5, 'punjab': 6, 'west bengal': 7,
+            'rajasthan': 8, 'telangana': 9, 'andhra pradesh': 10
+        }
+        return state_mapping.get(value_lower, 0)
+    
+    elif category_type == 'city':
+        city_mapping = {
+            'mumbai': 0, 'delhi': 1, 'bangalore': 2, 'chennai': 3, 'pune': 4,
+            'hyderabad': 5, 'kolkata': 6, 'ahmedabad': 7, 'lucknow': 8, 'chandigarh': 9
+        }
+        return city_mapping.get(value_lower, 0)
+    
+    elif category_type == 'vehicle':
+        vehicle_mapping = {'car': 0, 'bike': 1, 'motorcycle': 1, 'truck': 2, 'auto': 3, 'suv': 0}
+        return vehicle_mapping.get(value_lower, 0)
+    
+    elif category_type == 'lighting':
+        if 'dark' in value_lower or 'night' in value_lower:
+            return 1
+        else:
+            return 0
+    
+    elif category_type == 'traffic':
+        traffic_mapping = {'lights': 2, 'signs': 1, 'police': 2, 'none': 0}
+        return traffic_mapping.get(value_lower, 0)
+    
+    return 0
+
+
+# Code for state/city names the training LabelEncoder never saw (as FeatureEngineer.encode_categoricals(fit=False))
+UNKNOWN_LOCATION_CODE = -1
+
+
+def encode_location(value, category_type, gazetteer=None):
+    """
+    State/city code as LabelEncoder assigned it in training (gazetteer), hard-coded mapping otherwise
+    With a gazetteer, unknown names get UNKNOWN_LOCATION_CODE; legacy codes would collide with real labels
+    """
+    if gazetteer is None:
+        return encode_categorical(value, category_type)
+    code = gazetteer.code(value, category_type)
+    return UNKNOWN_LOCATION_CODE if code is None else code
+
+
+# Raw record columns (API field names first, cleaned_data.csv names as fallback) and their defaults
+RAW_FIELD_DEFAULTS = {
+    'datetime': '2023-01-01 12:00',
+    'driver_experience': '5 years',
+    'vehicle_condition': 'good',
+    'driver_speed_habit': 80,
+    'Driver Age': 30,
+    'Weather Conditions': 'Clear',
+    'Road Type': 'Urban Road',
+    'Road Condition': 'Dry',
+    'Driver License Status': 'Valid',
+    'alcohol_flag': 0,
+    'State Name': 'Unknown',
+    'City Name': 'Unknown',
+    'Vehicle Type Involved': 'Car',
+    'Lighting Conditions': 'Bright',
+    'Traffic Control Presence': 'Signs'
+}
+
+RAW_FIELD_ALIASES = {
+    'driver_speed_habit': 'driver_speed_habit(km/h)'
+}
+
+RUSH_HOURS = [7, 8, 9, 17, 18, 19]
+
+
+def _raw_column(df, field):
+    """Raw input column with API defaults filled in"""
+    import pandas as pd
+
+    default = RAW_FIELD_DEFAULTS[field]
+    if field in df.columns:
+        col = df[field]
+    elif RAW_FIELD_ALIASES.get(field) in df.columns:
+        col = df[RAW_FIELD_ALIASES[field]]
+    elif field == 'alcohol_flag' and 'Alcohol Involvement' in df.columns:
+        col = (df['Alcohol Involvement'].astype(str).str.lower() == 'yes').astype(int)
+    else:
+        return pd.Series(default, index=df.index)
+    return col.where(col.notna(), default)
+
+
+def _map_unique(series, fn):
+    """Apply a scalar scoring function once per distinct value and broadcast the result"""
+    import pandas as pd
+
+    uniques = pd.unique(series)
+    return series.map(pd.Series([fn(v) for v in uniques], index=uniques))
+
+
+def build_feature_frame(df, dayfirst=False, gazetteer=None):
+    """
+    Vectorized version of the /predict feature pipeline for a DataFrame of raw records
+    Uses the same scalar scoring/encoding functions, evaluated once per distinct value
+    gazetteer: optional gazetteer.Gazetteer supplying training-time State/City codes
+    """
+    import pandas as pd
+
+    dt = pd.to_datetime(_raw_column(df, 'datetime'), dayfirst=dayfirst, errors='coerce')
+    dt = dt.fillna(pd.Timestamp(RAW_FIELD_DEFAULTS['datetime']))
+    hour = dt.dt.hour
+
+    experience_years = _map_unique(_raw_column(df, 'driver_experience'), parse_experience_to_years)
+    speed = pd.to_numeric(_raw_column(df, 'driver_speed_habit'), errors='coerce').fillna(RAW_FIELD_DEFAULTS['driver_speed_habit'])
+    age = pd.to_numeric(_raw_column(df, 'Driver Age'), errors='coerce').fillna(RAW_FIELD_DEFAULTS['Driver Age']).astype(int)
+
+    return pd.DataFrame({
+        'hour': hour,
+        'is_weekend': (dt.dt.weekday >= 5).astype(int),
+        'is_rush_hour': hour.isin(RUSH_HOURS).astype(int),
+        'weather_score': _map_unique(_raw_column(df, 'Weather Conditions'), calculate_weather_risk_score),
+        'road_type_score': _map_unique(_raw_column(df, 'Road Type'), calculate_road_type_score),
+        'road_cond_score': _map_unique(_raw_column(df, 'Road Condition'), calculate_road_condition_score),
+        'age_score': _map_unique(age, calculate_age_risk_score),
+        'license_score': _map_unique(_raw_column(df, 'Driver License Status'), calculate_license_score),
+        'alcohol_flag': pd.to_numeric(_raw_column(df, 'alcohol_flag'), errors='coerce').fillna(0).astype(int),
+        'experience_score': _map_unique(experience_years, calculate_experience_score),
+        'vehicle_condition_score': _map_unique(_raw_column(df, 'vehicle_condition'), calculate_vehicle_condition_score),
+        'driver_speed_score': _map_unique(speed, calculate_driver_speed_score),
+        'State Name_enc': _map_unique(_raw_column(df, 'State Name'), lambda v: encode_location(v, 'state', gazetteer)),
+        'City Name_enc': _map_unique(_raw_column(df, 'City Name'), lambda v: encode_location(v, 'city', gazetteer)),
+        'Vehicle Type Involved_enc': _map_unique(_raw_column(df, 'Vehicle Type Involved'), lambda v: encode_categorical(v, 'vehicle')),
+        'Lighting Conditions_enc': _map_unique(_raw_column(df, 'Lighting Conditions'), lambda v: encode_categorical(v, 'lighting')),
+        'Traffic Control Presence_enc': _map_unique(_raw_column(df, 'Traffic Control Presence'), lambda v: encode_categorical(v, 'traffic'))
+    }, index=df.index)
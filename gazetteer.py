@@ -0,0 +1,157 @@
+import argparse
+import bisect
+import json
+import os
+import time
+
+import numpy as np
+
+
+KINDS = ('city', 'state', 'hotspot')
+
+
+def normalize(name):
+    """Case- and whitespace-insensitive lookup key"""
+    return ' '.join(str(name).lower().split())
+
+
+class Gazetteer:
+    """
+    Place names from the training data and hotspot CSV, with coordinates and training-time label codes
+    Prefix search runs on a sorted array of keys (full name plus every later word, so "district"
+    finds "North District-29"); a query is two binary searches plus a rank over the matching range
+    """
+
+    def __init__(self, entries, meta=None):
+        self.entries = entries
+        self.meta = meta or {}
+        self.kinds = np.array([KINDS.index(e['kind']) for e in entries], dtype=np.int8)
+        self.counts = np.array([e.get('count') or 0 for e in entries], dtype=np.int64)
+        self._codes = {kind: {} for kind in KINDS}
+        pairs = []
+        for i, entry in enumerate(entries):
+            key = normalize(entry['name'])
+            if entry.get('code') is not None:
+                self._codes[entry['kind']].setdefault(key, entry['code'])
+            words = key.split(' ')
+            pairs.append((key, i, True))
+            pairs += [(' '.join(words[k:]), i, False) for k in range(1, len(words))]
+        pairs.sort()
+        self.keys = [k for k, _, _ in pairs]
+        self.targets = np.array([i for _, i, _ in pairs], dtype=np.int64)
+        self.full_name = np.array([full for _, _, full in pairs], dtype=bool)
+
+    def search(self, prefix, kinds=None, limit=10):
+        """
+        Entries with a name (or a later word of it) starting with prefix
+        Ranked by full-name match first, then by number of training accidents
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_left(self.keys, key + '\uffff', lo)
+        if hi == lo:
+            return []
+        targets = self.targets[lo:hi]
+        score = self.counts[targets] + self.full_name[lo:hi] * (1 << 40)
+        if kinds:
+            score = np.where(np.isin(self.kinds[targets], [KINDS.index(k) for k in kinds]), score, -1)
+        results, seen = [], set()
+        for k in np.argsort(-score, kind='stable'):
+            if score[k] < 0 or len(results) >= limit:
+                break
+            target = int(targets[k])
+            if target not in seen:
+                seen.add(target)
+                results.append(self.entries[target])
+        return results
+
+    def code(self, name, kind):
+        """Training-time label code for a city or state name, None when unseen"""
+        return self._codes[kind].get(normalize(name))
+
+    def codes(self, kind):
+        """Distinct training-time label codes of a kind, sorted"""
+        return sorted(set(self._codes[kind].values()))
+
+    def city_code(self, name):
+        return self.code(name, 'city')
+
+    def state_code(self, name):
+        return self.code(name, 'state')
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'meta': self.meta, 'entries': self.entries}, f)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['entries'], data.get('meta'))
+
+    @classmethod
+    def build(cls, featured_csv='featured_data.csv', hotspots_csv='asia_accident_hotspots_enhanced.csv'):
+        """
+        Cities and states from featured_data.csv (label codes as used in training, mean accident location)
+        plus named hotspots from the hotspot CSV
+        """
+        import pandas as pd
+
+        entries = []
+        if featured_csv and os.path.exists(featured_csv):
+            cols = ['State Name', 'City Name', 'latitude', 'longitude', 'State Name_enc', 'City Name_enc']
+            df = pd.read_csv(featured_csv, usecols=lambda c: c in cols)
+            cities = df.groupby('City Name').agg(state=('State Name', lambda s: s.mode().iat[0]),
+                                                 latitude=('latitude', 'mean'), longitude=('longitude', 'mean'),
+                                                 code=('City Name_enc', 'first'), count=('City Name_enc', 'size'))
+            states = df.groupby('State Name').agg(latitude=('latitude', 'mean'), longitude=('longitude', 'mean'),
+                                                  code=('State Name_enc', 'first'), count=('State Name_enc', 'size'))
+            for name, row in cities.iterrows():
+                entries.append({'name': str(name), 'kind': 'city', 'state': str(row['state']),
+                                'latitude': round(float(row['latitude']), 5), 'longitude': round(float(row['longitude']), 5),
+                                'code': int(row['code']), 'count': int(row['count'])})
+            for name, row in states.iterrows():
+                entries.append({'name': str(name), 'kind': 'state', 'state': str(name),
+                                'latitude': round(float(row['latitude']), 5), 'longitude': round(float(row['longitude']), 5),
+                                'code': int(row['code']), 'count': int(row['count'])})
+        if hotspots_csv and os.path.exists(hotspots_csv):
+            from spatial_analysis import HotspotAnalyzer
+            for i, hotspot in enumerate(HotspotAnalyzer(csv_path=hotspots_csv, verbose=False).asia_hotspots):
+                entries.append({'name': str(hotspot['name']), 'kind': 'hotspot', 'state': hotspot.get('country'),
+                                'latitude': float(hotspot['lat']), 'longitude': float(hotspot['lon']),
+                                'code': None, 'count': int(hotspot.get('count') or 0), 'hotspot_id': i})
+        return cls(entries, {'featured_csv': featured_csv, 'hotspots_csv': hotspots_csv,
+                             'cities': sum(e['kind'] == 'city' for e in entries),
+                             'states': sum(e['kind'] == 'state' for e in entries),
+                             'hotspots': sum(e['kind'] == 'hotspot' for e in entries)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the place-name gazetteer used by /autocomplete and /predict')
+    parser.add_argument('--data', default='featured_data.csv', help='Training data with City/State names and label codes')
+    parser.add_argument('--hotspots', default='asia_accident_hotspots_enhanced.csv')
+    parser.add_argument('--out', default='models/gazetteer.json')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    gazetteer = Gazetteer.build(args.data, args.hotspots)
+    gazetteer.save(args.out)
+    print(f"✅ Gazetteer saved: {args.out} ({time.perf_counter() - start:.2f}s)")
+    print(f"   Cities: {gazetteer.meta['cities']:,} | States: {gazetteer.meta['states']:,} | "
+          f"Hotspots: {gazetteer.meta['hotspots']:,} | Index keys: {len(gazetteer.keys):,}")
+
+    queries = ['hyd', 'a', 'north d', 'delhi']
+    start = time.perf_counter()
+    for _ in range(1000):
+        for q in queries:
+            gazetteer.search(q)
+    print(f"   Prefix search: {(time.perf_counter() - start) / (1000 * len(queries)) * 1e6:.0f} µs per query")
+    return gazetteer
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import os
+import time
+
+import numpy as np
+from folium.plugins import MarkerCluster
+from folium.template import Template
+
+from spatial_analysis import MAP_MODES, HotspotAnalyzer
+
+
+class HotspotCluster(MarkerCluster):
+    """
+    Clustered circle markers drawn in the browser from one compact array
+    data rows: [lat, lon, count, band index, name, *extra fields]
+    bands: style per band ({'color', 'label', 'emoji', 'recommendation'})
+    fields: popup lines as [label, row index or band key]
+    Popups and tooltips are rendered on click / hover by one cluster-level handler, not stored per marker
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var map = {{ this._parent.get_name() }};
+                var bands = {{ this.bands|tojson }};
+                var fields = {{ this.fields|tojson }};
+                var radius = {{ this.radius|tojson }};
+                var data = {{ this.data|tojson }};
+                var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+                var maxRadius = radius[1] === null ? Infinity : radius[1];
+                var markers = new Array(data.length);
+                for (var i = 0; i < data.length; i++) {
+                    var row = data[i], color = bands[row[3]].color;
+                    markers[i] = L.circleMarker([row[0], row[1]], {
+                        radius: Math.max(radius[0], Math.min(maxRadius, row[2] / radius[2])),
+                        color: color, fillColor: color, fillOpacity: 0.7, weight: 2, row: i
+                    });
+                }
+                cluster.addLayers(markers);
+
+                function escapeHtml(value) {
+                    return String(value).replace(/[&<>"']/g, function (c) {
+                        return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                    });
+                }
+                function popupHtml(row) {
+                    var band = bands[row[3]], html = '<b>' + escapeHtml(row[4]) + '</b>';
+                    for (var j = 0; j < fields.length; j++) {
+                        var value = typeof fields[j][1] === 'number' ? row[fields[j][1]] : band[fields[j][1]];
+                        html += '<br>' + fields[j][0] + ': ' + (value === null || value === undefined ? 'N/A' : escapeHtml(value));
+                    }
+                    return html;
+                }
+                cluster.on('click', function (e) {
+                    L.popup().setLatLng(e.layer.getLatLng())
+                        .setContent(popupHtml(data[e.layer.options.row])).openOn(map);
+                });
+                cluster.on('mouseover', function (e) {
+                    if (!e.layer.getTooltip()) {
+                        var row = data[e.layer.options.row], band = bands[row[3]];
+                        e.layer.bindTooltip(escapeHtml(row[4]) + ' - ' + (band.emoji ? band.emoji + ' ' : '') + band.label);
+                    }
+                    e.layer.openTooltip();
+                });
+
+                cluster.addTo(map);
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, data, bands, fields, radius=(10, 50, 50), name=None, **kwargs):
+        kwargs.setdefault('chunked_loading', True)
+        super().__init__(name=name, **kwargs)
+        self._name = 'HotspotCluster'
+        self.data = data
+        self.bands = bands
+        self.fields = fields
+        self.radius = list(radius)
+
+
+def _plain(value):
+    """JSON-safe scalar: numpy values unwrapped, NaN as null"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+
+def distance_bands(analyzer):
+    """Band styles in classify_distance_bands order"""
+    return [{'color': info['color'], 'label': info['risk_level'], 'emoji': info['emoji'],
+             'recommendation': info['travel_recommendation']} for info in analyzer.risk_bands()]
+
+
+def add_distance_cluster(m, analyzer, user_lat=None, user_lon=None, radius_km=500):
+    """
+    Every hotspot within radius_km of the user (all hotspots without a location) as one HotspotCluster,
+    coloured by distance band. Returns the number of hotspots drawn
+    """
+    hotspots, distances = analyzer.hotspot_distances(user_lat, user_lon)
+    if user_lat and user_lon:
+        rows = np.flatnonzero(distances <= radius_km)
+    else:
+        rows = np.arange(len(hotspots))
+        distances = np.zeros(len(hotspots))
+    bands = analyzer.classify_distance_bands(distances[rows])
+    data = []
+    for i, band in zip(rows.tolist(), bands.tolist()):
+        h = hotspots[i]
+        data.append([round(float(h['lat']), 5), round(float(h['lon']), 5), _plain(h['count']), band, str(h['name']),
+                     round(float(distances[i]), 2), _plain(h.get('fatality_rate')),
+                     _plain(h.get('emergency_response_time_min'))])
+    fields = [['Distance (km)', 5], ['Risk Level', 'label'], ['Accidents', 2], ['Fatality Rate', 6],
+              ['Emergency Response (min)', 7], ['Recommendation', 'recommendation']]
+    if data:
+        HotspotCluster(data, distance_bands(analyzer), fields, radius=(10, 50, 50), name='Hotspots').add_to(m)
+    return len(data)
+
+
+def add_count_cluster(m, hotspots, colormap, n_bands=8):
+    """DBSCAN clusters (HotspotAnalyzer.fit) as one HotspotCluster, coloured by accident count in n_bands steps"""
+    counts = np.array([h['count'] for h in hotspots], dtype=np.float64)
+    edges = np.linspace(counts.min(), counts.max(), n_bands + 1)
+    bands = [{'color': colormap((lo + hi) / 2), 'label': f'{lo:.0f}-{hi:.0f} accidents', 'emoji': ''}
+             for lo, hi in zip(edges[:-1], edges[1:])]
+    band_index = np.clip(np.searchsorted(edges, counts, side='right') - 1, 0, n_bands - 1)
+    data = [[round(float(h['center'][0]), 5), round(float(h['center'][1]), 5), _plain(h['count']), int(b),
+             f"Cluster {h['cluster_id']}", h.get('severity', 'UNKNOWN')]
+            for h, b in zip(hotspots, band_index)]
+    HotspotCluster(data, bands, [['Accidents', 2], ['Severity', 5]], radius=(5, None, 5), name='Clusters').add_to(m)
+    return len(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare marker and clustered hotspot map rendering on synthetic hotspot sets')
+    parser.add_argument('--hotspots', default='asia_accident_hotspots_enhanced.csv')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 10000])
+    parser.add_argument('--out-dir', default='outputs/map_bench')
+    args = parser.parse_args(argv)
+
+    analyzer = HotspotAnalyzer(csv_path=args.hotspots, verbose=False)
+    base = analyzer.asia_hotspots
+    rng = np.random.default_rng(42)
+    print("🗺️  Hotspot map rendering (all hotspots, no user location)")
+    for n in args.sizes:
+        picks = rng.integers(0, len(base), n)
+        analyzer.asia_hotspots = [dict(base[p], name=f"{base[p]['name']} #{i}",
+                                       lat=base[p]['lat'] + rng.normal(0, 1.5), lon=base[p]['lon'] + rng.normal(0, 1.5))
+                                  for i, p in enumerate(picks)]
+        for mode in MAP_MODES:
+            path = os.path.join(args.out_dir, f'{mode}_{n}.html')
+            start = time.perf_counter()
+            analyzer.generate_asia_hotspot_map(filename=path, mode=mode, max_markers=None)
+            seconds = time.perf_counter() - start
+            print(f"   {n:7,} hotspots | {mode:9s} | {seconds:6.2f}s | {os.path.getsize(path) / 1024 / 1024:7.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import json
+import math
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from spatial_analysis import HotspotAnalyzer
+
+
+EARTH_RADIUS_KM = 6371
+DEFAULT_TILE_DEG = 10.0
+
+
+def tile_of(lat, lon, tile_deg=DEFAULT_TILE_DEG):
+    """(row, col) of the lat/lon tile containing a point"""
+    n_rows = int(math.ceil(180 / tile_deg))
+    n_cols = int(math.ceil(360 / tile_deg))
+    row = min(int((lat + 90) // tile_deg), n_rows - 1)
+    col = int(((lon + 180) % 360) // tile_deg) % n_cols
+    return row, col
+
+
+def shard_of_tile(tile, num_shards):
+    """Deterministic tile -> shard assignment shared by shards and router"""
+    row, col = tile
+    return (row * 7919 + col * 104729) % num_shards
+
+
+def tiles_within(lat, lon, radius_km, tile_deg=DEFAULT_TILE_DEG):
+    """
+    Every tile that can hold a point within radius_km of (lat, lon)
+    Uses exact great-circle bounds on latitude and longitude differences, so no hotspot is missed
+    """
+    n_rows = int(math.ceil(180 / tile_deg))
+    n_cols = int(math.ceil(360 / tile_deg))
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle) + 1e-9
+    lat_lo, lat_hi = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    rows = range(tile_of(lat_lo, 0, tile_deg)[0], tile_of(lat_hi, 0, tile_deg)[0] + 1)
+
+    if angle >= math.pi / 2 - math.radians(abs(lat)) or lat_lo <= -90 or lat_hi >= 90:
+        cols = range(n_cols)
+    else:
+        dlon = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(lat))))) + 1e-9
+        if dlon >= 180:
+            cols = range(n_cols)
+        else:
+            first = tile_of(0, lon - dlon, tile_deg)[1]
+            span = int(math.floor((lon + dlon + 180) / tile_deg) - math.floor((lon - dlon + 180) / tile_deg))
+            cols = sorted({(first + k) % n_cols for k in range(span + 1)})
+    return [(r, c) for r in rows for c in cols]
+
+
+def create_shard_app(csv_path, shard_id, num_shards, tile_deg=DEFAULT_TILE_DEG):
+    """Flask app serving the hotspots of the tiles owned by one shard"""
+    from flask import Flask, request, jsonify
+
+    analyzer = HotspotAnalyzer(csv_path=csv_path, verbose=False)
+    # Global position of each owned hotspot, so the router can reproduce single-node ordering
+    owned = [(i, h) for i, h in enumerate(analyzer.asia_hotspots)
+             if shard_of_tile(tile_of(h['lat'], h['lon'], tile_deg), num_shards) == shard_id]
+    global_order = [i for i, _ in owned]
+    analyzer.asia_hotspots = [h for _, h in owned]
+
+    app = Flask(__name__)
+
+    @app.route('/shard/info')
+    def info():
+        return jsonify({'shard_id': shard_id, 'num_shards': num_shards, 'tile_deg': tile_deg,
+                        'hotspots': len(global_order)}), 200
+
+    @app.route('/shard/nearby', methods=['POST'])
+    def nearby():
+        data = request.get_json()
+        pairs = analyzer.find_nearby_hotspots_indexed(float(data['latitude']), float(data['longitude']),
+                                                      float(data.get('radius_km', 500)))
+        return jsonify({'nearby': [[global_order[i], h] for i, h in pairs]}), 200
+
+    return app
+
+
+class HotspotShardRouter:
+    """
+    Sends nearby-hotspot queries to the shards owning the tiles within the search radius
+    and merges them into the same analysis a single HotspotAnalyzer would return
+    """
+
+    def __init__(self, shard_urls, tile_deg=DEFAULT_TILE_DEG, timeout=5.0):
+        self.shard_urls = [u.rstrip('/') for u in shard_urls]
+        self.tile_deg = tile_deg
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.shard_urls)))
+        # Indexed by global hotspot position, so it applies to merged results unchanged
+        self.time_profile = None
+        # Optional DensitySurface (density_surface.py), loaded by the API itself
+        self.density_surface = None
+
+    # Density scoring only reads self.density_surface, so the single-node implementation is shared
+    density_risk = HotspotAnalyzer.density_risk
+    get_density_risk = HotspotAnalyzer.get_density_risk
+    apply_density_scoring = HotspotAnalyzer.apply_density_scoring
+
+    def shards_for(self, lat, lon, radius_km):
+        return sorted({shard_of_tile(t, len(self.shard_urls)) for t in tiles_within(lat, lon, radius_km, self.tile_deg)})
+
+    def _query(self, shard, payload):
+        req = urllib.request.Request(f'{self.shard_urls[shard]}/shard/nearby', data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())['nearby']
+        except Exception as e:
+            raise RuntimeError(f'Hotspot shard {shard} ({self.shard_urls[shard]}) unavailable: {e}')
+
+    def find_nearby_hotspots_indexed(self, user_lat, user_lon, radius_km=500):
+        """(global hotspot index, hotspot with risk) pairs in single-node order"""
+        payload = {'latitude': user_lat, 'longitude': user_lon, 'radius_km': radius_km}
+        shards = self.shards_for(user_lat, user_lon, radius_km)
+        merged = [pair for result in self._pool.map(lambda s: self._query(s, payload), shards) for pair in result]
+        # (distance, global position) reproduces the stable distance sort of a single node
+        merged.sort(key=lambda pair: (pair[1]['distance_km'], pair[0]))
+        return [(i, h) for i, h in merged]
+
+    def find_nearby_hotspots(self, user_lat, user_lon, radius_km=500):
+        return [h for _, h in self.find_nearby_hotspots_indexed(user_lat, user_lon, radius_km)]
+
+    def get_hotspot_analysis(self, user_lat, user_lon, radius_km=500, when=None):
+        pairs = self.find_nearby_hotspots_indexed(user_lat, user_lon, radius_km)
+        return dict(HotspotAnalyzer.summarize_nearby_at(pairs, radius_km, self.time_profile, when),
+                    shards_queried=len(self.shards_for(user_lat, user_lon, radius_km)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def spawn_local_shards(csv_path, num_shards, tile_deg=DEFAULT_TILE_DEG, startup_timeout=30):
+    """Start num_shards shard servers as local processes; returns (processes, urls)"""
+    procs, urls = [], []
+    for shard_id in range(num_shards):
+        port = _free_port()
+        procs.append(subprocess.Popen(
+            [sys.executable, __file__, 'serve', '--csv', csv_path, '--shard-id', str(shard_id),
+             '--num-shards', str(num_shards), '--tile-deg', str(tile_deg), '--port', str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        urls.append(f'http://127.0.0.1:{port}')
+    deadline = time.time() + startup_timeout
+    for url in urls:
+        while True:
+            try:
+                urllib.request.urlopen(f'{url}/shard/info', timeout=1).read()
+                break
+            except Exception:
+                if time.time() > deadline:
+                    for p in procs:
+                        p.terminate()
+                    raise RuntimeError(f'Shard at {url} did not start')
+                time.sleep(0.2)
+    return procs, urls
+
+
+def check_against_single_node(csv_path, router, samples=500, seed=42):
+    """Compare routed analyses with a single HotspotAnalyzer for random points and radii"""
+    import random
+
+    rng = random.Random(seed)
+    single = HotspotAnalyzer(csv_path=csv_path, verbose=False)
+    points = [(h['lat'] + rng.uniform(-8, 8), h['lon'] + rng.uniform(-8, 8)) for h in single.asia_hotspots]
+    points += [(rng.uniform(-60, 75), rng.uniform(-180, 180)) for _ in range(samples - len(points))]
+    mismatches = 0
+    for lat, lon in points:
+        radius = rng.choice([10, 50, 150, 500, 1500, 5000])
+        expected = single.get_hotspot_analysis(lat, lon, radius)
+        routed = router.get_hotspot_analysis(lat, lon, radius)
+        routed.pop('shards_queried')
+        if json.dumps(expected, sort_keys=True, default=str) != json.dumps(routed, sort_keys=True, default=str):
+            mismatches += 1
+    return len(points), mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Region-sharded hotspot servers and router')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help='Run one shard server')
+    serve.add_argument('--csv', default='asia_accident_hotspots_enhanced.csv')
+    serve.add_argument('--shard-id', type=int, required=True)
+    serve.add_argument('--num-shards', type=int, required=True)
+    serve.add_argument('--tile-deg', type=float, default=DEFAULT_TILE_DEG)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=5101)
+
+    check = sub.add_parser('check', help='Spawn local shards and compare routed results with a single node')
+    check.add_argument('--csv', default='asia_accident_hotspots_enhanced.csv')
+    check.add_argument('--num-shards', type=int, default=3)
+    check.add_argument('--tile-deg', type=float, default=DEFAULT_TILE_DEG)
+    check.add_argument('--samples', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        app = create_shard_app(args.csv, args.shard_id, args.num_shards, args.tile_deg)
+        print(f"🧩 Hotspot shard {args.shard_id}/{args.num_shards} on http://{args.host}:{args.port}")
+        app.run(host=args.host, port=args.port, threaded=True)
+        return 0
+
+    print(f"\n🧩 SHARDED HOTSPOT CHECK ({args.num_shards} local shards, {args.tile_deg}° tiles)")
+    procs, urls = spawn_local_shards(args.csv, args.num_shards, args.tile_deg)
+    try:
+        for url in urls:
+            info = json.loads(urllib.request.urlopen(f'{url}/shard/info').read())
+            print(f"   Shard {info['shard_id']}: {info['hotspots']} hotspots at {url}")
+        router = HotspotShardRouter(urls, args.tile_deg)
+        start = time.perf_counter()
+        total, mismatches = check_against_single_node(args.csv, router, args.samples)
+        print(f"   {total} queries in {time.perf_counter() - start:.2f}s, mismatches vs single node: {mismatches}")
+    finally:
+        for p in procs:
+            p.terminate()
+    print("   ✅ Routed results match single node\n" if mismatches == 0 else "   ❌ Routed results differ\n")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+
+HOURS_PER_WEEK = 168
+
+# Accident weights when aggregating history (a fatal accident counts as three minor ones)
+SEVERITY_WEIGHTS = {'Minor': 1.0, 'Serious': 2.0, 'Fatal': 3.0}
+
+# Lower bounds of the time-risk multiplier levels, highest first
+TIME_RISK_LEVELS = [(1.5, 'PEAK'), (1.15, 'ELEVATED'), (0.85, 'TYPICAL'), (0.0, 'QUIET')]
+
+
+def hour_of_week(when):
+    """Monday 00:00 -> 0 ... Sunday 23:00 -> 167 (datetime or pandas Timestamp)"""
+    return when.weekday() * 24 + when.hour
+
+
+def time_risk_level(multiplier):
+    for bound, level in TIME_RISK_LEVELS:
+        if multiplier >= bound:
+            return level
+    return TIME_RISK_LEVELS[-1][1]
+
+
+class HotspotTimeProfile:
+    """
+    Dense (hotspots + 1) x 168 matrix of hour-of-week risk multipliers (1.0 = that hotspot's weekly average)
+    The last row is the pooled profile, used for hotspots added after the matrix was built (live clusters)
+    A lookup is one array index, so the cost does not depend on the number of hotspots
+    """
+
+    def __init__(self, risk, meta=None):
+        self.risk = risk
+        self.meta = meta or {}
+
+    @property
+    def num_hotspots(self):
+        return len(self.risk) - 1
+
+    def lookup(self, hotspot_ids, how):
+        """Multipliers for hotspot indices at one hour-of-week (vectorized)"""
+        ids = np.asarray(hotspot_ids, dtype=np.int64)
+        ids = np.where((ids >= 0) & (ids < self.num_hotspots), ids, self.num_hotspots)
+        return self.risk[ids, how]
+
+    def annotate(self, pairs, when):
+        """
+        Add time_multiplier / time_risk_level to (hotspot index, hotspot) pairs in place
+        Returns the time-aware summary for the analysis (closest hotspot first)
+        """
+        how = hour_of_week(when)
+        multipliers = self.lookup([i for i, _ in pairs], how) if pairs else np.empty(0)
+        for (_, hotspot), multiplier in zip(pairs, multipliers):
+            hotspot['time_multiplier'] = round(float(multiplier), 3)
+            hotspot['time_risk_level'] = time_risk_level(multiplier)
+        closest = float(multipliers[0]) if len(multipliers) else None
+        return {
+            'hour_of_week': how,
+            'day': when.strftime('%A'),
+            'hour': when.hour,
+            'closest_multiplier': round(closest, 3) if closest is not None else None,
+            'closest_time_risk_level': time_risk_level(closest) if closest is not None else None,
+            'peak_hotspots': int((multipliers >= TIME_RISK_LEVELS[0][0]).sum())
+        }
+
+    def matches(self, hotspots):
+        """True when the matrix rows were built for the leading entries of this hotspot list"""
+        names = self.meta.get('hotspot_names')
+        return names is None or [str(h['name']) for h in hotspots[:len(names)]] == names
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'risk.npy'), np.asarray(self.risk, dtype=np.float32))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a profile directory, memory-mapping the risk matrix"""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        risk = np.load(os.path.join(path, 'risk.npy'), mmap_mode='r' if mmap else None)
+        return cls(risk, meta)
+
+
+def _smooth_circular(profile, kernel=(0.25, 0.5, 0.25)):
+    """Circular smoothing across adjacent hours (Sunday 23:00 wraps to Monday 00:00)"""
+    return sum(w * np.roll(profile, shift, axis=-1) for w, shift in zip(kernel, (1, 0, -1)))
+
+
+def build_time_profile(analyzer, lats, lons, datetimes, severities=None, assign_km=150.0, prior=5.0):
+    """
+    Aggregate historical accidents into per-hotspot hour-of-week multipliers
+    Each accident goes to its nearest hotspot if within assign_km; slot counts are shrunk towards the
+    pooled profile with `prior` pseudo-accidents per slot, so sparse hotspots inherit the pooled shape
+    """
+    distances, idx = analyzer.nearest_hotspots(lats, lons)
+    how = np.asarray(datetimes.dt.weekday * 24 + datetimes.dt.hour, dtype=np.int64)
+    keep = (distances <= assign_km) & (idx >= 0)
+    weights = np.ones(len(idx)) if severities is None else \
+        np.asarray([SEVERITY_WEIGHTS.get(s, 1.0) for s in severities], dtype=np.float64)
+
+    n = len(analyzer.asia_hotspots)
+    counts = np.zeros((n, HOURS_PER_WEEK))
+    np.add.at(counts, (idx[keep], how[keep]), weights[keep])
+
+    pooled = _smooth_circular(counts.sum(axis=0))
+    pooled = pooled / pooled.mean() if pooled.sum() > 0 else np.ones(HOURS_PER_WEEK)
+    slot_mean = counts.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        risk = (counts + prior * pooled) / (slot_mean + prior)
+    # Hotspots without history get the pooled shape (also avoids 0/0 when prior is 0)
+    risk[counts.sum(axis=1) == 0] = pooled
+    risk = np.vstack([risk, pooled]).astype(np.float32)
+
+    meta = {
+        'hotspots': n,
+        'hotspot_names': [str(h['name']) for h in analyzer.asia_hotspots],
+        'assign_km': assign_km,
+        'prior': prior,
+        'accidents_used': int(keep.sum()),
+        'accidents_total': int(len(idx)),
+        'accidents_per_hotspot': np.bincount(idx[keep], minlength=n).tolist()
+    }
+    return HotspotTimeProfile(risk, meta)
+
+
+def main(argv=None):
+    import pandas as pd
+    from spatial_analysis import HotspotAnalyzer
+
+    parser = argparse.ArgumentParser(description='Precompute hour-of-week risk multipliers per hotspot')
+    parser.add_argument('--data', default='cleaned_data.csv', help='Historical accidents (datetime, latitude, longitude)')
+    parser.add_argument('--hotspots', default='asia_accident_hotspots_enhanced.csv')
+    parser.add_argument('--out', default='models/hotspot_time_profile')
+    parser.add_argument('--assign-km', type=float, default=150.0,
+                        help='Accidents farther than this from every hotspot are ignored')
+    parser.add_argument('--prior', type=float, default=5.0,
+                        help='Pseudo-accidents per slot pulling sparse hotspots towards the pooled profile')
+    parser.add_argument('--monthfirst', action='store_true', help='Datetimes are month-first (default day-first)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = pd.read_csv(args.data, usecols=lambda c: c in ('datetime', 'latitude', 'longitude', 'Accident Severity'))
+    df['datetime'] = pd.to_datetime(df['datetime'], dayfirst=not args.monthfirst, errors='coerce')
+    df = df.dropna(subset=['datetime', 'latitude', 'longitude'])
+    analyzer = HotspotAnalyzer(csv_path=args.hotspots, verbose=False)
+    severities = df['Accident Severity'] if 'Accident Severity' in df.columns else None
+    profile = build_time_profile(analyzer, df['latitude'].to_numpy(), df['longitude'].to_numpy(), df['datetime'],
+                                 severities, args.assign_km, args.prior)
+    profile.meta.update({'data': os.path.abspath(args.data), 'build_seconds': round(time.perf_counter() - start, 2)})
+    profile.save(args.out)
+
+    pooled = profile.risk[-1]
+    peak, quiet = int(pooled.argmax()), int(pooled.argmin())
+    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    print(f"✅ Hotspot time profile saved: {args.out}")
+    print(f"   Matrix: {profile.risk.shape[0] - 1} hotspots (+ pooled row) x {HOURS_PER_WEEK} hours, "
+          f"{profile.risk.nbytes / 1024:.1f} KB")
+    print(f"   Accidents used: {profile.meta['accidents_used']:,} of {profile.meta['accidents_total']:,} "
+          f"(within {args.assign_km:g} km of a hotspot)")
+    print(f"   Pooled peak: {days[peak // 24]} {peak % 24:02d}:00 (x{pooled[peak]:.2f}), "
+          f"quietest: {days[quiet // 24]} {quiet % 24:02d}:00 (x{pooled[quiet]:.2f})")
+    return profile
+
+
+if __name__ == '__main__':
+    main()
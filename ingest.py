@@ -0,0 +1,300 @@
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+
+class ColumnarStore:
+    """
+    Append-only training store: one snappy Parquet part file per micro-batch under a directory
+    Readable as a single table with pd.read_parquet(root); the schema is fixed by the first part
+    """
+
+    def __init__(self, root):
+        import pyarrow.parquet as pq
+
+        self.root = root
+        self._schema = None
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        parts = self.parts()
+        if parts:
+            self._schema = pq.read_schema(parts[-1])
+
+    def parts(self):
+        return sorted(glob.glob(os.path.join(self.root, 'part-*.parquet')))
+
+    def append(self, df):
+        """Write one batch as a new part file (atomic rename, hidden temp name)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with self._lock:
+            if self._schema is None:
+                self._schema = table.schema
+            else:
+                table = table.select(self._schema.names).cast(self._schema)
+            name = f'part-{time.time_ns():020d}-{uuid.uuid4().hex[:6]}.parquet'
+            tmp_path = os.path.join(self.root, f'.{name}.tmp')
+            pq.write_table(table, tmp_path, compression='snappy')
+            os.replace(tmp_path, os.path.join(self.root, name))
+        return len(df)
+
+    def rows(self):
+        import pyarrow.parquet as pq
+        return sum(pq.ParquetFile(p).metadata.num_rows for p in self.parts())
+
+    def read(self, columns=None):
+        import pandas as pd
+        if not self.parts():
+            return pd.DataFrame(columns=columns)
+        return pd.read_parquet(self.root, columns=columns)
+
+
+def load_feature_engineer(encoders_path='models/feature_columns.joblib', cleaned_csv='cleaned_data.csv'):
+    """
+    FeatureEngineer with the label encoders used for featured_data.csv
+    Falls back to refitting them on cleaned_data.csv exactly like the notebook does
+    """
+    from feature_engineering import FeatureEngineer
+
+    if encoders_path and os.path.exists(encoders_path):
+        return FeatureEngineer.load(encoders_path)
+    fe = FeatureEngineer()
+    if cleaned_csv and os.path.exists(cleaned_csv):
+        import pandas as pd
+        fe.process(pd.read_csv(cleaned_csv, parse_dates=['datetime'], dayfirst=True))
+    else:
+        print("⚠️  No label encoders found, categorical columns will be encoded as -1")
+    return fe
+
+
+def parse_ndjson(lines, first_line=1):
+    """Parse NDJSON lines into records; returns (records, line numbers, errors)"""
+    records, line_numbers, errors = [], [], []
+    for number, line in enumerate(lines, start=first_line):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            errors.append({'line': number, 'error': f'invalid JSON: {e}'})
+            continue
+        if not isinstance(record, dict):
+            errors.append({'line': number, 'error': 'expected a JSON object'})
+            continue
+        records.append(record)
+        line_numbers.append(number)
+    return records, line_numbers, errors
+
+
+class IngestPipeline:
+    """
+    Validated accident reports -> FeatureEngineer -> columnar store + sinks, on a worker thread
+    At most max_pending micro-batches of batch_rows reports are buffered; submit() blocks or raises
+    queue.Full beyond that, which is the backpressure signal for callers
+    """
+
+    def __init__(self, store, feature_engineer, sinks=(), batch_rows=1000, max_pending=8, dayfirst=False):
+        self.store = store
+        self.feature_engineer = feature_engineer
+        self.sinks = list(sinks)
+        self.batch_rows = batch_rows
+        self.dayfirst = dayfirst
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.stats = {'accepted': 0, 'rejected': 0, 'written': 0, 'batches': 0, 'failed_batches': 0,
+                      'last_error': None}
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, lines, first_line=1, timeout=None, dayfirst=None):
+        """
+        Validate one micro-batch of NDJSON lines and queue the valid rows
+        Raises queue.Full when the pipeline stays saturated for `timeout` seconds
+        """
+        import pandas as pd
+        from feature_engineering import validate_reports
+
+        records, line_numbers, errors = parse_ndjson(lines, first_line)
+        accepted = 0
+        if records:
+            dayfirst = self.dayfirst if dayfirst is None else dayfirst
+            valid, rejected = validate_reports(pd.DataFrame(records), dayfirst=dayfirst)
+            errors += [{'line': line_numbers[r['row']], 'error': r['error']} for r in rejected]
+            if len(valid):
+                self.queue.put(valid.reset_index(drop=True), timeout=timeout)
+                accepted = len(valid)
+        self._count(accepted=accepted, rejected=len(errors))
+        return {'accepted': accepted, 'rejected': len(errors), 'errors': errors}
+
+    def ingest_lines(self, lines, timeout=None, dayfirst=None, max_errors=20):
+        """
+        Stream an iterable of NDJSON lines through submit() in micro-batches
+        Stops early (backpressure=True) if the queue stays full; lines_consumed tells the client where to resume
+        """
+        result = {'accepted': 0, 'rejected': 0, 'errors': [], 'lines_consumed': 0, 'backpressure': False}
+        batch = []
+
+        def flush_batch():
+            out = self.submit(batch, first_line=result['lines_consumed'] + 1, timeout=timeout, dayfirst=dayfirst)
+            result['accepted'] += out['accepted']
+            result['rejected'] += out['rejected']
+            result['errors'] = (result['errors'] + out['errors'])[:max_errors]
+            result['lines_consumed'] += len(batch)
+            batch.clear()
+
+        try:
+            for line in lines:
+                batch.append(line)
+                if len(batch) >= self.batch_rows:
+                    flush_batch()
+            if batch:
+                flush_batch()
+        except queue.Full:
+            result['backpressure'] = True
+        result['queued_batches'] = self.queue.qsize()
+        return result
+
+    def _run(self):
+        while True:
+            batch = self.queue.get()
+            try:
+                if batch is None:
+                    return
+                featured = self.feature_engineer.transform(batch)
+                self.store.append(featured)
+                for sink in self.sinks:
+                    sink(featured)
+                self._count(written=len(featured), batches=1)
+            except Exception as e:
+                self._count(failed_batches=1, last_error=str(e))
+                print(f"❌ Ingest batch failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _count(self, last_error=None, **deltas):
+        """Add to the counters (submit() runs on request threads, _run() on the worker)"""
+        with self._stats_lock:
+            for name, value in deltas.items():
+                self.stats[name] += value
+            if last_error is not None:
+                self.stats['last_error'] = last_error
+
+    def status(self):
+        """Snapshot of the counters and the queue depth"""
+        with self._stats_lock:
+            return dict(self.stats, queued_batches=self.queue.qsize())
+
+    def flush(self):
+        """Block until every queued batch is written"""
+        self.queue.join()
+
+    def close(self):
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+def tail_lines(path, offset=0, follow=False, poll_seconds=1.0, on_idle=None):
+    """
+    Yield (line, end offset) from a growing NDJSON file starting at a byte offset
+    A trailing line without a newline is held back until it is complete
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if line.endswith(b'\n'):
+                yield line, f.tell()
+                continue
+            f.seek(position)
+            if on_idle is not None:
+                on_idle(position)
+            if not follow:
+                return
+            time.sleep(poll_seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tail an NDJSON file of accident reports into the columnar training store')
+    parser.add_argument('input', help='NDJSON file (one accident report per line), may still be growing')
+    parser.add_argument('--store', default='data/ingest_store')
+    parser.add_argument('--encoders', default='models/feature_columns.joblib')
+    parser.add_argument('--cleaned', default='cleaned_data.csv',
+                        help='Used to refit label encoders when --encoders is missing')
+    parser.add_argument('--batch-rows', type=int, default=1000)
+    parser.add_argument('--max-pending', type=int, default=8)
+    parser.add_argument('--dayfirst', action='store_true', help='Parse datetimes day-first (as in cleaned_data.csv)')
+    parser.add_argument('--follow', action='store_true', help='Keep polling for new lines (like tail -f)')
+    parser.add_argument('--poll', type=float, default=1.0)
+    parser.add_argument('--offset-file', default=None,
+                        help='Persist the committed byte offset here to resume after a restart')
+    args = parser.parse_args(argv)
+
+    offset = 0
+    if args.offset_file and os.path.exists(args.offset_file):
+        with open(args.offset_file) as f:
+            offset = int(f.read().strip() or 0)
+
+    print("\n📥 NDJSON INGESTION")
+    print(f"   Input: {args.input} (from byte {offset})")
+    print(f"   Store: {args.store}")
+    pipeline = IngestPipeline(ColumnarStore(args.store), load_feature_engineer(args.encoders, args.cleaned),
+                              batch_rows=args.batch_rows, max_pending=args.max_pending, dayfirst=args.dayfirst).start()
+    state = {'committed': offset, 'line': 0}
+    batch = []
+
+    def commit(position):
+        # Everything before `position` has been queued; wait for it to be written, then persist the offset
+        if batch:
+            submit_batch()
+        pipeline.flush()
+        if args.offset_file and position != state['committed']:
+            with open(args.offset_file, 'w') as f:
+                f.write(str(position))
+        state['committed'] = position
+
+    def submit_batch():
+        out = pipeline.submit(batch, first_line=state['line'] - len(batch) + 1)
+        for error in out['errors'][:5]:
+            print(f"   ⚠️  line {error['line']}: {error['error']}")
+        batch.clear()
+
+    start = time.perf_counter()
+    try:
+        for line, _ in tail_lines(args.input, offset, args.follow, args.poll, on_idle=commit):
+            state['line'] += 1
+            batch.append(line)
+            if len(batch) >= args.batch_rows:
+                submit_batch()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.flush()
+        pipeline.close()
+
+    seconds = time.perf_counter() - start
+    stats = pipeline.status()
+    print(f"\n✅ Accepted {stats['accepted']:,} | rejected {stats['rejected']:,} | written {stats['written']:,} "
+          f"in {seconds:.2f}s | store rows {pipeline.store.rows():,}\n")
+    return stats
+
+
+if __name__ == '__main__':
+    main()
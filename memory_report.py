@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Libraries whose standalone import cost is reported (each measured in its own fresh interpreter)
+LIBRARIES = ['numpy', 'pandas', 'sklearn.ensemble', 'xgboost', 'scipy.sparse', 'flask', 'folium', 'pyarrow']
+
+# Budgets on the reference dataset (featured_data.csv model, asia_accident_hotspots_enhanced.csv), in MB:
+# component -> deep object size, step -> RSS growth, 'worker_rss' -> RSS after load_resources()
+BUDGETS_MB = {
+    'components': {
+        'model': 32,
+        'hotspot_dataframe': 1,
+        'hotspot_list': 1,
+        'hotspot_index': 0.5,
+        'severity_table': 16,
+        'density_surface': 16,
+        'time_profile': 2,
+        'gazetteer': 8,
+        'drift_monitor': 4,
+        'model_catalog': 256
+    },
+    'steps': {
+        'import prediction_api': 80,
+        'load_resources': 300,
+        'first map (folium)': 40
+    },
+    'worker_rss': 400
+}
+
+PROBE = "from memory_report import {function}; {function}({args})"
+
+
+def _proc_kb(path, keys):
+    """Selected 'Key: N kB' fields of a /proc file in MB (None where unavailable, e.g. outside Linux)"""
+    values = dict.fromkeys(keys)
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in values:
+                    values[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        pass
+    return values
+
+
+def memory_counters():
+    """RSS / PSS / shared / private memory of this process and Python-traced bytes, in MB"""
+    status = _proc_kb('/proc/self/status', ['VmRSS', 'RssAnon', 'RssFile', 'RssShmem'])
+    rollup = _proc_kb('/proc/self/smaps_rollup', ['Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'])
+    shared = [rollup['Shared_Clean'], rollup['Shared_Dirty']]
+    private = [rollup['Private_Clean'], rollup['Private_Dirty']]
+    traced = tracemalloc.get_traced_memory()[0] / 1024 ** 2 if tracemalloc.is_tracing() else None
+    overhead = tracemalloc.get_tracemalloc_memory() / 1024 ** 2 if tracemalloc.is_tracing() else 0.0
+    rss = status['VmRSS']
+    return {
+        # tracemalloc's own bookkeeping is resident too; it is not part of the measured process
+        'rss': rss - overhead if rss is not None else None,
+        'pss': rollup['Pss'] - overhead if rollup['Pss'] is not None else None,
+        'shared': sum(shared) if None not in shared else None,
+        'private': sum(private) - overhead if None not in private else None,
+        'file_backed': status['RssFile'],
+        'traced': traced
+    }
+
+
+def _delta(after, before):
+    return {k: round(after[k] - before[k], 2) if after[k] is not None and before[k] is not None else None
+            for k in after}
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Bytes reachable from obj: containers, instance __dict__ / __slots__, numpy buffers counted once per owner,
+    pandas objects via memory_usage(deep=True), XGBoost boosters by serialized size, Cython objects
+    (sklearn trees) through __getstate__. Objects already in `seen` are not counted again
+    """
+    import numpy as np
+
+    seen = set() if seen is None else seen
+    skip = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+    # Temporaries (e.g. __getstate__ results) stay referenced so their ids are not reused during the walk
+    total, stack, keep = 0, [obj], []
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, skip):
+            continue
+        seen.add(id(o))
+        if isinstance(o, np.ndarray):
+            root = o
+            while isinstance(root.base, np.ndarray):
+                root = root.base
+            total += sys.getsizeof(o) - (o.nbytes if o.base is None else 0)
+            buffer = ('buffer', root.__array_interface__['data'][0])
+            if buffer not in seen:
+                seen.add(buffer)
+                total += root.nbytes
+            if o.dtype == object:
+                stack.extend(o.ravel().tolist())
+            continue
+        if hasattr(o, 'memory_usage') and type(o).__module__.startswith('pandas'):
+            usage = o.memory_usage(deep=True)
+            total += int(usage.sum() if hasattr(usage, 'sum') else usage)
+            continue
+        if hasattr(o, 'save_raw') and hasattr(o, 'num_boosted_rounds'):
+            total += len(o.save_raw())
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)) or type(o).__name__ in ('deque', 'OrderedDict'):
+            stack.extend(o)
+        elif not isinstance(o, (str, bytes, bytearray, int, float, complex, bool)) and o is not None:
+            state = getattr(o, '__dict__', None)
+            if state is not None:
+                stack.append(state)
+            for cls in type(o).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if hasattr(o, slot):
+                        stack.append(getattr(o, slot))
+            if state is None and type(o).__module__.startswith('sklearn'):
+                try:
+                    reduced = o.__getstate__()
+                except Exception:
+                    reduced = None
+                if isinstance(reduced, dict):
+                    keep.append(reduced)
+                    stack.extend(reduced.values())
+    return total
+
+
+def probe_import(module):
+    """Fresh interpreter: memory added by importing one library (and everything it pulls in)"""
+    tracemalloc.start()
+    before = memory_counters()
+    start = time.perf_counter()
+    __import__(module)
+    seconds = time.perf_counter() - start
+    print(json.dumps({'module': module, 'seconds': round(seconds, 3), 'delta': _delta(memory_counters(), before)}))
+
+
+def api_components(api):
+    """Loaded API objects by component, in attribution order (shared objects count toward the first)"""
+    analyzer = api.hotspot_analyzer
+    catalog = api.model_catalog
+    return [
+        ('model', api.model),
+        ('hotspot_dataframe', analyzer.asia_hotspots_df),
+        ('hotspot_list', analyzer.asia_hotspots),
+        ('hotspot_index', (analyzer.hotspot_lat_rad, analyzer.hotspot_lon_rad)),
+        ('severity_table', api.severity_table),
+        ('density_surface', analyzer.density_surface),
+        ('time_profile', analyzer.time_profile),
+        ('gazetteer', api.gazetteer),
+        ('drift_monitor', api.drift_monitor),
+        ('model_catalog', catalog._resident if catalog is not None else None)
+    ]
+
+
+def probe_api(first_map=True):
+    """Fresh interpreter: import, load_resources() and first map rendering of the API, then per-component sizes"""
+    tracemalloc.start()
+    steps = []
+    before = memory_counters()
+    baseline = before
+
+    def step(name, action):
+        nonlocal before
+        start = time.perf_counter()
+        action()
+        after = memory_counters()
+        steps.append({'step': name, 'seconds': round(time.perf_counter() - start, 3), 'delta': _delta(after, before)})
+        before = after
+
+    step('import prediction_api', lambda: __import__('prediction_api'))
+    api = sys.modules['prediction_api']
+    step('load_resources', api.load_resources)
+    loaded = memory_counters()
+    libraries_loaded = [m for m in LIBRARIES if m in sys.modules]
+    if first_map:
+        import tempfile
+        out = os.path.join(tempfile.mkdtemp(), 'map.html')
+        step('first map (folium)', lambda: api.hotspot_analyzer.generate_asia_hotspot_map(19.076, 72.8777, 500, out))
+
+    seen = set()
+    components = []
+    for name, obj in api_components(api):
+        if obj is not None:
+            components.append({'component': name, 'mb': round(deep_sizeof(obj, seen) / 1024 ** 2, 3)})
+    traced_load = next(s['delta']['traced'] for s in steps if s['step'] == 'load_resources')
+    print(json.dumps({
+        'baseline': {k: round(v, 2) if v is not None else None for k, v in baseline.items()},
+        'steps': steps,
+        'worker': {k: round(v, 2) if v is not None else None for k, v in loaded.items()},
+        'components': components,
+        'unattributed_traced_mb': round(traced_load - sum(c['mb'] for c in components), 2),
+        'libraries_loaded': libraries_loaded
+    }))
+
+
+def _run_probe(function, args='', env=None):
+    code = PROBE.format(function=function, args=args)
+    out = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True, text=True, check=True,
+                         env=dict(os.environ, **env) if env else None)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(libraries=LIBRARIES, first_map=True, env=None):
+    """
+    Memory report from fresh interpreters: per-library import cost and the API's steps and components
+    env: extra environment variables for the API probe (e.g. MODEL_DIR / HOTSPOTS_CSV)
+    """
+    imports = []
+    for module in libraries:
+        try:
+            imports.append(_run_probe('probe_import', repr(module)))
+        except subprocess.CalledProcessError:
+            imports.append({'module': module, 'seconds': None, 'delta': None})
+    return {'imports': imports, 'api': _run_probe('probe_api', repr(first_map), env)}
+
+
+def check_budgets(report, budgets=BUDGETS_MB):
+    """Budget violations as messages (empty list when everything fits)"""
+    failures = []
+    for c in report['api']['components']:
+        limit = budgets['components'].get(c['component'])
+        if limit is not None and c['mb'] > limit:
+            failures.append(f"component {c['component']}: {c['mb']:.1f} MB > budget {limit} MB")
+    for s in report['api']['steps']:
+        limit = budgets['steps'].get(s['step'])
+        rss = s['delta']['rss']
+        if limit is not None and rss is not None and rss > limit:
+            failures.append(f"step {s['step']}: +{rss:.1f} MB RSS > budget {limit} MB")
+    worker_rss = report['api']['worker']['rss']
+    if worker_rss is not None and worker_rss > budgets['worker_rss']:
+        failures.append(f"worker RSS after load: {worker_rss:.1f} MB > budget {budgets['worker_rss']} MB")
+    return failures
+
+
+def _mb(value, sign=True):
+    if value is None:
+        return '       -'
+    return f"{value:+8.1f}" if sign else f"{value:8.1f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Per-component memory accounting for an API worker (needs MODEL_DIR / HOTSPOTS_CSV)')
+    parser.add_argument('--budgets', default=None, help='JSON file overriding the built-in budgets (same layout as BUDGETS_MB)')
+    parser.add_argument('--skip-imports', action='store_true', help='Only measure the API worker')
+    parser.add_argument('--no-map', action='store_true', help='Skip the first folium map rendering step')
+    parser.add_argument('--out', default=None, help='Also write the report as JSON')
+    args = parser.parse_args(argv)
+
+    budgets = BUDGETS_MB
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets = json.load(f)
+
+    print("\n🧠 MEMORY REPORT")
+    report = measure([] if args.skip_imports else LIBRARIES, not args.no_map)
+    api = report['api']
+    if report['imports']:
+        print("   Library imports (each in a fresh interpreter):      RSS      PSS   shared   traced")
+        for r in report['imports']:
+            d = r['delta'] or dict.fromkeys(('rss', 'pss', 'shared', 'traced'))
+            print(f"      {r['module']:44s} {_mb(d['rss'])} {_mb(d['pss'])} {_mb(d['shared'])} {_mb(d['traced'])}")
+    print(f"   API worker (baseline RSS {api['baseline']['rss']} MB):                  RSS      PSS   shared   traced")
+    for s in api['steps']:
+        d = s['delta']
+        print(f"      {s['step']:44s} {_mb(d['rss'])} {_mb(d['pss'])} {_mb(d['shared'])} {_mb(d['traced'])}")
+    w = api['worker']
+    print(f"      {'after load_resources (total)':44s} {_mb(w['rss'], False)} {_mb(w['pss'], False)} "
+          f"{_mb(w['shared'], False)} {_mb(w['traced'], False)}")
+    print("   Components (deep object size, MB):")
+    for c in api['components']:
+        limit = budgets['components'].get(c['component'])
+        print(f"      {c['component']:24s} {c['mb']:9.3f}   budget {limit if limit is not None else '-'}")
+    print(f"      {'(unattributed traced)':24s} {api['unattributed_traced_mb']:9.3f}")
+    print(f"   Libraries loaded by the worker: {', '.join(api['libraries_loaded'])}")
+
+    if args.out:
+        from report_model import save_json
+        save_json(report, args.out)
+    failures = check_budgets(report, budgets)
+    for failure in failures:
+        print(f"   ❌ {failure}")
+    if not failures:
+        print("   ✅ Within memory budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+
+CATALOG_FILE = 'catalog.json'
+GLOBAL_KEY = 'global'
+
+
+def partition_key(value):
+    """Routing key for a partition value (case- and whitespace-insensitive)"""
+    return ' '.join(str(value).lower().split())
+
+
+def partition_slug(value):
+    return re.sub(r'[^a-z0-9]+', '_', partition_key(value)).strip('_') or 'unknown'
+
+
+def fit_partition(key, estimator, X_train, y_train, X_test, y_test, global_pred, out_path):
+    """
+    Fit one partition model on its rows of the global training split and score it on its rows of the
+    global test split, next to the global model's predictions for the same rows (process-pool task)
+    """
+    import joblib
+    from sklearn.base import clone
+    from sklearn.metrics import accuracy_score, f1_score
+    from sklearn.utils.class_weight import compute_sample_weight
+
+    start = time.perf_counter()
+    model = clone(estimator)
+    params = model.get_params()
+    fit_params = {} if params.get('class_weight') else {'sample_weight': compute_sample_weight('balanced', y_train)}
+    model.fit(X_train, y_train, **fit_params)
+    y_pred = model.predict(X_test)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    joblib.dump(model, out_path)
+    return {
+        'key': key,
+        'file': os.path.basename(out_path),
+        'bytes': os.path.getsize(out_path),
+        'train_rows': int(len(X_train)),
+        'test_rows': int(len(X_test)),
+        'accuracy': round(float(accuracy_score(y_test, y_pred)), 4),
+        'f1_weighted': round(float(f1_score(y_test, y_pred, average='weighted')), 4),
+        'global_f1_weighted': round(float(f1_score(y_test, global_pred, average='weighted')), 4),
+        'fit_seconds': round(time.perf_counter() - start, 2)
+    }
+
+
+def _partition_pool(workers):
+    """
+    Forked processes where available: retrain_model.py is a plain script, and spawn-based pools would re-run it
+    in every worker. Threads elsewhere (tree fitting releases the GIL for most of its work)
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+
+
+def train_partitions(estimator, X_train, y_train, X_test, y_test, global_pred, part_train, part_test,
+                     out_dir='models/regional', partition_by='State Name', min_rows=300, min_gain=0.0, workers=None):
+    """
+    Fit one model per partition value in parallel and write the catalog
+    X_train / X_test: feature DataFrames (partition models keep the feature names); y_*: label arrays
+    part_train / part_test: partition value per row of X_train / X_test
+    Partitions with fewer than min_rows training rows or missing a class are skipped; a fitted partition is
+    served only when its test F1 beats the global model on the same rows by at least min_gain
+    """
+    classes = set(np.unique(y_train))
+    part_train, part_test = np.asarray(part_train), np.asarray(part_test)
+    global_pred = np.asarray(global_pred)
+    tasks, skipped = [], {}
+    for value in sorted(set(part_train)):
+        train_mask, test_mask = part_train == value, part_test == value
+        if train_mask.sum() < min_rows:
+            skipped[str(value)] = f'{int(train_mask.sum())} training rows < {min_rows}'
+        elif set(np.unique(y_train[train_mask])) != classes or not test_mask.any():
+            skipped[str(value)] = 'missing classes or test rows'
+        else:
+            out_path = os.path.join(out_dir, f'{partition_slug(value)}.joblib')
+            tasks.append((str(value), estimator, X_train[train_mask], y_train[train_mask],
+                          X_test[test_mask], y_test[test_mask], global_pred[test_mask], out_path))
+
+    start = time.perf_counter()
+    with _partition_pool(workers) as pool:
+        results = list(pool.map(fit_partition, *zip(*tasks))) if tasks else []
+    entries = {}
+    for result in results:
+        result['serve'] = result['f1_weighted'] >= result['global_f1_weighted'] + min_gain
+        result['name'] = result.pop('key')
+        entries[partition_key(result['name'])] = result
+
+    catalog = {
+        'partition_by': partition_by,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'min_rows': min_rows,
+        'min_gain': min_gain,
+        'fit_seconds': round(time.perf_counter() - start, 2),
+        'entries': entries,
+        'skipped': skipped
+    }
+    # fit_partition creates out_dir for the models it writes; with every partition skipped nobody has
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, CATALOG_FILE), 'w') as f:
+        json.dump(catalog, f, indent=2)
+    return catalog
+
+
+class ModelCatalog:
+    """
+    Partition models loaded on first use and kept in an LRU bounded by max_bytes (serialized size as the
+    accounting unit); requests for unknown, unserved or skipped partitions get the global fallback
+    Loads run outside the LRU lock with one lock per key, so a slow load never blocks hits on other models
+    Explainers built for a partition model (explainer()) are dropped when that model is evicted
+    """
+
+    def __init__(self, root, fallback, max_bytes=256 * 1024 * 1024):
+        with open(os.path.join(root, CATALOG_FILE)) as f:
+            self.catalog = json.load(f)
+        self.root = root
+        self.fallback = fallback
+        self.max_bytes = max_bytes
+        self.entries = {k: e for k, e in self.catalog['entries'].items() if e.get('serve', True)}
+        self._resident = OrderedDict()
+        self._resident_bytes = 0
+        self._explainers = {}
+        self._lock = threading.Lock()
+        self._key_locks = {key: threading.Lock() for key in self.entries}
+        self.stats = {'lookups': 0, 'hits': 0, 'loads': 0, 'fallbacks': 0, 'evictions': 0,
+                      'load_seconds': 0.0, 'max_load_seconds': 0.0}
+
+    @property
+    def partition_by(self):
+        return self.catalog['partition_by']
+
+    def route(self, value):
+        """Catalog key serving this partition value, None for the global fallback"""
+        key = partition_key(value)
+        return key if key in self.entries else None
+
+    def get(self, value):
+        """(model, key) for a partition value; key is 'global' when the fallback serves it"""
+        key = self.route(value)
+        with self._lock:
+            self.stats['lookups'] += 1
+            if key is None:
+                self.stats['fallbacks'] += 1
+                return self.fallback, GLOBAL_KEY
+            model = self._resident.get(key)
+            if model is not None:
+                self._resident.move_to_end(key)
+                self.stats['hits'] += 1
+                return model, key
+        with self._key_locks[key]:
+            with self._lock:
+                model = self._resident.get(key)
+            if model is None:
+                model = self._load(key)
+        return model, key
+
+    def _load(self, key):
+        import joblib
+
+        start = time.perf_counter()
+        model = joblib.load(os.path.join(self.root, self.entries[key]['file']))
+        seconds = time.perf_counter() - start
+        size = self.entries[key]['bytes']
+        with self._lock:
+            self.stats['loads'] += 1
+            self.stats['load_seconds'] += seconds
+            self.stats['max_load_seconds'] = max(self.stats['max_load_seconds'], seconds)
+            self._resident[key] = model
+            self._resident_bytes += size
+            while self._resident_bytes > self.max_bytes and len(self._resident) > 1:
+                evicted, _ = self._resident.popitem(last=False)
+                self._resident_bytes -= self.entries[evicted]['bytes']
+                self._explainers.pop(evicted, None)
+                self.stats['evictions'] += 1
+        return model
+
+    def explainer(self, key, factory):
+        """
+        Explainer for the partition model under catalog key, built once with factory(model, model_path)
+        None for the global fallback (the caller explains that model itself)
+        """
+        key = self.route(key)
+        if key is None:
+            return None
+        with self._lock:
+            model = self._resident.get(key)
+        if model is None:
+            model, key = self.get(key)
+        with self._key_locks[key]:
+            with self._lock:
+                cached = self._explainers.get(key)
+            if cached is None or cached[0] is not model:
+                cached = (model, factory(model, os.path.join(self.root, self.entries[key]['file'])))
+                with self._lock:
+                    if key in self._resident:
+                        self._explainers[key] = cached
+        return cached[1]
+
+    def predict_proba(self, X, values, classes, fallback_proba=None):
+        """
+        Probabilities for feature rows routed by their partition values, columns aligned to `classes`
+        Returns (proba, model key per row); one predict_proba call per distinct model
+        fallback_proba: optional callable used instead of fallback.predict_proba for globally served rows
+        """
+        values = np.asarray(values, dtype=object)
+        proba = np.zeros((len(X), len(classes)))
+        keys = np.empty(len(X), dtype=object)
+        columns = {c: j for j, c in enumerate(classes)}
+        for value in set(values):
+            rows = np.flatnonzero(values == value)
+            model, key = self.get(value)
+            predict = fallback_proba if key == GLOBAL_KEY and fallback_proba is not None else model.predict_proba
+            part = predict(X.iloc[rows] if hasattr(X, 'iloc') else X[rows])
+            proba[np.ix_(rows, [columns[c] for c in model.classes_])] = part
+            keys[rows] = key
+        return proba, keys
+
+    def status(self):
+        with self._lock:
+            lookups = self.stats['lookups']
+            return dict(self.stats, load_seconds=round(self.stats['load_seconds'], 3),
+                        max_load_seconds=round(self.stats['max_load_seconds'], 3),
+                        hit_rate=round(self.stats['hits'] / lookups, 4) if lookups else None,
+                        partition_by=self.partition_by, served_partitions=len(self.entries),
+                        resident=list(self._resident), resident_bytes=self._resident_bytes,
+                        max_bytes=self.max_bytes)
+
+
+def main(argv=None):
+    import joblib
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    parser = argparse.ArgumentParser(description='Train per-partition models next to an existing global model')
+    parser.add_argument('--data', default='featured_data.csv')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--partition-by', default='State Name')
+    parser.add_argument('--out', default=None, help='Catalog directory (default: <model-dir>/regional)')
+    parser.add_argument('--min-rows', type=int, default=300)
+    parser.add_argument('--min-gain', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data)
+    feature_names = joblib.load(os.path.join(args.model_dir, 'feature_names.joblib'))
+    model = joblib.load(os.path.join(args.model_dir, 'best_model.joblib'))
+    X = df[feature_names].fillna(df[feature_names].mean())
+    y = df['target']
+    # Same split as retrain_model.py, so partition test rows were never seen by the global model
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    estimator = model
+    if hasattr(estimator, 'n_jobs'):
+        from sklearn.base import clone
+        estimator = clone(model).set_params(n_jobs=1)
+    catalog = train_partitions(estimator, X_train, y_train.to_numpy(), X_test,
+                               y_test.to_numpy(), model.predict(X_test),
+                               df.loc[X_train.index, args.partition_by], df.loc[X_test.index, args.partition_by],
+                               args.out or os.path.join(args.model_dir, 'regional'), args.partition_by,
+                               args.min_rows, args.min_gain, args.workers)
+    print_catalog(catalog)
+    return catalog
+
+
+def print_catalog(catalog):
+    entries = catalog['entries']
+    served = [e for e in entries.values() if e['serve']]
+    print(f"✅ Model catalog by {catalog['partition_by']}: {len(entries)} fitted, {len(served)} served, "
+          f"{len(catalog['skipped'])} skipped ({catalog['fit_seconds']}s)")
+    for e in sorted(entries.values(), key=lambda e: e['f1_weighted'] - e['global_f1_weighted'], reverse=True):
+        mark = '✓' if e['serve'] else '·'
+        print(f"   {mark} {e['name'][:24]:24s} rows {e['train_rows']:5d} | F1 {e['f1_weighted']:.4f} "
+              f"vs global {e['global_f1_weighted']:.4f} | {e['bytes'] / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
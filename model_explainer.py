@@ -0,0 +1,215 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+
+
+def model_version(path, block_size=1 << 20):
+    """Content hash of a model artifact, used to key cached explanation data"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def build_path_data(model, n_features):
+    """
+    Per-node contribution matrix for a sklearn tree ensemble
+    Every non-root node contributes (value[node] - value[parent]) to the feature its parent splits on,
+    stored as a sparse (total_nodes x n_features * n_classes) matrix aligned with model.decision_path()
+    Returns (rows, cols, data, shape, base_value)
+    """
+    trees = model.estimators_ if hasattr(model, 'estimators_') else [model]
+    n_classes = len(model.classes_)
+    rows, cols, data, roots = [], [], [], []
+    offset = 0
+    for estimator in trees:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :].astype(np.float64)
+        value /= np.maximum(value.sum(axis=1, keepdims=True), 1e-12)
+        roots.append(value[0])
+
+        parent = np.full(tree.node_count, -1, dtype=np.int64)
+        internal = np.flatnonzero(tree.children_left >= 0)
+        parent[tree.children_left[internal]] = internal
+        parent[tree.children_right[internal]] = internal
+        nodes = np.flatnonzero(parent >= 0)
+        delta = value[nodes] - value[parent[nodes]]
+        split_feature = tree.feature[parent[nodes]].astype(np.int64)
+
+        rows.append(np.repeat(nodes + offset, n_classes))
+        cols.append((split_feature[:, None] * n_classes + np.arange(n_classes)).ravel())
+        data.append(delta.ravel())
+        offset += tree.node_count
+
+    shape = (offset, n_features * n_classes)
+    base_value = np.mean(roots, axis=0)
+    return (np.concatenate(rows), np.concatenate(cols), np.concatenate(data).astype(np.float32),
+            shape, base_value)
+
+
+class TreeExplainer:
+    """
+    Per-prediction feature attributions for the served tree model
+    XGBoost: exact TreeSHAP from the booster (margin units)
+    RandomForest / DecisionTree: path contributions from cached per-node data (probability units),
+    base value plus contributions sums to predict_proba
+    """
+
+    def __init__(self, model, feature_names, version=None, cache_dir=None):
+        # Re-encoding wrappers (categorical_model.EncodedModel) are explained through their inner model
+        self.prepare = getattr(model, 'prepare', None)
+        model = getattr(model, 'model', model) if self.prepare is not None else model
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.classes = np.asarray(model.classes_)
+        self.version = version
+        self.path_matrix = None
+        self.base_value = None
+
+        if hasattr(model, 'get_booster'):
+            self.method, self.units = 'tree_shap', 'margin'
+        elif hasattr(model, 'estimators_') or hasattr(model, 'tree_'):
+            self.method, self.units = 'tree_path', 'probability'
+            self._load_path_data(cache_dir)
+        else:
+            raise ValueError(f'Unsupported model type for explanations: {type(model).__name__}')
+
+    def _load_path_data(self, cache_dir):
+        from scipy import sparse
+
+        cache_path = None
+        if cache_dir and self.version:
+            cache_path = os.path.join(cache_dir, f'path_data_{self.version}.npz')
+        if cache_path and os.path.exists(cache_path):
+            cached = np.load(cache_path)
+            rows, cols, data = cached['rows'], cached['cols'], cached['data']
+            shape, base_value = tuple(cached['shape']), cached['base_value']
+        else:
+            rows, cols, data, shape, base_value = build_path_data(self.model, len(self.feature_names))
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f'{cache_path}.tmp.npz'
+                np.savez(tmp_path, rows=rows, cols=cols, data=data, shape=np.array(shape), base_value=base_value)
+                os.replace(tmp_path, cache_path)
+        self.path_matrix = sparse.csr_matrix((data, (rows, cols)), shape=shape)
+        self.base_value = np.asarray(base_value, dtype=np.float64)
+
+    def explain(self, X):
+        """
+        Attributions for a batch of feature rows
+        Returns (base_value (n_classes,), contributions (n_rows, n_features, n_classes))
+        """
+        n_features, n_classes = len(self.feature_names), len(self.classes)
+        if self.prepare is not None:
+            X = self.prepare(X)
+        if self.method == 'tree_shap':
+            from xgboost import DMatrix
+            raw = self.model.get_booster().predict(DMatrix(X), pred_contribs=True)
+            raw = raw.reshape(len(X), -1, n_features + 1)
+            if raw.shape[1] == 1:
+                # binary models return one margin; expose it as the positive class
+                raw = np.concatenate([-raw, raw], axis=1)
+            return raw[0, :, -1].astype(np.float64), np.transpose(raw[:, :, :-1], (0, 2, 1))
+
+        if hasattr(self.model, 'estimators_'):
+            indicator, _ = self.model.decision_path(X)
+            n_trees = len(self.model.estimators_)
+        else:
+            indicator = self.model.decision_path(X)
+            n_trees = 1
+        contributions = np.asarray((indicator @ self.path_matrix).todense(), dtype=np.float64) / n_trees
+        return self.base_value, contributions.reshape(len(X), n_features, n_classes)
+
+    def explain_classes(self, X, class_index, top=None):
+        """
+        Attributions for one class per row (e.g. the predicted class), features ranked by |contribution|
+        Returns a list of explanation dicts, one per row
+        """
+        base_value, contributions = self.explain(X)
+        rows = np.arange(len(contributions))
+        class_index = np.broadcast_to(np.asarray(class_index), rows.shape)
+        chosen = contributions[rows, :, class_index]
+        order = np.argsort(-np.abs(chosen), axis=1)[:, :top]
+        values = np.asarray(X, dtype=np.float64)
+
+        explanations = []
+        for i in rows:
+            c = class_index[i]
+            explanations.append({
+                'method': self.method,
+                'units': self.units,
+                'model_version': self.version,
+                'explained_class': int(self.classes[c]),
+                'base_value': round(float(base_value[c]), 6),
+                'output_value': round(float(base_value[c] + chosen[i].sum()), 6),
+                'contributions': [
+                    {'feature': self.feature_names[j], 'value': float(values[i, j]),
+                     'contribution': round(float(chosen[i, j]), 6)}
+                    for j in order[i]
+                ]
+            })
+        return explanations
+
+    def mean_abs_importance(self, X):
+        """Global importance: mean |attribution| per feature, summed over classes"""
+        _, contributions = self.explain(X)
+        importance = np.abs(contributions).mean(axis=0).sum(axis=1)
+        return dict(zip(self.feature_names, np.round(importance, 6).tolist()))
+
+
+def main(argv=None):
+    import time
+
+    import joblib
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    from report_model import save_json
+
+    parser = argparse.ArgumentParser(description='Precompute explanation data for a model version and report global attributions')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--model-file', default='best_model.joblib')
+    parser.add_argument('--data', default='ai-traffic-prediction-backend/data/processed/featured_data.csv')
+    parser.add_argument('--cache-dir', default=None, help='Default: <model-dir>/explain_cache')
+    parser.add_argument('--sample', type=int, default=5000, help='Held-out rows used for global importance')
+    args = parser.parse_args(argv)
+
+    model_path = os.path.join(args.model_dir, args.model_file)
+    cache_dir = args.cache_dir or os.path.join(args.model_dir, 'explain_cache')
+    model = joblib.load(model_path)
+    feature_cols = joblib.load(os.path.join(args.model_dir, 'feature_names.joblib'))
+
+    print("\n🔍 MODEL EXPLANATIONS")
+    start = time.perf_counter()
+    explainer = TreeExplainer(model, feature_cols, version=model_version(model_path), cache_dir=cache_dir)
+    print(f"   Method: {explainer.method} ({explainer.units}) | version {explainer.version} | "
+          f"ready in {time.perf_counter() - start:.2f}s")
+
+    # Same held-out split as retrain_model.py
+    df = pd.read_csv(args.data)
+    X = df[feature_cols].fillna(df[feature_cols].mean())
+    _, X_test, _, _ = train_test_split(X, df['target'], test_size=0.2, random_state=42, stratify=df['target'])
+    X_test = X_test.iloc[:args.sample]
+
+    start = time.perf_counter()
+    model.predict_proba(X_test)
+    predict_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    importance = explainer.mean_abs_importance(X_test)
+    explain_seconds = time.perf_counter() - start
+    print(f"   {len(X_test):,} rows: predict {predict_seconds * 1000:.1f} ms | explain {explain_seconds * 1000:.1f} ms "
+          f"({explain_seconds / max(predict_seconds, 1e-9):.1f}x)")
+
+    for feature, value in sorted(importance.items(), key=lambda kv: kv[1], reverse=True)[:10]:
+        print(f"   {feature:30s} {value:.4f}")
+    path = save_json({'model_version': explainer.version, 'method': explainer.method, 'units': explainer.units,
+                      'rows': len(X_test), 'mean_abs_contribution': importance},
+                     os.path.join(args.model_dir, 'explanation_importance.json'))
+    print(f"   ✓ Saved: {path}\n")
+
+
+if __name__ == '__main__':
+    main()
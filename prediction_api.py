@@ -1,161 +1,342 @@
 from flask import Flask, request, jsonify, send_file
-import joblib
-import pandas as pd
+import atexit
 import numpy as np
-import re
 import os
 import sys
+import threading
+import time
+from datetime import datetime
 from flask_cors import CORS
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from spatial_analysis import HotspotAnalyzer
+from spatial_analysis import HotspotAnalyzer, MAP_MODES
+from severity_table import SeverityTable
+from hotspot_time_profile import HotspotTimeProfile, hour_of_week
+from density_surface import DensitySurface
+from gazetteer import Gazetteer, KINDS
+from drift_monitor import DriftMonitor
+from request_log import RequestLogger
+from model_catalog import ModelCatalog, GLOBAL_KEY
+from feature_scoring import (
+    parse_experience_to_years, format_experience_display, calculate_experience_score,
+    calculate_driver_speed_score, calculate_age_risk_score, calculate_vehicle_condition_score,
+    calculate_weather_risk_score, calculate_road_type_score, calculate_road_condition_score,
+    calculate_license_score, encode_categorical, encode_location, build_feature_frame, RUSH_HOURS
+)
+from model_explainer import TreeExplainer, model_version
+from request_schema import PREDICT_SCHEMA, HOTSPOT_SCHEMA, RESPONSE_OPTIONS, RequestSchema, SchemaError
+from response_encoding import json_response, columnar_response, negotiate_format
 
 
 app = Flask(__name__)
 CORS(app)
 
+MODEL_DIR = os.environ.get('MODEL_DIR', 'C:/Users/rahul/OneDrive/Desktop/ai-traffic-prediction-backend new/ai-traffic-prediction-backend/models')
+HOTSPOTS_CSV = os.environ.get('HOTSPOTS_CSV', 'C:/Users/rahul/OneDrive/Desktop/ai-traffic-prediction-backend new/ai-traffic-prediction-backend/data/processed/asia_accident_hotspots_enhanced.csv')
 
-# Load trained model and metadata
-model = joblib.load('C:/Users/rahul/OneDrive/Desktop/ai-traffic-prediction-backend new/ai-traffic-prediction-backend/models/best_model.joblib')
-severity_mapping = joblib.load('C:/Users/rahul/OneDrive/Desktop/ai-traffic-prediction-backend new/ai-traffic-prediction-backend/models/severity_mapping.joblib')
-feature_names = joblib.load('C:/Users/rahul/OneDrive/Desktop/ai-traffic-prediction-backend new/ai-traffic-prediction-backend/models/feature_names.joblib')
+# Optional precomputed probabilities (built with severity_table.py), live model is the fallback
+SEVERITY_TABLE_DIR = os.environ.get('SEVERITY_TABLE_DIR', f'{MODEL_DIR}/severity_table')
 
-# Load hotspot analyzer
-hotspot_analyzer = HotspotAnalyzer(csv_path='C:/Users/rahul/OneDrive/Desktop/ai-traffic-prediction-backend new/ai-traffic-prediction-backend/data/processed/asia_accident_hotspots_enhanced.csv')
+# 'full' serves best_model.joblib, 'compressed' serves compressed_model.joblib (built with compress_model.py),
+# 'categorical' serves categorical_model.joblib (target-encoded / native categorical locations, categorical_model.py)
+MODEL_VARIANT = os.environ.get('MODEL_VARIANT', 'full')
+MODEL_FILES = {'full': 'best_model.joblib', 'compressed': 'compressed_model.joblib',
+               'categorical': 'categorical_model.joblib'}
 
+# Per-node explanation data, keyed by the model file hash (built on the first explain=true request)
+EXPLAIN_CACHE_DIR = os.environ.get('EXPLAIN_CACHE_DIR', f'{MODEL_DIR}/explain_cache')
 
-def parse_experience_to_years(experience_input):
-    """Parse driver experience string to years"""
-    try:
-        experience_str = str(experience_input).lower().strip()
-        number = re.search(r'\d+\.?\d*', experience_str)
-        if not number:
-            return 5.0
-        value = float(number.group())
-        if 'month' in experience_str:
-            return value / 12
-        else:
-            return value
-    except:
-        return 5.0
-
-
-def format_experience_display(years):
-    """Format years to readable experience string"""
-    if years < 1:
-        months = int(years * 12)
-        return f"{months} months"
-    else:
-        return f"{years:.1f} years"
-
-
-def calculate_experience_score(years):
-    """Calculate risk score based on driver experience (1-5 scale)"""
-    if years < 0.5:
-        return 5  # Extreme risk
-    elif years < 1:
-        return 4  # Very high risk
-    elif years < 2:
-        return 3  # High risk
-    elif years < 5:
-        return 2  # Medium risk
-    else:
-        return 1  # Low risk
-
-
-def calculate_driver_speed_score(speed_habit):
-    """Calculate risk score based on driving speed habit (1-5 scale)"""
+MAX_BATCH_RECORDS = int(os.environ.get('MAX_BATCH_RECORDS', 1000))
+
+# Live accident reports (POST /ingest) are appended to this Parquet store and to the hotspot counts
+INGEST_STORE_DIR = os.environ.get('INGEST_STORE_DIR', 'data/ingest_store')
+FEATURE_ENCODERS = os.environ.get('FEATURE_ENCODERS', f'{MODEL_DIR}/feature_columns.joblib')
+CLEANED_DATA_CSV = os.environ.get('CLEANED_DATA_CSV', 'cleaned_data.csv')
+INGEST_TIMEOUT_SECONDS = float(os.environ.get('INGEST_TIMEOUT_SECONDS', 2.0))
+
+# Optional hour-of-week risk multipliers per hotspot (built with hotspot_time_profile.py)
+HOTSPOT_TIME_PROFILE_DIR = os.environ.get('HOTSPOT_TIME_PROFILE_DIR', f'{MODEL_DIR}/hotspot_time_profile')
+
+# Optional accident kernel density raster (built with density_surface.py) for scoring='density'
+DENSITY_SURFACE_DIR = os.environ.get('DENSITY_SURFACE_DIR', f'{MODEL_DIR}/density_surface')
+
+# Hotspot map rendering: 'markers' (closest 20 as folium markers) or 'clustered' (every hotspot in range, hotspot_map.py)
+MAP_MODE = os.environ.get('MAP_MODE', 'markers')
+
+# Place names with training-time State/City codes (built with gazetteer.py) for /autocomplete and /predict
+GAZETTEER_PATH = os.environ.get('GAZETTEER_PATH', f'{MODEL_DIR}/gazetteer.json')
+AUTOCOMPLETE_MAX_RESULTS = int(os.environ.get('AUTOCOMPLETE_MAX_RESULTS', 25))
+
+# Live /predict inputs are sketched and compared with the drift_baseline in the model manifest (GET /drift)
+MODEL_MANIFEST = os.environ.get('MODEL_MANIFEST', f'{MODEL_DIR}/model_manifest.json')
+DRIFT_FLUSH_SECONDS = float(os.environ.get('DRIFT_FLUSH_SECONDS', 1.0))
+
+# Sampled log of /predict and /predict_batch inputs, features, outputs and stage timings (0 disables)
+REQUEST_LOG_DIR = os.environ.get('REQUEST_LOG_DIR', 'data/request_logs')
+REQUEST_LOG_SAMPLE = float(os.environ.get('REQUEST_LOG_SAMPLE', 1.0))
+REQUEST_LOG_FORMAT = os.environ.get('REQUEST_LOG_FORMAT', 'ndjson')
+REQUEST_LOG_MAX_PENDING = int(os.environ.get('REQUEST_LOG_MAX_PENDING', 10000))
+
+# Optional per-region models (retrain_model.py --partition-by 'State Name'), loaded lazily into a bounded LRU
+MODEL_CATALOG_DIR = os.environ.get('MODEL_CATALOG_DIR', f'{MODEL_DIR}/regional')
+MODEL_CATALOG_MAX_MB = float(os.environ.get('MODEL_CATALOG_MAX_MB', 256))
+
+# Ingested accidents are folded into the hotspot index by a background copy-on-write refresh
+HOTSPOT_REFRESH_SECONDS = float(os.environ.get('HOTSPOT_REFRESH_SECONDS', 30))
+
+# Optional region-sharded hotspot servers (hotspot_shards.py serve), comma-separated base URLs
+HOTSPOT_SHARDS = [u for u in os.environ.get('HOTSPOT_SHARDS', '').split(',') if u.strip()]
+HOTSPOT_SHARD_TILE_DEG = float(os.environ.get('HOTSPOT_SHARD_TILE_DEG', 10))
+
+# Model artifacts and hotspot data are loaded by load_resources(), not at import time
+model = None
+severity_mapping = None
+feature_names = None
+severity_table = None
+hotspot_analyzer = None
+hotspot_router = None
+explainer = None
+ingest_pipeline = None
+gazetteer = None
+drift_monitor = None
+request_logger = None
+model_catalog = None
+
+_explainer_lock = threading.Lock()
+_gazetteer_lock = threading.Lock()
+_ingest_lock = threading.Lock()
+_load_lock = threading.Lock()
+_load_state = {'ready': False, 'loading': False, 'error': None, 'load_seconds': None, 'model_variant': None}
+
+# Endpoints that must answer before (or without) the model being loaded
+RESOURCE_FREE_ENDPOINTS = {'home', 'ready', 'view_hotspot_map', 'static', 'autocomplete'}
+
+
+def resolve_model_variant(variant):
+    """MODEL_VARIANT when it names a known variant whose model file exists, else 'full' (with a warning)"""
+    if variant not in MODEL_FILES:
+        print(f"⚠️  Unknown MODEL_VARIANT {variant!r} (expected one of {', '.join(MODEL_FILES)}), serving 'full'")
+        return 'full'
+    if not os.path.exists(f'{MODEL_DIR}/{MODEL_FILES[variant]}'):
+        print(f"⚠️  {MODEL_DIR}/{MODEL_FILES[variant]} not found, serving 'full'")
+        return 'full'
+    return variant
+
+
+def load_resources():
+    """Load model artifacts, severity table and hotspot analyzer once (thread-safe, idempotent)"""
+    global model, severity_mapping, feature_names, severity_table, hotspot_analyzer, hotspot_router, drift_monitor, \
+        request_logger, model_catalog
+    if _load_state['ready']:
+        return
+    with _load_lock:
+        if _load_state['ready']:
+            return
+        _load_state['loading'] = True
+        start = time.perf_counter()
+        try:
+            import joblib
+            variant = resolve_model_variant(MODEL_VARIANT)
+            model_file = MODEL_FILES[variant]
+            model = joblib.load(f'{MODEL_DIR}/{model_file}')
+            severity_mapping = joblib.load(f'{MODEL_DIR}/severity_mapping.joblib')
+            feature_names = joblib.load(f'{MODEL_DIR}/feature_names.joblib')
+            if os.path.exists(f'{SEVERITY_TABLE_DIR}/meta.json'):
+                table = SeverityTable.load(SEVERITY_TABLE_DIR)
+                # A table compiled from any other model (variant or retrain) would serve stale probabilities
+                if table.matches(model_version(f'{MODEL_DIR}/{model_file}')):
+                    severity_table = table
+                else:
+                    print(f"⚠️  Ignoring {SEVERITY_TABLE_DIR}: compiled from a different model than {model_file}")
+            _load_state['model_variant'] = variant
+            if os.path.exists(f'{MODEL_CATALOG_DIR}/catalog.json'):
+                model_catalog = ModelCatalog(MODEL_CATALOG_DIR, model, int(MODEL_CATALOG_MAX_MB * 1024 * 1024))
+            if HOTSPOT_SHARDS:
+                from hotspot_shards import HotspotShardRouter
+                hotspot_router = HotspotShardRouter(HOTSPOT_SHARDS, HOTSPOT_SHARD_TILE_DEG)
+            else:
+                hotspot_analyzer = HotspotAnalyzer(csv_path=HOTSPOTS_CSV, verbose=False)
+                hotspot_analyzer.start_background_refresh(HOTSPOT_REFRESH_SECONDS)
+            backend = hotspot_backend()
+            if os.path.exists(f'{HOTSPOT_TIME_PROFILE_DIR}/meta.json'):
+                profile = HotspotTimeProfile.load(HOTSPOT_TIME_PROFILE_DIR)
+                # Rows are hotspot positions, so a profile built from another hotspot list is ignored
+                # (shards serve HOTSPOTS_CSV, so the router checks against the file itself)
+                hotspots = hotspot_analyzer.asia_hotspots if hotspot_analyzer is not None else \
+                    HotspotAnalyzer(csv_path=HOTSPOTS_CSV, verbose=False).asia_hotspots
+                if profile.matches(hotspots):
+                    backend.time_profile = profile
+            if os.path.exists(f'{DENSITY_SURFACE_DIR}/meta.json'):
+                backend.density_surface = DensitySurface.load(DENSITY_SURFACE_DIR)
+            if get_gazetteer() is not None and severity_table is not None \
+                    and severity_table.meta.get('location_codes') == 'legacy':
+                print(f"⚠️  {SEVERITY_TABLE_DIR} was compiled with legacy State/City codes; "
+                      f"rebuild it with --gazetteer {GAZETTEER_PATH} to cover gazetteer-encoded requests")
+            drift_monitor = DriftMonitor.from_manifest(MODEL_MANIFEST).start(DRIFT_FLUSH_SECONDS)
+            if REQUEST_LOG_SAMPLE > 0:
+                request_logger = RequestLogger(REQUEST_LOG_DIR, REQUEST_LOG_SAMPLE, REQUEST_LOG_FORMAT,
+                                               REQUEST_LOG_MAX_PENDING).start()
+                # Publish the open .inprogress file and pending entries when the worker exits
+                atexit.register(request_logger.close)
+            _load_state.update({'ready': True, 'error': None,
+                                'load_seconds': round(time.perf_counter() - start, 3)})
+        except Exception as e:
+            _load_state['error'] = str(e)
+            raise
+        finally:
+            _load_state['loading'] = False
+
+
+def start_background_load():
+    """Kick off load_resources() in a daemon thread (used by the readiness probe)"""
+    if not _load_state['ready'] and not _load_state['loading']:
+        _load_state['loading'] = True
+        threading.Thread(target=_background_load, daemon=True).start()
+
+
+def _background_load():
     try:
-        speed = float(speed_habit)
-        if speed < 40:
-            return 1  # Safe/Cautious
-        elif speed < 60:
-            return 1  # Moderate
-        elif speed < 80:
-            return 2  # Slightly risky
-        elif speed < 100:
-            return 3  # Risky
-        else:
-            return 4  # Very risky
-    except:
-        return 2
-
-
-def calculate_age_risk_score(age):
-    """Calculate risk score based on driver age (1-5 scale)"""
-    if age < 20:
-        return 5  # Very high risk
-    elif age < 25:
-        return 4  # High risk
-    elif age > 70:
-        return 4  # High risk (elderly)
-    elif age > 60:
-        return 3  # Medium risk
-    else:
-        return 1  # Low risk (25-60)
-
-
-def calculate_vehicle_condition_score(condition):
-    """Calculate risk score based on vehicle condition (1-5 scale)"""
-    condition_lower = str(condition).lower()
-    if 'poor' in condition_lower or 'bad' in condition_lower or 'terrible' in condition_lower:
-        return 5  # Extreme risk
-    elif 'average' in condition_lower or 'medium' in condition_lower or 'ok' in condition_lower:
-        return 3  # Medium risk
-    elif 'good' in condition_lower or 'excellent' in condition_lower:
-        return 1  # Low risk
-    else:
-        return 2  # Default moderate risk
-
-
-def calculate_weather_risk_score(weather):
-    """Calculate risk score based on weather (1-5 scale)"""
-    weather_lower = str(weather).lower()
-    if 'storm' in weather_lower or 'tornado' in weather_lower or 'hurricane' in weather_lower:
-        return 5  # Extreme risk
-    elif 'heavy rain' in weather_lower or 'snow' in weather_lower or 'hail' in weather_lower:
-        return 4  # Very high risk
-    elif 'rain' in weather_lower or 'fog' in weather_lower or 'mist' in weather_lower:
-        return 3  # High risk
-    elif 'cloudy' in weather_lower or 'drizzle' in weather_lower:
-        return 2  # Medium risk
-    else:  # Clear, sunny
-        return 1  # Low risk
-
-
-def encode_categorical(value, category_type):
-    """Encode categorical features"""
-    value_lower = str(value).lower().strip()
-    
-    if category_type == 'state':
-        state_mapping = {
-            'maharashtra': 0, 'delhi': 1, 'karnataka': 2, 'tamil nadu': 3,
-            'gujarat': 4, 'uttar pradesh': 5, 'punjab': 6, 'west bengal': 7,
-            'rajasthan': 8, 'telangana': 9, 'andhra pradesh': 10
-        }
-        return state_mapping.get(value_lower, 0)
-    
-    elif category_type == 'city':
-        city_mapping = {
-            'mumbai': 0, 'delhi': 1, 'bangalore': 2, 'chennai': 3, 'pune': 4,
-            'hyderabad': 5, 'kolkata': 6, 'ahmedabad': 7, 'lucknow': 8, 'chandigarh': 9
-        }
-        return city_mapping.get(value_lower, 0)
-    
-    elif category_type == 'vehicle':
-        vehicle_mapping = {'car': 0, 'bike': 1, 'motorcycle': 1, 'truck': 2, 'auto': 3, 'suv': 0}
-        return vehicle_mapping.get(value_lower, 0)
-    
-    elif category_type == 'lighting':
-        if 'dark' in value_lower or 'night' in value_lower:
-            return 1
-        else:
-            return 0
-    
-    elif category_type == 'traffic':
-        traffic_mapping = {'lights': 2, 'signs': 1, 'police': 2, 'none': 0}
-        return traffic_mapping.get(value_lower, 0)
-    
-    return 0
+        load_resources()
+    except Exception:
+        pass
+
+
+@app.before_request
+def ensure_resources_loaded():
+    """Load resources on first use for endpoints that need them"""
+    if request.endpoint not in RESOURCE_FREE_ENDPOINTS:
+        load_resources()
+
+
+def get_explainer(model_key=GLOBAL_KEY):
+    """TreeExplainer for the loaded model (created once per process) or for the regional model under model_key"""
+    global explainer
+    if model_key != GLOBAL_KEY:
+        return model_catalog.explainer(model_key, lambda served_model, path: TreeExplainer(
+            served_model, feature_names, version=model_version(path), cache_dir=EXPLAIN_CACHE_DIR))
+    if explainer is None:
+        with _explainer_lock:
+            if explainer is None:
+                model_path = f"{MODEL_DIR}/{MODEL_FILES[_load_state['model_variant']]}"
+                explainer = TreeExplainer(model, feature_names, version=model_version(model_path),
+                                          cache_dir=EXPLAIN_CACHE_DIR)
+    return explainer
+
+
+def explain_rows(X, codes, model_keys=None, top=None):
+    """Explanations of each row's predicted class code, computed with the model that served the row"""
+    model_keys = np.full(len(X), GLOBAL_KEY, dtype=object) if model_keys is None else np.asarray(model_keys)
+    explanations = [None] * len(X)
+    for key in set(model_keys):
+        rows = np.flatnonzero(model_keys == key)
+        row_explainer = get_explainer(key)
+        class_index = np.searchsorted(row_explainer.classes, np.asarray(codes)[rows])
+        for i, explanation in zip(rows, row_explainer.explain_classes(X.iloc[rows], class_index, top=top)):
+            explanations[i] = explanation
+    return explanations
+
+
+def get_gazetteer():
+    """Gazetteer loaded once per process; None when GAZETTEER_PATH has not been built"""
+    global gazetteer
+    if gazetteer is None and os.path.exists(GAZETTEER_PATH):
+        with _gazetteer_lock:
+            if gazetteer is None:
+                gazetteer = Gazetteer.load(GAZETTEER_PATH)
+    return gazetteer
+
+
+def log_request(endpoint, payload, features, prediction, started, marks):
+    """Hand one served request to the request logger (no-op when disabled); marks are perf_counter stage ends"""
+    if request_logger is not None:
+        timings, last = {}, started
+        for stage, end in marks.items():
+            timings[stage] = round((end - last) * 1000, 3)
+            last = end
+        timings['total'] = round((last - started) * 1000, 3)
+        request_logger.log(endpoint, payload, features, prediction, timings)
+
+
+# Response options only (explain, explain_top, compact), for endpoints with their own body layout
+OPTIONS_SCHEMA = RequestSchema(RESPONSE_OPTIONS)
+
+
+def validate_request(schema, data):
+    """Schema values for a JSON body; response options in the query string (?compact=true) take precedence"""
+    overrides = {k: v for k, v in request.args.items() if k in RESPONSE_OPTIONS}
+    return schema.validate(data, overrides)
+
+
+def schema_error_response(e, message, schema):
+    """400 listing every invalid field, with the accepted fields for reference"""
+    return json_response({
+        'error': str(e),
+        'message': message,
+        'errors': e.errors,
+        'fields': schema.describe()
+    }, 400)
+
+
+def get_ingest_pipeline():
+    """Ingestion worker feeding the columnar store and live hotspot counts, started on first use"""
+    global ingest_pipeline
+    if ingest_pipeline is None:
+        with _ingest_lock:
+            if ingest_pipeline is None:
+                from ingest import ColumnarStore, IngestPipeline, load_feature_engineer
+                # Shards own their hotspot statistics, so live counts are only kept by an in-process analyzer
+                ingest_pipeline = IngestPipeline(
+                    ColumnarStore(INGEST_STORE_DIR),
+                    load_feature_engineer(FEATURE_ENCODERS, CLEANED_DATA_CSV),
+                    sinks=[update_hotspot_counts] if hotspot_analyzer is not None else []
+                ).start()
+    return ingest_pipeline
+
+
+def update_hotspot_counts(batch):
+    """Ingest sink: add new geotagged accidents to the live hotspot statistics"""
+    hotspot_analyzer.add_accidents(batch['latitude'].to_numpy(), batch['longitude'].to_numpy(),
+                                   batch['Accident Severity'].to_numpy())
+
+
+def hotspot_backend():
+    """Shard router when HOTSPOT_SHARDS is set, the in-process analyzer otherwise"""
+    return hotspot_router or hotspot_analyzer
+
+
+def sharded_hotspots_error(feature):
+    """501 body for features that need the whole hotspot list in process (None when it is local)"""
+    if hotspot_router is None:
+        return None
+    return {'error': f'{feature} is not available when hotspots are sharded (HOTSPOT_SHARDS is set)',
+            'message': 'Run this API without HOTSPOT_SHARDS to use it'}
+
+
+def scored_hotspot_analysis(user_lat, user_lon, radius_km, when=None, scoring='distance'):
+    """Hotspot analysis from the backend; the density surface is local, so density scoring is applied here"""
+    analysis = hotspot_backend().get_hotspot_analysis(user_lat, user_lon, radius_km, when=when)
+    if scoring == 'density':
+        analysis = hotspot_backend().apply_density_scoring(analysis, user_lat, user_lon)
+    return analysis
+
+
+def check_scoring(values):
+    """SchemaError when density scoring is requested without a density surface"""
+    if values.get('scoring') == 'density' and hotspot_backend().density_surface is None:
+        raise SchemaError([{'field': 'scoring', 'error': 'density surface not available (build it with density_surface.py)'}])
+
+
+def predict_severity_proba(X):
+    """Class probabilities for feature rows, served from the severity table when available"""
+    if severity_table is not None:
+        return severity_table.predict_proba(X, model)
+    return model.predict_proba(X)
+
+
+def route_model(state_name):
+    """(model, catalog key) serving a state: its regional model when the catalog has one, else the global model"""
+    if model_catalog is None:
+        return model, GLOBAL_KEY
+    return model_catalog.get(state_name)
 
 
 @app.route('/')
@@ -168,8 +349,17 @@ def home():
         'description': 'Real-world accident risk prediction with clean features',
         'endpoints': {
             'GET /': 'API info and documentation',
-            'POST /predict': 'Predict accident severity with ML + hotspot analysis',
+            'GET /ready': 'Readiness probe (starts model loading if needed)',
+            'GET /autocomplete': 'Prefix search over cities, states and hotspots (?q=hyd&kind=city)',
+            'GET /drift': 'Live /predict input distribution vs the training baseline (?reset=true starts a new window)',
+            'GET /request_log/status': 'Sampled request log counters (inputs, features, predictions, timings)',
+            'GET /model_catalog/status': 'Per-region model catalog: lookups, lazy loads, LRU evictions',
+            'POST /predict': 'Predict accident severity with ML + hotspot analysis (explain=true for attributions)',
+            'POST /predict_batch': 'Severity predictions for a list of records (explain=true for attributions)',
+            'POST /ingest': 'Stream NDJSON accident reports into the training store and hotspot counts',
+            'GET /ingest/status': 'Ingestion counters and store size',
             'POST /hotspot_analysis': 'Get distance-based hotspot risk assessment',
+            'POST /route_risk': 'Per-segment hotspot risk along a route (points or polyline)',
             'POST /generate_hotspot_map': 'Generate interactive Asia hotspot map',
             'GET /hotspot_map': 'View generated interactive map'
         },
@@ -196,24 +386,93 @@ def home():
     }), 200
 
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 200 once the model and hotspots are loaded, 503 (and warm-up started) otherwise"""
+    if not _load_state['ready']:
+        start_background_load()
+    return jsonify({
+        'ready': _load_state['ready'],
+        'loading': _load_state['loading'],
+        'error': _load_state['error'],
+        'load_seconds': _load_state['load_seconds'],
+        'severity_table': severity_table is not None,
+        'severity_table_stats': severity_table.stats() if severity_table is not None else None,
+        'hotspot_time_profile': hotspot_backend() is not None and hotspot_backend().time_profile is not None,
+        'density_surface': hotspot_backend() is not None and hotspot_backend().density_surface is not None,
+        'hotspot_shards': len(HOTSPOT_SHARDS),
+        'gazetteer': gazetteer is not None,
+        'model_catalog': model_catalog is not None,
+        'model_variant': _load_state['model_variant']
+    }), 200 if _load_state['ready'] else 503
+
+
+@app.route('/autocomplete')
+def autocomplete():
+    """
+    Place-name suggestions from the gazetteer (served without loading the model)
+    Query: q (prefix), kind (city, state, hotspot; comma-separated), limit (default 10)
+    Each match carries coordinates and, for cities/states, the label code /predict will use
+    """
+    places = get_gazetteer()
+    if places is None:
+        return json_response({'error': f'Gazetteer not found at {GAZETTEER_PATH}',
+                              'message': 'Build it with: python gazetteer.py'}, 503)
+    kinds = [k for k in request.args.get('kind', '').split(',') if k]
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown:
+        return json_response({'error': f'Unknown kind {unknown}, expected any of {list(KINDS)}',
+                              'message': 'Autocomplete failed'}, 400)
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), AUTOCOMPLETE_MAX_RESULTS)
+    except ValueError:
+        return json_response({'error': 'limit must be an integer', 'message': 'Autocomplete failed'}, 400)
+    query = request.args.get('q', '')
+    return json_response({'query': query, 'results': places.search(query, kinds, limit)}, 200)
+
+
+@app.route('/drift')
+def drift():
+    """
+    Input drift since startup (or the last reset): PSI per feature against the manifest baseline,
+    live vs training quantiles for speed/age and the share of cities never seen in training
+    """
+    report = drift_monitor.report()
+    if request.args.get('reset', '').lower() in ('1', 'true', 'yes'):
+        drift_monitor.reset()
+    return json_response(report, 200)
+
+
 @app.route('/hotspot_analysis', methods=['POST'])
 def hotspot_analysis():
     """
     Analyze accident hotspots with distance-based risk classification
     Required: latitude, longitude
-    Optional: radius_km (default 500)
+    Optional: radius_km (default 500), datetime (for hour-of-week risk, default now),
+              scoring ('distance' or 'density'), compact (bool, or ?compact=true)
+    Accept: application/vnd.apache.arrow.stream or application/msgpack (or ?format=arrow|msgpack)
+    returns every hotspot in range as packed hotspot_id/distance_km/risk_band columns plus the summary
     """
     try:
-        data = request.get_json()
+        values = validate_request(HOTSPOT_SCHEMA, request.get_json(silent=True))
+        check_scoring(values)
+        fmt = negotiate_format(request)
+    except SchemaError as e:
+        return schema_error_response(e, 'Hotspot analysis failed', HOTSPOT_SCHEMA)
+    except ValueError as e:
+        return json_response({'error': str(e), 'message': 'Hotspot analysis failed'}, 406)
+    
+    try:
+        user_lat, user_lon, radius_km = values['latitude'], values['longitude'], values['radius_km']
+        when = values['datetime'] or datetime.now()
         
-        user_lat = float(data.get('latitude'))
-        user_lon = float(data.get('longitude'))
-        radius_km = float(data.get('radius_km', 500))
+        if fmt != 'json':
+            return hotspot_columnar_response(user_lat, user_lon, radius_km, when, fmt, values['scoring'])
         
         # Get hotspot analysis
-        analysis = hotspot_analyzer.get_hotspot_analysis(user_lat, user_lon, radius_km)
+        analysis = scored_hotspot_analysis(user_lat, user_lon, radius_km, when, values['scoring'])
         
-        return jsonify({
+        return json_response({
             'status': 'success',
             'location': {
                 'latitude': user_lat,
@@ -222,27 +481,120 @@ def hotspot_analysis():
             },
             'search_radius_km': radius_km,
             'hotspot_analysis': analysis,
-            'timestamp': pd.Timestamp.now().isoformat()
-        }), 200
+            'timestamp': datetime.now().isoformat()
+        }, 200, compact=values['compact'])
     
     except Exception as e:
-        return jsonify({
+        return json_response({'error': str(e), 'message': 'Hotspot analysis failed'}, 500)
+
+
+def hotspot_columnar_response(user_lat, user_lon, radius_km, when, fmt, scoring='distance'):
+    """
+    All hotspots within radius_km as columns (index into the hotspot list, name, distance, risk band,
+    and the hour-of-week multiplier when a time profile is loaded)
+    """
+    backend = hotspot_backend()
+    pairs = backend.find_nearby_hotspots_indexed(user_lat, user_lon, radius_km)
+    nearby = [h for _, h in pairs]
+    ids = np.fromiter((i for i, _ in pairs), dtype=np.int32, count=len(pairs))
+    distances = np.fromiter((h['distance_km'] for h in nearby), dtype=np.float64, count=len(nearby))
+    summary = HotspotAnalyzer.summarize_nearby(nearby, radius_km)
+    if scoring == 'density':
+        summary = backend.apply_density_scoring(summary, user_lat, user_lon)
+    columns = {
+        'hotspot_id': ids,
+        'name': [str(h['name']) for h in nearby],
+        'distance_km': distances,
+        'risk_band': HotspotAnalyzer.classify_distance_bands(distances).astype(np.int8)
+    }
+    profile = backend.time_profile
+    if profile is not None:
+        columns['time_multiplier'] = profile.lookup(ids, hour_of_week(when))
+    return columnar_response(columns, {
+        'latitude': user_lat,
+        'longitude': user_lon,
+        'search_radius_km': radius_km,
+        'overall_risk_level': summary['overall_risk_level'],
+        'travel_permission': summary['travel_permission'],
+        'total_nearby': summary['total_nearby'],
+        'risk_breakdown': summary.get('risk_breakdown'),
+        'risk_bands': [band['risk_level'] for band in HotspotAnalyzer.risk_bands()],
+        'hour_of_week': hour_of_week(when) if profile is not None else None,
+        'scoring': scoring,
+        'density_risk': summary.get('density_risk'),
+        'timestamp': datetime.now().isoformat()
+    }, fmt)
+
+
+@app.route('/route_risk', methods=['POST'])
+def route_risk():
+    """
+    Score accident risk along a whole route in one call
+    Required: points ([[lat, lon], ...] or [{latitude, longitude}, ...]) or polyline (encoded string)
+    Optional: step_km (densification spacing, default 1.0), include_segments (default true), compact (bool)
+    Not available with HOTSPOT_SHARDS (501)
+    """
+    unsupported = sharded_hotspots_error('Route risk')
+    if unsupported:
+        return json_response(unsupported, 501)
+    try:
+        data = request.get_json()
+        options = validate_request(OPTIONS_SCHEMA, data)
+        
+        if data.get('polyline'):
+            points = HotspotAnalyzer.decode_polyline(data['polyline'])
+        else:
+            points = [
+                (p['latitude'], p['longitude']) if isinstance(p, dict) else (p[0], p[1])
+                for p in data.get('points', [])
+            ]
+        coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(coords) < 2:
+            raise ValueError('A route needs at least 2 points')
+        
+        step_km = float(data.get('step_km', 1.0))
+        if step_km <= 0:
+            raise ValueError('step_km must be positive')
+        
+        analysis = hotspot_analyzer.get_route_risk(coords[:, 0], coords[:, 1], step_km=step_km)
+        if not data.get('include_segments', True):
+            analysis.pop('segments')
+        
+        return json_response({
+            'status': 'success',
+            'route': {
+                'points': len(coords),
+                'step_km': step_km,
+                'coordinates_type': 'GPS (WGS84)'
+            },
+            'route_risk': analysis,
+            'timestamp': datetime.now().isoformat()
+        }, 200, compact=options['compact'])
+    
+    except Exception as e:
+        return json_response({
             'error': str(e),
-            'message': 'Hotspot analysis failed',
-            'required_fields': ['latitude (float)', 'longitude (float)'],
-            'optional_fields': ['radius_km (float, default: 500)']
-        }), 400
+            'message': 'Route risk analysis failed',
+            'required_fields': ['points (list of [lat, lon]) or polyline (encoded string)'],
+            'optional_fields': ['step_km (float, default: 1.0)', 'include_segments (bool, default: true)', 'compact (bool)']
+        }, 400)
 
 
 @app.route('/generate_hotspot_map', methods=['POST'])
 def generate_hotspot_map():
-    """Generate interactive Asia hotspot map with distance-based risk zones"""
+    """Generate interactive Asia hotspot map with distance-based risk zones (not available with HOTSPOT_SHARDS)"""
+    unsupported = sharded_hotspots_error('Hotspot map generation')
+    if unsupported:
+        return jsonify(dict(unsupported, status='error')), 501
     try:
         data = request.get_json()
         
         user_lat = float(data.get('latitude'))
         user_lon = float(data.get('longitude'))
         radius_km = float(data.get('radius_km', 500))
+        mode = data.get('mode', MAP_MODE)
+        if mode not in MAP_MODES:
+            raise ValueError(f"mode must be one of {list(MAP_MODES)}")
         
         # Generate map
         output_dir = 'C:/Users/rahul/OneDrive/Desktop/ai-traffic-prediction-backend new/ai-traffic-prediction-backend/outputs'
@@ -253,7 +605,8 @@ def generate_hotspot_map():
             user_lat=user_lat,
             user_lon=user_lon,
             radius_km=radius_km,
-            filename=map_filename
+            filename=map_filename,
+            mode=mode
         )
         
         return jsonify({
@@ -270,7 +623,8 @@ def generate_hotspot_map():
             'map_features': {
                 'zones': 'Color-coded by distance-based risk',
                 'markers': 'Interactive hotspot locations',
-                'legend': 'Risk classification guide'
+                'legend': 'Risk classification guide',
+                'mode': mode
             }
         }), 200
     
@@ -279,7 +633,8 @@ def generate_hotspot_map():
             'status': 'error',
             'error': str(e),
             'message': 'Map generation failed',
-            'required_fields': ['latitude (float)', 'longitude (float)']
+            'required_fields': ['latitude (float)', 'longitude (float)'],
+            'optional_fields': ['radius_km (float, default: 500)', f"mode ({' | '.join(MAP_MODES)}, default: {MAP_MODE})"]
         }), 400
 
 
@@ -315,74 +670,84 @@ def predict():
     Removed: Speed Limit, Vehicles Involved, Casualties, Fatalities (outcome variables)
     
     Returns ML prediction + distance-based hotspot risk + combined recommendation
+    Inputs are validated, coerced and defaulted in one pass by PREDICT_SCHEMA
+    Optional: compact (bool, or ?compact=true) omits the static text blocks,
+              scoring ('distance' or 'density') selects the hotspot risk model
     """
+    started = time.perf_counter()
+    data = request.get_json(silent=True)
+    try:
+        values = validate_request(PREDICT_SCHEMA, data)
+        check_scoring(values)
+    except SchemaError as e:
+        return schema_error_response(e, 'Prediction failed', PREDICT_SCHEMA)
+    marks = {'validate': time.perf_counter()}
+    
     try:
-        data = request.get_json()
-        
         # Extract coordinates for hotspot analysis
-        user_lat = data.get('latitude')
-        user_lon = data.get('longitude')
+        user_lat = values['latitude']
+        user_lon = values['longitude']
+        has_location = user_lat is not None and user_lon is not None
         
         hotspot_info = None
         travel_permission = None
         hotspot_risk_level = None
         
-        if user_lat and user_lon:
+        if has_location:
             try:
-                user_lat = float(user_lat)
-                user_lon = float(user_lon)
-                hotspot_info = hotspot_analyzer.get_hotspot_analysis(user_lat, user_lon, radius_km=500)
+                hotspot_info = scored_hotspot_analysis(user_lat, user_lon, values['radius_km'],
+                                                       values['datetime'], values['scoring'])
                 travel_permission = hotspot_info.get('travel_permission', 'Unknown')
                 hotspot_risk_level = hotspot_info.get('overall_risk_level', 'Unknown')
             except Exception as e:
                 print(f"Hotspot analysis warning: {str(e)}")
                 hotspot_info = None
+        marks['hotspots'] = time.perf_counter()
+        
+        import pandas as pd
         
         # Extract time features
-        dt = pd.to_datetime(data.get('datetime', '2023-01-01 12:00'))
+        dt = values['datetime']
         hour = dt.hour
-        is_rush_hour = 1 if hour in [7, 8, 9, 17, 18, 19] else 0
+        is_rush_hour = 1 if hour in RUSH_HOURS else 0
         is_weekend = 1 if dt.weekday() >= 5 else 0
         
         # Driver experience scoring
-        driver_experience_years = parse_experience_to_years(data.get('driver_experience', '5 years'))
+        driver_experience_years = parse_experience_to_years(values['driver_experience'])
         experience_score = calculate_experience_score(driver_experience_years)
         
         # Vehicle condition scoring
-        vehicle_condition_score = calculate_vehicle_condition_score(data.get('vehicle_condition', 'good'))
+        vehicle_condition_score = calculate_vehicle_condition_score(values['vehicle_condition'])
         
         # Driver speed habit scoring
-        driver_speed_habit = float(data.get('driver_speed_habit', 80))
+        driver_speed_habit = values['driver_speed_habit']
         driver_speed_score = calculate_driver_speed_score(driver_speed_habit)
         
         # Age risk scoring
-        age = int(data.get('Driver Age', 30))
+        age = values['Driver Age']
         age_score = calculate_age_risk_score(age)
         
         # Weather scoring
-        weather_score = calculate_weather_risk_score(data.get('Weather Conditions', 'Clear'))
+        weather_score = calculate_weather_risk_score(values['Weather Conditions'])
         
         # Road type scoring
-        road_type = str(data.get('Road Type', 'Urban Road')).lower()
-        road_type_score = 4 if 'national' in road_type else 3 if 'state' in road_type else 2 if 'urban' in road_type else 1
+        road_type_score = calculate_road_type_score(values['Road Type'])
         
         # Road condition scoring
-        road_cond = str(data.get('Road Condition', 'Dry')).lower()
-        road_cond_score = 5 if 'construction' in road_cond else 4 if 'damaged' in road_cond else 3 if 'wet' in road_cond else 1
+        road_cond_score = calculate_road_condition_score(values['Road Condition'])
         
         # License scoring
-        license_status = str(data.get('Driver License Status', 'Valid')).lower()
-        license_score = 5 if 'expired' in license_status else 4 if 'no' in license_status else 1
+        license_score = calculate_license_score(values['Driver License Status'])
         
         # Alcohol flag
-        alcohol_flag = int(data.get('alcohol_flag', 0))
+        alcohol_flag = values['alcohol_flag']
         
         # Encode categorical features
-        state_enc = encode_categorical(data.get('State Name', 'Unknown'), 'state')
-        city_enc = encode_categorical(data.get('City Name', 'Unknown'), 'city')
-        vehicle_type_enc = encode_categorical(data.get('Vehicle Type Involved', 'Car'), 'vehicle')
-        lighting_enc = encode_categorical(data.get('Lighting Conditions', 'Bright'), 'lighting')
-        traffic_enc = encode_categorical(data.get('Traffic Control Presence', 'Signs'), 'traffic')
+        state_enc = encode_location(values['State Name'], 'state', get_gazetteer())
+        city_enc = encode_location(values['City Name'], 'city', get_gazetteer())
+        vehicle_type_enc = encode_categorical(values['Vehicle Type Involved'], 'vehicle')
+        lighting_enc = encode_categorical(values['Lighting Conditions'], 'lighting')
+        traffic_enc = encode_categorical(values['Traffic Control Presence'], 'traffic')
         
         # Build feature vector with CLEAN features (no outcome variables)
         feature_values = {
@@ -406,12 +771,17 @@ def predict():
         }
         
         # Create DataFrame and predict
+        drift_monitor.observe(feature_values, driver_speed_habit, age, values['City Name'])
         X = pd.DataFrame([feature_values])
         X = X[feature_names]
+        marks['features'] = time.perf_counter()
         
-        # Get ML prediction
-        prediction = int(model.predict(X)[0])
-        probability = float(model.predict_proba(X)[0][prediction])
+        # Get ML prediction: regional model for the state when cataloged, else lookup table / global model
+        served_model, model_key = route_model(values['State Name'])
+        proba = predict_severity_proba(X)[0] if model_key == GLOBAL_KEY else served_model.predict_proba(X)[0]
+        best = int(np.argmax(proba))
+        prediction = int(served_model.classes_[best])
+        probability = float(proba[best])
         
         severity_label = severity_mapping.get(prediction, 'Unknown')
         
@@ -443,13 +813,14 @@ def predict():
                 'severity_code': prediction,
                 'ml_probability': round(probability, 4),
                 'ml_risk_level': ml_risk_level,
-                'timestamp': pd.Timestamp.now().isoformat()
+                'model': model_key,
+                'timestamp': datetime.now().isoformat()
             },
             
             'input_summary': {
                 'time': data.get('datetime'),
                 'location': f"{data.get('City Name', 'Unknown')}, {data.get('State Name', 'Unknown')}",
-                'coordinates': f"({user_lat}, {user_lon})" if user_lat and user_lon else 'N/A',
+                'coordinates': f"({user_lat}, {user_lon})" if has_location else 'N/A',
                 'weather': data.get('Weather Conditions'),
                 'road_condition': data.get('Road Condition'),
                 'vehicle_type': data.get('Vehicle Type Involved'),
@@ -467,6 +838,8 @@ def predict():
                 'road_type_score': road_type_score,
                 'road_condition_score': road_cond_score,
                 'license_score': license_score,
+                'state_code': state_enc,
+                'city_code': city_enc,
                 'lighting_conditions': lighting_enc,
                 'traffic_control': traffic_enc,
                 'alcohol_involved': alcohol_flag == 1
@@ -489,6 +862,9 @@ def predict():
                 'total_hotspots_nearby': hotspot_info.get('total_nearby', 0),
                 'nearby_hotspots': hotspot_info.get('nearby_hotspots', [])[:5]
             }
+            for key in ('time_profile', 'scoring', 'density_risk'):
+                if key in hotspot_info:
+                    response['hotspot_analysis'][key] = hotspot_info[key]
             
             response['map_generation'] = {
                 'available': True,
@@ -496,37 +872,172 @@ def predict():
                 'description': 'Generate interactive map showing hotspots and risk zones'
             }
         
-        return jsonify(response), 200
+        # Per-feature attributions for the predicted class
+        if values['explain']:
+            response['explanation'] = explain_rows(X, [prediction], [model_key], values['explain_top'])[0]
+        
+        marks['model'] = time.perf_counter()
+        log_request('predict', data, feature_values,
+                    {'severity_code': prediction, 'probabilities': proba, 'model': model_key,
+                     'hotspot_risk_level': hotspot_risk_level}, started, marks)
+        return json_response(response, 200, compact=values['compact'])
     
+    except Exception as e:
+        return json_response({'error': str(e), 'message': 'Prediction failed'}, 500)
+
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Severity predictions for many records in one vectorized pass
+    Required: records (list of /predict input objects)
+    Optional: explain (bool, or ?explain=true), explain_top (int), compact (bool)
+    Accept: application/vnd.apache.arrow.stream or application/msgpack (or ?format=arrow|msgpack)
+    returns severity_code and the probability matrix as packed columns, class labels in the metadata
+    """
+    started = time.perf_counter()
+    data = request.get_json(silent=True)
+    try:
+        options = validate_request(OPTIONS_SCHEMA, data)
+        fmt = negotiate_format(request)
+    except SchemaError as e:
+        return schema_error_response(e, 'Batch prediction failed', OPTIONS_SCHEMA)
+    except ValueError as e:
+        return json_response({'error': str(e), 'message': 'Batch prediction failed'}, 406)
+    if fmt != 'json' and options['explain']:
+        return json_response({'error': 'explain is only available in JSON responses',
+                              'message': 'Batch prediction failed'}, 400)
+    
+    try:
+        records = data.get('records')
+        if not isinstance(records, list) or not records:
+            return json_response({
+                'error': 'records must be a non-empty list',
+                'message': 'Batch prediction failed'
+            }, 400)
+        if len(records) > MAX_BATCH_RECORDS:
+            return json_response({
+                'error': f'At most {MAX_BATCH_RECORDS} records per request',
+                'message': 'Batch prediction failed'
+            }, 400)
+        
+        import pandas as pd
+        frame = pd.DataFrame(records)
+        X = build_feature_frame(frame, gazetteer=get_gazetteer())[feature_names]
+        marks = {'features': time.perf_counter()}
+        
+        model_keys = None
+        if model_catalog is not None:
+            states = frame['State Name'].fillna('Unknown') if 'State Name' in frame else ['Unknown'] * len(frame)
+            proba, model_keys = model_catalog.predict_proba(X, states, model.classes_, predict_severity_proba)
+        else:
+            proba = predict_severity_proba(X)
+        best = proba.argmax(axis=1)
+        codes = np.asarray(model.classes_)[best]
+        labels = [severity_mapping.get(int(c), 'Unknown') for c in model.classes_]
+        ml_risk_levels = {0: 'LOW', 1: 'MEDIUM', 2: 'HIGH'}
+        marks['model'] = time.perf_counter()
+        log_request('predict_batch', records, None, {'severity_code': codes, 'probabilities': proba}, started, marks)
+        
+        if fmt != 'json':
+            # Probability rows follow `classes`; NumPy buffers are packed as-is
+            columns = {'severity_code': codes, 'probabilities': proba}
+            if model_keys is not None:
+                columns['model'] = model_keys.tolist()
+            return columnar_response(columns, {
+                'count': len(codes),
+                'classes': [int(c) for c in model.classes_],
+                'labels': labels,
+                'model_variant': _load_state['model_variant'],
+                'timestamp': datetime.now().isoformat()
+            }, fmt)
+        
+        predictions = [{
+            'severity': severity_mapping.get(int(code), 'Unknown'),
+            'severity_code': int(code),
+            'ml_probability': round(float(p[b]), 4),
+            'ml_risk_level': ml_risk_levels.get(int(code), 'UNKNOWN'),
+            'probabilities': {label: round(float(v), 4) for label, v in zip(labels, p)}
+        } for code, p, b in zip(codes, proba, best)]
+        if model_keys is not None:
+            for prediction, key in zip(predictions, model_keys):
+                prediction['model'] = key
+        
+        if options['explain']:
+            explanations = explain_rows(X, codes, model_keys, options['explain_top'])
+            for prediction, explanation in zip(predictions, explanations):
+                prediction['explanation'] = explanation
+        
+        return json_response({
+            'count': len(predictions),
+            'predictions': predictions,
+            'timestamp': datetime.now().isoformat()
+        }, 200, compact=options['compact'])
+    
+    except Exception as e:
+        return json_response({
+            'error': str(e),
+            'message': 'Batch prediction failed',
+            'required_input_fields': ['records (list of /predict input objects)'],
+            'optional_input_fields': ['explain (bool)', 'explain_top (int)', 'compact (bool)']
+        }, 400)
+
+
+@app.route('/ingest', methods=['POST'])
+def ingest():
+    """
+    Stream live accident reports as NDJSON (one cleaned_data.csv-style object per line)
+    Required per line: datetime, latitude, longitude, Accident Severity
+    Optional: dayfirst=true query parameter for day-first datetimes
+    Returns 202 with accepted/rejected counts, or 429 + Retry-After when the pipeline is saturated
+    """
+    try:
+        dayfirst = request.args.get('dayfirst', 'false').lower() == 'true'
+        result = get_ingest_pipeline().ingest_lines(request.stream, timeout=INGEST_TIMEOUT_SECONDS, dayfirst=dayfirst)
+        if result['backpressure']:
+            response = jsonify(dict(result, message='Ingest queue full, resend from lines_consumed + 1'))
+            response.headers['Retry-After'] = '1'
+            return response, 429
+        return jsonify(result), 202
     except Exception as e:
         return jsonify({
             'error': str(e),
-            'message': 'Prediction failed',
-            'required_input_fields': [
-                'datetime (format: YYYY-MM-DD HH:MM)',
-                'State Name (string)',
-                'City Name (string)',
-                'Driver Age (integer)',
-                'Driver License Status (Valid/Expired/No License)',
-                'driver_experience (string: e.g., "5 years", "6 months")',
-                'driver_speed_habit (integer: km/h)',
-                'alcohol_flag (0 or 1)',
-                'Vehicle Type Involved (Car/Bike/Truck/Auto)',
-                'vehicle_condition (good/average/poor)',
-                'Road Type (Urban Road/State Highway/National Highway)',
-                'Road Condition (Dry/Wet/Damaged)',
-                'Weather Conditions (Clear/Rainy/Foggy/Stormy)',
-                'Lighting Conditions (Bright/Dusk/Dark)',
-                'Traffic Control Presence (Lights/Signs/Police/None)'
-            ],
-            'optional_input_fields': [
-                'latitude (float) - for hotspot analysis',
-                'longitude (float) - for hotspot analysis',
-                'radius_km (float) - hotspot search radius'
-            ]
+            'message': 'Ingestion failed',
+            'required_input_fields': ['datetime', 'latitude', 'longitude', 'Accident Severity'],
+            'content_type': 'application/x-ndjson'
         }), 400
 
 
+@app.route('/request_log/status')
+def request_log_status():
+    """Request logger counters (logged, sampled out, dropped under overload, written, files)"""
+    if request_logger is None:
+        return jsonify({'enabled': False, 'sample_rate': REQUEST_LOG_SAMPLE}), 200
+    return jsonify(dict(request_logger.status(), enabled=True)), 200
+
+
+@app.route('/model_catalog/status')
+def model_catalog_status():
+    """Regional model catalog: routing lookups, LRU hits, lazy loads (count/seconds), evictions, resident models"""
+    if model_catalog is None:
+        return jsonify({'enabled': False, 'catalog_dir': MODEL_CATALOG_DIR}), 200
+    return jsonify(dict(model_catalog.status(), enabled=True)), 200
+
+
+@app.route('/ingest/status')
+def ingest_status():
+    """
+    Ingestion counters, queue depth, rows in the columnar store and live hotspot index state
+    Reports enabled=False until the first POST /ingest starts the pipeline (status never starts it)
+    """
+    pipeline = ingest_pipeline
+    if pipeline is None:
+        return jsonify({'enabled': False, 'store': INGEST_STORE_DIR}), 200
+    # hotspots is None when HOTSPOT_SHARDS is set: live accidents are stored but not added to shard statistics
+    return jsonify(dict(pipeline.status(), enabled=True, store_rows=pipeline.store.rows(), store=INGEST_STORE_DIR,
+                        hotspots=hotspot_analyzer.live_stats() if hotspot_analyzer is not None else None)), 200
+
+
 if __name__ == '__main__':
     print("\n" + "="*80)
     print("🚗 AI TRAFFIC ACCIDENT SEVERITY PREDICTION API v4.0")
@@ -534,7 +1045,10 @@ if __name__ == '__main__':
     print("📍 Server: http://127.0.0.1:5000")
     print("📖 API Info: GET http://127.0.0.1:5000/")
     print("🔮 Predict: POST http://127.0.0.1:5000/predict")
+    print("📦 Batch Predict: POST http://127.0.0.1:5000/predict_batch")
     print("🗺️  Hotspot Analysis: POST http://127.0.0.1:5000/hotspot_analysis")
+    print("🔎 Autocomplete: GET http://127.0.0.1:5000/autocomplete?q=hyd")
+    print("📈 Input Drift: GET http://127.0.0.1:5000/drift")
     print("🌏 Generate Map: POST http://127.0.0.1:5000/generate_hotspot_map")
     print("👁️  View Map: GET http://127.0.0.1:5000/hotspot_map")
     print("="*80)
@@ -577,6 +1091,8 @@ if __name__ == '__main__':
     print("   • Comprehensive risk scoring")
     print("   • Combined safety recommendations")
     
+    load_resources()
+    print(f"\n📦 Model + hotspots loaded in {_load_state['load_seconds']}s")
     print("\n✨ System Ready for Production! ✨\n")
     print("="*80 + "\n")
     
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+
+
+def save_json(data, path='models/metrics.json'):
+    """Atomically write a training artifact (metrics, manifest) as JSON"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_metrics(path='models/metrics.json'):
+    """Read a metrics artifact written by retrain_model.py"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def render_report(metrics, out_dir='outputs', dpi=300):
+    """Render feature importance, confusion matrix and per-class figures from a metrics artifact"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+
+    os.makedirs(out_dir, exist_ok=True)
+    saved = []
+    model_name = metrics['model_name']
+    class_names = metrics['class_names']
+    per_class = [metrics['per_class'][name] for name in class_names]
+
+    importances = sorted(metrics['feature_importances'].items(), key=lambda kv: kv[1], reverse=True)[:15]
+    plt.figure(figsize=(12, 8))
+    sns.barplot(x=[imp for _, imp in importances], y=[feat for feat, _ in importances], palette='viridis')
+    plt.title(f"Top 15 Feature Importances ({model_name}) - {metrics.get('version', '')} Clean + Balanced",
+              fontsize=14, fontweight='bold')
+    plt.xlabel("Importance Score", fontsize=12)
+    plt.ylabel("Feature Name", fontsize=12)
+    plt.tight_layout()
+    path = os.path.join(out_dir, 'feature_importance.png')
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    saved.append(path)
+    plt.close()
+
+    cm = np.array(metrics['confusion_matrix'])
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=class_names,
+                yticklabels=class_names, cbar_kws={'label': 'Count'})
+    plt.title('Confusion Matrix', fontsize=14, fontweight='bold')
+    plt.ylabel('True Label', fontsize=12)
+    plt.xlabel('Predicted Label', fontsize=12)
+    plt.tight_layout()
+    path = os.path.join(out_dir, 'confusion_matrix.png')
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    saved.append(path)
+    plt.close()
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    class_accuracies = [c['accuracy'] for c in per_class]
+    f1_per_class = [c['f1'] for c in per_class]
+    colors = ['#2ecc71', '#f39c12', '#e74c3c'][:len(class_names)]
+
+    axes[0].bar(class_names, class_accuracies, color=colors, edgecolor='black', linewidth=1.5)
+    axes[0].set_title('Per-Class Accuracy', fontsize=12, fontweight='bold')
+    axes[0].set_ylabel('Accuracy', fontsize=11)
+    axes[0].set_ylim([0, 1.0])
+    for i, v in enumerate(class_accuracies):
+        axes[0].text(i, v + 0.02, f'{v:.2%}', ha='center', fontweight='bold', fontsize=10)
+
+    axes[1].bar(class_names, f1_per_class, color=colors, edgecolor='black', linewidth=1.5)
+    axes[1].set_title('Per-Class F1-Score', fontsize=12, fontweight='bold')
+    axes[1].set_ylabel('F1-Score', fontsize=11)
+    axes[1].set_ylim([0, 1.0])
+    for i, v in enumerate(f1_per_class):
+        axes[1].text(i, v + 0.02, f'{v:.2f}', ha='center', fontweight='bold', fontsize=10)
+
+    plt.tight_layout()
+    path = os.path.join(out_dir, 'model_performance.png')
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    saved.append(path)
+    plt.close()
+    return saved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render model report figures from a metrics artifact')
+    parser.add_argument('--metrics', default='models/metrics.json')
+    parser.add_argument('--out', default='outputs')
+    parser.add_argument('--dpi', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    print("\n📊 Rendering model report...")
+    for path in render_report(load_metrics(args.metrics), args.out, args.dpi):
+        print(f"   ✓ Saved: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # stdlib json in the writer thread when orjson is not installed
+    orjson = None
+
+
+LOG_FORMATS = ('ndjson', 'parquet')
+
+# Parquet columns; nested parts of an entry are stored as JSON strings so every file shares one schema
+PARQUET_COLUMNS = ('ts', 'endpoint', 'status', 'request', 'features', 'prediction', 'timings_ms')
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def dumps(obj):
+    """One JSON document as bytes (numpy values and datetimes included)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_json_default, ensure_ascii=False).encode('utf-8')
+
+
+class RequestLogger:
+    """
+    Sampled request/prediction log written by a background thread
+    log() only samples and appends to a deque (atomic in CPython, no lock); when max_pending entries
+    are waiting the entry is dropped and counted instead of blocking the request
+    The writer serializes batches into gzip NDJSON or Parquet files under root, rotated by size or age;
+    the file being written is hidden (.name.inprogress) and renamed once closed
+    """
+
+    def __init__(self, root='data/request_logs', sample_rate=1.0, fmt='ndjson', max_pending=10000,
+                 batch_rows=500, flush_seconds=2.0, rotate_bytes=64 * 1024 * 1024, rotate_seconds=3600):
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f'Unknown log format {fmt!r}, expected one of {LOG_FORMATS}')
+        self.root = root
+        self.sample_rate = sample_rate
+        self.fmt = fmt
+        self.max_pending = max_pending
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.stats = {'logged': 0, 'sampled_out': 0, 'dropped': 0, 'written': 0, 'files': 0,
+                      'failed_batches': 0, 'last_error': None}
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()
+        self._stop = False
+        self._thread = None
+        self._file = None
+        self._writer = None
+        self._path = None
+        self._opened_at = 0.0
+        self._bytes = 0
+        os.makedirs(root, exist_ok=True)
+
+    def log(self, endpoint, request=None, features=None, prediction=None, timings=None, status=200):
+        """Queue one entry (hot path: a sampling draw and a deque append); returns False when not logged"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.stats['sampled_out'] += 1
+            return False
+        if len(self._pending) >= self.max_pending:
+            self.stats['dropped'] += 1
+            return False
+        self._pending.append((time.time(), endpoint, status, request, features, prediction, timings))
+        self.stats['logged'] += 1
+        if len(self._pending) == self.batch_rows:
+            self._wake.set()
+        return True
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.stats['failed_batches'] += 1
+                self.stats['last_error'] = str(e)
+                print(f"❌ Request log batch failed: {e}")
+
+    def flush(self):
+        """Write every pending entry now (batches of batch_rows) and rotate if due"""
+        with self._write_lock:
+            while self._pending:
+                batch = []
+                while self._pending and len(batch) < self.batch_rows:
+                    batch.append(self._pending.popleft())
+                self._write(batch)
+            if self._file is not None and time.time() - self._opened_at >= self.rotate_seconds:
+                self._rotate()
+
+    def _entries(self, batch):
+        for ts, endpoint, status, request, features, prediction, timings in batch:
+            yield {'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(ts)) + f'.{int(ts * 1000) % 1000:03d}',
+                   'endpoint': endpoint, 'status': status, 'request': request, 'features': features,
+                   'prediction': prediction, 'timings_ms': timings}
+
+    def _write(self, batch):
+        if self._file is None:
+            self._open()
+        if self.fmt == 'ndjson':
+            data = b'\n'.join(dumps(entry) for entry in self._entries(batch)) + b'\n'
+            self._file.write(data)
+            self._bytes += len(data)
+        else:
+            import pyarrow as pa
+            rows = list(self._entries(batch))
+            columns = {name: [row[name] if name in ('ts', 'endpoint', 'status') else
+                              (dumps(row[name]).decode('utf-8') if row[name] is not None else None)
+                              for row in rows] for name in PARQUET_COLUMNS}
+            table = pa.table(columns, schema=self._parquet_schema())
+            self._writer.write_table(table)
+            self._bytes += table.nbytes
+        self.stats['written'] += len(batch)
+        if self._bytes >= self.rotate_bytes:
+            self._rotate()
+
+    @staticmethod
+    def _parquet_schema():
+        import pyarrow as pa
+        return pa.schema([('ts', pa.string()), ('endpoint', pa.string()), ('status', pa.int32())] +
+                         [(name, pa.string()) for name in PARQUET_COLUMNS[3:]])
+
+    def _open(self):
+        suffix = 'ndjson.gz' if self.fmt == 'ndjson' else 'parquet'
+        name = f"requests-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.time_ns() % 10**6:06d}.{suffix}"
+        self._path = os.path.join(self.root, name)
+        tmp_path = os.path.join(self.root, f'.{name}.inprogress')
+        if self.fmt == 'ndjson':
+            self._file = gzip.open(tmp_path, 'wb', compresslevel=6)
+        else:
+            import pyarrow.parquet as pq
+            self._file = tmp_path
+            self._writer = pq.ParquetWriter(tmp_path, self._parquet_schema(), compression='zstd')
+        self._opened_at = time.time()
+        self._bytes = 0
+
+    def _rotate(self):
+        """Close the current file and publish it under its final name"""
+        if self._file is None:
+            return
+        if self.fmt == 'ndjson':
+            tmp_path = self._file.name
+            self._file.close()
+        else:
+            tmp_path = self._file
+            self._writer.close()
+            self._writer = None
+        os.replace(tmp_path, self._path)
+        self._file = None
+        self.stats['files'] += 1
+
+    def close(self):
+        """Stop the writer thread, write what is pending and publish the open file"""
+        self._stop = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            self._rotate()
+
+    def files(self):
+        return sorted(glob.glob(os.path.join(self.root, 'requests-*')))
+
+    def status(self):
+        return dict(self.stats, pending=len(self._pending), format=self.fmt, sample_rate=self.sample_rate,
+                    root=self.root, files_on_disk=len(self.files()))
+
+
+def read_logs(root, endpoint=None):
+    """Entries from every published log file under root (NDJSON and Parquet), oldest file first"""
+    entries = []
+    for path in sorted(glob.glob(os.path.join(root, 'requests-*'))):
+        if path.endswith('.ndjson.gz'):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            import pyarrow.parquet as pq
+            rows = pq.read_table(path).to_pylist()
+            for row in rows:
+                for name in PARQUET_COLUMNS[3:]:
+                    row[name] = json.loads(row[name]) if row[name] is not None else None
+        entries += [row for row in rows if endpoint is None or row['endpoint'] == endpoint]
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the request logger hot path or summarize a log directory')
+    parser.add_argument('--root', default='data/request_logs')
+    parser.add_argument('--format', choices=LOG_FORMATS, default='ndjson')
+    parser.add_argument('--bench', type=int, default=0, help='Log N synthetic /predict entries and report per-call cost')
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        logger = RequestLogger(args.root, fmt=args.format, max_pending=args.bench).start()
+        request = {'City Name': 'Mumbai', 'State Name': 'Maharashtra', 'Driver Age': 30, 'driver_speed_habit': 80}
+        features = {'hour': 12, 'weather_score': 1, 'road_type_score': 2, 'age_score': 2, 'State Name_enc': 17}
+        prediction = {'severity_code': 0, 'probability': 0.61}
+        start = time.perf_counter()
+        for _ in range(args.bench):
+            logger.log('predict', request, features, prediction, {'total': 1.2})
+        per_call_ns = (time.perf_counter() - start) / args.bench * 1e9
+        start = time.perf_counter()
+        logger.close()
+        print(f"✅ log(): {per_call_ns:.0f} ns per request | writer: {args.bench / (time.perf_counter() - start):,.0f} entries/sec")
+    entries = read_logs(args.root)
+    endpoints = {}
+    for entry in entries:
+        endpoints[entry['endpoint']] = endpoints.get(entry['endpoint'], 0) + 1
+    print(f"📜 {len(entries):,} logged requests in {args.root}: {endpoints}")
+    return entries
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+from datetime import datetime
+
+from feature_scoring import RAW_FIELD_DEFAULTS
+
+
+class SchemaError(ValueError):
+    """Request failed validation; `errors` holds one {'field', 'error'} entry per bad field"""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(f"{e['field']}: {e['error']}" for e in errors))
+        self.errors = errors
+
+
+def _to_str(value):
+    return str(value).strip()
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        raise ValueError('expected a number')
+    return float(value)
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        raise ValueError('expected an integer')
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError('expected an integer')
+    return int(number)
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'on'):
+        return True
+    if text in ('0', 'false', 'no', 'off', ''):
+        return False
+    raise ValueError('expected a boolean')
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        # Same parser predict() used before, for non-ISO inputs
+        import pandas as pd
+        parsed = pd.to_datetime(str(value), errors='coerce')
+        if pd.isna(parsed):
+            raise ValueError('expected a date/time, e.g. 2023-01-01 12:00')
+        return parsed.to_pydatetime()
+
+
+COERCERS = {
+    'str': _to_str,
+    'float': _to_float,
+    'int': _to_int,
+    'bool': _to_bool,
+    'datetime': _to_datetime
+}
+
+
+class RequestSchema:
+    """
+    Request fields compiled once into (name, coerce, default, bounds, choices) tuples
+    validate() coerces, range-checks and defaults every field in a single pass
+    Field spec: name -> (type, default) or (type, default, {'min', 'max', 'choices', 'required'})
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self._compiled = []
+        for name, spec in fields.items():
+            kind, default = spec[0], spec[1]
+            options = spec[2] if len(spec) > 2 else {}
+            self._compiled.append((name, COERCERS[kind], default, options.get('min'), options.get('max'),
+                                   options.get('choices'), options.get('required', False)))
+
+    def validate(self, data, overrides=None):
+        """
+        Coerced values for every field (defaults filled in); raises SchemaError listing all bad fields
+        overrides: extra raw values (e.g. query-string flags) taking precedence over the body
+        """
+        if not isinstance(data, dict):
+            raise SchemaError([{'field': '(body)', 'error': 'expected a JSON object'}])
+        if overrides:
+            data = dict(data, **overrides)
+
+        values, errors = {}, []
+        for name, coerce, default, lo, hi, choices, required in self._compiled:
+            raw = data.get(name)
+            if raw is None or raw == '':
+                if required:
+                    errors.append({'field': name, 'error': 'required'})
+                values[name] = default
+                continue
+            try:
+                value = coerce(raw)
+            except (TypeError, ValueError) as e:
+                errors.append({'field': name, 'error': str(e) if str(e).startswith('expected') else f'invalid value {raw!r}'})
+                continue
+            if (lo is not None and value < lo) or (hi is not None and value > hi):
+                errors.append({'field': name, 'error': f'must be between {lo} and {hi}'})
+                continue
+            if choices is not None and value not in choices:
+                errors.append({'field': name, 'error': f'must be one of {sorted(choices)}'})
+                continue
+            values[name] = value
+        if errors:
+            raise SchemaError(errors)
+        return values
+
+    def describe(self):
+        """Field -> type/default summary for error responses"""
+        described = {}
+        for name, spec in self.fields.items():
+            options = dict(spec[2]) if len(spec) > 2 else {}
+            if 'choices' in options:
+                options['choices'] = sorted(options['choices'])
+            default = spec[1].isoformat(sep=' ', timespec='minutes') if isinstance(spec[1], datetime) else spec[1]
+            described[name] = {'type': spec[0], 'default': default, **options}
+        return described
+
+
+# Hotspot risk models: distance bands around hotspots, or the accident density surface
+SCORING_MODES = {'distance', 'density'}
+
+# Shared by every response-shaping endpoint
+RESPONSE_OPTIONS = {
+    'compact': ('bool', False),
+    'explain': ('bool', False),
+    'explain_top': ('int', None, {'min': 1})
+}
+
+PREDICT_SCHEMA = RequestSchema({
+    'datetime': ('datetime', _to_datetime(RAW_FIELD_DEFAULTS['datetime'])),
+    'State Name': ('str', RAW_FIELD_DEFAULTS['State Name']),
+    'City Name': ('str', RAW_FIELD_DEFAULTS['City Name']),
+    'Driver Age': ('int', RAW_FIELD_DEFAULTS['Driver Age'], {'min': 10, 'max': 120}),
+    'Driver License Status': ('str', RAW_FIELD_DEFAULTS['Driver License Status']),
+    'driver_experience': ('str', RAW_FIELD_DEFAULTS['driver_experience']),
+    'driver_speed_habit': ('float', float(RAW_FIELD_DEFAULTS['driver_speed_habit']), {'min': 0, 'max': 400}),
+    'alcohol_flag': ('int', RAW_FIELD_DEFAULTS['alcohol_flag'], {'choices': {0, 1}}),
+    'Vehicle Type Involved': ('str', RAW_FIELD_DEFAULTS['Vehicle Type Involved']),
+    'vehicle_condition': ('str', RAW_FIELD_DEFAULTS['vehicle_condition']),
+    'Road Type': ('str', RAW_FIELD_DEFAULTS['Road Type']),
+    'Road Condition': ('str', RAW_FIELD_DEFAULTS['Road Condition']),
+    'Weather Conditions': ('str', RAW_FIELD_DEFAULTS['Weather Conditions']),
+    'Lighting Conditions': ('str', RAW_FIELD_DEFAULTS['Lighting Conditions']),
+    'Traffic Control Presence': ('str', RAW_FIELD_DEFAULTS['Traffic Control Presence']),
+    'latitude': ('float', None, {'min': -90, 'max': 90}),
+    'longitude': ('float', None, {'min': -180, 'max': 180}),
+    'radius_km': ('float', 500.0, {'min': 0}),
+    'scoring': ('str', 'distance', {'choices': SCORING_MODES}),
+    **RESPONSE_OPTIONS
+})
+
+HOTSPOT_SCHEMA = RequestSchema({
+    'latitude': ('float', None, {'min': -90, 'max': 90, 'required': True}),
+    'longitude': ('float', None, {'min': -180, 'max': 180, 'required': True}),
+    'radius_km': ('float', 500.0, {'min': 0}),
+    'datetime': ('datetime', None),
+    'scoring': ('str', 'distance', {'choices': SCORING_MODES}),
+    'compact': ('bool', False)
+})
@@ -0,0 +1,139 @@
+import json
+
+import numpy as np
+from flask import Response, jsonify
+
+try:
+    import orjson
+except ImportError:  # plain jsonify when orjson is not installed
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are only offered when msgpack is installed
+    msgpack = None
+
+
+JSON_MIME = 'application/json'
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+MSGPACK_MIME = 'application/msgpack'
+
+# ?format= values and the Accept types that select them
+RESPONSE_FORMATS = {
+    'json': [JSON_MIME],
+    'arrow': [ARROW_MIME],
+    'msgpack': [MSGPACK_MIME, 'application/x-msgpack']
+}
+
+
+# Static or derivable text dropped in compact mode: map hints, echo of the input, and the
+# emoji/recommendation strings that follow from risk_level / severity_code
+COMPACT_DROP_KEYS = frozenset({
+    'map_generation', 'input_summary', 'message', 'description', 'emoji',
+    'travel_recommendation', 'recommendation', 'ml_recommendation', 'coordinates_type'
+})
+
+
+def compact_payload(obj):
+    """Copy of a response payload without COMPACT_DROP_KEYS (at any depth)"""
+    if isinstance(obj, dict):
+        return {k: compact_payload(v) for k, v in obj.items() if k not in COMPACT_DROP_KEYS}
+    if isinstance(obj, list):
+        return [compact_payload(v) for v in obj]
+    return obj
+
+
+def json_response(payload, status=200, compact=False):
+    """
+    JSON response encoded with orjson when available, flask.jsonify otherwise
+    orjson writes UTF-8 directly (no \\uXXXX escapes for emoji) and serializes numpy values natively
+    """
+    if compact:
+        payload = compact_payload(payload)
+    if orjson is None:
+        response = jsonify(payload)
+        response.status_code = status
+        return response
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return Response(body, status=status, mimetype='application/json')
+
+
+def available_formats():
+    return [fmt for fmt in RESPONSE_FORMATS if fmt != 'msgpack' or msgpack is not None]
+
+
+def negotiate_format(req):
+    """
+    Response format for a request: ?format=json|arrow|msgpack, else the best Accept match (JSON by default)
+    Raises ValueError for an explicit format that is unknown or not installed
+    """
+    requested = req.args.get('format')
+    if requested:
+        if requested not in available_formats():
+            raise ValueError(f'Unsupported format {requested!r}, available: {available_formats()}')
+        return requested
+    offers = {mime: fmt for fmt in available_formats() for mime in RESPONSE_FORMATS[fmt]}
+    return offers[req.accept_mimetypes.best_match(list(offers), default=JSON_MIME)]
+
+
+def _packed(values):
+    """C-contiguous array (no copy when it already is); object/str columns stay as lists"""
+    if isinstance(values, list) and all(isinstance(v, str) for v in values):
+        return values
+    values = np.asarray(values)
+    if values.dtype.kind in 'OUS':
+        return values.tolist()
+    return np.ascontiguousarray(values)
+
+
+def encode_arrow(columns, meta):
+    """
+    One-batch Arrow IPC stream; 2-D arrays become FixedSizeList columns (row-major)
+    Numeric columns wrap the NumPy buffers without copying; meta is JSON in the schema metadata
+    """
+    import pyarrow as pa
+
+    arrays = []
+    for values in columns.values():
+        values = _packed(values)
+        if isinstance(values, list):
+            arrays.append(pa.array(values, type=pa.string()))
+        elif values.ndim == 2:
+            arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(values.reshape(-1)), values.shape[1]))
+        else:
+            arrays.append(pa.array(values))
+    batch = pa.RecordBatch.from_arrays(arrays, names=list(columns))
+    batch = batch.replace_schema_metadata({'meta': json.dumps(meta, default=str)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_msgpack(columns, meta):
+    """
+    {'meta': ..., 'columns': {name: {'dtype', 'shape', 'data'}}}, data being the raw little-endian array bytes
+    (np.frombuffer(data, dtype).reshape(shape) on the client); string columns are plain lists
+    """
+    packed = {}
+    for name, values in columns.items():
+        values = _packed(values)
+        if isinstance(values, list):
+            packed[name] = values
+        else:
+            values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+            packed[name] = {'dtype': values.dtype.str, 'shape': list(values.shape),
+                            'data': memoryview(values).cast('B')}
+    return msgpack.packb({'meta': meta, 'columns': packed}, use_bin_type=True, default=str)
+
+
+def columnar_response(columns, meta, fmt, status=200):
+    """
+    Columns of equal length (1-D or 2-D NumPy arrays, or string lists) plus a metadata dict,
+    encoded as Arrow IPC or MessagePack for service-to-service callers
+    """
+    if fmt == 'arrow':
+        return Response(encode_arrow(columns, meta), status=status, mimetype=ARROW_MIME)
+    if fmt == 'msgpack':
+        return Response(encode_msgpack(columns, meta), status=status, mimetype=MSGPACK_MIME)
+    raise ValueError(f'No columnar encoding for format {fmt!r}')
@@ -1,23 +1,72 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
 import pandas as pd
 import joblib
 import numpy as np
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
-from imblearn.over_sampling import SMOTE
 from sklearn.metrics import classification_report, accuracy_score, f1_score, precision_recall_fscore_support, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
 import warnings
+from balancing import BALANCING_METHODS, balance_training_set
+from report_model import save_json, render_report
+from drift_monitor import build_baseline
+from xgb_training import XGB_PARAMS, early_stopping_params, fit_xgboost
 warnings.filterwarnings('ignore')
 
+parser = argparse.ArgumentParser(description='Retrain the accident severity model')
+parser.add_argument('--data', default='ai-traffic-prediction-backend/data/processed/featured_data.csv')
+parser.add_argument('--ingest-store', default=None,
+                    help='Also train on reports appended by POST /ingest / ingest.py (Parquet store directory)')
+parser.add_argument('--balancing', choices=BALANCING_METHODS, default='smote',
+                    help='smote: imblearn SMOTE | smote-index: KD-tree SMOTE stored as row indices, applied as '
+                         'per-row weights (no oversampled copy) | '
+                         'class-weight / sample-weight: no resampling, balanced weights | none')
+parser.add_argument('--k-neighbors', type=int, default=5)
+parser.add_argument('--balancing-cache', default='cache/balancing',
+                    help="Directory for cached resampled training sets ('' disables)")
+parser.add_argument('--xgb-mode', choices=['early-stop', 'fixed'], default='early-stop',
+                    help="early-stop: tree_method='hist' with a validation split | fixed: 200 trees")
+parser.add_argument('--val-size', type=float, default=0.15, help='Validation fraction for early stopping')
+parser.add_argument('--early-stopping-rounds', type=int, default=30)
+parser.add_argument('--xgb-max-rounds', type=int, default=1000)
+parser.add_argument('--threads', type=int, default=-1, help='n_jobs for RandomForest and XGBoost')
+parser.add_argument('--partition-by', default=None,
+                    help="Also fit one model per value of this column (e.g. 'State Name') into --catalog-dir")
+parser.add_argument('--catalog-dir', default='models/regional')
+parser.add_argument('--partition-min-rows', type=int, default=300, help='Smaller partitions use the global model')
+parser.add_argument('--partition-min-gain', type=float, default=0.0,
+                    help='Serve a partition model only if its test F1 beats the global model by this much')
+parser.add_argument('--partition-workers', type=int, default=None)
+parser.add_argument('--report', choices=['background', 'inline', 'skip'], default='background',
+                    help='Render figures from models/metrics.json after the model is saved')
+parser.add_argument('--out-of-core', action='store_true',
+                    help='Stream --data / --ingest-store in chunks and train XGBoost with external memory '
+                         '(train_out_of_core.py, writes models/ooc_model.joblib)')
+parser.add_argument('--chunksize', type=int, default=100000, help='Rows per chunk for --out-of-core')
+args = parser.parse_args()
+
+if args.out_of_core:
+    from train_out_of_core import train_out_of_core
+    train_out_of_core(args.data, args.ingest_store, chunksize=args.chunksize, threads=args.threads,
+                      max_rounds=args.xgb_max_rounds, early_stopping_rounds=args.early_stopping_rounds,
+                      val_size=args.val_size)
+    sys.exit(0)
+
 print("\n" + "="*80)
 print("🔄 RETRAINING MODEL v8.0 - CLEAN FEATURES + CLASS BALANCING FOR BEST ACCURACY")
 print("="*80)
 
 print("\n1️⃣ Loading featured data...")
-df = pd.read_csv('ai-traffic-prediction-backend/data/processed/featured_data.csv')
+df = pd.read_csv(args.data)
 print(f"   ✓ Loaded {len(df)} records")
+if args.ingest_store and os.path.isdir(args.ingest_store):
+    ingested = pd.read_parquet(args.ingest_store)
+    df = pd.concat([df, ingested[[c for c in df.columns if c in ingested.columns]]], ignore_index=True)
+    print(f"   ✓ Added {len(ingested)} ingested records from {args.ingest_store}")
 
 print("\n2️⃣ Selecting CLEAN PREDICTIVE features (REMOVED ALL PROBLEMATIC FEATURES)...")
 feature_cols = []
@@ -82,28 +131,41 @@ print("\n3️⃣ Splitting data (80% train, 20% test)...")
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
 
 print("\n4️⃣🎯 CLASS BALANCING - CRITICAL FOR ACCURACY!")
-print("   Applying SMOTE (Synthetic Minority Oversampling)...")
+print(f"   Method: {args.balancing}")
 
 try:
+    X_train_balanced, y_train_balanced, train_sample_weight, balancing_info = balance_training_set(
+        X_train, y_train, method=args.balancing, k_neighbors=args.k_neighbors,
+        random_state=42, cache_dir=args.balancing_cache or None
+    )
     
-    smote = SMOTE(random_state=42, k_neighbors=5)
-    X_train_balanced, y_train_balanced = smote.fit_resample(X_train, y_train)
-    
-    print(f"   ✓ Before SMOTE: {len(X_train)} samples")
-    print(f"   ✓ After SMOTE:  {len(X_train_balanced)} samples")
+    print(f"   ✓ Before balancing: {len(X_train)} samples")
+    print(f"   ✓ After balancing:  {len(X_train_balanced)} samples")
+    if balancing_info.get('cache_key'):
+        print(f"   ✓ Cache: {'HIT' if balancing_info['cache_hit'] else 'MISS'} ({balancing_info['cache_key']})")
+    if args.balancing == 'smote-index':
+        print(f"   ✓ {balancing_info['synthetic_rows']} SMOTE rows applied as weights on their base/neighbor rows")
+    elif train_sample_weight is not None:
+        print("   ✓ Using balanced sample weights (no resampling)")
     print(f"\n   ✓ Balanced Training Distribution:")
     for class_id in unique_classes:
-        count = (y_train_balanced == class_id).sum()
-        pct = count/len(y_train_balanced)*100
-        print(f"      - {class_names_all[class_id]:8s}: {count:5d} ({pct:5.1f}%)")
+        mask = (y_train_balanced == class_id).values
+        count = mask.sum()
+        weight = train_sample_weight[mask].sum() if train_sample_weight is not None else count
+        pct = weight/(train_sample_weight.sum() if train_sample_weight is not None else len(y_train_balanced))*100
+        print(f"      - {class_names_all[class_id]:8s}: {count:5d} ({pct:5.1f}% effective)")
     
-    use_balanced = True
+    use_balanced = args.balancing != 'none'
 except ImportError:
     print("   ⚠️  SMOTE not installed. Install: pip install imbalanced-learn")
     print("   Using original unbalanced data (accuracy may be lower)")
-    X_train_balanced, y_train_balanced = X_train, y_train
+    X_train_balanced, y_train_balanced, train_sample_weight = X_train, y_train, None
     use_balanced = False
 
+fit_params = {'sample_weight': train_sample_weight} if train_sample_weight is not None else {}
+# class-weight mode: RandomForest balances through class_weight, XGBoost (no class_weight) through sample weights
+rf_fit_params = {} if args.balancing == 'class-weight' else fit_params
+
 print("\n5️⃣ RandomForest with GridSearchCV (CLASS-WEIGHTED + BALANCED DATA)...")
 param_grid_rf = {
     'n_estimators': [100, 200, 300],
@@ -111,11 +173,12 @@ param_grid_rf = {
     'min_samples_split': [2, 5, 10],
     'min_samples_leaf': [1, 2, 4],
     'max_features': ['sqrt', 'log2'],
-    'class_weight': ['balanced']
+    # sample-weight / smote-index modes already carry the balancing in fit_params
+    'class_weight': [None] if args.balancing in ('sample-weight', 'smote-index') else ['balanced']
 }
 
 grid_search = GridSearchCV(
-    RandomForestClassifier(random_state=42, n_jobs=-1),
+    RandomForestClassifier(random_state=42, n_jobs=args.threads),
     param_grid_rf,
     cv=5,
     scoring='f1_weighted',
@@ -123,37 +186,44 @@ grid_search = GridSearchCV(
     verbose=0
 )
 print("   Running GridSearch...")
-grid_search.fit(X_train_balanced, y_train_balanced)
+rf_start = time.perf_counter()
+grid_search.fit(X_train_balanced, y_train_balanced, **rf_fit_params)
+rf_seconds = time.perf_counter() - rf_start
 rf_model = grid_search.best_estimator_
 y_pred_rf = rf_model.predict(X_test)
 accuracy_rf = accuracy_score(y_test, y_pred_rf)
 f1_rf = f1_score(y_test, y_pred_rf, average='weighted')
 
-print(f"   ✓ RandomForest: Accuracy {accuracy_rf:.4f} | F1 {f1_rf:.4f}")
+print(f"   ✓ RandomForest: Accuracy {accuracy_rf:.4f} | F1 {f1_rf:.4f} | {rf_seconds:.1f}s")
 print(f"   Best Params: {grid_search.best_params_}")
 
 print("\n6️⃣ XGBoost (CLASS-WEIGHTED + BALANCED DATA)...")
-xgb_model = XGBClassifier(
-    n_estimators=200,
-    max_depth=8,
-    learning_rate=0.1,
-    min_child_weight=1,
-    gamma=0.1,
-    subsample=0.9,
-    colsample_bytree=0.9,
-    random_state=42,
-    n_jobs=-1,
-    use_label_encoder=False,
-    eval_metric='mlogloss',
-    verbosity=0
-)
+xgb_params = dict(XGB_PARAMS, n_jobs=args.threads)
+X_xgb_train, y_xgb_train, xgb_weight, xgb_validation = X_train_balanced, y_train_balanced, train_sample_weight, None
+if args.xgb_mode == 'early-stop':
+    # Validation rows come from the original (pre-balancing) training data, then the rest is re-balanced
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=args.val_size, random_state=42, stratify=y_train
+    )
+    X_xgb_train, y_xgb_train, xgb_weight, _ = balance_training_set(
+        X_fit, y_fit, method=args.balancing, k_neighbors=args.k_neighbors,
+        random_state=42, cache_dir=args.balancing_cache or None
+    )
+    xgb_params = early_stopping_params(xgb_params, args.xgb_max_rounds, args.early_stopping_rounds)
+    xgb_validation = (X_val, y_val)
+    print(f"   Mode: hist + early stopping ({args.early_stopping_rounds} rounds, max {args.xgb_max_rounds})")
+    print(f"   Validation split: {len(X_val)} rows | Training rows: {len(X_xgb_train)}")
+
 print("   Training XGBoost with balanced classes...")
-xgb_model.fit(X_train_balanced, y_train_balanced)
+xgb_model, xgb_seconds, xgb_best_iteration = fit_xgboost(xgb_params, X_xgb_train, y_xgb_train,
+                                                         xgb_weight, xgb_validation)
 y_pred_xgb = xgb_model.predict(X_test)
 accuracy_xgb = accuracy_score(y_test, y_pred_xgb)
 f1_xgb = f1_score(y_test, y_pred_xgb, average='weighted')
 
-print(f"   ✓ XGBoost: Accuracy {accuracy_xgb:.4f} | F1 {f1_xgb:.4f}")
+print(f"   ✓ XGBoost: Accuracy {accuracy_xgb:.4f} | F1 {f1_xgb:.4f} | {xgb_seconds:.1f}s")
+if xgb_best_iteration is not None:
+    print(f"   ✓ Best iteration: {xgb_best_iteration} of {args.xgb_max_rounds}")
 
 print("\n7️⃣ Model Comparison & Selection...")
 print(f"\n   ┌─────────────────┬──────────────┬──────────────┐")
@@ -178,7 +248,94 @@ else:
 
 print(f"\n   🏆 Selected: {model_name}")
 
-print("\n8️⃣ Evaluation...")
+print("\n8️⃣ Saving model + metrics artifact...")
+joblib.dump(best_model, 'models/best_model.joblib')
+severity_mapping = {0: 'Minor', 1: 'Serious', 2: 'Fatal'}
+joblib.dump(severity_mapping, 'models/severity_mapping.joblib')
+joblib.dump(feature_cols, 'models/feature_names.joblib')
+joblib.dump(grid_search.best_params_, 'models/best_parameters.joblib')
+print("   ✓ Model saved: best_model.joblib")
+print("   ✓ Mapping saved: severity_mapping.joblib")
+print("   ✓ Features saved: feature_names.joblib")
+print("   ✓ Parameters saved: best_parameters.joblib")
+
+precision, recall, f1_per_class, support = precision_recall_fscore_support(y_test, y_pred, labels=unique_classes)
+feature_importance = pd.Series(best_model.feature_importances_, index=X.columns).sort_values(ascending=False)
+cm = confusion_matrix(y_test, y_pred, labels=unique_classes)
+class_accuracies = [accuracy_score(y_test[y_test == class_id], y_pred[y_test == class_id]) for class_id in unique_classes]
+
+metrics = {
+    'model_name': model_name,
+    'version': 'v8.0',
+    'class_names': actual_class_names,
+    'class_ids': [int(c) for c in unique_classes],
+    'accuracy': float(accuracy),
+    'f1_weighted': float(f1),
+    'train_samples': int(len(X_train_balanced)),
+    'test_samples': int(len(X_test)),
+    'balancing': args.balancing,
+    'confusion_matrix': cm.tolist(),
+    'per_class': {
+        name: {
+            'precision': float(precision[i]),
+            'recall': float(recall[i]),
+            'f1': float(f1_per_class[i]),
+            'support': int(support[i]),
+            'accuracy': float(class_accuracies[i])
+        }
+        for i, name in enumerate(actual_class_names)
+    },
+    'feature_importances': {feat: float(imp) for feat, imp in feature_importance.items()}
+}
+save_json(metrics, 'models/metrics.json')
+print("   ✓ Metrics saved: metrics.json")
+
+catalog_summary = None
+if args.partition_by:
+    from sklearn.base import clone
+    from model_catalog import train_partitions, print_catalog
+    print(f"\n   🗂️  Partitioned models by {args.partition_by} (parallel)...")
+    if model_name == 'XGBoost':
+        n_rounds = xgb_best_iteration + 1 if xgb_best_iteration is not None else xgb_params['n_estimators']
+        partition_estimator = clone(xgb_model).set_params(n_estimators=n_rounds, early_stopping_rounds=None, n_jobs=1)
+    else:
+        partition_estimator = clone(rf_model).set_params(n_jobs=1)
+    # Partition models train on their rows of X_train and are compared with the global model on X_test
+    catalog = train_partitions(partition_estimator, X_train, y_train.to_numpy(), X_test,
+                               y_test.to_numpy(), y_pred, df.loc[X_train.index, args.partition_by],
+                               df.loc[X_test.index, args.partition_by], args.catalog_dir, args.partition_by,
+                               args.partition_min_rows, args.partition_min_gain, args.partition_workers)
+    print_catalog(catalog)
+    catalog_summary = {'dir': args.catalog_dir, 'partition_by': args.partition_by,
+                       'fitted': len(catalog['entries']),
+                       'served': sum(e['serve'] for e in catalog['entries'].values())}
+
+manifest = {
+    'model_name': model_name,
+    'version': 'v8.0',
+    'trained_at': datetime.now().isoformat(),
+    'data': args.data,
+    'ingest_store': args.ingest_store,
+    'feature_names': feature_cols,
+    'balancing': args.balancing,
+    'threads': args.threads,
+    'training_seconds': {'random_forest_grid': round(rf_seconds, 2), 'xgboost': round(xgb_seconds, 2)},
+    'xgboost': {
+        'mode': args.xgb_mode,
+        'tree_method': xgb_params.get('tree_method', 'auto'),
+        'best_iteration': xgb_best_iteration,
+        'early_stopping_rounds': xgb_params.get('early_stopping_rounds'),
+        'max_rounds': xgb_params['n_estimators']
+    },
+    'random_forest': {'best_params': grid_search.best_params_},
+    'model_bytes': os.path.getsize('models/best_model.joblib'),
+    'model_catalog': catalog_summary,
+    'drift_baseline': build_baseline(df)
+}
+save_json(manifest, 'models/model_manifest.json')
+print("   ✓ Manifest saved: model_manifest.json")
+
+print("\n9️⃣ Evaluation...")
 print(f"\n   📊 OVERALL METRICS:")
 print(f"      Accuracy: {accuracy:.4f} ({accuracy*100:.2f}%)")
 print(f"      F1-Score: {f1:.4f}")
@@ -186,8 +343,6 @@ print(f"      F1-Score: {f1:.4f}")
 print(f"\n   Classification Report:")
 print(classification_report(y_test, y_pred, target_names=actual_class_names, digits=4, labels=unique_classes))
 
-precision, recall, f1_per_class, support = precision_recall_fscore_support(y_test, y_pred, labels=unique_classes)
-
 print(f"\n   Per-Class Metrics:")
 print(f"   ┌────────┬───────────┬────────┬──────────┬─────────┐")
 print(f"   │ Class  │ Precision │ Recall │ F1-Score │ Support │")
@@ -197,8 +352,6 @@ for i, class_id in enumerate(unique_classes):
     print(f"   │ {label:6s} │ {precision[i]:9.4f} │ {recall[i]:6.4f} │ {f1_per_class[i]:8.4f} │ {support[i]:7d} │")
 print(f"   └────────┴───────────┴────────┴──────────┴─────────┘")
 
-print("\n9️⃣ Feature Importance...")
-feature_importance = pd.Series(best_model.feature_importances_, index=X.columns).sort_values(ascending=False)
 print(f"\n   Top 15 Most Important Features:")
 print(f"   ┌────┬──────────────────────────┬────────────┐")
 print(f"   │ No │ Feature                  │ Importance │")
@@ -207,63 +360,20 @@ for i, (feat, imp) in enumerate(feature_importance.head(15).items(), 1):
     print(f"   │ {i:2d} │ {feat:24s} │ {imp:10.4f} │")
 print(f"   └────┴──────────────────────────┴────────────┘")
 
-print("\n🔟 Generating visualizations...")
-
-plt.figure(figsize=(12, 8))
-sns.barplot(x=feature_importance[:15].values, y=feature_importance.index[:15], palette='viridis')
-plt.title(f"Top 15 Feature Importances ({model_name}) - v8.0 Clean + Balanced", fontsize=14, fontweight='bold')
-plt.xlabel("Importance Score", fontsize=12)
-plt.ylabel("Feature Name", fontsize=12)
-plt.tight_layout()
-plt.savefig('outputs/feature_importance.png', dpi=300, bbox_inches='tight')
-print("   ✓ Saved: feature_importance.png")
-plt.close()
-
-cm = confusion_matrix(y_test, y_pred, labels=unique_classes)
-plt.figure(figsize=(10, 8))
-sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=actual_class_names, 
-            yticklabels=actual_class_names, cbar_kws={'label': 'Count'})
-plt.title('Confusion Matrix', fontsize=14, fontweight='bold')
-plt.ylabel('True Label', fontsize=12)
-plt.xlabel('Predicted Label', fontsize=12)
-plt.tight_layout()
-plt.savefig('outputs/confusion_matrix.png', dpi=300, bbox_inches='tight')
-print("   ✓ Saved: confusion_matrix.png")
-plt.close()
-
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-class_accuracies = [accuracy_score(y_test[y_test == class_id], y_pred[y_test == class_id]) for class_id in unique_classes]
-colors = ['#2ecc71', '#f39c12', '#e74c3c'][:len(unique_classes)]
-
-axes[0].bar(actual_class_names, class_accuracies, color=colors, edgecolor='black', linewidth=1.5)
-axes[0].set_title('Per-Class Accuracy', fontsize=12, fontweight='bold')
-axes[0].set_ylabel('Accuracy', fontsize=11)
-axes[0].set_ylim([0, 1.0])
-for i, v in enumerate(class_accuracies):
-    axes[0].text(i, v + 0.02, f'{v:.2%}', ha='center', fontweight='bold', fontsize=10)
-
-axes[1].bar(actual_class_names, f1_per_class, color=colors, edgecolor='black', linewidth=1.5)
-axes[1].set_title('Per-Class F1-Score', fontsize=12, fontweight='bold')
-axes[1].set_ylabel('F1-Score', fontsize=11)
-axes[1].set_ylim([0, 1.0])
-for i, v in enumerate(f1_per_class):
-    axes[1].text(i, v + 0.02, f'{v:.2f}', ha='center', fontweight='bold', fontsize=10)
-
-plt.tight_layout()
-plt.savefig('outputs/model_performance.png', dpi=300, bbox_inches='tight')
-print("   ✓ Saved: model_performance.png")
-plt.close()
-
-print("\n1️⃣1️⃣ Saving model...")
-joblib.dump(best_model, 'models/best_model.joblib')
-severity_mapping = {0: 'Minor', 1: 'Serious', 2: 'Fatal'}
-joblib.dump(severity_mapping, 'models/severity_mapping.joblib')
-joblib.dump(feature_cols, 'models/feature_names.joblib')
-joblib.dump(grid_search.best_params_, 'models/best_parameters.joblib')
-print("   ✓ Model saved: best_model.joblib")
-print("   ✓ Mapping saved: severity_mapping.joblib")
-print("   ✓ Features saved: feature_names.joblib")
-print("   ✓ Parameters saved: best_parameters.joblib")
+print("\n🔟 Report stage...")
+if args.report == 'background':
+    report_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report_model.py')
+    report_cmd = [sys.executable, report_script, '--metrics', 'models/metrics.json', '--out', 'outputs']
+    subprocess.Popen(report_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    print("   ✓ Figures rendering in background: report_model.py " + ' '.join(report_cmd[2:]))
+elif args.report == 'inline':
+    try:
+        for path in render_report(metrics, 'outputs'):
+            print(f"   ✓ Saved: {path}")
+    except Exception as e:
+        print(f"   ⚠️  Report failed (model already saved): {e}")
+else:
+    print("   ✓ Skipped - run later: python report_model.py --metrics models/metrics.json --out outputs")
 
 print("\n" + "="*80)
 print("✅ RETRAINING COMPLETE v8.0 - CLEAN FEATURES + CLASS BALANCING")
@@ -286,8 +396,8 @@ print(f"      • Road: road_type_score, road_cond_score, lighting_conditions_en
 print(f"      • Environment: weather_score, traffic_control_presence_enc")
 
 print(f"\n   🎯 CLASS BALANCING:")
-print(f"      • SMOTE Applied: {use_balanced}")
-if use_balanced:
+print(f"      • Balancing: {args.balancing} (applied: {use_balanced})")
+if len(X_train_balanced) != len(X_train):
     print(f"      • Training samples increased: {len(X_train)} → {len(X_train_balanced)}")
 
 print(f"\n   📊 Performance:")
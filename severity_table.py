@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from feature_scoring import RUSH_HOURS, UNKNOWN_LOCATION_CODE
+
+
+# Values each model input can take when it comes out of the /predict scoring
+# and encoding functions in prediction_api.py (hour is 0-23, rush hour is derived from it)
+# State/City codes are the legacy encode_categorical ones; with a gazetteer see location_domains()
+API_FEATURE_DOMAINS = {
+    'hour': list(range(24)),
+    'is_weekend': [0, 1],
+    'is_rush_hour': [0, 1],
+    'weather_score': [1, 2, 3, 4, 5],
+    'road_type_score': [1, 2, 3, 4],
+    'road_cond_score': [1, 3, 4, 5],
+    'age_score': [1, 3, 4, 5],
+    'license_score': [1, 4, 5],
+    'alcohol_flag': [0, 1],
+    'experience_score': [1, 2, 3, 4, 5],
+    'vehicle_condition_score': [1, 2, 3, 5],
+    'driver_speed_score': [1, 2, 3, 4],
+    'State Name_enc': list(range(11)),
+    'City Name_enc': list(range(10)),
+    'Vehicle Type Involved_enc': [0, 1, 2, 3],
+    'Lighting Conditions_enc': [0, 1],
+    'Traffic Control Presence_enc': [0, 1, 2]
+}
+
+
+class SeverityTable:
+    """
+    Precomputed model probabilities keyed by a mixed-radix index over discrete feature domains
+    Keys are kept sorted so a lookup is an index computation plus a binary search
+    meta['model_version'] is the content hash of the model the table was compiled from
+    """
+
+    def __init__(self, feature_names, domains, classes, keys, proba, meta=None):
+        self.feature_names = list(feature_names)
+        self.domains = [np.asarray(domains[f], dtype=np.int64) for f in self.feature_names]
+        self.classes = np.asarray(classes)
+        self.keys = keys
+        self.proba = proba
+        self.meta = meta or {}
+        radix = [len(d) for d in self.domains]
+        self.strides = np.cumprod([1] + radix[:0:-1])[::-1].astype(np.int64)
+        self.space_size = int(np.prod(radix, dtype=np.float64))
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def encode_keys(self, X):
+        """Map feature rows to table keys, returns (keys, in_domain mask)"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        keys = np.zeros(len(X), dtype=np.int64)
+        in_domain = np.ones(len(X), dtype=bool)
+        for j, domain in enumerate(self.domains):
+            col = X[:, j]
+            pos = np.searchsorted(domain, col)
+            pos = np.minimum(pos, len(domain) - 1)
+            in_domain &= domain[pos] == col
+            keys += pos * self.strides[j]
+        return keys, in_domain
+
+    def lookup(self, X):
+        """Return (probabilities, hit mask); rows that miss the table have zero probabilities"""
+        keys, in_domain = self.encode_keys(X)
+        idx = np.searchsorted(self.keys, keys)
+        idx = np.minimum(idx, max(len(self.keys) - 1, 0))
+        hit = in_domain & (self.keys[idx] == keys) if len(self.keys) else np.zeros(len(keys), dtype=bool)
+        proba = np.zeros((len(keys), len(self.classes)), dtype=np.float64)
+        proba[hit] = self.proba[idx[hit]]
+        return proba, hit
+
+    def predict_proba(self, X, model):
+        """Table probabilities with the live model as fallback for out-of-table rows"""
+        proba, hit = self.lookup(X)
+        n_hit = int(hit.sum())
+        with self._stats_lock:
+            self.hits += n_hit
+            self.misses += len(hit) - n_hit
+        if n_hit < len(hit):
+            miss = np.flatnonzero(~hit)
+            proba[miss] = model.predict_proba(X.iloc[miss] if hasattr(X, 'iloc') else X[miss])
+        return proba
+
+    def matches(self, version):
+        """True when the table was compiled from the model whose model_version() is version"""
+        return self.meta.get('model_version') == version
+
+    def stats(self):
+        """Table size and runtime hit rate"""
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'rows': int(len(self.keys)),
+            'space_size': self.space_size,
+            'bytes': int(self.keys.nbytes + self.proba.nbytes),
+            'coverage': self.meta.get('coverage'),
+            'coverage_source': self.meta.get('coverage_source'),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None
+        }
+
+    def save(self, path):
+        """Write keys, probabilities and metadata to a table directory"""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'keys.npy'), np.asarray(self.keys))
+        np.save(os.path.join(path, 'proba.npy'), np.asarray(self.proba))
+        meta = dict(self.meta)
+        meta.update({
+            'feature_names': self.feature_names,
+            'domains': {f: d.tolist() for f, d in zip(self.feature_names, self.domains)},
+            'classes': self.classes.tolist()
+        })
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a table directory, memory-mapping the key and probability arrays"""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        mode = 'r' if mmap else None
+        keys = np.load(os.path.join(path, 'keys.npy'), mmap_mode=mode)
+        proba = np.load(os.path.join(path, 'proba.npy'), mmap_mode=mode)
+        return cls(meta['feature_names'], meta['domains'], meta['classes'], keys, proba, meta)
+
+
+def location_domains(gazetteer):
+    """State/City codes /predict produces when a gazetteer is loaded (training codes plus the unknown code)"""
+    return {f'{kind.title()} Name_enc': [UNKNOWN_LOCATION_CODE] + gazetteer.codes(kind) for kind in ('state', 'city')}
+
+
+def merge_domains(feature_names, df=None, overrides=None, gazetteer=None):
+    """Union of API-reachable values and values seen in the reference data, per feature"""
+    api_domains = dict(API_FEATURE_DOMAINS)
+    if gazetteer is not None:
+        api_domains.update(location_domains(gazetteer))
+    domains = {}
+    for f in feature_names:
+        values = set(api_domains.get(f, []))
+        if df is not None and f in df.columns:
+            values.update(int(v) for v in df[f].dropna().unique())
+        domains[f] = sorted(values)
+    for f, values in (overrides or {}).items():
+        domains[f] = sorted(values)
+    return domains
+
+
+def iter_domain_product(table, chunk_size=200000):
+    """Yield reachable feature combinations in chunks (rush hour must agree with hour)"""
+    names = table.feature_names
+    hour_idx = names.index('hour') if 'hour' in names else None
+    rush_idx = names.index('is_rush_hour') if 'is_rush_hour' in names else None
+    for start in range(0, table.space_size, chunk_size):
+        chunk = _decode_keys(np.arange(start, min(start + chunk_size, table.space_size), dtype=np.int64), table)
+        if hour_idx is not None and rush_idx is not None:
+            reachable = np.isin(chunk[:, hour_idx], RUSH_HOURS).astype(np.int64) == chunk[:, rush_idx]
+            chunk = chunk[reachable]
+        yield chunk
+
+
+def compile_table(model, feature_names, domains, rows=None, max_rows=5000000, batch_size=200000):
+    """
+    Enumerate feature combinations and store the model's probabilities for each
+    rows: optional array of observed feature rows; when given only their distinct
+          in-domain combinations are compiled (factorized subset of the space)
+    """
+    import pandas as pd
+
+    empty = SeverityTable(feature_names, domains, getattr(model, 'classes_', [0, 1, 2]),
+                          np.empty(0, dtype=np.int64), np.empty((0, 0)))
+    if rows is not None:
+        keys, in_domain = empty.encode_keys(rows)
+        keys = np.unique(keys[in_domain])
+        chunks = [_decode_keys(keys[i:i + batch_size], empty) for i in range(0, len(keys), batch_size)]
+    else:
+        # rush-hour filtering at most halves the product, so bail out before enumerating
+        if empty.space_size > max_rows * 2:
+            raise ValueError(
+                f'Feature space has {empty.space_size:,} combinations (limit {max_rows:,}); '
+                'restrict domains or compile from observed rows'
+            )
+        chunks = iter_domain_product(empty, batch_size)
+
+    all_keys, all_proba = [], []
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        X = pd.DataFrame(chunk, columns=feature_names)
+        chunk_keys, _ = empty.encode_keys(chunk)
+        all_keys.append(chunk_keys)
+        all_proba.append(model.predict_proba(X).astype(np.float32))
+        if sum(len(k) for k in all_keys) > max_rows:
+            raise ValueError(f'Table exceeds {max_rows:,} rows; restrict domains')
+
+    keys = np.concatenate(all_keys) if all_keys else np.empty(0, dtype=np.int64)
+    proba = np.vstack(all_proba) if all_proba else np.empty((0, len(empty.classes)), dtype=np.float32)
+    order = np.argsort(keys, kind='stable')
+    return SeverityTable(feature_names, domains, empty.classes, keys[order], proba[order])
+
+
+def _decode_keys(keys, table):
+    """Inverse of encode_keys: table keys back to feature values"""
+    out = np.empty((len(keys), len(table.domains)), dtype=np.int64)
+    rest = keys.copy()
+    for j, (domain, stride) in enumerate(zip(table.domains, table.strides)):
+        out[:, j] = domain[rest // stride]
+        rest = rest % stride
+    return out
+
+
+def parse_restrictions(items):
+    """Parse COLUMN=v1,v2 overrides from the command line"""
+    overrides = {}
+    for item in items or []:
+        col, _, values = item.partition('=')
+        overrides[col] = [int(v) for v in values.split(',') if v != '']
+    return overrides
+
+
+def split_holdout(n, fraction, seed=42):
+    """Boolean mask marking a random fraction of n rows as held out from compilation"""
+    mask = np.zeros(n, dtype=bool)
+    if fraction > 0:
+        mask[np.random.default_rng(seed).permutation(n)[:int(round(n * fraction))]] = True
+    return mask
+
+
+def traffic_rows(log_root, feature_names):
+    """Model input rows of logged /predict requests (request_log.py), None when there are none"""
+    from request_log import read_logs
+
+    rows = [[entry['features'].get(f) for f in feature_names]
+            for entry in read_logs(log_root, endpoint='predict') if entry.get('features')]
+    if not rows:
+        return None
+    X = np.array(rows, dtype=np.float64)
+    return X[~np.isnan(X).any(axis=1)]
+
+
+def main(argv=None):
+    import joblib
+    import pandas as pd
+
+    from model_explainer import model_version
+
+    parser = argparse.ArgumentParser(description='Compile a precomputed severity lookup table')
+    parser.add_argument('--model', default='models/best_model.joblib')
+    parser.add_argument('--features', default='models/feature_names.joblib')
+    parser.add_argument('--data', default='featured_data.csv',
+                        help='Reference dataset for domains and coverage')
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help='Fraction of --data rows kept out of an observed table and used to measure coverage')
+    parser.add_argument('--traffic', default=None, metavar='LOG_DIR',
+                        help='Measure coverage on /predict requests logged by request_log.py instead')
+    parser.add_argument('--gazetteer', default='models/gazetteer.json',
+                        help='Gazetteer served with the API; its State/City codes replace the legacy ones (if the file exists)')
+    parser.add_argument('--out', default='models/severity_table')
+    parser.add_argument('--mode', choices=['exhaustive', 'observed'], default='observed',
+                        help='exhaustive: full reachable product; observed: distinct (non-held-out) rows of --data')
+    parser.add_argument('--restrict', action='append', metavar='COLUMN=V1,V2',
+                        help='Limit a feature to the given values (repeatable)')
+    parser.add_argument('--max-rows', type=int, default=5000000)
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+    feature_names = joblib.load(args.features)
+    gazetteer = None
+    if args.gazetteer and os.path.exists(args.gazetteer):
+        from gazetteer import Gazetteer
+        gazetteer = Gazetteer.load(args.gazetteer)
+    df = pd.read_csv(args.data, usecols=lambda c: c in feature_names) if args.data else None
+    reference = df[feature_names].fillna(df[feature_names].mean()).round().astype(np.int64) if df is not None else None
+
+    # exhaustive tables cover what /predict can produce; observed tables also need the data's codes
+    domain_source = reference if args.mode == 'observed' else None
+    domains = merge_domains(feature_names, domain_source, parse_restrictions(args.restrict), gazetteer)
+
+    # Coverage is never measured on the rows a table was compiled from (that is 1.0 by construction)
+    held_out = split_holdout(len(reference), args.holdout if args.mode == 'observed' else 0) \
+        if reference is not None else None
+    start = time.perf_counter()
+    rows = reference.values[~held_out] if args.mode == 'observed' else None
+    table = compile_table(model, feature_names, domains, rows=rows, max_rows=args.max_rows)
+    elapsed = time.perf_counter() - start
+
+    coverage, coverage_source, coverage_rows = None, None, None
+    if args.traffic:
+        coverage_rows, coverage_source = traffic_rows(args.traffic, feature_names), f'traffic:{args.traffic}'
+    elif reference is not None and args.mode == 'observed' and held_out.any():
+        coverage_rows, coverage_source = reference.values[held_out], f'holdout:{args.data}:{args.holdout}'
+    elif reference is not None and args.mode == 'exhaustive':
+        coverage_rows, coverage_source = reference.values, f'data:{args.data}'
+    if coverage_rows is not None and len(coverage_rows):
+        _, hit = table.lookup(coverage_rows)
+        coverage = round(float(hit.mean()), 4)
+    table.meta = {
+        'model': os.path.abspath(args.model),
+        'model_version': model_version(args.model),
+        'mode': args.mode,
+        'location_codes': 'gazetteer' if gazetteer is not None else 'legacy',
+        'rows': int(len(table.keys)),
+        'space_size': table.space_size,
+        'coverage': coverage,
+        'coverage_source': coverage_source,
+        'compile_seconds': round(elapsed, 2)
+    }
+    table.save(args.out)
+
+    stats = table.stats()
+    print(f"✅ Severity table saved: {args.out}")
+    print(f"   Rows: {stats['rows']:,} of {stats['space_size']:,} combinations")
+    print(f"   Size: {stats['bytes'] / 1024 / 1024:.2f} MB")
+    print(f"   Coverage ({coverage_source or 'no reference rows'}): {coverage if coverage is not None else 'N/A'}")
+    print(f"   Compile time: {elapsed:.2f}s")
+    return table
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,90 @@
-import pandas as pd
-import folium
-from sklearn.cluster import DBSCAN
-import branca.colormap as cm
 import numpy as np
 import os
+import threading
+import time
 from math import radians, cos, sin, asin, sqrt
+from typing import TYPE_CHECKING
+
+from density_surface import DENSITY_LEVELS
+
+# pandas, folium/branca and sklearn.cluster are imported where they are used so that
+# importing this module (e.g. for classify_distance_based_risk) stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Hotspot map rendering modes (see generate_asia_hotspot_map)
+MAP_MODES = ('markers', 'clustered')
+
+
+class HotspotIndex:
+    """
+    Immutable snapshot of the hotspot list and its radian coordinate arrays
+    Readers take one reference and never see a half-updated index; the list is append-only,
+    so hotspot indices stay valid across snapshots
+    """
+    __slots__ = ('hotspots', 'lat_rad', 'lon_rad', 'version')
+
+    def __init__(self, hotspots, lat_rad=None, lon_rad=None, version=0):
+        self.hotspots = hotspots
+        if lat_rad is None:
+            coords = np.array([[h['lat'], h['lon']] for h in hotspots], dtype=np.float64).reshape(-1, 2)
+            lat_rad, lon_rad = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+        self.lat_rad = lat_rad
+        self.lon_rad = lon_rad
+        self.version = version
 
 
 class HotspotAnalyzer:
-    def __init__(self, csv_path='asia_accident_hotspots_enhanced.csv'):
+    # Upper bounds (km) of the distance-based risk bands used by classify_distance_based_risk
+    RISK_BAND_EDGES_KM = [10, 50, 100, 150, 300]
+    
+    # Live accidents within this distance update the closest hotspot, farther ones accumulate in grid
+    # cells of LIVE_CELL_DEG degrees that become new hotspots once they reach LIVE_PROMOTE_COUNT accidents
+    LIVE_ASSIGN_KM = 50
+    LIVE_CELL_DEG = 0.25
+    LIVE_PROMOTE_COUNT = 25
+    SEVERITY_CODES = {'Minor': 0, 'Serious': 1, 'Fatal': 2}
+    
+
+    def __init__(self, csv_path='asia_accident_hotspots_enhanced.csv', verbose=True):
         """
         Initialize HotspotAnalyzer with CSV data loading
         csv_path: Path to the enhanced hotspots CSV file
+        verbose: Print loading status messages
         """
+        self.verbose = verbose
         self.hotspots = []
         self.asia_hotspots_df = None
-        self.asia_hotspots = []
+        self._index = HotspotIndex([])
+        self._write_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+        self._stop_refresh = threading.Event()
+        # Optional HotspotTimeProfile (hotspot_time_profile.py) for time-aware analyses
+        self.time_profile = None
+        # Optional DensitySurface (density_surface.py) for the 'density' scoring mode
+        self.density_surface = None
+        self.reset_live_state()
         self.load_asia_hotspots_from_csv(csv_path)
     
+    @property
+    def asia_hotspots(self):
+        """Hotspots of the current index snapshot"""
+        return self._index.hotspots
+    
+    @asia_hotspots.setter
+    def asia_hotspots(self, hotspots):
+        self._index = HotspotIndex(list(hotspots), version=self._index.version + 1)
+    
+    @property
+    def hotspot_lat_rad(self):
+        return self._index.lat_rad
+    
+    @property
+    def hotspot_lon_rad(self):
+        return self._index.lon_rad
+    
     def load_asia_hotspots_from_csv(self, csv_path):
         """
         Load Asia hotspots from CSV file for better performance and flexibility
@@ -25,19 +92,25 @@ class HotspotAnalyzer:
         """
         try:
             if os.path.exists(csv_path):
+                import pandas as pd
                 self.asia_hotspots_df = pd.read_csv(csv_path)
-                print(f"✅ Loaded {len(self.asia_hotspots_df)} hotspots from CSV: {csv_path}")
+                self.log(f"✅ Loaded {len(self.asia_hotspots_df)} hotspots from CSV: {csv_path}")
                 # Convert DataFrame to list format
                 self.asia_hotspots = self.dataframe_to_hotspots_list()
             else:
-                print(f"⚠️ CSV file not found at {csv_path}")
-                print("✅ Using default hardcoded hotspots instead")
+                self.log(f"⚠️ CSV file not found at {csv_path}")
+                self.log("✅ Using default hardcoded hotspots instead")
                 self.asia_hotspots = self.get_default_asia_hotspots()
         except Exception as e:
             print(f"❌ Error loading CSV: {str(e)}")
             print("✅ Falling back to default hotspots")
             self.asia_hotspots = self.get_default_asia_hotspots()
     
+    def log(self, message):
+        """Print a status message when verbose"""
+        if self.verbose:
+            print(message)
+    
     def dataframe_to_hotspots_list(self):
         """Convert DataFrame to hotspots list format"""
         if self.asia_hotspots_df is None or self.asia_hotspots_df.empty:
@@ -112,7 +185,152 @@ class HotspotAnalyzer:
         r = 6371  # Radius of earth in km
         return c * r
     
-    def classify_distance_based_risk(self, distance_km):
+    def build_hotspot_index(self):
+        """Rebuild the radian coordinate index from the current hotspot list"""
+        self.asia_hotspots = self.asia_hotspots
+        return len(self.asia_hotspots)
+    
+    def hotspot_distances(self, lat, lon):
+        """
+        Vectorized haversine distance from one point to every hotspot
+        Returns (hotspots, distance_km array) from the same index snapshot; distances are NaN without a point
+        """
+        index = self._index
+        if lat is None or lon is None:
+            return index.hotspots, np.full(len(index.hotspots), np.nan)
+        lat, lon = np.radians(float(lat)), np.radians(float(lon))
+        a = (np.sin((index.lat_rad - lat) / 2) ** 2
+             + np.cos(lat) * np.cos(index.lat_rad) * np.sin((index.lon_rad - lon) / 2) ** 2)
+        return index.hotspots, 2 * 6371 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    
+    def nearest_hotspots(self, lats, lons, chunk_size=4096):
+        """
+        Vectorized haversine distance from each point to its closest hotspot
+        Returns (distance_km array, hotspot index array) with one entry per point
+        """
+        index = self._index
+        lats = np.radians(np.asarray(lats, dtype=np.float64))
+        lons = np.radians(np.asarray(lons, dtype=np.float64))
+        distances = np.full(len(lats), np.inf)
+        indices = np.full(len(lats), -1, dtype=np.int64)
+        if len(index.lat_rad) == 0:
+            return distances, indices
+        
+        cos_hot = np.cos(index.lat_rad)
+        for start in range(0, len(lats), chunk_size):
+            lat = lats[start:start + chunk_size, None]
+            lon = lons[start:start + chunk_size, None]
+            a = (np.sin((index.lat_rad - lat) / 2) ** 2
+                 + np.cos(lat) * cos_hot * np.sin((index.lon_rad - lon) / 2) ** 2)
+            d = 2 * 6371 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+            idx = d.argmin(axis=1)
+            indices[start:start + chunk_size] = idx
+            distances[start:start + chunk_size] = d[np.arange(len(idx)), idx]
+        return distances, indices
+    
+    @staticmethod
+    def decode_polyline(polyline):
+        """Decode a Google encoded polyline string into [(lat, lon), ...]"""
+        points, index, lat, lon = [], 0, 0, 0
+        while index < len(polyline):
+            for coord in ('lat', 'lon'):
+                shift, result = 0, 0
+                while True:
+                    b = ord(polyline[index]) - 63
+                    index += 1
+                    result |= (b & 0x1f) << shift
+                    shift += 5
+                    if b < 0x20:
+                        break
+                delta = ~(result >> 1) if result & 1 else result >> 1
+                if coord == 'lat':
+                    lat += delta
+                else:
+                    lon += delta
+            points.append((lat / 1e5, lon / 1e5))
+        return points
+    
+    def densify_route(self, lats, lons, step_km=1.0):
+        """
+        Insert evenly spaced points so no gap along the route exceeds step_km
+        Returns (dense_lats, dense_lons, segment index of each dense point, segment lengths in km)
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        lat1, lon1, lat2, lon2 = map(np.radians, (lats[:-1], lons[:-1], lats[1:], lons[1:]))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        seg_km = 2 * 6371 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+        
+        steps = np.maximum(1, np.ceil(seg_km / step_km).astype(np.int64))
+        segment = np.repeat(np.arange(len(seg_km)), steps + 1)
+        offsets = np.arange(len(segment)) - np.repeat(np.cumsum(steps + 1) - (steps + 1), steps + 1)
+        t = offsets / np.repeat(steps, steps + 1)
+        dense_lats = lats[segment] + (lats[segment + 1] - lats[segment]) * t
+        dense_lons = lons[segment] + (lons[segment + 1] - lons[segment]) * t
+        return dense_lats, dense_lons, segment, seg_km
+    
+    def get_route_risk(self, lats, lons, step_km=1.0):
+        """
+        Score a whole route in one pass: per-segment closest hotspot and distance-based risk band
+        Segment distance is the minimum over its densified points; the km breakdown classifies each
+        densified sub-segment (at most step_km long) by the closer of its two end points
+        """
+        dense_lats, dense_lons, segment, seg_km = self.densify_route(lats, lons, step_km)
+        distances, indices = self.nearest_hotspots(dense_lats, dense_lons)
+        
+        n_segments = len(seg_km)
+        order = np.lexsort((distances, segment))
+        first = np.searchsorted(segment[order], np.arange(n_segments))
+        seg_distance = distances[order][first]
+        seg_hotspot = indices[order][first]
+        
+        # Consecutive dense points of the same segment bound one sub-segment of seg_km / steps km
+        inner = segment[:-1] == segment[1:]
+        sub_segment = segment[:-1][inner]
+        sub_km = (seg_km / np.maximum(np.bincount(segment, minlength=n_segments) - 1, 1))[sub_segment]
+        sub_band = self.classify_distance_bands(np.minimum(distances[:-1], distances[1:])[inner])
+        length_by_level = {}
+        for band, info in enumerate(self.risk_bands()):
+            km = float(sub_km[sub_band == band].sum())
+            if km > 0:
+                length_by_level[info['risk_level']] = length_by_level.get(info['risk_level'], 0.0) + km
+        
+        segments = []
+        for i in range(n_segments):
+            risk_info = self.classify_distance_based_risk(seg_distance[i])
+            hotspot = self.asia_hotspots[seg_hotspot[i]] if seg_hotspot[i] >= 0 else {}
+            segments.append({
+                'segment': i,
+                'start': [float(lats[i]), float(lons[i])],
+                'end': [float(lats[i + 1]), float(lons[i + 1])],
+                'length_km': round(float(seg_km[i]), 3),
+                'closest_hotspot': hotspot.get('name'),
+                'distance_km': round(float(seg_distance[i]), 2),
+                'risk_level': risk_info['risk_level'],
+                'severity': risk_info['severity'],
+                'emoji': risk_info['emoji'],
+                'confidence': risk_info['confidence']
+            })
+        
+        total_km = float(seg_km.sum())
+        worst = int(seg_distance.argmin()) if n_segments else None
+        worst_risk = self.classify_distance_based_risk(seg_distance[worst]) if worst is not None else None
+        return {
+            'status': 'ANALYSIS_COMPLETE',
+            'total_length_km': round(total_km, 3),
+            'segments_scored': n_segments,
+            'points_evaluated': int(len(dense_lats)),
+            'overall_risk_level': worst_risk['risk_level'] if worst_risk else 'NO RISK - SAFE TO TRAVEL',
+            'travel_recommendation': worst_risk['travel_recommendation'] if worst_risk else None,
+            'closest_danger': segments[worst] if worst is not None else None,
+            'risk_breakdown_km': {level: round(km, 3) for level, km in length_by_level.items()},
+            'risk_breakdown_pct': {level: round(km / total_km * 100, 2) if total_km else 0.0
+                                   for level, km in length_by_level.items()},
+            'segments': segments
+        }
+    
+    @staticmethod
+    def classify_distance_based_risk(distance_km):
         """
         Classify risk level based on distance from hotspot
         Distance Ranges:
@@ -178,8 +396,189 @@ class HotspotAnalyzer:
                 'confidence': 10
             }
     
-    def fit(self, df: pd.DataFrame, eps=0.05, min_samples=10):
+    def reset_live_state(self):
+        """Clear live accumulators (accidents added since the last refresh and pending grid cells)"""
+        # Per-hotspot deltas: [n, minor, serious, fatal, lat_sum, lon_sum]
+        self._deltas = {}
+        # Grid cell -> same layout, for accidents not close to any hotspot
+        self._pending_cells = {}
+        # Grid cell -> index of the hotspot it was promoted to
+        self._cell_hotspot = {}
+        self._live_stats = {'accidents_added': 0, 'refreshes': 0, 'last_refresh_seconds': None,
+                            'last_refresh_at': None, 'promoted_hotspots': 0}
+    
+    @classmethod
+    def _accident_rows(cls, lats, lons, severities):
+        """[n, minor, serious, fatal, lat, lon] row per accident"""
+        rows = np.zeros((len(lats), 6))
+        rows[:, 0] = 1
+        if severities is not None:
+            codes = np.array([cls.SEVERITY_CODES.get(s, -1) for s in severities])
+            for code in range(3):
+                rows[:, 1 + code] = codes == code
+        rows[:, 4] = lats
+        rows[:, 5] = lons
+        return rows
+    
+    @staticmethod
+    def _accumulate(table, keys, rows):
+        """Add rows into table[key] grouped by key, one numpy reduction per batch"""
+        if len(keys) == 0:
+            return
+        uniques, inverse = np.unique(keys, axis=0, return_inverse=True)
+        sums = np.zeros((len(uniques), rows.shape[1]))
+        np.add.at(sums, inverse.ravel(), rows)
+        for key, total in zip(map(lambda k: tuple(np.atleast_1d(k).tolist()), uniques), sums):
+            key = key[0] if len(key) == 1 else key
+            table[key] = table[key] + total if key in table else total
+    
+    def add_accidents(self, lats, lons, severities=None, max_distance_km=None):
+        """
+        Record newly reported geotagged accidents (cost proportional to the batch)
+        Accidents within max_distance_km of a hotspot update its statistics, the rest accumulate in grid cells
+        Changes become visible to readers on the next refresh()
+        Returns the number of accidents attributed to an existing hotspot
+        """
+        max_distance_km = self.LIVE_ASSIGN_KM if max_distance_km is None else max_distance_km
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        severities = None if severities is None else np.asarray(severities, dtype=object)[valid]
+        rows = self._accident_rows(lats[valid], lons[valid], severities)
+        distances, indices = self.nearest_hotspots(lats[valid], lons[valid])
+        near = distances <= max_distance_km
+        cells = np.floor(rows[~near][:, 4:6] / self.LIVE_CELL_DEG).astype(np.int64)
+        
+        with self._write_lock:
+            self._accumulate(self._deltas, indices[near], rows[near])
+            self._accumulate(self._pending_cells, cells, rows[~near])
+            self._live_stats['accidents_added'] += len(rows)
+        return int(near.sum())
+    
+    @staticmethod
+    def _severity_label(count, fatal):
+        """Same rule as fit(): CRITICAL above 30% fatal, HIGH above 100 accidents"""
+        return 'CRITICAL' if fatal > count * 0.3 else ('HIGH' if count > 100 else 'MEDIUM')
+    
+    def refresh(self):
+        """
+        Fold accumulated accidents into a new index snapshot and swap it in atomically
+        Only touched hotspots are copied; readers keep using the previous snapshot until the swap
+        """
+        with self._refresh_lock:
+            start = time.perf_counter()
+            with self._write_lock:
+                deltas, self._deltas = self._deltas, {}
+                pending = self._pending_cells
+                promote = [cell for cell, total in pending.items()
+                           if cell in self._cell_hotspot or total[0] >= self.LIVE_PROMOTE_COUNT]
+                promoted = {cell: pending.pop(cell) for cell in promote}
+            
+            old = self._index
+            hotspots = list(old.hotspots)
+            lat_rad, lon_rad = old.lat_rad.copy(), old.lon_rad.copy()
+            new_lat, new_lon = [], []
+            for cell, total in promoted.items():
+                if cell in self._cell_hotspot:
+                    i = self._cell_hotspot[cell]
+                    deltas[i] = deltas[i] + total if i in deltas else total
+                    continue
+                n = total[0]
+                hotspots.append({
+                    'id': None,
+                    'name': f'Live cluster ({total[4] / n:.2f}, {total[5] / n:.2f})',
+                    'lat': total[4] / n, 'lon': total[5] / n, 'count': 0,
+                    'severity': None, 'country': None, 'risk_score': None, 'source': 'live'
+                })
+                self._cell_hotspot[cell] = len(hotspots) - 1
+                deltas[len(hotspots) - 1] = total
+                new_lat.append(np.radians(total[4] / n))
+                new_lon.append(np.radians(total[5] / n))
+            lat_rad = np.concatenate([lat_rad, new_lat])
+            lon_rad = np.concatenate([lon_rad, new_lon])
+            
+            for i, (n, minor, serious, fatal, lat_sum, lon_sum) in deltas.items():
+                h = dict(hotspots[i])
+                base = float(h.get('count') or 0)
+                mix = dict(h.get('severity_mix') or {'Minor': 0, 'Serious': 0, 'Fatal': 0})
+                mix = {'Minor': mix['Minor'] + int(minor), 'Serious': mix['Serious'] + int(serious),
+                       'Fatal': mix['Fatal'] + int(fatal)}
+                if base > 0:
+                    # centroid weighted by the accidents the hotspot already represents
+                    h['lat'] = (h['lat'] * base + lat_sum) / (base + n)
+                    h['lon'] = (h['lon'] * base + lon_sum) / (base + n)
+                h['count'] = int(base + n)
+                h['live_count'] = int((h.get('live_count') or 0) + n)
+                h['severity_mix'] = mix
+                labelled = sum(mix.values())
+                if labelled:
+                    h['fatality_rate'] = round(mix['Fatal'] / labelled, 4)
+                if h.get('source') == 'live':
+                    h['severity'] = self._severity_label(h['count'], mix['Fatal'])
+                hotspots[i] = h
+                lat_rad[i], lon_rad[i] = np.radians(h['lat']), np.radians(h['lon'])
+            
+            self._index = HotspotIndex(hotspots, lat_rad, lon_rad, version=old.version + 1)
+            self._live_stats.update({
+                'refreshes': self._live_stats['refreshes'] + 1,
+                'promoted_hotspots': self._live_stats['promoted_hotspots'] + len(new_lat),
+                'last_refresh_seconds': round(time.perf_counter() - start, 6),
+                'last_refresh_at': time.time()
+            })
+            return {'updated_hotspots': len(deltas), 'new_hotspots': len(new_lat), 'version': old.version + 1}
+    
+    def live_stats(self):
+        """Index version, hotspot counts and accidents waiting for the next refresh"""
+        with self._write_lock:
+            pending_accidents = int(sum(t[0] for t in self._deltas.values()))
+            pending_cells = len(self._pending_cells)
+            unassigned = int(sum(t[0] for t in self._pending_cells.values()))
+        return dict(self._live_stats, index_version=self._index.version, hotspots=len(self.asia_hotspots),
+                    pending_accidents=pending_accidents, pending_cells=pending_cells,
+                    unassigned_accidents=unassigned)
+    
+    def start_background_refresh(self, interval_seconds=30):
+        """Refresh the index every interval_seconds on a daemon thread when new accidents arrived"""
+        if self._refresh_thread is not None:
+            return
+        
+        def loop():
+            while not self._stop_refresh.wait(interval_seconds):
+                if self._deltas or self._pending_cells:
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        print(f"❌ Hotspot refresh failed: {str(e)}")
+        
+        self._stop_refresh.clear()
+        self._refresh_thread = threading.Thread(target=loop, daemon=True)
+        self._refresh_thread.start()
+    
+    def stop_background_refresh(self):
+        if self._refresh_thread is not None:
+            self._stop_refresh.set()
+            self._refresh_thread.join()
+            self._refresh_thread = None
+
+    @classmethod
+    def classify_distance_bands(cls, distances_km):
+        """
+        Vectorized classify_distance_based_risk: band index per distance
+        Band i holds the result of classify_distance_based_risk for that range (see risk_bands)
+        """
+        return np.searchsorted(cls.RISK_BAND_EDGES_KM, np.asarray(distances_km, dtype=np.float64), side='left')
+    
+    @classmethod
+    def risk_bands(cls):
+        """Risk info for each band index returned by classify_distance_bands"""
+        return [cls.classify_distance_based_risk(edge) for edge in cls.RISK_BAND_EDGES_KM] + \
+               [cls.classify_distance_based_risk(float('inf'))]
+    
+    def fit(self, df: 'pd.DataFrame', eps=0.05, min_samples=10):
         """Identify accident hotspots using DBSCAN clustering"""
+        import pandas as pd
+        from sklearn.cluster import DBSCAN
+        
         coords = df[['latitude', 'longitude']].dropna().values
         clustering = DBSCAN(eps=eps, min_samples=min_samples).fit(coords)
         df = df.loc[df[['latitude', 'longitude']].dropna().index].copy()
@@ -203,17 +602,30 @@ class HotspotAnalyzer:
         self.hotspots.sort(key=lambda x: x['count'], reverse=True)
         return self.hotspots
     
-    def save_map(self, filename='../outputs/accident_hotspots.html', top_n=10):
-        """Create and save an interactive map of India hotspots"""
+    def save_map(self, filename='../outputs/accident_hotspots.html', top_n=10, mode='markers'):
+        """
+        Create and save an interactive map of India hotspots
+        mode 'markers': one CircleMarker per hotspot for the top_n largest
+        mode 'clustered': every hotspot in one clustered array (hotspot_map.py), top_n is ignored
+        """
+        import folium
+        import branca.colormap as cm
+        
         center = self.hotspots[0]['center'] if self.hotspots else (23.0, 79.0)
         m = folium.Map(location=center, zoom_start=6)
         
-        counts = [h['count'] for h in self.hotspots[:top_n]]
+        shown = self.hotspots if mode == 'clustered' else self.hotspots[:top_n]
+        counts = [h['count'] for h in shown]
         colormap = cm.LinearColormap(['yellow', 'orange', 'red'],
                                      vmin=min(counts), vmax=max(counts))
         colormap.caption = 'Accident Count'
         
-        for h in self.hotspots[:top_n]:
+        if mode == 'clustered':
+            from hotspot_map import add_count_cluster
+            add_count_cluster(m, shown, colormap)
+            shown = []
+        
+        for h in shown:
             count = h['count']
             color = colormap(count)
             radius = max(5, count / 5)
@@ -235,35 +647,89 @@ class HotspotAnalyzer:
     
     def find_nearby_hotspots(self, user_lat, user_lon, radius_km=500):
         """Find hotspots and classify by distance-based risk"""
+        return [h for _, h in self.find_nearby_hotspots_indexed(user_lat, user_lon, radius_km)]
+    
+    def find_nearby_hotspots_indexed(self, user_lat, user_lon, radius_km=500):
+        """find_nearby_hotspots as (hotspot index, hotspot with risk) pairs, same order"""
+        hotspots, distances = self.hotspot_distances(user_lat, user_lon)
+        rows = np.flatnonzero(distances <= radius_km)
+        bands = self.risk_bands()
         nearby = []
-        for hotspot in self.asia_hotspots:
-            distance = self.haversine(user_lat, user_lon, hotspot['lat'], hotspot['lon'])
-            if distance <= radius_km:
-                risk_info = self.classify_distance_based_risk(distance)
-                hotspot_with_risk = {
-                    'name': hotspot['name'],
-                    'lat': hotspot['lat'],
-                    'lon': hotspot['lon'],
-                    'count': hotspot['count'],
-                    'severity': hotspot['severity'],
-                    'distance_km': round(distance, 2),
-                    'risk_level': risk_info['risk_level'],
-                    'travel_recommendation': risk_info['travel_recommendation'],
-                    'confidence': risk_info['confidence'],
-                    'emoji': risk_info['emoji'],
-                    'risk_score': hotspot.get('risk_score'),
-                    'fatality_rate': hotspot.get('fatality_rate'),
-                    'emergency_response_time': hotspot.get('emergency_response_time_min')
-                }
-                nearby.append(hotspot_with_risk)
-        
-        nearby.sort(key=lambda x: x['distance_km'])
+        for i, band in zip(rows.tolist(), self.classify_distance_bands(distances[rows]).tolist()):
+            hotspot, distance, risk_info = hotspots[i], float(distances[i]), bands[band]
+            hotspot_with_risk = {
+                'name': hotspot['name'],
+                'lat': hotspot['lat'],
+                'lon': hotspot['lon'],
+                'count': hotspot['count'],
+                'severity': hotspot['severity'],
+                'distance_km': round(distance, 2),
+                'risk_level': risk_info['risk_level'],
+                'travel_recommendation': risk_info['travel_recommendation'],
+                'confidence': risk_info['confidence'],
+                'emoji': risk_info['emoji'],
+                'risk_score': hotspot.get('risk_score'),
+                'fatality_rate': hotspot.get('fatality_rate'),
+                'emergency_response_time': hotspot.get('emergency_response_time_min')
+            }
+            nearby.append((i, hotspot_with_risk))
+        
+        nearby.sort(key=lambda x: x[1]['distance_km'])
         return nearby
     
-    def get_hotspot_analysis(self, user_lat, user_lon, radius_km=500):
-        """Get comprehensive hotspot analysis with distance-based risk classification"""
-        nearby = self.find_nearby_hotspots(user_lat, user_lon, radius_km)
-        
+    def get_hotspot_analysis(self, user_lat, user_lon, radius_km=500, when=None, scoring='distance'):
+        """
+        Get comprehensive hotspot analysis with distance-based risk classification
+        when: datetime for hour-of-week risk multipliers (needs time_profile)
+        scoring: 'distance' (risk bands around hotspots) or 'density' (KDE surface, needs density_surface)
+        """
+        pairs = self.find_nearby_hotspots_indexed(user_lat, user_lon, radius_km)
+        analysis = self.summarize_nearby_at(pairs, radius_km, self.time_profile, when)
+        if scoring == 'density':
+            analysis = self.apply_density_scoring(analysis, user_lat, user_lon)
+        return analysis
+    
+    def density_risk(self, lats, lons):
+        """Vectorized density scoring: (accidents per km², risk score 0-1, DENSITY_LEVELS index) arrays"""
+        surface = self.density_surface
+        densities = surface.density_at(lats, lons)
+        scores = surface.risk_scores(densities)
+        return densities, scores, surface.level_indices(scores)
+    
+    def get_density_risk(self, lat, lon):
+        """Density scoring for one point (scalar lookup, no array allocation)"""
+        surface = self.density_surface
+        density = surface.density_at_point(lat, lon)
+        score = surface.risk_score(density)
+        _, level, permission = DENSITY_LEVELS[surface.level_index(score)]
+        return {
+            'density_per_km2': round(density, 6),
+            'risk_score': round(score, 4),
+            'risk_level': level,
+            'travel_permission': permission,
+            'bandwidth_km': surface.meta.get('bandwidth_km')
+        }
+    
+    def apply_density_scoring(self, analysis, lat, lon):
+        """Copy of an analysis whose overall risk comes from the accident density surface"""
+        if self.density_surface is None:
+            raise ValueError('Density scoring needs a density surface (build it with density_surface.py)')
+        density = self.get_density_risk(lat, lon)
+        return dict(analysis, scoring='density', density_risk=density,
+                    overall_risk_level=density['risk_level'], travel_permission=density['travel_permission'])
+    
+    @classmethod
+    def summarize_nearby_at(cls, pairs, radius_km=500, time_profile=None, when=None):
+        """summarize_nearby for (hotspot index, hotspot) pairs, time-aware when a profile and time are given"""
+        time_summary = time_profile.annotate(pairs, when) if time_profile is not None and when is not None else None
+        analysis = cls.summarize_nearby([h for _, h in pairs], radius_km)
+        if time_summary is not None:
+            analysis['time_profile'] = time_summary
+        return analysis
+    
+    @staticmethod
+    def summarize_nearby(nearby, radius_km=500):
+        """Hotspot analysis for nearby hotspots already sorted by distance (shared with the shard router)"""
         if not nearby:
             return {
                 'status': 'NO_HOTSPOTS',
@@ -314,11 +780,16 @@ class HotspotAnalyzer:
             'recommendation': f'{overall_travel} - {[h["travel_recommendation"] for h in nearby[:1]][0] if nearby else "Safe to travel"}'
         }
     
-    def generate_asia_hotspot_map(self, user_lat=None, user_lon=None, radius_km=500, filename='../outputs/asia_hotspots_map.html'):
+    def generate_asia_hotspot_map(self, user_lat=None, user_lon=None, radius_km=500, filename='../outputs/asia_hotspots_map.html',
+                                  mode='markers', max_markers=20):
         """
         Generate interactive Asia-wide hotspot map with distance-based risk
         If no hotspots found within radius, display large green NO RISK ZONE
+        mode 'markers': one CircleMarker with an inline popup per hotspot, closest max_markers only (None: all)
+        mode 'clustered': every hotspot in range as one compact clustered array with lazy popups (hotspot_map.py)
         """
+        import folium
+        
         center_lat = user_lat if user_lat else 34.0479
         center_lon = user_lon if user_lon else 100.6197
         
@@ -336,9 +807,14 @@ class HotspotAnalyzer:
             ).add_to(m)
         
         # Find and add nearby hotspots
-        nearby_hotspots = self.find_nearby_hotspots(user_lat, user_lon, radius_km) if user_lat and user_lon else self.asia_hotspots
+        if mode == 'clustered':
+            from hotspot_map import add_distance_cluster
+            hotspots_found = add_distance_cluster(m, self, user_lat, user_lon, radius_km) > 0
+            nearby_hotspots = []
+        else:
+            nearby_hotspots = self.find_nearby_hotspots(user_lat, user_lon, radius_km) if user_lat and user_lon else self.asia_hotspots
         
-        for hotspot in nearby_hotspots[:20]:
+        for hotspot in nearby_hotspots[:max_markers]:
             lat, lon = hotspot['lat'], hotspot['lon']
             name = hotspot['name']
             count = hotspot['count']
@@ -0,0 +1,82 @@
+"""
+Unit tests for the class-balancing stage (balancing.py)
+    python -m pytest test_balancing.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from balancing import SmoteIndex, balance_training_set, data_fingerprint, fit_smote_index
+
+
+@pytest.fixture
+def imbalanced():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 4)), columns=['a', 'b', 'c', 'd'])
+    y = pd.Series(np.repeat([0, 1, 2], [200, 70, 30]), name='severity')
+    X.loc[y == 2] += 5
+    return X, y
+
+
+def test_oversamples_every_class_to_the_majority(imbalanced):
+    X, y = imbalanced
+    index = fit_smote_index(X, y, k_neighbors=5)
+    assert np.bincount(index.labels, minlength=3).tolist() == [0, 130, 170]
+    assert (y.to_numpy()[index.base] == index.labels).all()
+    assert (y.to_numpy()[index.neighbor] == index.labels).all()
+    assert ((index.gap >= 0) & (index.gap < 1)).all()
+
+
+def test_neighbors_come_from_the_kd_tree(imbalanced):
+    X, y = imbalanced
+    index = fit_smote_index(X, y, k_neighbors=3)
+    values = X.to_numpy()
+    for base, neighbor, cls in zip(index.base[:50], index.neighbor[:50], index.labels[:50]):
+        rows = np.flatnonzero(y.to_numpy() == cls)
+        distances = np.linalg.norm(values[rows] - values[base], axis=1)
+        # the neighbor is one of the 3 nearest same-class rows (excluding the base row itself)
+        assert np.linalg.norm(values[neighbor] - values[base]) <= np.sort(distances)[3] + 1e-12
+
+
+def test_synthetic_rows_interpolate_base_and_neighbor(imbalanced):
+    X, y = imbalanced
+    index = fit_smote_index(X, y)
+    synthetic = index.materialize(X)
+    values = X.to_numpy()
+    expected = values[index.base] + index.gap[:, None] * (values[index.neighbor] - values[index.base])
+    assert np.allclose(synthetic, expected, atol=1e-6)
+
+
+def test_row_weights_balance_classes_without_new_rows(imbalanced):
+    X, y = imbalanced
+    X_bal, y_bal, weights, info = balance_training_set(X, y, method='smote-index', cache_dir=None)
+    assert X_bal is X and len(weights) == len(X)
+    assert info['synthetic_rows'] == 300 and info['rows'] == 300
+    per_class = np.bincount(y.to_numpy(), weights=weights)
+    assert per_class == pytest.approx([200, 200, 200])
+    assert weights.min() >= 1
+
+
+def test_index_is_cached_by_data_and_parameters(imbalanced, tmp_path):
+    X, y = imbalanced
+    _, _, first, info = balance_training_set(X, y, method='smote-index', cache_dir=str(tmp_path))
+    _, _, second, cached = balance_training_set(X, y, method='smote-index', cache_dir=str(tmp_path))
+    assert not info['cache_hit'] and cached['cache_hit']
+    assert np.array_equal(first, second)
+    assert data_fingerprint(X, y, k=5) != data_fingerprint(X, y, k=3)
+
+
+def test_index_round_trips_through_npz(imbalanced, tmp_path):
+    X, y = imbalanced
+    index = fit_smote_index(X, y)
+    path = str(tmp_path / 'index.npz')
+    index.save(path)
+    loaded = SmoteIndex.load(path)
+    assert np.array_equal(loaded.base, index.base) and np.array_equal(loaded.gap, index.gap)
+    assert loaded.nbytes == index.nbytes == len(index) * 13
+
+
+def test_too_few_minority_rows_rejected():
+    X = np.arange(10, dtype=float).reshape(-1, 1)
+    with pytest.raises(ValueError, match='too few'):
+        fit_smote_index(X, np.array([0] * 9 + [1]))
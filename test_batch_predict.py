@@ -0,0 +1,87 @@
+"""
+Unit tests for offline batch scoring (batch_predict.py) and its agreement with the API feature pipeline
+    python -m pytest test_batch_predict.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import prediction_api as api
+from batch_predict import engineer_features, score_chunk
+from drift_monitor import DriftMonitor
+from feature_scoring import RUSH_HOURS, build_feature_frame
+from gazetteer import Gazetteer
+from train_out_of_core import select_feature_columns
+
+MAPPING = {0: 'Minor', 1: 'Serious', 2: 'Fatal'}
+
+
+class RecordingModel:
+    """Deterministic stand-in for a classifier that keeps every feature row it scores"""
+
+    classes_ = np.array([0, 1, 2])
+
+    def __init__(self):
+        self.rows = []
+
+    def predict_proba(self, X):
+        self.rows.append(pd.DataFrame(X).copy())
+        s = np.asarray(X, dtype=np.float64).sum(axis=1)
+        raw = np.stack([s % 3 + 1, s % 5 + 1, s % 7 + 1], axis=1)
+        return raw / raw.sum(axis=1, keepdims=True)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    from ingest import load_feature_engineer
+    featured = pd.read_csv('featured_data.csv', nrows=400)
+    return (pd.read_csv('cleaned_data.csv', nrows=400), featured, select_feature_columns(list(featured.columns)),
+            load_feature_engineer(None, 'cleaned_data.csv'))
+
+
+def test_raw_records_rebuild_the_training_features(reference):
+    cleaned, featured, features, engineer = reference
+    X = engineer_features(cleaned, engineer, dayfirst=True)[features]
+    assert np.allclose(X.astype(np.float64), featured[features].astype(np.float64))
+
+
+def test_raw_and_precomputed_scoring_agree(reference):
+    cleaned, featured, features, engineer = reference
+    model = RecordingModel()
+    kwargs = dict(model=model, feature_names=features, severity_mapping=MAPPING, feature_engineer=engineer)
+    precomputed = score_chunk(featured, 'auto', keep_columns=['Accident Severity'], **kwargs)
+    raw = score_chunk(cleaned, 'raw', dayfirst=True, **kwargs)
+    pd.testing.assert_frame_equal(precomputed.drop(columns='Accident Severity'), raw)
+    assert list(raw.columns) == ['pred_severity_code', 'pred_severity', 'pred_probability',
+                                 'proba_Minor', 'proba_Serious', 'proba_Fatal']
+    assert set(raw['pred_severity']) <= set(MAPPING.values())
+    assert np.allclose(raw[['proba_Minor', 'proba_Serious', 'proba_Fatal']].sum(axis=1), 1, atol=1e-6)
+
+
+@pytest.fixture
+def served(monkeypatch):
+    model = RecordingModel()
+    features = list(build_feature_frame(pd.DataFrame(index=[0])).columns)
+    for name, value in [('model', model), ('feature_names', features), ('severity_mapping', MAPPING),
+                        ('drift_monitor', DriftMonitor(None)), ('severity_table', None), ('model_catalog', None),
+                        ('request_logger', None), ('gazetteer', Gazetteer([]))]:
+        monkeypatch.setattr(api, name, value)
+    monkeypatch.setitem(api._load_state, 'ready', True)
+    return api.app.test_client(), model
+
+
+def test_predict_and_predict_batch_build_the_same_features(served):
+    client, model = served
+    records = [{'datetime': f'2024-03-{day:02d} {hour:02d}:15', 'City Name': 'Pune', 'Weather Conditions': weather,
+                'Driver Age': age, 'driver_speed_habit': speed}
+               for day, hour, weather, age, speed in [(4, 8, 'Rain', 19, 120), (9, 18, 'Fog', 45, 60),
+                                                      (10, 13, 'Clear', 70, 90), (11, 23, 'Snow', 30, 150)]]
+    for record in records:
+        assert client.post('/predict', json=record).status_code == 200
+    single = pd.concat(model.rows, ignore_index=True)
+    model.rows.clear()
+    assert client.post('/predict_batch', json={'records': records}).status_code == 200
+    batch = pd.concat(model.rows, ignore_index=True)
+    pd.testing.assert_frame_equal(single.astype(np.int64), batch.astype(np.int64))
+    assert single['is_rush_hour'].tolist() == [int(h in RUSH_HOURS) for h in (8, 18, 13, 23)]
+    assert single['is_weekend'].tolist() == [0, 1, 1, 0]
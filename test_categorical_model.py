@@ -0,0 +1,105 @@
+"""
+Unit tests for categorical encodings of the location columns (categorical_model.py)
+    python -m pytest test_categorical_model.py
+"""
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from xgboost import XGBClassifier
+
+from categorical_model import EncodedModel, main, reference_estimator, target_encode_oof, tree_stats
+from model_explainer import TreeExplainer
+
+FEATURES = ['City Name_enc', 'State Name_enc', 'hour', 'age_score']
+
+
+@pytest.fixture(scope='module')
+def featured():
+    rng = np.random.default_rng(0)
+    n = 900
+    city = rng.integers(0, 40, n)
+    df = pd.DataFrame({'City Name_enc': city, 'State Name_enc': city // 8, 'hour': rng.integers(0, 24, n),
+                       'age_score': rng.integers(1, 6, n)})
+    # severity depends on the city code in a way that is not monotonic in the code
+    df['target'] = np.where(np.isin(city, [3, 17, 29, 31]), 2, np.where(rng.random(n) < 0.3, 1, 0))
+    return df
+
+
+def test_out_of_fold_values_never_see_their_own_label():
+    codes = np.array([0, 0, 0, 0, 1, 1])
+    y = np.array([1, 1, 1, 0, 0, 0])
+    oof, table, prior = target_encode_oof(codes, y, n_categories=3, n_splits=6, smoothing=1.0)
+    assert prior == pytest.approx(0.5)
+    assert table.tolist() == pytest.approx([(3 + 0.5) / 5, 0.5 / 3, 0.5])
+    # leave-one-out: the row labelled 0 in category 0 is encoded from the three 1s
+    assert oof[3] == pytest.approx((3 + 0.5) / 4)
+    assert oof[0] == pytest.approx((2 + 0.5) / 4)
+
+
+def test_prepare_maps_codes_and_handles_unseen_ones():
+    inner = HistGradientBoostingClassifier(max_iter=2).fit(pd.DataFrame(np.eye(3, 4), columns=FEATURES), [0, 1, 2])
+    model = EncodedModel(inner, FEATURES, target_maps={'City Name_enc': np.array([0.1, 0.9])},
+                         priors={'City Name_enc': 0.4}, category_counts={'State Name_enc': 3})
+    X = pd.DataFrame({'age_score': [5, 1, 2], 'hour': [8, 9, 10], 'State Name_enc': [2, 3, -1],
+                      'City Name_enc': [1, 7, 0]})
+    prepared = model.prepare(X)
+    assert list(prepared.columns) == FEATURES
+    assert prepared['City Name_enc'].tolist() == [0.9, 0.4, 0.1]
+    assert prepared['State Name_enc'].iloc[0] == 2 and prepared['State Name_enc'].iloc[1:].isna().all()
+    assert prepared['hour'].tolist() == [8, 9, 10]
+    assert np.array_equal(model.predict_proba(X), inner.predict_proba(prepared))
+
+
+def test_encoded_models_are_explained_through_the_inner_model(featured):
+    X = featured[FEATURES].astype(np.float64)
+    counts = {c: int(X[c].max()) + 1 for c in ('City Name_enc', 'State Name_enc')}
+    X_cat = X.assign(**{c: pd.Categorical(X[c].astype(int), categories=range(n)) for c, n in counts.items()})
+    inner = XGBClassifier(n_estimators=15, max_depth=3, tree_method='hist', enable_categorical=True,
+                          verbosity=0).fit(X_cat, featured['target'])
+    model = EncodedModel(inner, FEATURES, category_counts=counts)
+    base_value, contributions = TreeExplainer(model, FEATURES).explain(X.iloc[:20])
+    margin = inner.predict(model.prepare(X.iloc[:20]), output_margin=True)
+    assert np.allclose(base_value + contributions.sum(axis=1), margin, atol=1e-4)
+
+
+def test_tree_stats_for_each_family(featured):
+    X, y = featured[FEATURES], featured['target']
+    forest = RandomForestClassifier(n_estimators=3, max_depth=4, random_state=0).fit(X, y)
+    assert tree_stats(forest) == {'nodes': sum(e.tree_.node_count for e in forest.estimators_),
+                                  'mean_depth': pytest.approx(np.mean([e.tree_.max_depth for e in forest.estimators_]))}
+    stats = tree_stats(XGBClassifier(n_estimators=4, max_depth=2, verbosity=0).fit(X, y))
+    assert stats['nodes'] > 0 and 0 < stats['mean_depth'] <= 2
+    hgb = HistGradientBoostingClassifier(max_iter=5, max_depth=3).fit(X, y)
+    assert tree_stats(EncodedModel(hgb, FEATURES))['mean_depth'] <= 3
+
+
+def test_reference_estimator_keeps_the_early_stopped_round_count(featured):
+    X, y = featured[FEATURES], featured['target']
+    model = XGBClassifier(n_estimators=300, early_stopping_rounds=5, learning_rate=0.5, verbosity=0)
+    model.fit(X.iloc[:700], y.iloc[:700], eval_set=[(X.iloc[700:], y.iloc[700:])], verbose=False)
+    params = reference_estimator(model, threads=2).get_params()
+    assert params['n_estimators'] == model.best_iteration + 1 and params['early_stopping_rounds'] is None
+    assert params['n_jobs'] == 2
+
+
+def test_benchmark_publishes_a_candidate_and_report(featured, tmp_path):
+    data = tmp_path / 'featured.csv'
+    featured.to_csv(data, index=False)
+    model_dir = tmp_path / 'models'
+    model_dir.mkdir()
+    served = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0, class_weight='balanced')
+    joblib.dump(served.fit(featured[FEATURES], featured['target']), model_dir / 'best_model.joblib')
+    joblib.dump(FEATURES, model_dir / 'feature_names.joblib')
+
+    report = main(['--data', str(data), '--model-dir', str(model_dir), '--max-f1-drop', '1', '--threads', '1'])
+    assert [c['name'] for c in report['candidates']] == ['label_codes', 'target_encoded', 'xgb_native_categorical',
+                                                        'hgb_native_categorical']
+    assert report['selected'] in ('target_encoded', 'xgb_native_categorical')
+    published = joblib.load(model_dir / 'categorical_model.joblib')
+    assert isinstance(published, EncodedModel) and published.feature_names == FEATURES
+    assert published.predict_proba(featured[FEATURES].iloc[:5]).shape == (5, 3)
+    assert json.loads((model_dir / 'categorical_report.json').read_text())['selected'] == report['selected']
@@ -0,0 +1,77 @@
+"""
+Unit tests for chunked streaming and bulk location scoring (chunked_io.py, score_locations.py)
+    python -m pytest test_chunked_io.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from chunked_io import ChunkWriter, iter_chunks, process_file
+from score_locations import score_chunk, score_file
+from spatial_analysis import HotspotAnalyzer
+
+HOTSPOTS_CSV = 'asia_accident_hotspots_enhanced.csv'
+
+
+def tag_chunk(df, label):
+    return df.assign(label=label, first_id=df['id'].iloc[0])
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'parquet'])
+def test_process_file_keeps_input_order(tmp_path, suffix):
+    if suffix == 'parquet':
+        pytest.importorskip('pyarrow')
+    source = tmp_path / 'points.csv'
+    pd.DataFrame({'id': range(1000), 'x': np.arange(1000) * 0.5}).to_csv(source, index=False)
+    out = tmp_path / f'tagged.{suffix}'
+    result = process_file(str(source), str(out), tag_chunk, args=('t',), chunksize=64, workers=3)
+    assert result['rows'] == 1000
+    back = pd.concat(iter_chunks(str(out), chunksize=300))
+    assert back['id'].tolist() == list(range(1000))
+    assert back['first_id'].tolist() == [i - i % 64 for i in range(1000)]
+
+
+def test_parquet_column_empty_in_first_chunk(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'out.parquet')
+    with ChunkWriter(path) as writer:
+        writer.write(pd.DataFrame({'id': [1, 2], 'name': [None, None]}))
+        writer.write(pd.DataFrame({'id': [3, 4], 'name': ['Marine Drive', None]}))
+    back = pd.concat(iter_chunks(path))
+    assert back['name'].tolist() == [None, None, 'Marine Drive', None]
+
+
+def test_explicit_parquet_schema(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'out.parquet')
+    schema = pa.schema([('id', pa.int64()), ('score', pa.float32())])
+    with ChunkWriter(path, schema) as writer:
+        writer.write(pd.DataFrame({'id': [1], 'score': [None]}))
+        writer.write(pd.DataFrame({'id': [2], 'score': [0.5]}))
+    back = pd.concat(iter_chunks(path))
+    assert back['score'].dtype == np.float32 and back['score'].iloc[1] == 0.5
+
+
+def test_score_chunk_matches_single_point_classification():
+    analyzer = HotspotAnalyzer(csv_path=HOTSPOTS_CSV, verbose=False)
+    points = pd.DataFrame({'latitude': [19.07, 28.6, np.nan, -33.9], 'longitude': [72.88, 77.2, 10.0, 151.2]})
+    scored = score_chunk(points, analyzer=analyzer)
+    for i in (0, 1, 3):
+        nearest = analyzer.find_nearby_hotspots(points['latitude'][i], points['longitude'][i], 20000)[0]
+        assert scored['nearest_hotspot'][i] == nearest['name']
+        assert scored['distance_km'][i] == pytest.approx(nearest['distance_km'], abs=0.006)
+        expected = analyzer.classify_distance_based_risk(scored['distance_km'][i])
+        assert scored['risk_level'][i] == expected['risk_level']
+    assert scored['nearest_hotspot'][2] is None and np.isnan(scored['distance_km'][2])
+
+
+def test_score_file_with_unlocated_first_chunk(tmp_path):
+    pytest.importorskip('pyarrow')
+    source = tmp_path / 'points.csv'
+    lats = np.r_[np.full(50, np.nan), np.linspace(10, 30, 150)]
+    pd.DataFrame({'latitude': lats, 'longitude': 77.0}).to_csv(source, index=False)
+    out = str(tmp_path / 'scored.parquet')
+    result = score_file(str(source), out, HOTSPOTS_CSV, chunksize=50, workers=2)
+    assert result['rows'] == 200
+    back = pd.concat(iter_chunks(out))
+    assert back['risk_level'].iloc[:50].isna().all() and back['risk_level'].iloc[50:].notna().all()
@@ -0,0 +1,61 @@
+"""
+Unit tests for model compression and selection (compress_model.py)
+    python -m pytest test_compress_model.py
+"""
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from compress_model import main, select_compressed, select_tree_subset
+
+
+def test_select_compressed_picks_smallest_within_drop():
+    results = [{'f1_delta': -0.002, 'size_bytes': 500}, {'f1_delta': -0.05, 'size_bytes': 100},
+               {'f1_delta': 0.0, 'size_bytes': 300}]
+    candidates = [('a', 'A'), ('b', 'B'), ('c', 'C')]
+    assert select_compressed(results, candidates, 0.01) == (results[2], 'C')
+    assert select_compressed(results, candidates, 0.1)[1] == 'B'
+    assert select_compressed(results[1:2], candidates[1:2], 0.01) is None
+
+
+@pytest.fixture
+def trained(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(600, 4)), columns=['a', 'b', 'c', 'd'])
+    y = (X['a'] + 0.5 * X['b'] > 0).astype(int) + (X['c'] > 1).astype(int)
+    forest = RandomForestClassifier(n_estimators=30, max_depth=6, random_state=0).fit(X, y)
+    joblib.dump(forest, tmp_path / 'best_model.joblib')
+    joblib.dump(list(X.columns), tmp_path / 'feature_names.joblib')
+    X.assign(target=y).to_csv(tmp_path / 'featured.csv', index=False)
+    return forest, X, y, tmp_path
+
+
+def test_tree_subset_keeps_chosen_trees(trained):
+    forest, X, y, _ = trained
+    pruned = select_tree_subset(forest, X.iloc[:200], y.iloc[:200], 5)
+    assert pruned.n_estimators == len(pruned.estimators_) == 5
+    assert all(any(t is s for s in forest.estimators_) for t in pruned.estimators_)
+    assert len(forest.estimators_) == 30
+
+
+def run(model_dir, max_drop):
+    return main(['--data', str(model_dir / 'featured.csv'), '--model-dir', str(model_dir), '--tree-counts', '5', '10',
+                 '--max-f1-drop', str(max_drop), '--threads', '1'])
+
+
+def test_publishes_then_removes_stale_compressed_model(trained):
+    _, _, _, model_dir = trained
+    compressed = model_dir / 'compressed_model.joblib'
+    report = run(model_dir, 1.0)
+    assert report['selected'] is not None and compressed.exists()
+
+    report = run(model_dir, -1.0)
+    assert report['selected'] is None
+    assert not compressed.exists()
+    with open(model_dir / 'compression_report.json') as f:
+        assert json.load(f)['selected'] is None
+    assert {c['name'] for c in report['candidates']} == {'rf_subset_5', 'rf_subset_10', 'xgb_student_depth_4'}
@@ -0,0 +1,92 @@
+"""
+Unit tests for the binned FFT kernel density risk surface (density_surface.py)
+    python -m pytest test_density_surface.py
+"""
+import numpy as np
+import pytest
+
+from density_surface import DENSITY_LEVELS, DensitySurface, build_density_surface, exact_density
+from spatial_analysis import HotspotAnalyzer
+
+BANDWIDTH_KM = 10.0
+
+
+@pytest.fixture(scope='module')
+def accidents():
+    rng = np.random.default_rng(0)
+    centers = np.array([[19.07, 72.88], [18.52, 73.86], [21.0, 79.0]])
+    sizes = [600, 300, 100]
+    points = np.vstack([c + rng.normal(0, 0.15, size=(n, 2)) for c, n in zip(centers, sizes)])
+    return points[:, 0], points[:, 1]
+
+
+@pytest.fixture(scope='module')
+def surface(accidents):
+    return build_density_surface(*accidents, bandwidth_km=BANDWIDTH_KM, cell_deg=0.02)
+
+
+def test_fft_kde_matches_exact_pairwise_kde(accidents, surface):
+    lats, lons = accidents
+    rng = np.random.default_rng(1)
+    idx = rng.integers(0, len(lats), 300)
+    q_lats = lats[idx] + rng.normal(0, 0.1, 300)
+    q_lons = lons[idx] + rng.normal(0, 0.1, 300)
+    exact = exact_density(lats, lons, np.ones(len(lats)), q_lats, q_lons, BANDWIDTH_KM)
+    approx = surface.density_at(q_lats, q_lons)
+    assert np.abs(approx - exact).max() / exact.max() < 0.02
+    # the raster integrates to the number of accidents (per km² times cell area)
+    cell_km2 = (0.02 * 111.195) ** 2 * np.cos(np.radians(surface.meta['ref_lat']))
+    assert surface.grid.sum() * cell_km2 == pytest.approx(len(lats), rel=0.02)
+
+
+def test_weights_scale_the_density(accidents):
+    lats, lons = accidents
+    single = build_density_surface(lats, lons, bandwidth_km=BANDWIDTH_KM, cell_deg=0.05)
+    double = build_density_surface(lats, lons, np.full(len(lats), 2.0), bandwidth_km=BANDWIDTH_KM, cell_deg=0.05)
+    assert np.allclose(double.grid, 2 * single.grid, rtol=1e-5, atol=1e-9)
+    assert double.meta['weighted'] and not single.meta['weighted']
+
+
+def test_scalar_and_vectorized_lookups_agree(surface):
+    lats = np.array([19.07, 18.6, 20.0, 60.0, surface.lat0])
+    lons = np.array([72.88, 73.9, 76.0, 10.0, surface.lon0])
+    densities = surface.density_at(lats, lons)
+    assert densities[3] == 0
+    for lat, lon, density in zip(lats, lons, densities):
+        assert surface.density_at_point(lat, lon) == pytest.approx(density, rel=1e-5, abs=1e-12)
+    scores = surface.risk_scores(densities)
+    assert [surface.risk_score(d) for d in densities] == pytest.approx(scores.tolist())
+    assert surface.level_indices(scores).tolist() == [surface.level_index(s) for s in scores]
+
+
+def test_risk_score_is_the_accident_percentile(accidents, surface):
+    scores = surface.risk_scores(surface.density_at(*accidents))
+    assert np.median(scores) == pytest.approx(0.5, abs=0.02)
+    assert (scores >= 0).all() and (scores <= 1).all()
+    dense = surface.risk_score(surface.density_at_point(19.07, 72.88))
+    sparse = surface.risk_score(surface.density_at_point(21.4, 79.4))
+    assert dense > 0.8 > sparse
+    assert DENSITY_LEVELS[surface.level_index(0.0)][1] == 'NO RISK - SAFE TO TRAVEL'
+    assert DENSITY_LEVELS[surface.level_index(0.97)][1] == 'HIGH CRITICAL RED ZONE'
+
+
+def test_save_load_round_trip(surface, tmp_path):
+    surface.save(str(tmp_path / 'surface'))
+    loaded = DensitySurface.load(str(tmp_path / 'surface'))
+    assert isinstance(loaded.grid, np.memmap) and np.array_equal(loaded.grid, surface.grid)
+    assert np.array_equal(loaded.quantiles, surface.quantiles)
+    assert loaded.density_at_point(19.07, 72.88) == surface.density_at_point(19.07, 72.88)
+    assert loaded.meta['bandwidth_km'] == BANDWIDTH_KM
+
+
+def test_density_scoring_replaces_the_overall_risk(surface):
+    analyzer = HotspotAnalyzer(csv_path='asia_accident_hotspots_enhanced.csv', verbose=False)
+    with pytest.raises(ValueError, match='density surface'):
+        analyzer.get_hotspot_analysis(19.07, 72.88, 100, scoring='density')
+    analyzer.density_surface = surface
+    analysis = analyzer.get_hotspot_analysis(19.07, 72.88, 100, scoring='density')
+    density = analysis['density_risk']
+    assert analysis['scoring'] == 'density' and analysis['overall_risk_level'] == density['risk_level']
+    assert density['risk_score'] == round(surface.risk_score(surface.density_at_point(19.07, 72.88)), 4)
+    _, _, levels = analyzer.density_risk(np.array([19.07]), np.array([72.88]))
+    assert DENSITY_LEVELS[levels[0]][1] == density['risk_level']
@@ -0,0 +1,75 @@
+"""
+Unit tests for the drift sketches and monitor (drift_monitor.py)
+    python -m pytest test_drift_monitor.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from drift_monitor import CategoryCounts, CountMinSketch, DriftMonitor, QuantileSketch, build_baseline, psi
+
+
+@pytest.mark.parametrize('q', [0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+def test_quantiles_within_relative_error(q):
+    values = np.random.default_rng(0).lognormal(4, 0.6, 50000)
+    sketch = QuantileSketch(alpha=0.01)
+    sketch.update_many(values)
+    exact = np.quantile(values, q, method='inverted_cdf')
+    assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+
+def test_scalar_and_vector_updates_agree():
+    values = [0.5, 1.0, 1.01, 37.2, 120.0, 5000.0, 5e5, float('nan')]
+    one, many = QuantileSketch(), QuantileSketch()
+    for v in values:
+        one.update(v)
+    many.update_many(values)
+    assert np.array_equal(one.counts, many.counts)
+    # below min_value and NaN share bucket 0, above max_value clamps to the last bucket
+    assert one.counts[0] == 2 and one.counts[-1] == 1
+
+
+def test_quantile_sketch_round_trip():
+    sketch = QuantileSketch()
+    sketch.update_many(np.arange(1, 1000))
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert np.array_equal(restored.counts, sketch.counts)
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_category_counts_overflow_bin():
+    counts = CategoryCounts(4)
+    counts.update_many([0, 1, 2, 3, 7, -1])
+    assert counts.counts.tolist() == [1, 1, 1, 3]
+
+
+def test_count_min_never_underestimates():
+    sketch = CountMinSketch(width=256, depth=4)
+    truth = {f'city {i}': i % 7 + 1 for i in range(300)}
+    for key, count in truth.items():
+        sketch.update(key, count)
+    assert all(sketch.estimate(k) >= c for k, c in truth.items())
+    assert sketch.estimate('City 5 ') == sketch.estimate('city 5')
+    restored = CountMinSketch.from_dict(sketch.to_dict())
+    assert np.array_equal(restored.counts, sketch.counts)
+
+
+def test_psi_zero_for_identical_and_large_for_shifted():
+    assert psi([10, 20, 30], [1, 2, 3]) == pytest.approx(0)
+    assert psi([100, 0, 0], [0, 0, 100]) > 0.25
+
+
+def test_monitor_flags_shifted_speeds():
+    rng = np.random.default_rng(1)
+    train = pd.DataFrame({'driver_speed_habit(km/h)': rng.normal(70, 10, 5000), 'Driver Age': rng.normal(40, 10, 5000),
+                          'hour': rng.integers(0, 24, 5000), 'City Name': 'Mumbai'})
+    monitor = DriftMonitor(build_baseline(train), min_observations=100)
+    for speed, age, hour in zip(rng.normal(110, 10, 500), rng.normal(40, 10, 500), rng.integers(0, 24, 500)):
+        monitor.observe({'hour': int(hour)}, speed, age, 'Atlantis')
+    report = monitor.report()
+    assert report['observations'] == 500
+    assert report['features']['driver_speed_habit']['level'] == 'DRIFT'
+    assert report['features']['Driver Age']['level'] == 'STABLE'
+    assert report['features']['driver_speed_habit']['live']['p50'] == pytest.approx(110, rel=0.05)
+    assert report['cities']['unseen_rate'] == 1.0
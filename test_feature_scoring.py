@@ -0,0 +1,46 @@
+"""
+Unit tests for state/city encoding with and without a gazetteer (feature_scoring.py, gazetteer.py)
+    python -m pytest test_feature_scoring.py
+"""
+import pandas as pd
+import pytest
+
+from feature_scoring import UNKNOWN_LOCATION_CODE, build_feature_frame, encode_categorical, encode_location
+from gazetteer import Gazetteer
+
+
+@pytest.fixture
+def gazetteer():
+    # Training codes deliberately differ from the built-in mapping (mumbai=0, pune=4)
+    return Gazetteer([
+        {'name': 'Mumbai', 'kind': 'city', 'code': 7, 'count': 10},
+        {'name': 'Pune', 'kind': 'city', 'code': 0, 'count': 5},
+        {'name': 'Maharashtra', 'kind': 'state', 'code': 3, 'count': 15},
+        {'name': 'Marine Drive', 'kind': 'hotspot', 'code': None, 'count': 40}
+    ])
+
+
+def test_known_names_use_training_codes(gazetteer):
+    assert encode_location('Mumbai', 'city', gazetteer) == 7
+    assert encode_location('  pune ', 'city', gazetteer) == 0
+    assert encode_location('MAHARASHTRA', 'state', gazetteer) == 3
+
+
+def test_unknown_names_get_the_unknown_code(gazetteer):
+    # The legacy mapping would return 0 here, which is Pune's training code
+    assert encode_location('Atlantis', 'city', gazetteer) == UNKNOWN_LOCATION_CODE == -1
+    assert encode_location('Delhi', 'city', gazetteer) == UNKNOWN_LOCATION_CODE
+    assert encode_location('Marine Drive', 'city', gazetteer) == UNKNOWN_LOCATION_CODE
+    assert encode_location('Unknown', 'state', gazetteer) == UNKNOWN_LOCATION_CODE
+
+
+def test_without_gazetteer_the_legacy_mapping_is_used():
+    for name in ('Mumbai', 'Pune', 'Atlantis'):
+        assert encode_location(name, 'city') == encode_categorical(name, 'city')
+
+
+def test_feature_frame_encodes_unknown_locations(gazetteer):
+    frame = pd.DataFrame({'City Name': ['Mumbai', 'Atlantis', 'Pune'], 'State Name': ['Maharashtra', 'Nowhere', None]})
+    X = build_feature_frame(frame, gazetteer=gazetteer)
+    assert X['City Name_enc'].tolist() == [7, -1, 0]
+    assert X['State Name_enc'].tolist() == [3, -1, -1]
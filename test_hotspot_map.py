@@ -0,0 +1,110 @@
+"""
+Unit tests for clustered hotspot map rendering (hotspot_map.py, HotspotAnalyzer map modes)
+    python -m pytest test_hotspot_map.py
+"""
+import json
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+folium = pytest.importorskip('folium')
+
+from hotspot_map import HotspotCluster, _plain, add_count_cluster, add_distance_cluster, distance_bands
+from spatial_analysis import HotspotAnalyzer
+
+
+def cluster_data(html):
+    """Rows embedded in the first HotspotCluster script of a saved map"""
+    return json.loads(re.search(r'var data = (.*);', html).group(1))
+
+
+@pytest.fixture
+def analyzer():
+    rng = np.random.default_rng(0)
+    a = HotspotAnalyzer(csv_path='missing.csv', verbose=False)
+    a.asia_hotspots = [{'name': f'Junction <{i}>', 'lat': 28.6 + rng.normal(0, 1), 'lon': 77.2 + rng.normal(0, 1),
+                        'count': int(rng.integers(10, 500)), 'severity': 'HIGH',
+                        'fatality_rate': float('nan') if i == 0 else 0.1} for i in range(300)]
+    return a
+
+
+def test_distance_cluster_holds_every_hotspot_in_range(analyzer):
+    m = folium.Map(location=[28.6, 77.2])
+    drawn = add_distance_cluster(m, analyzer, 28.6, 77.2, radius_km=150)
+    nearby = analyzer.find_nearby_hotspots(28.6, 77.2, radius_km=150)
+    assert drawn == len(nearby) > 20
+    html = m.get_root().render()
+    rows = cluster_data(html)
+    assert sorted(r[4] for r in rows) == sorted(h['name'] for h in nearby)
+    bands = distance_bands(analyzer)
+    by_name = {h['name']: h for h in nearby}
+    for row in rows:
+        assert bands[row[3]]['label'] == by_name[row[4]]['risk_level']
+        assert row[5] == pytest.approx(by_name[row[4]]['distance_km'], abs=0.01)
+    assert html.count('L.markerClusterGroup') == 1 and 'L.circleMarker' in html
+
+
+def test_without_location_every_hotspot_is_drawn(analyzer):
+    m = folium.Map()
+    assert add_distance_cluster(m, analyzer) == len(analyzer.asia_hotspots)
+    assert add_distance_cluster(folium.Map(), analyzer, 1.0, 1.0, 100) == 0
+
+
+def test_rows_are_json_safe():
+    assert _plain(np.int64(3)) == 3 and type(_plain(np.float32(0.5))) is float
+    assert _plain(float('nan')) is None and _plain('x') == 'x'
+
+
+def test_clustered_map_is_smaller_than_per_marker_popups(analyzer, tmp_path):
+    markers = tmp_path / 'markers.html'
+    clustered = tmp_path / 'clustered.html'
+    analyzer.generate_asia_hotspot_map(28.6, 77.2, 300, filename=str(markers), mode='markers', max_markers=None)
+    analyzer.generate_asia_hotspot_map(28.6, 77.2, 300, filename=str(clustered), mode='clustered')
+    marker_html, cluster_html = markers.read_text(), clustered.read_text()
+    in_range = len(analyzer.find_nearby_hotspots(28.6, 77.2, 300))
+    assert marker_html.count('L.circleMarker(') == in_range
+    assert len(cluster_data(cluster_html)) == in_range
+    assert len(cluster_html) < len(marker_html) / 2
+    # names travel as JSON strings and are escaped by the browser-side popup builder
+    assert 'Junction <0>' in [row[4] for row in cluster_data(cluster_html)]
+    assert 'Junction <0>' not in cluster_html and 'escapeHtml(row[4])' in cluster_html
+
+
+def test_default_marker_mode_keeps_the_cap(analyzer, tmp_path):
+    path = tmp_path / 'capped.html'
+    analyzer.generate_asia_hotspot_map(28.6, 77.2, 300, filename=str(path))
+    assert path.read_text().count('L.circleMarker(') == 20
+
+
+def test_count_cluster_bands_span_the_counts():
+    import branca.colormap as cm
+    hotspots = [{'center': (19.0 + i / 100, 72.8), 'count': c, 'cluster_id': i, 'severity': 'MEDIUM'}
+                for i, c in enumerate([10, 55, 100, 400, 1000])]
+    m = folium.Map()
+    assert add_count_cluster(m, hotspots, cm.LinearColormap(['yellow', 'red'], vmin=10, vmax=1000), n_bands=4) == 5
+    rows = cluster_data(m.get_root().render())
+    assert [r[3] for r in rows] == [0, 0, 0, 1, 3]
+    assert [r[4] for r in rows] == [f'Cluster {i}' for i in range(5)]
+
+
+def test_save_map_clusters_every_dbscan_cluster(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.uniform([10, 70], [30, 90], size=(15, 2))
+    points = np.vstack([c + rng.normal(0, 0.01, size=(20, 2)) for c in centers])
+    analyzer = HotspotAnalyzer(csv_path='missing.csv', verbose=False)
+    analyzer.fit(pd.DataFrame({'latitude': points[:, 0], 'longitude': points[:, 1]}), eps=0.05, min_samples=5)
+    assert len(analyzer.hotspots) == 15
+    path = tmp_path / 'clusters.html'
+    analyzer.save_map(str(path), top_n=3, mode='clustered')
+    assert len(cluster_data(path.read_text())) == 15
+    analyzer.save_map(str(tmp_path / 'top.html'), top_n=3)
+    assert (tmp_path / 'top.html').read_text().count('L.circleMarker(') == 3
+
+
+def test_cluster_element_renders_its_options():
+    m = folium.Map()
+    HotspotCluster([[1.0, 2.0, 5, 0, 'A']], [{'color': 'red', 'label': 'X'}], [], radius=(5, None, 5)).add_to(m)
+    html = m.get_root().render()
+    assert '"chunkedLoading": true' in html and 'var radius = [5, null, 5];' in html
@@ -0,0 +1,94 @@
+"""
+Unit tests for region-sharded hotspot serving (hotspot_shards.py) and the API in sharded mode
+    python -m pytest test_hotspot_shards.py
+"""
+import threading
+
+import numpy as np
+import pytest
+from werkzeug.serving import make_server
+
+import prediction_api as api
+from density_surface import build_density_surface
+from hotspot_shards import (HotspotShardRouter, check_against_single_node, create_shard_app, shard_of_tile,
+                            tile_of, tiles_within)
+from spatial_analysis import HotspotAnalyzer
+
+CSV = 'asia_accident_hotspots_enhanced.csv'
+NUM_SHARDS = 3
+TILE_DEG = 5.0
+
+
+@pytest.fixture(scope='module')
+def shard_urls():
+    servers = [make_server('127.0.0.1', 0, create_shard_app(CSV, shard_id, NUM_SHARDS, TILE_DEG), threaded=True)
+               for shard_id in range(NUM_SHARDS)]
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+    yield [f'http://127.0.0.1:{server.server_port}' for server in servers]
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def router(shard_urls):
+    return HotspotShardRouter(shard_urls, TILE_DEG)
+
+
+def test_tiles_within_cover_every_point_in_the_radius():
+    rng = np.random.default_rng(0)
+    for lat, lon, radius in [(28.6, 77.2, 300), (1.3, 103.8, 1500), (-33.9, 179.5, 200), (85.0, 10.0, 100)]:
+        tiles = set(tiles_within(lat, lon, radius, TILE_DEG))
+        bearings = rng.uniform(0, 2 * np.pi, 200)
+        d = rng.uniform(0, radius, 200) / 6371
+        plat, plon = np.radians(lat), np.radians(lon)
+        lats = np.arcsin(np.sin(plat) * np.cos(d) + np.cos(plat) * np.sin(d) * np.cos(bearings))
+        lons = plon + np.arctan2(np.sin(bearings) * np.sin(d) * np.cos(plat), np.cos(d) - np.sin(plat) * np.sin(lats))
+        lons = (np.degrees(lons) + 180) % 360 - 180
+        assert all(tile_of(a, b, TILE_DEG) in tiles for a, b in zip(np.degrees(lats), lons))
+
+
+def test_router_queries_only_owning_shards(router):
+    tiles = tiles_within(28.6, 77.2, 10, TILE_DEG)
+    assert router.shards_for(28.6, 77.2, 10) == sorted({shard_of_tile(t, NUM_SHARDS) for t in tiles})
+    assert len(router.shards_for(28.6, 77.2, 20000)) == NUM_SHARDS
+
+
+def test_routed_analysis_matches_single_node(router):
+    total, mismatches = check_against_single_node(CSV, router, samples=150)
+    assert total >= 150 and mismatches == 0
+
+
+@pytest.fixture
+def sharded_api(router, monkeypatch):
+    monkeypatch.setattr(api, 'hotspot_router', router)
+    monkeypatch.setattr(api, 'hotspot_analyzer', None)
+    monkeypatch.setitem(api._load_state, 'ready', True)
+    return api.app.test_client()
+
+
+def test_sharded_api_rejects_whole_list_features(sharded_api):
+    response = sharded_api.post('/route_risk', json={'points': [[28.6, 77.2], [28.7, 77.3]]})
+    assert response.status_code == 501 and 'HOTSPOT_SHARDS' in response.get_json()['error']
+    response = sharded_api.post('/generate_hotspot_map', json={'latitude': 28.6, 'longitude': 77.2})
+    assert response.status_code == 501
+
+
+def test_sharded_api_scores_density_and_bands_through_router(sharded_api, router):
+    single = HotspotAnalyzer(csv_path=CSV, verbose=False)
+    response = sharded_api.post('/hotspot_analysis', json={'latitude': 28.6, 'longitude': 77.2, 'scoring': 'density'})
+    assert response.status_code == 400
+
+    lats = np.array([h['lat'] for h in single.asia_hotspots])
+    lons = np.array([h['lon'] for h in single.asia_hotspots])
+    router.density_surface = single.density_surface = build_density_surface(lats, lons, bandwidth_km=50, cell_deg=0.5)
+    body = {'latitude': 28.6, 'longitude': 77.2, 'radius_km': 800, 'scoring': 'density'}
+    analysis = sharded_api.post('/hotspot_analysis', json=body).get_json()['hotspot_analysis']
+    expected = single.get_hotspot_analysis(28.6, 77.2, 800, scoring='density')
+    assert analysis['density_risk'] == expected['density_risk']
+    assert analysis['overall_risk_level'] == expected['overall_risk_level']
+    assert analysis['shards_queried'] == len(router.shards_for(28.6, 77.2, 800))
+
+    response = sharded_api.post('/hotspot_analysis?format=msgpack', json=body)
+    assert response.status_code == 200 and response.mimetype == 'application/msgpack'
@@ -0,0 +1,90 @@
+"""
+Unit tests for hour-of-week hotspot risk multipliers (hotspot_time_profile.py)
+    python -m pytest test_hotspot_time_profile.py
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hotspot_time_profile import (HOURS_PER_WEEK, HotspotTimeProfile, build_time_profile, hour_of_week,
+                                  time_risk_level)
+from spatial_analysis import HotspotAnalyzer
+
+MONDAY_8 = datetime(2024, 3, 4, 8, 30)
+SUNDAY_23 = datetime(2024, 3, 10, 23, 5)
+
+
+@pytest.fixture
+def analyzer():
+    a = HotspotAnalyzer(csv_path='missing.csv', verbose=False)
+    a.asia_hotspots = [
+        {'name': 'Commuter', 'lat': 0.0, 'lon': 0.0, 'count': 100, 'severity': 'HIGH'},
+        {'name': 'Quiet', 'lat': 0.0, 'lon': 5.0, 'count': 50, 'severity': 'MEDIUM'}
+    ]
+    return a
+
+
+@pytest.fixture
+def profile(analyzer):
+    # 60 Monday-morning accidents at the first hotspot, 2 spread over the week, one far from every hotspot
+    when = pd.Series(pd.to_datetime([MONDAY_8] * 60 + [datetime(2024, 3, 6, 14), datetime(2024, 3, 9, 2),
+                                                        MONDAY_8]))
+    lats = np.r_[np.full(62, 0.01), 30.0]
+    lons = np.r_[np.full(62, 0.01), 30.0]
+    return build_time_profile(analyzer, lats, lons, when, prior=5.0)
+
+
+def test_hour_of_week():
+    assert hour_of_week(datetime(2024, 3, 4, 0, 10)) == 0
+    assert hour_of_week(MONDAY_8) == 8
+    assert hour_of_week(pd.Timestamp(SUNDAY_23)) == HOURS_PER_WEEK - 1
+
+
+def test_multipliers_average_to_one_per_hotspot(profile):
+    assert profile.risk.shape == (3, HOURS_PER_WEEK)
+    assert profile.risk.mean(axis=1) == pytest.approx([1, 1, 1], abs=1e-4)
+    assert profile.meta['accidents_used'] == 62 and profile.meta['accidents_total'] == 63
+    assert profile.meta['accidents_per_hotspot'] == [62, 0]
+
+
+def test_busy_slots_stand_out_and_empty_hotspots_use_the_pooled_row(profile):
+    commuter = profile.risk[0]
+    assert commuter.argmax() == 8 and time_risk_level(commuter[8]) == 'PEAK'
+    assert time_risk_level(commuter[100]) == 'QUIET'
+    assert np.array_equal(profile.risk[1], profile.risk[2])
+    # live clusters appended after the build and invalid ids fall back to the pooled row
+    assert profile.lookup([0, 1, 5, -1], 8).tolist() == [commuter[8], profile.risk[2, 8], profile.risk[2, 8],
+                                                         profile.risk[2, 8]]
+
+
+def test_fatal_accidents_weigh_more(analyzer):
+    when = pd.Series(pd.to_datetime([MONDAY_8, SUNDAY_23]))
+    minor = build_time_profile(analyzer, np.zeros(2), np.zeros(2), when, ['Minor', 'Minor'], prior=0)
+    fatal = build_time_profile(analyzer, np.zeros(2), np.zeros(2), when, ['Fatal', 'Minor'], prior=0)
+    assert fatal.risk[0, 8] > minor.risk[0, 8]
+
+
+def test_annotate_adds_time_fields_to_nearby_hotspots(analyzer, profile):
+    analyzer.time_profile = profile
+    analysis = analyzer.get_hotspot_analysis(0.0, 0.1, radius_km=1000, when=MONDAY_8)
+    summary = analysis['time_profile']
+    assert summary['hour_of_week'] == 8 and summary['day'] == 'Monday'
+    assert summary['closest_multiplier'] == round(float(profile.risk[0, 8]), 3)
+    assert summary['closest_time_risk_level'] == 'PEAK'
+    # the hotspot without history follows the pooled profile, which peaks at the same hour
+    assert [h['time_risk_level'] for h in analysis['nearby_hotspots']] == ['PEAK', 'PEAK']
+    assert summary['peak_hotspots'] == 2
+    assert analyzer.get_hotspot_analysis(0.0, 0.1, 1000, when=SUNDAY_23)['time_profile']['peak_hotspots'] == 0
+    assert 'time_multiplier' not in analyzer.asia_hotspots[0]
+    assert profile.annotate([], MONDAY_8)['closest_multiplier'] is None
+
+
+def test_save_load_round_trip_and_hotspot_match(analyzer, profile, tmp_path):
+    profile.save(str(tmp_path / 'profile'))
+    loaded = HotspotTimeProfile.load(str(tmp_path / 'profile'))
+    assert isinstance(loaded.risk, np.memmap) and np.array_equal(loaded.risk, profile.risk)
+    assert loaded.matches(analyzer.asia_hotspots)
+    assert loaded.matches(analyzer.asia_hotspots + [{'name': 'Live cluster (1.00, 1.00)'}])
+    assert not loaded.matches(list(reversed(analyzer.asia_hotspots)))
@@ -0,0 +1,95 @@
+"""
+Unit tests for report validation and NDJSON parsing (feature_engineering.py, ingest.py)
+    python -m pytest test_ingest.py
+"""
+import json
+
+import pandas as pd
+
+from feature_engineering import validate_reports
+from ingest import IngestPipeline, parse_ndjson
+
+
+def report(**fields):
+    row = {'datetime': '2024-03-05 08:30', 'latitude': 19.07, 'longitude': 72.87, 'Accident Severity': 'Minor',
+           'State Name': 'Maharashtra', 'City Name': 'Mumbai', 'Driver Age': 35}
+    row.update(fields)
+    return row
+
+
+def test_validate_reports_accepts_complete_rows():
+    valid, errors = validate_reports(pd.DataFrame([report(), report(driver_speed_habit=70)]))
+    assert errors == []
+    assert len(valid) == 2
+    assert valid['Year'].tolist() == [2024, 2024]
+    assert valid['Month'].tolist() == ['March', 'March']
+    assert valid['driver_speed_habit(km/h)'].tolist()[1] == 70
+
+
+def test_validate_reports_rejections():
+    rows = [
+        report(),
+        report(datetime=None),
+        report(latitude=95.0),
+        report(longitude='east'),
+        report(**{'Accident Severity': 'Catastrophic'}),
+        report(**{'Driver Age': 7}),
+        report(datetime='not a date'),
+        {'latitude': 19.0, 'longitude': 72.0, 'Accident Severity': 'Minor'}
+    ]
+    valid, errors = validate_reports(pd.DataFrame(rows))
+    assert valid.index.tolist() == [0]
+    assert errors == [
+        {'row': 1, 'error': 'missing datetime'},
+        {'row': 2, 'error': 'coordinates out of range'},
+        {'row': 3, 'error': 'invalid longitude'},
+        {'row': 4, 'error': 'unknown Accident Severity'},
+        {'row': 5, 'error': 'invalid Driver Age'},
+        {'row': 6, 'error': 'invalid datetime'},
+        {'row': 7, 'error': 'missing datetime'}
+    ]
+
+
+def test_validate_reports_dayfirst():
+    valid, _ = validate_reports(pd.DataFrame([report(datetime='04-03-2024 10:00')]), dayfirst=True)
+    assert valid['datetime'].iloc[0] == pd.Timestamp('2024-03-04 10:00')
+    valid, _ = validate_reports(pd.DataFrame([report(datetime='04-03-2024 10:00')]), dayfirst=False)
+    assert valid['datetime'].iloc[0] == pd.Timestamp('2024-04-03 10:00')
+
+
+def test_parse_ndjson_records_and_errors():
+    lines = [b'{"a": 1}\n', '\n', '{"a": 2', '[1, 2]', '  {"a": 3}  ', b'\xff\xfe']
+    records, numbers, errors = parse_ndjson(lines, first_line=10)
+    assert records == [{'a': 1}, {'a': 3}]
+    assert numbers == [10, 14]
+    assert [e['line'] for e in errors] == [12, 13, 15]
+    assert errors[0]['error'].startswith('invalid JSON')
+    assert errors[1]['error'] == 'expected a JSON object'
+
+
+class ListStore:
+    def __init__(self):
+        self.frames = []
+
+    def append(self, df):
+        self.frames.append(df)
+        return len(df)
+
+
+class PassThroughEngineer:
+    def transform(self, df):
+        return df
+
+
+def test_pipeline_counts_accepted_rejected_and_written():
+    store = ListStore()
+    pipeline = IngestPipeline(store, PassThroughEngineer(), batch_rows=2).start()
+    lines = [json.dumps(report()) for _ in range(3)] + ['{bad', json.dumps(report(latitude=120))]
+    result = pipeline.ingest_lines(lines)
+    pipeline.flush()
+    pipeline.close()
+    assert (result['accepted'], result['rejected'], result['lines_consumed']) == (3, 2, 5)
+    status = pipeline.status()
+    assert (status['accepted'], status['rejected'], status['written'], status['batches']) == (3, 2, 3, 2)
+    assert status['queued_batches'] == 0
+    assert sum(len(f) for f in store.frames) == 3
@@ -0,0 +1,142 @@
+"""
+Memory budget regression tests for an API worker on the reference dataset
+Run with MODEL_DIR / HOTSPOTS_CSV pointing at the reference artifacts:
+    MODEL_DIR=models HOTSPOTS_CSV=asia_accident_hotspots_enhanced.csv python -m pytest test_memory_budget.py
+Without a model in MODEL_DIR, stand-in artifacts are built from featured_data.csv / cleaned_data.csv
+MEMORY_BUDGETS may name a JSON file overriding memory_report.BUDGETS_MB
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from memory_report import BUDGETS_MB, check_budgets, deep_sizeof, measure
+
+
+MODEL_DIR = os.environ.get('MODEL_DIR', 'models')
+HOTSPOTS_CSV = os.environ.get('HOTSPOTS_CSV', 'asia_accident_hotspots_enhanced.csv')
+
+
+def load_budgets():
+    path = os.environ.get('MEMORY_BUDGETS')
+    if not path:
+        return BUDGETS_MB
+    with open(path) as f:
+        return json.load(f)
+
+
+BUDGETS = load_budgets()
+
+def build_stand_in_artifacts(model_dir):
+    """Model trained like retrain_model.py (XGBoost, early stopping) plus the density surface, time profile and gazetteer"""
+    import joblib
+    from sklearn.model_selection import train_test_split
+
+    import density_surface
+    import gazetteer
+    import hotspot_time_profile
+    from train_out_of_core import select_feature_columns
+    from xgb_training import XGB_PARAMS, early_stopping_params, fit_xgboost
+
+    df = pd.read_csv('featured_data.csv')
+    features = select_feature_columns(list(df.columns))
+    X = df[features].fillna(df[features].mean())
+    X_fit, X_val, y_fit, y_val = train_test_split(X, df['target'], test_size=0.15, random_state=42,
+                                                  stratify=df['target'])
+    model, _, _ = fit_xgboost(early_stopping_params(XGB_PARAMS, 300, 30), X_fit, y_fit, validation=(X_val, y_val))
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(model_dir, 'best_model.joblib'))
+    joblib.dump(features, os.path.join(model_dir, 'feature_names.joblib'))
+    joblib.dump({0: 'Minor', 1: 'Serious', 2: 'Fatal'}, os.path.join(model_dir, 'severity_mapping.joblib'))
+    density_surface.main(['--out', os.path.join(model_dir, 'density_surface'), '--check', '0'])
+    hotspot_time_profile.main(['--hotspots', HOTSPOTS_CSV, '--out', os.path.join(model_dir, 'hotspot_time_profile')])
+    gazetteer.main(['--hotspots', HOTSPOTS_CSV, '--out', os.path.join(model_dir, 'gazetteer.json')])
+
+
+@pytest.fixture(scope='module')
+def report(tmp_path_factory):
+    model_dir = MODEL_DIR
+    if not os.path.exists(os.path.join(model_dir, 'best_model.joblib')):
+        model_dir = str(tmp_path_factory.mktemp('models'))
+        build_stand_in_artifacts(model_dir)
+    # One fresh interpreter for the whole module: import, load_resources(), first map
+    env = {'MODEL_DIR': os.path.abspath(model_dir), 'HOTSPOTS_CSV': os.path.abspath(HOTSPOTS_CSV),
+           'REQUEST_LOG_DIR': str(tmp_path_factory.mktemp('request_logs'))}
+    return measure(libraries=[], first_map=True, env=env)
+
+
+def synthetic_report(components=None, steps=None, worker_rss=100.0):
+    return {'api': {'components': [{'component': c, 'mb': mb} for c, mb in (components or {}).items()],
+                    'steps': [{'step': s, 'delta': {'rss': rss}} for s, rss in (steps or {}).items()],
+                    'worker': {'rss': worker_rss}}}
+
+
+def test_check_budgets_passes_within_limits():
+    report = synthetic_report({'model': 10, 'unbudgeted': 1000}, {'load_resources': 100, 'other step': 1000})
+    assert check_budgets(report, BUDGETS_MB) == []
+
+
+def test_check_budgets_names_each_violation():
+    report = synthetic_report({'model': 40, 'gazetteer': 1}, {'first map (folium)': 41.5, 'load_resources': None},
+                              worker_rss=512)
+    assert check_budgets(report, BUDGETS_MB) == [
+        f"component model: 40.0 MB > budget {BUDGETS_MB['components']['model']} MB",
+        f"step first map (folium): +41.5 MB RSS > budget {BUDGETS_MB['steps']['first map (folium)']} MB",
+        f"worker RSS after load: 512.0 MB > budget {BUDGETS_MB['worker_rss']} MB"
+    ]
+    # no RSS readings outside Linux: only the object sizes are checked
+    assert check_budgets(synthetic_report({'model': 1}, {'load_resources': None}, None), BUDGETS_MB) == []
+
+
+def test_deep_sizeof_counts_shared_buffers_once():
+    data = np.zeros(100000)
+    assert deep_sizeof([data, data[:10], data[::2]]) < data.nbytes + 4096
+    assert deep_sizeof({'a': data}) >= data.nbytes
+
+
+def test_deep_sizeof_dataframe_uses_deep_memory_usage():
+    df = pd.DataFrame({'name': ['x' * 100] * 1000, 'value': np.arange(1000)})
+    assert deep_sizeof(df) == int(df.memory_usage(deep=True).sum())
+
+
+def test_deep_sizeof_skips_already_attributed_objects():
+    shared = np.ones(50000)
+    seen = set()
+    first = deep_sizeof({'model': shared}, seen)
+    second = deep_sizeof({'fallback': shared}, seen)
+    assert first >= shared.nbytes
+    assert second < 4096
+
+
+@pytest.mark.parametrize('component', sorted(BUDGETS['components']))
+def test_component_within_budget(report, component):
+    sizes = {c['component']: c['mb'] for c in report['api']['components']}
+    if component not in sizes:
+        pytest.skip(f'{component} not loaded with these artifacts')
+    assert sizes[component] <= BUDGETS['components'][component], \
+        f"{component}: {sizes[component]:.1f} MB > budget {BUDGETS['components'][component]} MB"
+
+
+@pytest.mark.parametrize('step', sorted(BUDGETS['steps']))
+def test_step_rss_within_budget(report, step):
+    deltas = {s['step']: s['delta']['rss'] for s in report['api']['steps']}
+    if deltas.get(step) is None:
+        pytest.skip(f'no RSS reading for {step} (needs /proc)')
+    assert deltas[step] <= BUDGETS['steps'][step], \
+        f"{step}: +{deltas[step]:.1f} MB RSS > budget {BUDGETS['steps'][step]} MB"
+
+
+def test_worker_rss_within_budget(report):
+    rss = report['api']['worker']['rss']
+    if rss is None:
+        pytest.skip('no RSS reading (needs /proc)')
+    assert rss <= BUDGETS['worker_rss'], f"worker RSS {rss:.1f} MB > budget {BUDGETS['worker_rss']} MB"
+
+
+def test_check_budgets_reports_violations(report):
+    tight = {'components': {c: 0 for c in BUDGETS['components']}, 'steps': {}, 'worker_rss': 0}
+    failures = check_budgets(report, tight)
+    assert any(f.startswith('worker RSS') for f in failures)
+    assert any(f.startswith('component model') for f in failures)
@@ -0,0 +1,110 @@
+"""
+Unit tests for the per-partition model catalog (model_catalog.py)
+    python -m pytest test_model_catalog.py
+"""
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_catalog import CATALOG_FILE, GLOBAL_KEY, ModelCatalog, partition_key, train_partitions
+
+
+class ConstantModel:
+    """Picklable stand-in for a partition model that always predicts the same probabilities"""
+
+    classes_ = np.array([0, 1, 2])
+
+    def __init__(self, proba):
+        self.proba = np.asarray(proba, dtype=np.float64)
+
+    def predict_proba(self, X):
+        return np.tile(self.proba, (len(X), 1))
+
+
+@pytest.fixture
+def catalog_dir(tmp_path):
+    entries = {}
+    for i, name in enumerate(['Goa', 'Kerala', 'Punjab', 'Assam']):
+        path = tmp_path / f'{name.lower()}.joblib'
+        joblib.dump(ConstantModel(np.roll([0.8, 0.1, 0.1], i % 3)), path)
+        entries[partition_key(name)] = {'name': name, 'file': path.name, 'bytes': 100, 'serve': name != 'Assam'}
+    with open(tmp_path / CATALOG_FILE, 'w') as f:
+        json.dump({'partition_by': 'State Name', 'entries': entries, 'skipped': {}}, f)
+    return str(tmp_path)
+
+
+def test_routes_served_partitions_and_falls_back(catalog_dir):
+    fallback = ConstantModel([0.1, 0.1, 0.8])
+    catalog = ModelCatalog(catalog_dir, fallback)
+    assert catalog.route('  GOA ') == 'goa'
+    assert catalog.get('Assam') == (fallback, GLOBAL_KEY)
+    assert catalog.get('Atlantis') == (fallback, GLOBAL_KEY)
+    model, key = catalog.get('Kerala')
+    assert key == 'kerala' and model.proba.argmax() == 1
+    assert catalog.stats['fallbacks'] == 2
+
+
+def test_lru_evicts_least_recently_used(catalog_dir):
+    catalog = ModelCatalog(catalog_dir, ConstantModel([1, 0, 0]), max_bytes=250)
+    catalog.get('Goa')
+    catalog.get('Kerala')
+    catalog.get('Goa')
+    catalog.get('Punjab')
+    status = catalog.status()
+    assert status['resident'] == ['goa', 'punjab']
+    assert status['resident_bytes'] == 200
+    assert (status['loads'], status['hits'], status['evictions']) == (3, 1, 1)
+    catalog.get('Kerala')
+    assert catalog.status()['resident'] == ['punjab', 'kerala']
+
+
+def test_at_least_one_model_stays_resident(catalog_dir):
+    catalog = ModelCatalog(catalog_dir, ConstantModel([1, 0, 0]), max_bytes=10)
+    catalog.get('Goa')
+    catalog.get('Kerala')
+    assert catalog.status()['resident'] == ['kerala']
+
+
+def test_explainers_are_dropped_with_their_model(catalog_dir):
+    catalog = ModelCatalog(catalog_dir, ConstantModel([1, 0, 0]), max_bytes=100)
+    built = []
+
+    def factory(model, path):
+        built.append(os.path.basename(path))
+        return object()
+
+    first = catalog.explainer('Goa', factory)
+    assert catalog.explainer('goa', factory) is first
+    assert catalog.explainer('Assam', factory) is None
+    catalog.get('Kerala')
+    assert catalog.explainer('Goa', factory) is not first
+    assert built == ['goa.joblib', 'goa.joblib']
+
+
+def test_predict_proba_groups_rows_by_model(catalog_dir):
+    fallback = ConstantModel([0.1, 0.1, 0.8])
+    catalog = ModelCatalog(catalog_dir, fallback)
+    X = pd.DataFrame({'x': range(4)})
+    proba, keys = catalog.predict_proba(X, ['Goa', 'Atlantis', 'Kerala', 'Goa'], fallback.classes_,
+                                        fallback_proba=lambda rows: np.full((len(rows), 3), 1 / 3))
+    assert keys.tolist() == ['goa', GLOBAL_KEY, 'kerala', 'goa']
+    assert proba.argmax(axis=1).tolist() == [0, 0, 1, 0]
+    assert np.allclose(proba[1], 1 / 3)
+
+
+def test_catalog_written_when_every_partition_is_skipped(tmp_path):
+    from sklearn.tree import DecisionTreeClassifier
+
+    X = pd.DataFrame({'x': range(10)})
+    y = np.array([0, 1, 2] * 3 + [0])
+    states = np.array(['Goa'] * 6 + ['Kerala'] * 4)
+    out_dir = str(tmp_path / 'regional')
+    catalog = train_partitions(DecisionTreeClassifier(), X, y, X, y, y, states, states, out_dir=out_dir,
+                               min_rows=300, workers=1)
+    assert catalog['entries'] == {}
+    assert set(catalog['skipped']) == {'Goa', 'Kerala'}
+    assert ModelCatalog(out_dir, ConstantModel([1, 0, 0])).get('Goa')[1] == GLOBAL_KEY
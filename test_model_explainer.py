@@ -0,0 +1,120 @@
+"""
+Unit tests for per-prediction attributions (model_explainer.py) and explain=true on the API
+    python -m pytest test_model_explainer.py
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+
+import prediction_api as api
+from drift_monitor import DriftMonitor
+from feature_scoring import build_feature_frame
+from gazetteer import Gazetteer
+from model_explainer import TreeExplainer, model_version
+
+FEATURES = ['a', 'b', 'c', 'd']
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(400, 4)), columns=FEATURES)
+    y = (X['a'] > 0).astype(int) + (X['b'] > 0.8)
+    return X, y
+
+
+@pytest.fixture(scope='module')
+def forest(data):
+    return RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0).fit(*data)
+
+
+def test_forest_contributions_sum_to_predict_proba(data, forest):
+    X, _ = data
+    base_value, contributions = TreeExplainer(forest, FEATURES).explain(X.iloc[:50])
+    assert contributions.shape == (50, 4, 3)
+    assert np.allclose(base_value + contributions.sum(axis=1), forest.predict_proba(X.iloc[:50]), atol=1e-5)
+
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_xgboost_contributions_sum_to_the_margin(data, n_classes):
+    X, y = data
+    y = np.minimum(y, n_classes - 1)
+    model = XGBClassifier(n_estimators=20, max_depth=3, verbosity=0).fit(X, y)
+    explainer = TreeExplainer(model, FEATURES)
+    base_value, contributions = explainer.explain(X.iloc[:30])
+    assert explainer.units == 'margin' and contributions.shape == (30, 4, n_classes)
+    margin = model.predict(X.iloc[:30], output_margin=True)
+    if n_classes == 2:
+        assert np.allclose(base_value[1] + contributions[:, :, 1].sum(axis=1), margin, atol=1e-4)
+    else:
+        assert np.allclose(base_value + contributions.sum(axis=1), margin, atol=1e-4)
+
+
+def test_explain_classes_ranks_features_of_the_chosen_class(data, forest):
+    X, _ = data
+    rows = X.iloc[:5]
+    codes = forest.predict(rows)
+    explanations = TreeExplainer(forest, FEATURES, version='v1').explain_classes(rows, codes, top=2)
+    proba = forest.predict_proba(rows)
+    for explanation, code, p in zip(explanations, codes, proba):
+        assert explanation['explained_class'] == code and explanation['model_version'] == 'v1'
+        assert explanation['output_value'] == pytest.approx(p[code], abs=1e-5)
+        magnitudes = [abs(c['contribution']) for c in explanation['contributions']]
+        assert len(magnitudes) == 2 and magnitudes == sorted(magnitudes, reverse=True)
+
+
+def test_path_data_is_cached_per_model_version(data, forest, tmp_path):
+    X, _ = data
+    path = tmp_path / 'model.joblib'
+    joblib.dump(forest, path)
+    version = model_version(str(path))
+    first = TreeExplainer(forest, FEATURES, version=version, cache_dir=str(tmp_path / 'cache'))
+    assert (tmp_path / 'cache' / f'path_data_{version}.npz').exists()
+    cached = TreeExplainer(forest, FEATURES, version=version, cache_dir=str(tmp_path / 'cache'))
+    assert np.array_equal(first.explain(X.iloc[:20])[1], cached.explain(X.iloc[:20])[1])
+
+    other = RandomForestClassifier(n_estimators=3, random_state=1).fit(*data)
+    joblib.dump(other, tmp_path / 'other.joblib')
+    assert model_version(str(tmp_path / 'other.joblib')) != version
+
+
+def test_unsupported_model_rejected(data):
+    from sklearn.linear_model import LogisticRegression
+    with pytest.raises(ValueError, match='Unsupported'):
+        TreeExplainer(LogisticRegression().fit(*data), FEATURES)
+
+
+@pytest.fixture
+def explained_api(tmp_path, monkeypatch):
+    features = list(build_feature_frame(pd.DataFrame(index=[0])).columns)
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.integers(0, 5, size=(300, len(features))), columns=features)
+    model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=0).fit(X, rng.integers(0, 3, 300))
+    joblib.dump(model, tmp_path / 'best_model.joblib')
+    for name, value in [('model', model), ('feature_names', features),
+                        ('severity_mapping', {0: 'Minor', 1: 'Serious', 2: 'Fatal'}),
+                        ('drift_monitor', DriftMonitor(None)), ('severity_table', None), ('model_catalog', None),
+                        ('request_logger', None), ('gazetteer', Gazetteer([])), ('explainer', None),
+                        ('MODEL_DIR', str(tmp_path)), ('EXPLAIN_CACHE_DIR', str(tmp_path / 'cache'))]:
+        monkeypatch.setattr(api, name, value)
+    monkeypatch.setitem(api._load_state, 'ready', True)
+    monkeypatch.setitem(api._load_state, 'model_variant', 'full')
+    return api.app.test_client(), model
+
+
+def test_predict_batch_explanations_match_the_prediction(explained_api):
+    client, model = explained_api
+    records = [{'datetime': '2024-03-04 08:15', 'Weather Conditions': 'Rain', 'Driver Age': 19},
+               {'datetime': '2024-03-09 23:40', 'Weather Conditions': 'Fog', 'Driver Age': 70}]
+    response = client.post('/predict_batch', json={'records': records, 'explain': True, 'explain_top': 3})
+    assert response.status_code == 200
+    for prediction in response.get_json()['predictions']:
+        explanation = prediction['explanation']
+        assert explanation['explained_class'] == prediction['severity_code']
+        assert explanation['output_value'] == pytest.approx(prediction['ml_probability'], abs=1e-3)
+        assert len(explanation['contributions']) == 3
+    assert api.explainer.version == model_version(f'{api.MODEL_DIR}/best_model.joblib')
+    assert client.post('/predict_batch?format=msgpack', json={'records': records, 'explain': True}).status_code == 400
@@ -0,0 +1,51 @@
+"""
+Unit tests for the decoupled training report stage (report_model.py)
+    python -m pytest test_report_model.py
+"""
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from report_model import load_metrics, main, render_report, save_json
+
+METRICS = {
+    'model_name': 'RandomForest',
+    'version': 'v8.0',
+    'class_names': ['Minor', 'Serious', 'Fatal'],
+    'confusion_matrix': [[50, 5, 1], [6, 40, 4], [2, 3, 30]],
+    'per_class': {name: {'precision': 0.8, 'recall': 0.75, 'f1': 0.77, 'support': 50, 'accuracy': 0.75}
+                  for name in ['Minor', 'Serious', 'Fatal']},
+    'feature_importances': {'hour': 0.3, 'weather_score': 0.2, 'City Name_enc': 0.5}
+}
+
+
+def test_save_json_replaces_atomically(tmp_path):
+    path = str(tmp_path / 'models' / 'metrics.json')
+    save_json({'accuracy': 0.5}, path)
+    save_json(dict(METRICS, trained_at=datetime(2024, 1, 2)), path)
+    assert os.listdir(tmp_path / 'models') == ['metrics.json']
+    loaded = load_metrics(path)
+    assert loaded['trained_at'] == '2024-01-02 00:00:00' and 'accuracy' not in loaded
+
+
+def test_render_report_from_metrics_only(tmp_path):
+    saved = render_report(METRICS, str(tmp_path), dpi=20)
+    assert [os.path.basename(p) for p in saved] == ['feature_importance.png', 'confusion_matrix.png',
+                                                    'model_performance.png']
+    assert all(os.path.getsize(p) > 0 for p in saved)
+
+
+def test_cli_renders_from_a_saved_artifact(tmp_path):
+    metrics_path = save_json(METRICS, str(tmp_path / 'metrics.json'))
+    main(['--metrics', metrics_path, '--out', str(tmp_path / 'outputs'), '--dpi', '20'])
+    assert sorted(os.listdir(tmp_path / 'outputs')) == ['confusion_matrix.png', 'feature_importance.png',
+                                                        'model_performance.png']
+
+
+def test_import_leaves_plotting_libraries_unloaded():
+    code = "import sys, json, report_model; print(json.dumps([m for m in ('matplotlib', 'seaborn') if m in sys.modules]))"
+    out = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True, check=True)
+    assert json.loads(out.stdout) == []
@@ -0,0 +1,79 @@
+"""
+Unit tests for the sampled request logger (request_log.py)
+    python -m pytest test_request_log.py
+"""
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from request_log import RequestLogger, read_logs
+
+
+def log_predictions(logger, n):
+    for i in range(n):
+        logger.log('predict', {'City Name': 'Mumbai'}, {'hour': np.int64(i % 24)},
+                   {'severity_code': 1, 'probabilities': np.array([0.2, 0.5, 0.3])}, {'total': 1.5})
+
+
+def test_close_publishes_pending_entries(tmp_path):
+    logger = RequestLogger(str(tmp_path), flush_seconds=60).start()
+    log_predictions(logger, 25)
+    logger.close()
+    assert glob.glob(os.path.join(str(tmp_path), '.*.inprogress')) == []
+    entries = read_logs(str(tmp_path))
+    assert len(entries) == 25
+    assert entries[3]['features'] == {'hour': 3}
+    assert entries[0]['prediction']['probabilities'] == [0.2, 0.5, 0.3]
+    assert logger.status()['written'] == 25
+
+
+def test_open_file_stays_hidden_until_rotated(tmp_path):
+    logger = RequestLogger(str(tmp_path))
+    log_predictions(logger, 5)
+    logger.flush()
+    assert logger.files() == []
+    assert len(glob.glob(os.path.join(str(tmp_path), '.*.inprogress'))) == 1
+    logger.close()
+    assert len(logger.files()) == 1
+
+
+def test_rotates_by_size(tmp_path):
+    logger = RequestLogger(str(tmp_path), batch_rows=10, rotate_bytes=1)
+    log_predictions(logger, 35)
+    logger.close()
+    assert len(logger.files()) == 4
+    assert logger.stats['files'] == 4
+    assert len(read_logs(str(tmp_path), endpoint='predict')) == 35
+
+
+def test_rotates_by_age(tmp_path):
+    logger = RequestLogger(str(tmp_path), rotate_seconds=0)
+    log_predictions(logger, 3)
+    logger.flush()
+    assert len(logger.files()) == 1
+
+
+def test_sampling_and_backpressure(tmp_path):
+    logger = RequestLogger(str(tmp_path), sample_rate=0.0)
+    log_predictions(logger, 10)
+    assert logger.stats['sampled_out'] == 10 and logger.stats['logged'] == 0
+
+    logger = RequestLogger(str(tmp_path), max_pending=4)
+    log_predictions(logger, 10)
+    assert (logger.stats['logged'], logger.stats['dropped']) == (4, 6)
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    logger = RequestLogger(str(tmp_path), fmt='parquet').start()
+    log_predictions(logger, 12)
+    logger.close()
+    entries = read_logs(str(tmp_path))
+    assert len(entries) == 12 and entries[-1]['features'] == {'hour': 11}
+
+
+def test_unknown_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        RequestLogger(str(tmp_path), fmt='csv')
@@ -0,0 +1,98 @@
+"""
+Unit tests for request validation and JSON response encoding (request_schema.py, response_encoding.py)
+    python -m pytest test_request_schema.py
+"""
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+from flask import Flask
+
+import prediction_api as api
+import response_encoding
+from request_schema import HOTSPOT_SCHEMA, PREDICT_SCHEMA, RequestSchema, SchemaError
+from response_encoding import json_response
+
+SCHEMA = RequestSchema({
+    'name': ('str', 'Unknown'),
+    'age': ('int', 30, {'min': 10, 'max': 120}),
+    'speed': ('float', 60.0, {'min': 0}),
+    'flag': ('bool', False),
+    'mode': ('str', 'distance', {'choices': {'distance', 'density'}}),
+    'when': ('datetime', None),
+    'lat': ('float', None, {'required': True})
+})
+
+
+def test_values_are_coerced_and_defaulted():
+    values = SCHEMA.validate({'name': '  Pune ', 'age': '42', 'speed': 55, 'flag': 'yes',
+                              'when': '2024-03-04T08:15', 'lat': '19.07', 'extra': 'ignored'})
+    assert values == {'name': 'Pune', 'age': 42, 'speed': 55.0, 'flag': True, 'mode': 'distance',
+                      'when': datetime(2024, 3, 4, 8, 15), 'lat': 19.07}
+    assert SCHEMA.validate({'lat': 0, 'age': '', 'when': '03/04/2024 08:15'})['age'] == 30
+    assert SCHEMA.validate({'lat': 0, 'flag': 'false'}, overrides={'flag': 'true'})['flag'] is True
+
+
+def test_every_bad_field_is_reported_at_once():
+    with pytest.raises(SchemaError) as raised:
+        SCHEMA.validate({'age': 42.5, 'speed': -1, 'flag': 'maybe', 'mode': 'walking', 'when': 'soon'})
+    errors = {e['field']: e['error'] for e in raised.value.errors}
+    assert errors == {'age': 'expected an integer', 'speed': 'must be between 0 and None',
+                      'flag': 'expected a boolean', 'mode': "must be one of ['density', 'distance']",
+                      'when': 'expected a date/time, e.g. 2023-01-01 12:00', 'lat': 'required'}
+    assert isinstance(raised.value, ValueError) and 'lat: required' in str(raised.value)
+
+
+def test_booleans_are_not_numbers():
+    with pytest.raises(SchemaError, match='age: expected an integer'):
+        SCHEMA.validate({'lat': 0, 'age': True})
+    with pytest.raises(SchemaError, match=r'\(body\)'):
+        SCHEMA.validate(['not', 'an', 'object'])
+
+
+def test_describe_lists_types_defaults_and_bounds():
+    described = PREDICT_SCHEMA.describe()
+    assert described['Driver Age'] == {'type': 'int', 'default': PREDICT_SCHEMA.fields['Driver Age'][1],
+                                       'min': 10, 'max': 120}
+    assert described['scoring']['choices'] == ['density', 'distance']
+    assert isinstance(described['datetime']['default'], str)
+    json.dumps(HOTSPOT_SCHEMA.describe())
+
+
+@pytest.fixture
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_response_with_and_without_orjson(app_context, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(response_encoding, 'orjson', None)
+    payload = {'risk': '🔴 HIGH', 'values': [1, 2], 'message': 'dropped when compact',
+               'nested': [{'emoji': '⚠️', 'score': 0.5}]}
+    response = json_response(payload, 201)
+    assert response.status_code == 201 and response.mimetype == 'application/json'
+    assert response.get_json() == payload
+    assert json_response(payload, compact=True).get_json() == {'risk': '🔴 HIGH', 'values': [1, 2],
+                                                               'nested': [{'score': 0.5}]}
+
+
+def test_orjson_serializes_numpy_and_writes_utf8(app_context):
+    pytest.importorskip('orjson')
+    response = json_response({'codes': np.array([0, 2]), 'p': np.float32(0.25), 'label': '🟢'})
+    assert response.get_json() == {'codes': [0, 2], 'p': 0.25, 'label': '🟢'}
+    assert '🟢'.encode() in response.get_data()
+
+
+def test_api_rejects_invalid_fields_with_the_schema(monkeypatch):
+    monkeypatch.setitem(api._load_state, 'ready', True)
+    client = api.app.test_client()
+    response = client.post('/hotspot_analysis', json={'latitude': 95, 'radius_km': 'far'})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert {e['field'] for e in body['errors']} == {'latitude', 'longitude', 'radius_km'}
+    assert body['fields'] == HOTSPOT_SCHEMA.describe()
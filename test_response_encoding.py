@@ -0,0 +1,103 @@
+"""
+Unit tests for Arrow IPC / MessagePack content negotiation (response_encoding.py) and columnar API responses
+    python -m pytest test_response_encoding.py
+"""
+import json
+
+import numpy as np
+import pytest
+from flask import Flask, request
+
+import prediction_api as api
+import response_encoding
+from response_encoding import columnar_response, encode_arrow, encode_msgpack, negotiate_format
+from spatial_analysis import HotspotAnalyzer
+
+app = Flask(__name__)
+
+COLUMNS = {
+    'severity_code': np.array([0, 2, 1], dtype=np.int64),
+    'probabilities': np.array([[0.7, 0.2, 0.1], [0.1, 0.3, 0.6], [0.2, 0.5, 0.3]], dtype=np.float32),
+    'name': ['Marine Drive', 'NH48', 'Ring Road']
+}
+META = {'labels': ['Minor', 'Serious', 'Fatal'], 'count': 3}
+
+
+@pytest.mark.parametrize('query, accept, expected', [
+    ('', None, 'json'),
+    ('', 'application/vnd.apache.arrow.stream', 'arrow'),
+    ('', 'application/x-msgpack', 'msgpack'),
+    ('', 'text/html, application/json;q=0.9', 'json'),
+    ('?format=arrow', 'application/msgpack', 'arrow'),
+])
+def test_negotiate_format(query, accept, expected):
+    if expected == 'msgpack':
+        pytest.importorskip('msgpack')
+    headers = {'Accept': accept} if accept else {}
+    with app.test_request_context(f'/{query}', headers=headers):
+        assert negotiate_format(request) == expected
+
+
+def test_unknown_or_missing_format_is_rejected(monkeypatch):
+    monkeypatch.setattr(response_encoding, 'msgpack', None)
+    for fmt in ('xml', 'msgpack'):
+        with app.test_request_context(f'/?format={fmt}'):
+            with pytest.raises(ValueError, match='Unsupported format'):
+                negotiate_format(request)
+    with app.test_request_context('/', headers={'Accept': 'application/msgpack'}):
+        assert negotiate_format(request) == 'json'
+
+
+def test_arrow_round_trip():
+    pa = pytest.importorskip('pyarrow')
+    table = pa.ipc.open_stream(encode_arrow(COLUMNS, META)).read_all()
+    assert table.column('severity_code').to_pylist() == [0, 2, 1]
+    probabilities = np.asarray(table.column('probabilities').combine_chunks().flatten()).reshape(-1, 3)
+    assert np.array_equal(probabilities, COLUMNS['probabilities'])
+    assert table.column('name').to_pylist() == COLUMNS['name']
+    assert json.loads(table.schema.metadata[b'meta']) == META
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip('msgpack')
+    body = msgpack.unpackb(encode_msgpack(COLUMNS, META))
+    assert body['meta'] == META and body['columns']['name'] == COLUMNS['name']
+    for name in ('severity_code', 'probabilities'):
+        column = body['columns'][name]
+        values = np.frombuffer(column['data'], dtype=column['dtype']).reshape(column['shape'])
+        assert np.array_equal(values, COLUMNS[name]) and values.dtype == COLUMNS[name].dtype
+
+
+def test_columnar_response_sets_mime_type():
+    pytest.importorskip('pyarrow')
+    with app.app_context():
+        assert columnar_response(COLUMNS, META, 'arrow').mimetype == 'application/vnd.apache.arrow.stream'
+        with pytest.raises(ValueError, match='No columnar encoding'):
+            columnar_response(COLUMNS, META, 'json')
+
+
+@pytest.fixture
+def hotspot_api(monkeypatch):
+    analyzer = HotspotAnalyzer(csv_path='asia_accident_hotspots_enhanced.csv', verbose=False)
+    monkeypatch.setattr(api, 'hotspot_analyzer', analyzer)
+    monkeypatch.setattr(api, 'hotspot_router', None)
+    monkeypatch.setitem(api._load_state, 'ready', True)
+    return api.app.test_client(), analyzer
+
+
+def test_hotspot_analysis_columns_match_json(hotspot_api):
+    pa = pytest.importorskip('pyarrow')
+    client, analyzer = hotspot_api
+    body = {'latitude': 19.07, 'longitude': 72.88, 'radius_km': 300}
+    response = client.post('/hotspot_analysis', json=body, headers={'Accept': 'application/vnd.apache.arrow.stream'})
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.get_data()).read_all()
+    expected = analyzer.find_nearby_hotspots_indexed(19.07, 72.88, 300)
+    assert table.column('hotspot_id').to_pylist() == [i for i, _ in expected]
+    assert table.column('distance_km').to_pylist() == [h['distance_km'] for _, h in expected]
+    meta = json.loads(table.schema.metadata[b'meta'])
+    bands = [meta['risk_bands'][b] for b in table.column('risk_band').to_pylist()]
+    assert bands == [h['risk_level'] for _, h in expected]
+    summary = client.post('/hotspot_analysis', json=body).get_json()['hotspot_analysis']
+    assert meta['overall_risk_level'] == summary['overall_risk_level']
+    assert client.post('/hotspot_analysis?format=xml', json=body).status_code == 406
@@ -0,0 +1,113 @@
+"""
+Unit tests for the precomputed severity table (severity_table.py)
+    python -m pytest test_severity_table.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from severity_table import SeverityTable, _decode_keys, compile_table, split_holdout
+
+
+class RowSumModel:
+    """Deterministic stand-in for a classifier: probabilities derived from the feature row sum"""
+
+    classes_ = np.array([0, 1, 2])
+
+    def __init__(self):
+        self.rows_seen = 0
+
+    def predict_proba(self, X):
+        s = np.asarray(X, dtype=np.float64).sum(axis=1)
+        self.rows_seen += len(s)
+        raw = np.stack([s % 3 + 1, s % 5 + 1, s % 7 + 1], axis=1)
+        return raw / raw.sum(axis=1, keepdims=True)
+
+
+FEATURES = ['a', 'b', 'c']
+DOMAINS = {'a': [0, 1, 2], 'b': [1, 3, 4, 5], 'c': [0, 1]}
+
+
+def test_keys_round_trip_through_decode():
+    table = compile_table(RowSumModel(), FEATURES, DOMAINS)
+    rows = _decode_keys(np.arange(table.space_size, dtype=np.int64), table)
+    keys, in_domain = table.encode_keys(rows)
+    assert in_domain.all()
+    assert np.array_equal(keys, np.arange(table.space_size))
+    assert table.space_size == len(table.keys) == 24
+
+
+def test_out_of_domain_rows_miss():
+    table = compile_table(RowSumModel(), FEATURES, DOMAINS)
+    _, in_domain = table.encode_keys(np.array([[0, 2, 0], [3, 1, 0], [1, 5, 1]]))
+    assert in_domain.tolist() == [False, False, True]
+    _, hit = table.lookup(np.array([[0, 2, 0], [1, 5, 1]]))
+    assert hit.tolist() == [False, True]
+
+
+def test_predict_proba_falls_back_to_model_for_misses():
+    model = RowSumModel()
+    rows = np.array([[0, 1, 0], [2, 4, 1]])
+    table = compile_table(model, FEATURES, DOMAINS, rows=rows)
+    assert len(table.keys) == 2
+
+    X = pd.DataFrame([[0, 1, 0], [1, 3, 1], [2, 4, 1], [9, 9, 9]], columns=FEATURES)
+    model.rows_seen = 0
+    proba = table.predict_proba(X, model)
+    assert model.rows_seen == 2
+    assert np.allclose(proba, RowSumModel().predict_proba(X), atol=1e-6)
+    stats = table.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (2, 2, 0.5)
+
+
+def test_save_load_keeps_model_version(tmp_path):
+    table = compile_table(RowSumModel(), FEATURES, DOMAINS)
+    table.meta = {'model_version': 'abc123', 'coverage': 0.5}
+    table.save(str(tmp_path))
+    loaded = SeverityTable.load(str(tmp_path))
+    assert loaded.matches('abc123') and not loaded.matches('other')
+    assert np.array_equal(loaded.keys, table.keys)
+    X = _decode_keys(table.keys[:5], table)
+    assert np.allclose(loaded.lookup(X)[0], table.lookup(X)[0])
+
+
+def test_exhaustive_compile_skips_unreachable_rush_hours():
+    domains = {'hour': list(range(24)), 'is_rush_hour': [0, 1]}
+    table = compile_table(RowSumModel(), ['hour', 'is_rush_hour'], domains)
+    assert len(table.keys) == 24
+    _, hit = table.lookup(np.array([[8, 1], [8, 0], [12, 0], [12, 1]]))
+    assert hit.tolist() == [True, False, True, False]
+
+
+def test_exhaustive_compile_refuses_oversized_space():
+    with pytest.raises(ValueError, match='combinations'):
+        compile_table(RowSumModel(), FEATURES, DOMAINS, max_rows=10)
+
+
+def test_holdout_split_is_seeded_and_sized():
+    mask = split_holdout(1000, 0.2)
+    assert mask.sum() == 200
+    assert np.array_equal(mask, split_holdout(1000, 0.2))
+    assert not split_holdout(10, 0).any()
+
+
+def test_gazetteer_encoded_requests_hit_the_table():
+    from feature_scoring import build_feature_frame
+    from gazetteer import Gazetteer
+    from severity_table import merge_domains
+
+    gazetteer = Gazetteer([
+        {'name': 'Mumbai', 'kind': 'city', 'code': 4100, 'count': 10},
+        {'name': 'Pune', 'kind': 'city', 'code': 12, 'count': 5},
+        {'name': 'Maharashtra', 'kind': 'state', 'code': 31, 'count': 15}
+    ])
+    features = ['State Name_enc', 'City Name_enc']
+    domains = merge_domains(features, gazetteer=gazetteer)
+    assert domains == {'State Name_enc': [-1, 31], 'City Name_enc': [-1, 12, 4100]}
+    table = compile_table(RowSumModel(), features, domains)
+
+    requests = pd.DataFrame({'State Name': ['Maharashtra', 'Maharashtra', 'Nowhere'],
+                             'City Name': ['Mumbai', 'Atlantis', 'Pune']})
+    X = build_feature_frame(requests, gazetteer=gazetteer)[features]
+    _, hit = table.lookup(X.values)
+    assert hit.all()
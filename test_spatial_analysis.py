@@ -0,0 +1,100 @@
+"""
+Unit tests for route risk scoring, nearby-hotspot search and live hotspot statistics (spatial_analysis.py)
+    python -m pytest test_spatial_analysis.py
+"""
+import numpy as np
+import pytest
+
+from spatial_analysis import HotspotAnalyzer
+
+
+KM_PER_DEGREE = 2 * np.pi * 6371 / 360
+
+
+@pytest.fixture
+def analyzer():
+    a = HotspotAnalyzer(csv_path='missing.csv', verbose=False)
+    a.asia_hotspots = [
+        {'name': 'Origin', 'lat': 0.0, 'lon': 0.0, 'count': 100, 'severity': 'HIGH'},
+        {'name': 'Far East', 'lat': 0.0, 'lon': 5.0, 'count': 50, 'severity': 'MEDIUM'}
+    ]
+    return a
+
+
+def test_route_breakdown_splits_a_long_segment_by_distance(analyzer):
+    # One straight 2-point segment leaving a hotspot: 0-10 km, 10-50 km and 50+ km stretches
+    result = analyzer.get_route_risk([0.0, 0.0], [0.0, 90 / KM_PER_DEGREE], step_km=1.0)
+    breakdown = result['risk_breakdown_km']
+    assert result['total_length_km'] == pytest.approx(90, abs=0.01)
+    assert breakdown['HIGH CRITICAL RED ZONE'] == pytest.approx(10, abs=1.0)
+    assert breakdown['CRITICAL ZONE'] == pytest.approx(40, abs=1.0)
+    assert breakdown['MEDIUM RISK ZONE'] == pytest.approx(40, abs=1.0)
+    assert sum(breakdown.values()) == pytest.approx(result['total_length_km'], abs=0.01)
+    assert sum(result['risk_breakdown_pct'].values()) == pytest.approx(100, abs=0.05)
+    # The segment itself is still reported at its closest point
+    assert result['segments'][0]['risk_level'] == 'HIGH CRITICAL RED ZONE'
+    assert result['segments'][0]['closest_hotspot'] == 'Origin'
+
+
+def test_route_breakdown_resolution_follows_step(analyzer):
+    lons = [0.0, 30 / KM_PER_DEGREE, 60 / KM_PER_DEGREE]
+    coarse = analyzer.get_route_risk([0.0, 0.0, 0.0], lons, step_km=30.0)['risk_breakdown_km']
+    fine = analyzer.get_route_risk([0.0, 0.0, 0.0], lons, step_km=0.5)['risk_breakdown_km']
+    assert coarse == {'HIGH CRITICAL RED ZONE': pytest.approx(30, abs=0.01),
+                      'CRITICAL ZONE': pytest.approx(30, abs=0.01)}
+    assert fine['HIGH CRITICAL RED ZONE'] == pytest.approx(10, abs=0.5)
+    assert fine['CRITICAL ZONE'] == pytest.approx(40, abs=0.5)
+    assert fine['MEDIUM RISK ZONE'] == pytest.approx(10, abs=0.5)
+
+
+def test_nearby_hotspots_match_scalar_haversine(analyzer):
+    nearby = analyzer.find_nearby_hotspots_indexed(0.0, 1.0, radius_km=500)
+    assert [i for i, _ in nearby] == [0, 1]
+    for i, hotspot in nearby:
+        source = analyzer.asia_hotspots[i]
+        expected = analyzer.haversine(0.0, 1.0, source['lat'], source['lon'])
+        assert hotspot['distance_km'] == round(expected, 2)
+        assert hotspot['risk_level'] == analyzer.classify_distance_based_risk(expected)['risk_level']
+    assert analyzer.find_nearby_hotspots(0.0, 1.0, radius_km=200) == [nearby[0][1]]
+
+
+def test_refresh_copies_only_touched_hotspots(analyzer):
+    before = analyzer._index
+    attributed = analyzer.add_accidents([0.1, -0.1, np.nan], [0.1, -0.1, 0.0], ['Fatal', 'Minor', 'Fatal'])
+    assert attributed == 2
+    assert analyzer._index is before and analyzer.live_stats()['pending_accidents'] == 2
+
+    result = analyzer.refresh()
+    assert result == {'updated_hotspots': 1, 'new_hotspots': 0, 'version': before.version + 1}
+    origin = analyzer.asia_hotspots[0]
+    assert origin['count'] == 102 and origin['live_count'] == 2
+    assert origin['severity_mix'] == {'Minor': 1, 'Serious': 0, 'Fatal': 1}
+    assert origin['lat'] == pytest.approx(0.0) and origin['fatality_rate'] == 0.5
+    # the previous snapshot is untouched and the other hotspot is shared, not copied
+    assert before.hotspots[0]['count'] == 100 and 'live_count' not in before.hotspots[0]
+    assert analyzer.asia_hotspots[1] is before.hotspots[1]
+    assert analyzer.live_stats()['pending_accidents'] == 0
+
+
+def test_far_accidents_promote_a_cell_to_a_hotspot(analyzer):
+    lats = np.full(HotspotAnalyzer.LIVE_PROMOTE_COUNT, 10.1)
+    lons = np.full(HotspotAnalyzer.LIVE_PROMOTE_COUNT, 10.1)
+    assert analyzer.add_accidents(lats[:-1], lons[:-1], ['Serious'] * (len(lats) - 1)) == 0
+    assert analyzer.refresh()['new_hotspots'] == 0
+    assert analyzer.live_stats()['unassigned_accidents'] == len(lats) - 1
+
+    analyzer.add_accidents(lats[-1:], lons[-1:], ['Fatal'])
+    assert analyzer.refresh()['new_hotspots'] == 1
+    live = analyzer.asia_hotspots[2]
+    assert live['source'] == 'live' and live['count'] == HotspotAnalyzer.LIVE_PROMOTE_COUNT
+    assert (live['lat'], live['lon']) == (pytest.approx(10.1), pytest.approx(10.1))
+    assert live['severity'] == 'MEDIUM'
+    assert analyzer.find_nearby_hotspots(10.1, 10.1, radius_km=5)[0]['name'] == live['name']
+
+    # later accidents nearby update the promoted hotspot instead of opening a new cell
+    analyzer.add_accidents([10.12], [10.08], ['Minor'])
+    analyzer.refresh()
+    stats = analyzer.live_stats()
+    assert analyzer.asia_hotspots[2]['count'] == HotspotAnalyzer.LIVE_PROMOTE_COUNT + 1
+    assert (stats['hotspots'], stats['promoted_hotspots'], stats['pending_cells']) == (3, 1, 0)
+    assert stats['accidents_added'] == HotspotAnalyzer.LIVE_PROMOTE_COUNT + 1
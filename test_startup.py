@@ -0,0 +1,48 @@
+"""
+Unit tests for lazy imports and deferred resource loading (prediction_api.py, bench_startup.py)
+    python -m pytest test_startup.py
+"""
+import time
+
+import pytest
+
+import prediction_api as api
+from bench_startup import measure
+
+
+@pytest.mark.parametrize('module', ['spatial_analysis', 'prediction_api'])
+def test_import_does_not_pull_in_heavy_modules(module):
+    result = measure(module, runs=1)
+    assert result['heavy_loaded'] == []
+
+
+@pytest.fixture
+def cold_api(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, '_load_state', {'ready': False, 'loading': False, 'error': None,
+                                             'load_seconds': None, 'model_variant': None})
+    monkeypatch.setattr(api, 'MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(api, 'model', None)
+    return api.app.test_client()
+
+
+def test_resource_free_endpoints_answer_without_loading(cold_api):
+    assert cold_api.get('/').status_code == 200
+    assert api._load_state == {'ready': False, 'loading': False, 'error': None, 'load_seconds': None,
+                               'model_variant': None}
+    assert api.model is None
+
+
+def test_ready_starts_loading_and_reports_failures(cold_api):
+    response = cold_api.get('/ready')
+    assert response.status_code == 503
+    deadline = time.time() + 10
+    while api._load_state['loading'] and time.time() < deadline:
+        time.sleep(0.05)
+    body = cold_api.get('/ready').get_json()
+    assert not body['ready'] and 'best_model.joblib' in body['error']
+
+
+def test_model_endpoints_load_on_first_use(cold_api):
+    response = cold_api.post('/predict', json={})
+    assert response.status_code == 500
+    assert api._load_state['error'] is not None and not api._load_state['loading']
@@ -0,0 +1,67 @@
+"""
+Unit tests for the chunk-independent splits of out-of-core training (train_out_of_core.py)
+    python -m pytest test_train_out_of_core.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from train_out_of_core import (SPLIT_TEST, SPLIT_TRAIN, SPLIT_VAL, TARGET, iter_training_chunks, prepare_chunk,
+                               scan_statistics, select_feature_columns, split_ids)
+
+
+def test_split_ids_independent_of_chunking():
+    whole = split_ids(0, 10000)
+    for size in (1, 7, 999, 4096):
+        parts = np.concatenate([split_ids(start, min(size, 10000 - start)) for start in range(0, 10000, size)])
+        assert np.array_equal(parts, whole)
+
+
+def test_split_ids_fractions():
+    splits = split_ids(0, 100000, test_size=0.2, val_size=0.15)
+    counts = np.bincount(splits, minlength=3) / len(splits)
+    assert counts[SPLIT_TEST] == pytest.approx(0.2, abs=0.005)
+    assert counts[SPLIT_VAL] == pytest.approx(0.15, abs=0.005)
+    assert counts[SPLIT_TRAIN] == pytest.approx(0.65, abs=0.005)
+    assert not np.isin(split_ids(0, 1000, test_size=0.0, val_size=0.0), [SPLIT_TEST, SPLIT_VAL]).any()
+
+
+@pytest.fixture
+def featured_csv(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 1000
+    df = pd.DataFrame({'hour': rng.integers(0, 24, n), 'weather_score': rng.integers(1, 6, n),
+                       'City Name_enc': rng.integers(0, 50, n), 'Accident Severity_enc': rng.integers(0, 3, n),
+                       'Number of Casualties': rng.integers(0, 5, n), TARGET: rng.integers(0, 3, n).astype(float)})
+    df.loc[rng.choice(n, 100, replace=False), TARGET] = np.nan
+    path = tmp_path / 'featured.csv'
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def test_feature_selection_matches_retrain():
+    columns = ['hour', 'weather_score', 'City Name_enc', 'Accident Severity_enc', 'Number of Casualties', TARGET]
+    assert select_feature_columns(columns) == ['hour', 'weather_score', 'City Name_enc']
+
+
+def test_row_splits_survive_rechunking_with_unlabeled_rows(featured_csv):
+    path, df = featured_csv
+    features = ['hour', 'weather_score', 'City Name_enc']
+    means = df[features].mean()
+    expected = split_ids(0, len(df))[df[TARGET].notna().to_numpy()]
+    for chunksize in (64, 333, 1000):
+        splits = [prepare_chunk(first, chunk, features, means, 0.2, 0.15)[2]
+                  for first, chunk in iter_training_chunks([path], features + [TARGET], chunksize)]
+        assert np.array_equal(np.concatenate(splits), expected)
+
+
+def test_scan_statistics_counts_labeled_training_rows(featured_csv):
+    path, df = featured_csv
+    stats = scan_statistics([path], ['hour'], 250, 0.2, 0.15)
+    labeled = df[TARGET].notna().to_numpy()
+    splits = split_ids(0, len(df))[labeled]
+    assert sum(stats['rows'].values()) == labeled.sum()
+    assert stats['rows']['train'] == int((splits == SPLIT_TRAIN).sum())
+    train_labels = df[TARGET].to_numpy()[labeled][splits == SPLIT_TRAIN]
+    assert stats['class_counts'] == {int(c): int((train_labels == c).sum()) for c in np.unique(train_labels)}
+    assert stats['means']['hour'] == pytest.approx(df.loc[labeled, 'hour'].mean())
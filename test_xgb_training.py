@@ -0,0 +1,55 @@
+"""
+Unit tests for the XGBoost training stage (xgb_training.py)
+    python -m pytest test_xgb_training.py
+"""
+import numpy as np
+import pytest
+from sklearn.metrics import log_loss
+from sklearn.model_selection import train_test_split
+from sklearn.utils.class_weight import compute_sample_weight
+
+from xgb_training import early_stopping_params, fit_xgboost
+
+PARAMS = dict(n_estimators=40, max_depth=4, learning_rate=0.3, random_state=42, n_jobs=1,
+              eval_metric='mlogloss', verbosity=0)
+
+
+@pytest.fixture(scope='module')
+def noisy():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1500, 6))
+    y = (X[:, 0] + rng.normal(scale=1.5, size=1500) > 0).astype(int) + (X[:, 1] > 1.2)
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+
+def test_early_stopping_params_switch_to_hist():
+    params = early_stopping_params(PARAMS, max_rounds=500, early_stopping_rounds=10)
+    assert params['tree_method'] == 'hist' and params['n_estimators'] == 500
+    assert params['early_stopping_rounds'] == 10
+    assert 'tree_method' not in PARAMS and PARAMS['n_estimators'] == 40
+
+
+def test_stops_before_max_rounds_on_noisy_labels(noisy):
+    X_fit, X_val, y_fit, y_val = noisy
+    params = early_stopping_params(PARAMS, max_rounds=1000, early_stopping_rounds=10)
+    model, seconds, best_iteration = fit_xgboost(params, X_fit, y_fit, validation=(X_val, y_val))
+    assert seconds > 0 and best_iteration is not None
+    assert model.get_booster().num_boosted_rounds() == best_iteration + 11 < 1000
+    losses = model.evals_result()['validation_0']['mlogloss']
+    assert int(np.argmin(losses)) == best_iteration
+
+
+def test_fixed_mode_trains_every_round(noisy):
+    X_fit, _, y_fit, _ = noisy
+    model, _, best_iteration = fit_xgboost(PARAMS, X_fit, y_fit)
+    assert best_iteration is None and model.get_booster().num_boosted_rounds() == 40
+
+
+def test_weighted_training_weights_the_validation_set(noisy):
+    X_fit, X_val, y_fit, y_val = noisy
+    params = early_stopping_params(PARAMS, max_rounds=200, early_stopping_rounds=10)
+    model, _, _ = fit_xgboost(params, X_fit, y_fit, np.where(y_fit == 2, 5.0, 1.0), (X_val, y_val))
+    rounds = model.get_booster().num_boosted_rounds()
+    proba = model.predict_proba(X_val, iteration_range=(0, rounds))
+    expected = log_loss(y_val, proba, sample_weight=compute_sample_weight('balanced', y_val))
+    assert model.evals_result()['validation_0']['mlogloss'][-1] == pytest.approx(expected, rel=1e-4)
@@ -0,0 +1,320 @@
+import argparse
+import glob
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from chunked_io import is_parquet, iter_chunks
+
+
+TARGET = 'target'
+CLASS_NAMES = ['Minor', 'Serious', 'Fatal']
+
+# Split by a multiplicative hash of the global row number: independent of chunk size and file layout
+SPLIT_TEST, SPLIT_VAL, SPLIT_TRAIN = 0, 1, 2
+
+# retrain_model.py XGBoost settings, as native parameters
+XGB_PARAMS = {
+    'objective': 'multi:softprob',
+    'eval_metric': 'mlogloss',
+    'tree_method': 'hist',
+    'max_depth': 8,
+    'eta': 0.1,
+    'min_child_weight': 1,
+    'gamma': 0.1,
+    'subsample': 0.9,
+    'colsample_bytree': 0.9,
+    'seed': 42,
+    'verbosity': 0
+}
+
+
+def select_feature_columns(columns):
+    """Same selection as retrain_model.py: *_enc / *_score plus the time and alcohol flags"""
+    features = [c for c in columns
+                if (c.endswith(('_enc', '_score')) and c != 'Accident Severity_enc')
+                or c in ('hour', 'is_weekend', 'is_rush_hour', 'alcohol_flag')]
+    leaks = {'Number of Vehicles Involved', 'Number of Casualties', 'Number of Fatalities', 'Speed Limit (km/h)'}
+    return [c for c in features if c not in leaks]
+
+
+def training_sources(data, ingest_store=None):
+    """The featured CSV/Parquet file plus every part file of the ingest store"""
+    sources = [data]
+    if ingest_store and os.path.isdir(ingest_store):
+        sources += sorted(glob.glob(os.path.join(ingest_store, 'part-*.parquet')))
+    return sources
+
+
+def source_columns(path):
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_training_chunks(sources, columns, chunksize):
+    """(first global row number, chunk) over all sources; columns missing from a source come back as NaN"""
+    row = 0
+    for path in sources:
+        present = [c for c in columns if c in set(source_columns(path))]
+        for chunk in iter_chunks(path, chunksize, present):
+            yield row, chunk.reindex(columns=columns)
+            row += len(chunk)
+
+
+def split_ids(first_row, n, test_size=0.2, val_size=0.15):
+    rows = np.arange(first_row, first_row + n, dtype=np.uint64)
+    u = ((rows * np.uint64(2654435761)) % np.uint64(2 ** 32)).astype(np.float64) / 2 ** 32
+    return np.where(u < test_size, SPLIT_TEST, np.where(u < test_size + val_size, SPLIT_VAL, SPLIT_TRAIN))
+
+
+def labeled_rows(first_row, chunk, test_size, val_size):
+    """Rows with a target and their splits; splits come from global row numbers before unlabeled rows are dropped"""
+    splits = split_ids(first_row, len(chunk), test_size, val_size)
+    labeled = chunk[TARGET].notna().to_numpy()
+    return chunk[labeled], splits[labeled]
+
+
+def scan_statistics(sources, feature_cols, chunksize, test_size, val_size):
+    """First pass: column means for fillna and training class counts (for balanced weights)"""
+    sums = np.zeros(len(feature_cols))
+    counts = np.zeros(len(feature_cols))
+    class_counts = {}
+    split_rows = np.zeros(3, dtype=np.int64)
+    for first_row, chunk in iter_training_chunks(sources, feature_cols + [TARGET], chunksize):
+        chunk, splits = labeled_rows(first_row, chunk, test_size, val_size)
+        values = chunk[feature_cols].to_numpy(dtype=np.float64)
+        sums += np.nansum(values, axis=0)
+        counts += (~np.isnan(values)).sum(axis=0)
+        split_rows += np.bincount(splits, minlength=3)
+        for label, count in chunk.loc[splits == SPLIT_TRAIN, TARGET].astype(int).value_counts().items():
+            class_counts[int(label)] = class_counts.get(int(label), 0) + int(count)
+    means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    return {'means': dict(zip(feature_cols, means)), 'class_counts': class_counts,
+            'rows': {'test': int(split_rows[SPLIT_TEST]), 'val': int(split_rows[SPLIT_VAL]),
+                     'train': int(split_rows[SPLIT_TRAIN])}}
+
+
+def prepare_chunk(first_row, chunk, feature_cols, means, test_size, val_size):
+    chunk, splits = labeled_rows(first_row, chunk, test_size, val_size)
+    X = chunk[feature_cols].fillna(means).astype(np.float32)
+    return X, chunk[TARGET].astype(np.int32).to_numpy(), splits
+
+
+def make_chunk_iter(sources, feature_cols, means, chunksize, split, class_weights, cache_prefix,
+                    test_size, val_size):
+    """xgboost.DataIter feeding one split chunk by chunk; XGBoost pages it to cache_prefix (external memory)"""
+    import xgboost as xgb
+
+    class ChunkIter(xgb.DataIter):
+        def __init__(self):
+            self._chunks = None
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            if self._chunks is None:
+                self._chunks = iter_training_chunks(sources, feature_cols + [TARGET], chunksize)
+            for first_row, chunk in self._chunks:
+                X, y, splits = prepare_chunk(first_row, chunk, feature_cols, means, test_size, val_size)
+                mask = splits == split
+                if mask.any():
+                    weight = np.array([class_weights.get(int(c), 1.0) for c in range(max(class_weights) + 1)])[y[mask]]
+                    input_data(data=X[mask], label=y[mask], weight=weight)
+                    return 1
+            return 0
+
+        def reset(self):
+            self._chunks = None
+
+    return ChunkIter()
+
+
+def weighted_scores(confusion):
+    """Accuracy and support-weighted F1 from a confusion matrix (rows = true class)"""
+    tp = np.diag(confusion).astype(np.float64)
+    support = confusion.sum(axis=1)
+    precision = np.divide(tp, confusion.sum(axis=0), out=np.zeros_like(tp), where=confusion.sum(axis=0) > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp), where=(precision + recall) > 0)
+    return float(tp.sum() / confusion.sum()), float((f1 * support).sum() / support.sum())
+
+
+def evaluate_streaming(booster, sources, feature_cols, means, chunksize, num_class, test_size, val_size):
+    """Confusion matrix on the test split, predicted chunk by chunk"""
+    import xgboost as xgb
+
+    confusion = np.zeros((num_class, num_class), dtype=np.int64)
+    for first_row, chunk in iter_training_chunks(sources, feature_cols + [TARGET], chunksize):
+        X, y, splits = prepare_chunk(first_row, chunk, feature_cols, means, test_size, val_size)
+        mask = splits == SPLIT_TEST
+        if mask.any():
+            pred = booster.predict(xgb.DMatrix(X[mask])).argmax(axis=1)
+            np.add.at(confusion, (y[mask], pred), 1)
+    return confusion
+
+
+def current_rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def as_classifier(booster, num_class, params):
+    """Wrap a native booster as an XGBClassifier so the API / batch scorer can load it like best_model.joblib"""
+    from xgboost import XGBClassifier
+
+    model = XGBClassifier(objective='multi:softprob', max_depth=params['max_depth'],
+                          learning_rate=params['eta'], n_estimators=booster.num_boosted_rounds())
+    model._Booster = booster
+    model.n_classes_ = num_class
+    model.classes_ = np.arange(num_class)
+    return model
+
+
+def train_in_memory(sources, feature_cols, means, class_weights, params, max_rounds, early_stopping_rounds,
+                    test_size, val_size):
+    """Reference run on the same split, fill values and weights with the whole dataset in memory"""
+    import xgboost as xgb
+
+    frames = [prepare_chunk(first_row, chunk, feature_cols, means, test_size, val_size)
+              for first_row, chunk in iter_training_chunks(sources, feature_cols + [TARGET], 10 ** 9)]
+    X = pd.concat([f[0] for f in frames])
+    y = np.concatenate([f[1] for f in frames])
+    splits = np.concatenate([f[2] for f in frames])
+    weights = np.array([class_weights.get(int(c), 1.0) for c in y])
+    train, val, test = splits == SPLIT_TRAIN, splits == SPLIT_VAL, splits == SPLIT_TEST
+    booster = xgb.train(params, xgb.DMatrix(X[train], label=y[train], weight=weights[train]), max_rounds,
+                        evals=[(xgb.DMatrix(X[val], label=y[val], weight=weights[val]), 'val')],
+                        early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+    pred = booster.predict(xgb.DMatrix(X[test]), iteration_range=(0, booster.best_iteration + 1)).argmax(axis=1)
+    confusion = np.zeros((params['num_class'], params['num_class']), dtype=np.int64)
+    np.add.at(confusion, (y[test], pred), 1)
+    return booster, confusion
+
+
+def train_out_of_core(data, ingest_store=None, model_dir='models', model_file='ooc_model.joblib',
+                      chunksize=100000, threads=-1, max_rounds=1000, early_stopping_rounds=30,
+                      test_size=0.2, val_size=0.15, cache_dir='cache/xgb_external', compare=False):
+    """
+    Train XGBoost from chunked training data without materializing it:
+    pass 1 streams fill means and class counts, then train/validation DMatrix are built from a DataIter and
+    paged to disk by XGBoost; the test split is scored chunk by chunk. Memory is bounded by chunksize
+    """
+    import joblib
+    import xgboost as xgb
+
+    start_rss = current_rss_mb()
+    start = time.perf_counter()
+    sources = training_sources(data, ingest_store)
+    feature_cols = select_feature_columns(source_columns(sources[0]))
+
+    print("\n1️⃣ Pass 1: streaming fill statistics...")
+    stats = scan_statistics(sources, feature_cols, chunksize, test_size, val_size)
+    means = stats['means']
+    num_class = max(stats['class_counts']) + 1
+    train_rows = sum(stats['class_counts'].values())
+    # Balanced class weights (the sample-weight balancing of retrain_model.py); SMOTE needs all rows in memory
+    class_weights = {c: train_rows / (num_class * n) for c, n in stats['class_counts'].items()}
+    print(f"   ✓ {sum(stats['rows'].values()):,} rows | train {stats['rows']['train']:,} | "
+          f"val {stats['rows']['val']:,} | test {stats['rows']['test']:,} | {len(feature_cols)} features")
+
+    print("\n2️⃣ Pass 2: XGBoost external-memory training...")
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_root = tempfile.mkdtemp(dir=cache_dir)
+    params = dict(XGB_PARAMS, num_class=num_class, nthread=threads if threads and threads > 0 else os.cpu_count())
+    try:
+        common = (sources, feature_cols, means, chunksize)
+        train_matrix = xgb.DMatrix(make_chunk_iter(*common, SPLIT_TRAIN, class_weights,
+                                                   os.path.join(cache_root, 'train'), test_size, val_size))
+        val_matrix = xgb.DMatrix(make_chunk_iter(*common, SPLIT_VAL, class_weights,
+                                                 os.path.join(cache_root, 'val'), test_size, val_size))
+        train_start = time.perf_counter()
+        booster = xgb.train(params, train_matrix, max_rounds, evals=[(val_matrix, 'val')],
+                            early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+        train_seconds = time.perf_counter() - train_start
+        cache_bytes = sum(os.path.getsize(p) for p in glob.glob(os.path.join(cache_root, '*')))
+        del train_matrix, val_matrix
+    finally:
+        shutil.rmtree(cache_root, ignore_errors=True)
+    booster = booster[:booster.best_iteration + 1]
+    print(f"   ✓ {booster.num_boosted_rounds()} rounds (early stopping) in {train_seconds:.1f}s | "
+          f"disk cache {cache_bytes / 1024 ** 2:.1f} MB")
+
+    print("\n3️⃣ Streaming evaluation on the test split...")
+    confusion = evaluate_streaming(booster, sources, feature_cols, means, chunksize, num_class, test_size, val_size)
+    accuracy, f1 = weighted_scores(confusion)
+    peak = peak_rss_mb()
+    print(f"   ✓ Accuracy {accuracy:.4f} | F1 {f1:.4f}")
+    print(f"   ✓ Memory: RSS {start_rss:.0f} MB at start, peak {peak:.0f} MB (chunksize {chunksize:,})")
+
+    model = as_classifier(booster, num_class, params)
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(model_dir, model_file))
+    if model_file == 'best_model.joblib':
+        joblib.dump(feature_cols, os.path.join(model_dir, 'feature_names.joblib'))
+    report = {
+        'model_file': model_file,
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sources': sources,
+        'feature_names': feature_cols,
+        'rows': stats['rows'],
+        'class_weights': class_weights,
+        'chunksize': chunksize,
+        'rounds': booster.num_boosted_rounds(),
+        'accuracy': accuracy,
+        'f1_weighted': f1,
+        'confusion_matrix': confusion.tolist(),
+        'train_seconds': round(train_seconds, 2),
+        'total_seconds': round(time.perf_counter() - start, 2),
+        'start_rss_mb': round(start_rss, 1),
+        'peak_rss_mb': round(peak, 1),
+        'disk_cache_mb': round(cache_bytes / 1024 ** 2, 2)
+    }
+
+    if compare:
+        print("\n4️⃣ In-memory reference (same split, fill values and weights)...")
+        _, reference = train_in_memory(sources, feature_cols, means, class_weights, params, max_rounds,
+                                       early_stopping_rounds, test_size, val_size)
+        ref_accuracy, ref_f1 = weighted_scores(reference)
+        report['in_memory'] = {'accuracy': ref_accuracy, 'f1_weighted': ref_f1, 'peak_rss_mb': round(peak_rss_mb(), 1)}
+        print(f"   ✓ In-memory accuracy {ref_accuracy:.4f} | F1 {ref_f1:.4f} "
+              f"(out-of-core delta {accuracy - ref_accuracy:+.4f} / {f1 - ref_f1:+.4f})")
+
+    from report_model import save_json
+    save_json(report, os.path.join(model_dir, 'ooc_metrics.json'))
+    print(f"\n✅ Saved {os.path.join(model_dir, model_file)} and ooc_metrics.json")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Out-of-core XGBoost training from chunked CSV/Parquet data')
+    parser.add_argument('--data', default='featured_data.csv')
+    parser.add_argument('--ingest-store', default=None, help='Also stream the Parquet parts of the ingest store')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--model-file', default='ooc_model.joblib',
+                        help="best_model.joblib replaces the served model (and writes feature_names.joblib)")
+    parser.add_argument('--chunksize', type=int, default=100000)
+    parser.add_argument('--threads', type=int, default=-1)
+    parser.add_argument('--max-rounds', type=int, default=1000)
+    parser.add_argument('--early-stopping-rounds', type=int, default=30)
+    parser.add_argument('--cache-dir', default='cache/xgb_external')
+    parser.add_argument('--compare', action='store_true',
+                        help='Also train in memory on the same split and report the accuracy difference')
+    args = parser.parse_args(argv)
+    return train_out_of_core(args.data, args.ingest_store, args.model_dir, args.model_file, args.chunksize,
+                             args.threads, args.max_rounds, args.early_stopping_rounds,
+                             cache_dir=args.cache_dir, compare=args.compare)
+
+
+if __name__ == '__main__':
+    main()
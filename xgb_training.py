@@ -0,0 +1,44 @@
+import time
+
+from xgboost import XGBClassifier
+
+
+# retrain_model.py XGBoost settings (--xgb-mode fixed trains all 200 rounds)
+XGB_PARAMS = dict(
+    n_estimators=200,
+    max_depth=8,
+    learning_rate=0.1,
+    min_child_weight=1,
+    gamma=0.1,
+    subsample=0.9,
+    colsample_bytree=0.9,
+    random_state=42,
+    eval_metric='mlogloss',
+    verbosity=0
+)
+
+
+def early_stopping_params(params, max_rounds, early_stopping_rounds):
+    """XGBClassifier parameters for hist training that stops early on a validation set"""
+    return dict(params, tree_method='hist', n_estimators=max_rounds, early_stopping_rounds=early_stopping_rounds)
+
+
+def fit_xgboost(params, X, y, sample_weight=None, validation=None):
+    """
+    Fit an XGBClassifier; validation=(X_val, y_val) is the early-stopping eval set
+    When the training rows carry balancing weights, the validation rows get balanced weights too
+    Returns (model, fit seconds, best iteration or None)
+    """
+    fit_params = {} if sample_weight is None else {'sample_weight': sample_weight}
+    if validation is not None:
+        X_val, y_val = validation
+        fit_params.update(eval_set=[(X_val, y_val)], verbose=False)
+        if sample_weight is not None:
+            from sklearn.utils.class_weight import compute_sample_weight
+            fit_params['sample_weight_eval_set'] = [compute_sample_weight('balanced', y_val)]
+    model = XGBClassifier(**params)
+    start = time.perf_counter()
+    model.fit(X, y, **fit_params)
+    seconds = time.perf_counter() - start
+    best_iteration = getattr(model, 'best_iteration', None) if params.get('early_stopping_rounds') else None
+    return model, seconds, best_iteration